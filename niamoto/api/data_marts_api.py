@@ -18,6 +18,7 @@ from niamoto.data_marts.dimensions.vector_hierarchy_dimension import \
     VectorHierarchyDimension
 from niamoto.data_marts.dimensions.raster_dimension import RasterDimension
 from niamoto.data_marts.dimensional_model import DimensionalModel
+from niamoto.data_marts import populate_scheduler
 from niamoto.api import publish_api
 from niamoto.log import get_logger
 
@@ -253,6 +254,60 @@ def populate_fact_table(fact_table_name, publisher_key, *args,
     fact_table.populate_from_publisher(*args, **kwargs)
 
 
+def refresh_fact_table(fact_table_name, publisher_key, *args, full=False,
+                       **kwargs):
+    """
+    Refresh a registered fact table using an available publisher:
+    incrementally (only the rows changed since the last population or
+    refresh) if the publisher supports it, else truncate and populate.
+    :param fact_table_name: The name of the fact table to refresh.
+    :param publisher_key: The key of the publisher to use for refreshing the
+        fact table.
+    :param full: If True, force a full refresh (truncate and populate).
+    :return: The refresh mode ('incremental', 'full' or 'none') and the
+        number of deleted and inserted rows, see
+        BaseFactTable.refresh_from_publisher.
+    """
+    fact_table = get_fact_table(
+        fact_table_name,
+        publisher_cls=publish_api.get_publisher_class(publisher_key)
+    )
+    return fact_table.refresh_from_publisher(*args, full=full, **kwargs)
+
+
+def populate_data_marts(dimension_names=(), fact_tables=(), jobs=1,
+                        raise_on_error=True):
+    """
+    Populate several registered dimensions and fact tables, in dependency
+    order (a fact table after its dimensions, a vector hierarchy dimension
+    after its vector dimensions), the independent ones being populated
+    concurrently.
+    :param dimension_names: An iterable of the names of the dimensions to
+        populate.
+    :param fact_tables: An iterable of (fact_table_name, publisher_key)
+        tuples, the fact tables to populate and the key of the publisher to
+        use for each of them.
+    :param jobs: The number of worker threads.
+    :param raise_on_error: If True, raise a DataMartPopulateError if a
+        dimension or a fact table could not be populated.
+    :return: The population report, see
+        niamoto.data_marts.populate_scheduler.populate_data_marts.
+    """
+    dimensions = [get_dimension(name) for name in dimension_names]
+    loaded_fact_tables = [
+        get_fact_table(
+            fact_table_name,
+            publisher_cls=publish_api.get_publisher_class(publisher_key)
+        ) for fact_table_name, publisher_key in fact_tables
+    ]
+    return populate_scheduler.populate_data_marts(
+        dimensions,
+        loaded_fact_tables,
+        jobs=jobs,
+        raise_on_error=raise_on_error
+    )
+
+
 def get_dimensional_model(fact_table_name, aggregates):
     """
     Return a DimensionalModel object from a fact table name and a
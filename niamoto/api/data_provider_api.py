@@ -4,6 +4,8 @@
 API Module for managing data providers.
 """
 
+from inspect import signature
+
 from sqlalchemy import *
 import pandas as pd
 
@@ -11,8 +13,20 @@ from niamoto.db.connector import Connector
 from niamoto.db.metadata import data_provider, \
     synonym_key_registry
 from niamoto.db.utils import fix_db_sequences
+from niamoto.db import property_catalog
 from niamoto.data_providers.base_data_provider import BaseDataProvider
 from niamoto.data_providers.base_data_provider import PROVIDER_REGISTRY
+from niamoto.data_providers.sync_coordinator import sync_data_providers, \
+    get_sync_report, SYNC_SKIPPED
+from niamoto.log import get_logger
+
+
+LOGGER = get_logger(__name__)
+
+
+#  Property of a data provider storing the arguments used to sync all the
+#  data providers at once.
+SYNC_ARGS_PROPERTY = 'sync_args'
 
 
 def get_data_provider_type_list():
@@ -49,7 +63,8 @@ def get_data_provider_list():
 
 
 def add_data_provider(name, provider_type, *args, properties={},
-                      synonym_key=None, return_object=False, **kwargs):
+                      synonym_key=None, return_object=False, sync_args=None,
+                      **kwargs):
     """
     Register a data provider in a given Niamoto database.
     :param name: The name of the provider to register (must be unique).
@@ -58,6 +73,8 @@ def add_data_provider(name, provider_type, *args, properties={},
     :param args: Additional args.
     :param properties: Properties dict to store for the data provider.
     :param return_object: If True, return the created object.
+    :param sync_args: If not None, the arguments of the provider used to
+        sync all the data providers at once (stored in its properties).
     :param kwargs: Additional keyword args.
     """
     if provider_type not in PROVIDER_REGISTRY:
@@ -69,6 +86,9 @@ def add_data_provider(name, provider_type, *args, properties={},
         ))
         raise e
     provider_cls = PROVIDER_REGISTRY[provider_type]['class']
+    if sync_args is not None:
+        properties = dict(properties)
+        properties[SYNC_ARGS_PROPERTY] = list(sync_args)
     return provider_cls.register_data_provider(
         name,
         *args,
@@ -89,16 +109,26 @@ def delete_data_provider(name):
 
 
 def update_data_provider(current_name, new_name=None, properties={},
-                         synonym_key=None):
+                         synonym_key=None, sync_args=None):
     """
     Update an existing data provider.
     :param current_name:
     :param new_name:
     :param properties:
     :param synonym_key:
+    :param sync_args: If not None, the new arguments of the provider used
+        to sync all the data providers at once, otherwise the stored ones
+        are kept.
     :return:
     """
     provider = load_data_provider(current_name)
+    properties = dict(properties)
+    if sync_args is not None:
+        properties[SYNC_ARGS_PROPERTY] = list(sync_args)
+    elif SYNC_ARGS_PROPERTY not in properties:
+        stored_args = get_sync_args(current_name)
+        if stored_args is not None:
+            properties[SYNC_ARGS_PROPERTY] = stored_args
     provider.update_data_provider(
         current_name,
         new_name=new_name,
@@ -107,10 +137,61 @@ def update_data_provider(current_name, new_name=None, properties={},
     )
 
 
-def sync_with_data_provider(name, *args, **kwargs):
+def get_sync_args(name):
+    """
+    :param name: The name of the data provider.
+    :return: The stored arguments of the provider used to sync all the
+        data providers at once, None if they are not set.
+    """
+    sel = select([data_provider.c.properties]).where(
+        data_provider.c.name == name
+    )
+    with Connector.get_connection() as connection:
+        properties = connection.execute(sel).scalar()
+    return (properties or {}).get(SYNC_ARGS_PROPERTY, None)
+
+
+def set_sync_args(name, sync_args):
+    """
+    Store the arguments of a data provider used to sync all the data
+    providers at once, the other properties of the provider are kept.
+    :param name: The name of the data provider.
+    :param sync_args: The list of arguments.
+    """
+    BaseDataProvider.assert_data_provider_exists(name)
+    properties = data_provider.c.properties
+    upd = data_provider.update().where(
+        data_provider.c.name == name
+    ).values({
+        'properties': properties.op('||')(
+            cast({SYNC_ARGS_PROPERTY: list(sync_args)}, properties.type)
+        ),
+        'date_update': func.now(),
+    })
+    with Connector.get_connection() as connection:
+        connection.execute(upd)
+
+
+def requires_sync_args(provider_cls):
+    """
+    :param provider_cls: A data provider class.
+    :return: True if the provider takes arguments (e.g. the paths of its
+        files) besides its name, without which syncing it is meaningless.
+    """
+    parameters = signature(provider_cls).parameters
+    return len(parameters) > 1
+
+
+def sync_with_data_provider(name, *args, chunk_size=None, save_args=False,
+                            **kwargs):
     """
     Sync the Niamoto database with a data provider.
     :param name: The name of the data provider.
+    :param chunk_size: If not None, stream the provider's occurrences and
+        sync them by chunks of chunk_size occurrences.
+    :param save_args: If True and the sync succeeds, store args as the
+        arguments of the provider used to sync all the data providers at
+        once.
     :return: The sync report.
     """
     with Connector.get_connection() as connection:
@@ -120,11 +201,94 @@ def sync_with_data_provider(name, *args, **kwargs):
             connection=connection,
             **kwargs
         )
-        sync_report = provider.sync()
+        sync_report = provider.sync(chunk_size=chunk_size)
     fix_db_sequences()
+    if save_args and len(args) > 0:
+        set_sync_args(name, args)
     return sync_report
 
 
+def sync_with_all_data_providers(jobs=1, chunk_size=None):
+    """
+    Sync the Niamoto database with all the registered data providers. The
+    arguments of each provider (e.g. the csv files paths) are read from the
+    'sync_args' property of the provider (a list). If it is not set, the
+    providers taking arguments (c.f. requires_sync_args) are skipped, with
+    a 'skipped' status in their report, and the others are instantiated
+    without arguments.
+    :param jobs: The number of processes extracting the providers' data,
+        the writes to the database are done by the current process, one
+        provider at a time.
+    :param chunk_size: If not None, stream the providers' occurrences and
+        sync them by chunks of chunk_size occurrences.
+    :return: A dict with the providers' names as keys, and their sync
+        report as values (see sync_coordinator.get_sync_report).
+    """
+    sel = select([
+        data_provider.c.name,
+        data_provider.c.provider_type_key,
+        data_provider.c.properties,
+    ]).order_by(data_provider.c.id)
+    with Connector.get_connection() as connection:
+        records = connection.execute(sel).fetchall()
+    providers = []
+    skipped = []
+    for record in records:
+        provider_cls = PROVIDER_REGISTRY[record.provider_type_key]['class']
+        properties = record.properties or {}
+        args = properties.get(SYNC_ARGS_PROPERTY, None)
+        if args is None and requires_sync_args(provider_cls):
+            LOGGER.warning(
+                "The data provider '{}' has no stored sync arguments, it "
+                "is skipped.".format(record.name)
+            )
+            skipped.append(record.name)
+            continue
+        providers.append((
+            record.name,
+            provider_cls,
+            get_provider_args([] if args is None else args),
+        ))
+    reports = sync_data_providers(
+        providers,
+        jobs=jobs,
+        chunk_size=chunk_size
+    )
+    fix_db_sequences()
+    for name in skipped:
+        reports[name] = get_sync_report(None, 0, 0, status=SYNC_SKIPPED)
+    # In the providers order
+    return {r.name: reports[r.name] for r in records}
+
+
+def get_property_catalog(entity=None):
+    """
+    :param entity: If not None, only return the properties of this entity
+        ('occurrence' or 'plot').
+    :return: A DataFrame describing the occurrence and plot properties
+        (key, type, number of non null values and data providers), read
+        from the property catalog.
+    """
+    return property_catalog.get_property_catalog(entity=entity)
+
+
+def refresh_property_catalog():
+    """
+    Rebuild the property catalog from the occurrences and plots
+    properties, e.g. after they had been modified outside of Niamoto.
+    """
+    property_catalog.refresh_property_catalogs()
+
+
+def get_provider_args(args):
+    """
+    :return: The provider args, with the args that must be set None
+    (e.g. 'none', '0', coming from the command line) replaced by None.
+    """
+    none_values = [None, 'none', 'None', '0', 'n', 'N', ]
+    return [None if i in none_values else i for i in args]
+
+
 def load_data_provider(name, *args, connection=None, **kwargs):
     BaseDataProvider.assert_data_provider_exists(name)
     sel = select([
@@ -135,8 +299,7 @@ def load_data_provider(name, *args, connection=None, **kwargs):
         data_provider.c.name == name
     )
     # Look for args that must be set None
-    none_values = [None, 'none', 'None', '0', 'n', 'N', ]
-    nargs = [None if i in none_values else i for i in args]
+    nargs = get_provider_args(args)
     close_after = False
     if connection is None:
         close_after = True
@@ -11,6 +11,7 @@ Init the niamoto database:
 """
 
 from niamoto.db.schema_manager import SchemaManager
+from niamoto.db import utils
 from niamoto.log import get_logger
 
 
@@ -19,3 +20,14 @@ LOGGER = get_logger(__name__)
 
 def init_db():
     SchemaManager.upgrade_db('head')
+
+
+def optimize_db(rebuild=False):
+    """
+    Create the missing indexes of the Niamoto database, rebuild the invalid
+    ones (or all of them if rebuild is True) concurrently, and update the
+    planner statistics.
+    :return: A dict with the index names as keys, and 'created', 'rebuilt'
+        or 'valid' as values.
+    """
+    return utils.optimize_db(rebuild=rebuild)
@@ -3,17 +3,23 @@
 import sys
 
 from niamoto.data_publishers.base_data_publisher import PUBLISHER_REGISTRY
+from niamoto.data_publishers.publisher_cache import PublisherCache
 from niamoto.exceptions import WrongPublisherKeyError, \
     UnavailablePublishFormat
 
 
 def publish(publisher_key, publish_format, *args, destination=sys.stdout,
-            **kwargs):
+            use_cache=None, stream=False, **kwargs):
     """
     Api method for processing and publishing data.
     :param publisher_key:
     :param publish_format:
     :param destination
+    :param use_cache: If False, do not use the publisher cache. If None,
+        use it if it is enabled in the settings.
+    :param stream: If True and the publish format is csv, stream the data
+        from the database to the destination if the publisher supports it
+        (see BaseDataPublisher.stream_csv).
     :return:
     """
     publisher_instance = get_publisher_class(publisher_key)()
@@ -22,7 +28,19 @@ def publish(publisher_key, publish_format, *args, destination=sys.stdout,
         raise UnavailablePublishFormat(
             m.format(publish_format, publisher_key)
         )
-    data, p_args, p_kwargs = publisher_instance.process(*args, **kwargs)
+    if stream and publish_format == publisher_instance.CSV:
+        publisher_instance.stream_csv(
+            *args,
+            destination=destination,
+            use_cache=use_cache,
+            **kwargs
+        )
+        return
+    data, p_args, p_kwargs = publisher_instance.process(
+        *args,
+        use_cache=use_cache,
+        **kwargs
+    )
     kwargs.update(p_kwargs)
     publisher_instance.publish(
         data,
@@ -54,3 +72,17 @@ def get_publisher_class(publisher_key):
         raise WrongPublisherKeyError(m)
     publisher = PUBLISHER_REGISTRY[publisher_key]
     return publisher['class']
+
+
+def get_publisher_cache_stats():
+    """
+    :return: The publisher cache statistics, see PublisherCache.get_stats.
+    """
+    return PublisherCache.get_stats()
+
+
+def clear_publisher_cache():
+    """
+    Remove all the results stored in the publisher cache.
+    """
+    PublisherCache.clear()
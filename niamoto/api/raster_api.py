@@ -99,9 +99,62 @@ def extract_raster_values_to_plots(raster_name):
     RasterValueExtractor.extract_raster_values_to_plots(raster_name)
 
 
-def extract_all_rasters_values_to_occurrences():
+def extract_rasters_values_to_occurrences(raster_names, timing=False,
+                                          incremental=False):
+    """
+    Extract the values of several rasters to occurrences properties, in a
+    single pass over the occurrences.
+    :param raster_names: The names of the rasters to extract the values from.
+    :param timing: If True, measure the time spent in each raster.
+    :param incremental: If True, only extract the values of the
+        occurrences that do not hold a value from the current version of
+        the rasters (e.g. inserted or updated by a data provider sync).
+    :return: If timing, a dict with the rasters' names as keys and the
+        time spent extracting their values (in seconds) as values.
+    """
+    LOGGER.debug("Extracting {} rasters values to occurrences...".format(
+        raster_names
+    ))
+    return RasterValueExtractor.extract_rasters_values_to_occurrences(
+        raster_names,
+        timing=timing,
+        incremental=incremental
+    )
+
+
+def extract_rasters_values_to_plots(raster_names, timing=False,
+                                    incremental=False):
+    """
+    Extract the values of several rasters to plots properties, in a single
+    pass over the plots.
+    :param raster_names: The names of the rasters to extract the values from.
+    :param timing: If True, measure the time spent in each raster.
+    :param incremental: If True, only extract the values of the plots that
+        do not hold a value from the current version of the rasters (e.g.
+        inserted or updated by a data provider sync).
+    :return: If timing, a dict with the rasters' names as keys and the
+        time spent extracting their values (in seconds) as values.
+    """
+    LOGGER.debug("Extracting {} rasters values to plots...".format(
+        raster_names
+    ))
+    return RasterValueExtractor.extract_rasters_values_to_plots(
+        raster_names,
+        timing=timing,
+        incremental=incremental
+    )
+
+
+def extract_all_rasters_values_to_occurrences(timing=False,
+                                              incremental=False):
     """
     Extract raster values to occurrences properties for all registered rasters.
+    :param timing: If True, measure the time spent in each raster.
+    :param incremental: If True, only extract the values of the
+        occurrences that do not hold a value from the current version of
+        the rasters (e.g. inserted or updated by a data provider sync).
+    :return: If timing, a dict with the rasters' names as keys and the
+        time spent extracting their values (in seconds) as values.
     """
     m1 = "Extracting raster values to occurrences for all registered " \
         "rasters..."
@@ -109,13 +162,22 @@ def extract_all_rasters_values_to_occurrences():
         "size, this procedure may take some time."
     LOGGER.debug(m1)
     LOGGER.info(m2)
-    for name in get_raster_list()['name']:
-        extract_raster_values_to_occurrences(name)
+    return extract_rasters_values_to_occurrences(
+        list(get_raster_list()['name']),
+        timing=timing,
+        incremental=incremental
+    )
 
 
-def extract_all_rasters_values_to_plots():
+def extract_all_rasters_values_to_plots(timing=False, incremental=False):
     """
     Extract raster values to plots properties for all registered rasters.
+    :param timing: If True, measure the time spent in each raster.
+    :param incremental: If True, only extract the values of the plots that
+        do not hold a value from the current version of the rasters (e.g.
+        inserted or updated by a data provider sync).
+    :return: If timing, a dict with the rasters' names as keys and the
+        time spent extracting their values (in seconds) as values.
     """
     m1 = "Extracting raster values to plots for all registered " \
         "rasters..."
@@ -123,5 +185,8 @@ def extract_all_rasters_values_to_plots():
         "size, this procedure may take some time."
     LOGGER.debug(m1)
     LOGGER.info(m2)
-    for name in get_raster_list()['name']:
-        extract_raster_values_to_plots(name)
+    return extract_rasters_values_to_plots(
+        list(get_raster_list()['name']),
+        timing=timing,
+        incremental=incremental
+    )
@@ -62,3 +62,11 @@ def get_general_status():
         'nb_rasters': df.iloc[0]['nb_rasters'],
         'nb_vectors': df.iloc[0]['nb_vectors'],
     }
+
+
+def get_pool_status():
+    """
+    :return: The state of the connection pools of the current process, c.f.
+    Connector.get_pool_status.
+    """
+    return Connector.get_pool_status()
@@ -1,6 +1,7 @@
 # coding: utf-8
 
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 import pandas as pd
 from sqlalchemy import select
@@ -43,30 +44,135 @@ def set_taxonomy(csv_file_path):
     return TaxonomyManager.set_taxonomy(dataframe)
 
 
-def map_all_synonyms():
+def add_taxon(taxon_id, full_name, rank_name, rank, parent_id=None,
+              synonyms={}):
+    """
+    Add a single taxon to the taxonomy, without rebuilding it.
+    :param taxon_id: The id of the taxon to add.
+    :param full_name: The full name of the taxon.
+    :param rank_name: The rank name of the taxon.
+    :param rank: The rank of the taxon.
+    :param parent_id: The id of the parent taxon, None for a root.
+    :param synonyms: A dict of synonyms {synonym_key: provider_taxon_id}.
+    """
+    return TaxonomyManager.add_taxon(
+        taxon_id,
+        full_name,
+        rank_name,
+        rank,
+        parent_id=parent_id,
+        synonyms=synonyms,
+    )
+
+
+def move_taxon(taxon_id, new_parent_id=None):
+    """
+    Move a taxon and its subtree under a new parent, without rebuilding the
+    taxonomy.
+    :param taxon_id: The id of the taxon to move.
+    :param new_parent_id: The id of the new parent, None to make the taxon
+        a root.
+    """
+    return TaxonomyManager.move_taxon(taxon_id, new_parent_id=new_parent_id)
+
+
+def delete_subtree(taxon_id):
+    """
+    Delete a taxon and all its descendants, without rebuilding the taxonomy.
+    :param taxon_id: The id of the root of the subtree to delete.
+    :return: The number of deleted taxa.
+    """
+    return TaxonomyManager.delete_subtree(taxon_id)
+
+
+def set_synonyms(csv_file_path, synonym_key, register=False, mapping=True):
+    """
+    Set the synonyms of the taxa for a synonym key from a csv file, and
+    update the synonym mapping of the data providers using this key.
+    The csv must have a header and it must contains the following columns:
+    - taxon_id: The id of the taxon, in Niamoto's referential.
+    - provider_taxon_id: The synonym of the taxon, must be an integer.
+    :param csv_file_path: The csv file path.
+    :param synonym_key: The synonym key.
+    :param register: If True, register the synonym key if it does not
+        exist yet.
+    :param mapping: If True, update the synonym mapping of the data
+        providers using the synonym key.
+    :return: The number of updated taxa.
+    """
+    if not os.path.exists(csv_file_path) or os.path.isdir(csv_file_path):
+        raise DataSourceNotFoundError(
+            "The csv file '{}' had not been found.".format(csv_file_path)
+        )
+    dataframe = pd.read_csv(csv_file_path)
+    if register:
+        synonym_keys = TaxonomyManager.get_synonym_keys()
+        if synonym_key not in set(synonym_keys['name']):
+            TaxonomyManager.register_synonym_key(synonym_key)
+    nb = TaxonomyManager.set_synonym_data(synonym_key, dataframe)
+    if mapping:
+        map_synonyms_for_key(synonym_key)
+    return nb
+
+
+def map_all_synonyms(jobs=1):
     """
     Update the synonym mapping for every data provider registered in the
     database.
+    :param jobs: The number of providers remapped concurrently, each one
+        in its own thread and connection.
     """
     data_providers = get_data_provider_list()
-    for i, record in data_providers.iterrows():
-        name = record['name']
-        provider_type = record['provider_type']
-        synonym_key = record['synonym_key']
-        data_provider = PROVIDER_REGISTRY[provider_type]['class'](name)
-        m, s = data_provider.occurrence_provider.update_synonym_mapping()
-        msg = "DataProvider(provider_type='{}', name='{}', synonym_key='{}'" \
-              "): {} taxa had been mapped, over {} occurrences."
-        LOGGER.info(msg.format(
-            provider_type,
-            name,
-            synonym_key,
-            len(m[m.notnull()]),
-            len(m),
-        ))
+    _map_synonyms(data_providers, jobs=jobs)
     return data_providers
 
 
+def map_synonyms_for_key(synonym_key, jobs=1):
+    """
+    Update the synonym mapping for the data providers using a synonym key.
+    :param synonym_key: The synonym key.
+    :param jobs: The number of providers remapped concurrently.
+    """
+    data_providers = get_data_provider_list()
+    data_providers = data_providers[
+        data_providers['synonym_key'] == synonym_key
+    ]
+    _map_synonyms(data_providers, jobs=jobs)
+    return data_providers
+
+
+def _map_synonyms(data_providers, jobs=1):
+    records = [record for i, record in data_providers.iterrows()]
+    if jobs <= 1 or len(records) <= 1:
+        for record in records:
+            _map_provider_synonyms(record)
+        return
+    # The remapping is done server side, the providers' occurrences are
+    # disjoint hence they can be updated concurrently.
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        for future in [executor.submit(_map_provider_synonyms, record)
+                       for record in records]:
+            future.result()
+
+
+def _map_provider_synonyms(record):
+    name = record['name']
+    provider_type = record['provider_type']
+    synonym_key = record['synonym_key']
+    data_provider = PROVIDER_REGISTRY[provider_type]['class'](name)
+    mapped, total = \
+        data_provider.occurrence_provider.update_synonym_mapping()
+    msg = "DataProvider(provider_type='{}', name='{}', synonym_key='{}'" \
+          "): {} taxa had been mapped, over {} occurrences."
+    LOGGER.info(msg.format(
+        provider_type,
+        name,
+        synonym_key,
+        mapped,
+        total,
+    ))
+
+
 def get_synonym_keys():
     """
     :return: A Dataframe containing all the registered synonym keys.
@@ -14,22 +14,22 @@ from niamoto.bin.commands.raster import list_rasters_cli, add_raster_cli, \
     extract_all_rasters_values_to_plots_cli
 from niamoto.bin.commands.vector import list_vectors_cli, add_vector_cli, \
     update_vector_cli, delete_vector_cli
-from niamoto.bin.commands.manage_db import init_db_cli
+from niamoto.bin.commands.manage_db import init_db_cli, optimize_db_cli
 from niamoto.bin.commands.data_provider import list_data_provider_types, \
     list_data_providers, add_data_provider, delete_data_provider, sync, \
-    update_data_provider_cli
+    update_data_provider_cli, list_properties_cli
 from niamoto.bin.commands.taxonomy import set_taxonomy_cli, \
-    map_all_synonyms_cli, get_synonym_keys_cli
+    map_all_synonyms_cli, get_synonym_keys_cli, set_synonyms_cli
 from niamoto.bin.commands.status import get_general_status_cli
 from niamoto.bin.commands.publish import publish_cli, list_publishers_cli, \
-    list_publish_formats_cli, init_publish_cli
+    list_publish_formats_cli, init_publish_cli, publisher_cache_cli
 from niamoto.bin.commands.data_marts import list_dimension_types_cli, \
     list_dimensions_cli, list_fact_tables_cli, create_vector_dim_cli, \
     create_fact_table_cli, delete_dimension_cli, delete_fact_table_cli, \
     create_taxon_dim_cli, populate_fact_table_cli, \
     create_vector_hierarchy_dim_cli, create_occurrence_location_dim_cli, \
     create_raster_dim_cli, truncate_dimension_cli, truncate_fact_table_cli, \
-    populate_dimension_cli
+    populate_dimension_cli, populate_data_marts_cli, refresh_fact_table_cli
 
 from niamoto import conf
 from niamoto.decorators import cli_catch_unknown_error
@@ -67,6 +67,7 @@ def niamoto_cli(context, niamoto_home=None):
 
 # General commands
 niamoto_cli.add_command(init_db_cli)
+niamoto_cli.add_command(optimize_db_cli)
 niamoto_cli.add_command(get_general_status_cli)
 
 # Raster commands
@@ -92,16 +93,19 @@ niamoto_cli.add_command(add_data_provider)
 niamoto_cli.add_command(delete_data_provider)
 niamoto_cli.add_command(update_data_provider_cli)
 niamoto_cli.add_command(sync)
+niamoto_cli.add_command(list_properties_cli)
 
 # Taxonomy commands
 niamoto_cli.add_command(set_taxonomy_cli)
 niamoto_cli.add_command(map_all_synonyms_cli)
+niamoto_cli.add_command(set_synonyms_cli)
 niamoto_cli.add_command(get_synonym_keys_cli)
 
 # Data publisher commands
 niamoto_cli.add_command(publish_cli)
 niamoto_cli.add_command(list_publishers_cli)
 niamoto_cli.add_command(list_publish_formats_cli)
+niamoto_cli.add_command(publisher_cache_cli)
 
 # Data marts commands
 niamoto_cli.add_command(list_dimension_types_cli)
@@ -117,6 +121,8 @@ niamoto_cli.add_command(delete_dimension_cli)
 niamoto_cli.add_command(delete_fact_table_cli)
 niamoto_cli.add_command(populate_dimension_cli)
 niamoto_cli.add_command(populate_fact_table_cli)
+niamoto_cli.add_command(refresh_fact_table_cli)
+niamoto_cli.add_command(populate_data_marts_cli)
 niamoto_cli.add_command(truncate_dimension_cli)
 niamoto_cli.add_command(truncate_fact_table_cli)
 
@@ -124,11 +130,13 @@ niamoto_cli.add_command(truncate_fact_table_cli)
 display_dict = OrderedDict()
 display_dict["General commands"] = [
     init_db_cli,
+    optimize_db_cli,
     get_general_status_cli,
 ]
 display_dict["Taxonomy commands"] = [
     set_taxonomy_cli,
     map_all_synonyms_cli,
+    set_synonyms_cli,
     get_synonym_keys_cli,
 ]
 display_dict["Data provider commands"] = [
@@ -138,6 +146,7 @@ display_dict["Data provider commands"] = [
     delete_data_provider,
     update_data_provider_cli,
     sync,
+    list_properties_cli,
 ]
 display_dict["Vector commands"] = [
     list_vectors_cli,
@@ -159,6 +168,7 @@ display_dict["Data publisher commands"] = [
     publish_cli,
     list_publishers_cli,
     list_publish_formats_cli,
+    publisher_cache_cli,
 ]
 display_dict["Data marts commands"] = [
     list_dimension_types_cli,
@@ -176,6 +186,8 @@ display_dict["Data marts commands"] = [
     delete_fact_table_cli,
     populate_fact_table_cli,
     populate_dimension_cli,
+    refresh_fact_table_cli,
+    populate_data_marts_cli,
 ]
 
 niamoto_cli.commands_display_dict = display_dict
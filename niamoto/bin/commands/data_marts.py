@@ -1,5 +1,7 @@
 # coding: utf-8
 
+import sys
+
 import click
 
 from niamoto.decorators import cli_catch_unknown_error
@@ -420,3 +422,121 @@ def populate_fact_table_cli(fact_table_name, publisher_key, truncate=False):
             fact_table_name
         )
     )
+
+
+@click.command('refresh_fact_table')
+@click.argument('fact_table_name')
+@click.argument('publisher_key')
+@click.option(
+    '--full',
+    help='Truncate and populate the fact table, even if the publisher '
+         'supports incremental refresh',
+    is_flag=True,
+)
+@cli_catch_unknown_error
+def refresh_fact_table_cli(fact_table_name, publisher_key, full=False):
+    """
+    Refresh a registered fact table using an available publisher, only the
+    rows changed since the last refresh are replaced if the publisher
+    supports it.
+    """
+    from niamoto.api import data_marts_api
+    click.secho(
+        "Refreshing the '{}' fact table using the '{}' publisher...".format(
+            fact_table_name,
+            publisher_key
+        )
+    )
+    result = data_marts_api.refresh_fact_table(
+        fact_table_name,
+        publisher_key,
+        full=full
+    )
+    if result['mode'] == 'none':
+        click.secho(
+            "The '{}' fact table was already up to date.".format(
+                fact_table_name
+            )
+        )
+        return
+    click.secho(
+        "The '{}' fact table had been successfully refreshed ({}: {} rows "
+        "deleted, {} rows inserted)!".format(
+            fact_table_name,
+            result['mode'],
+            result['deleted'],
+            result['inserted'],
+        )
+    )
+
+
+@click.command('populate_data_marts')
+@click.option(
+    '--dimension',
+    '-d',
+    help="The name of a dimension to populate",
+    type=str,
+    multiple=True,
+)
+@click.option(
+    '--fact_table',
+    '-f',
+    help="The name of a fact table to populate, and the key of the "
+         "publisher to use",
+    type=(str, str),
+    multiple=True,
+)
+@click.option(
+    '--jobs',
+    help="The number of dimensions and fact tables populated concurrently",
+    default=1,
+    type=int,
+)
+@cli_catch_unknown_error
+def populate_data_marts_cli(dimension, fact_table, jobs=1):
+    """
+    Populate several registered dimensions and fact tables, in dependency
+    order. Use -d <dimension_name> for each dimension, and
+    -f <fact_table_name> <publisher_key> for each fact table.
+    """
+    import pandas as pd
+    from niamoto.api import data_marts_api
+    click.echo(
+        "Populating {} dimensions and fact tables ({} jobs)...".format(
+            len(dimension) + len(fact_table),
+            jobs
+        )
+    )
+    report = data_marts_api.populate_data_marts(
+        dimension_names=dimension,
+        fact_tables=fact_table,
+        jobs=jobs,
+        raise_on_error=False
+    )
+    rows = []
+    for (kind, name), node in report['nodes'].items():
+        rows.append({
+            'name': name,
+            'kind': kind,
+            'start (s)': '' if node['start'] is None
+            else "{:.2f}".format(node['start']),
+            'time (s)': '' if node['time'] is None
+            else "{:.2f}".format(node['time']),
+            'status': node['status'],
+        })
+    if len(rows) > 0:
+        click.echo(pd.DataFrame(rows).set_index('name').to_string())
+    click.echo("Total time: {:.2f} s".format(report['total_time']))
+    click.echo("Critical path ({:.2f} s): {}".format(
+        report['critical_path_time'],
+        ' -> '.join([name for kind, name in report['critical_path']])
+    ))
+    failed = {k: v['error'] for k, v in report['nodes'].items()
+              if v['status'] == 'failed'}
+    for (kind, name), error in failed.items():
+        click.secho(
+            "Populating the {} '{}' failed: {}".format(kind, name, error),
+            fg='red'
+        )
+    if len(failed) > 0:
+        sys.exit(1)
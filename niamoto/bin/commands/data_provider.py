@@ -1,5 +1,7 @@
 # coding: utf-8
 
+import sys
+
 import click
 
 from niamoto.decorators import cli_catch_unknown_error
@@ -48,8 +50,16 @@ def list_data_providers():
 @click.argument("name")
 @click.argument("provider_type")
 @click.argument('synonym_key', required=False, default=None)
+@click.option(
+    '--sync_args',
+    help="An argument of the provider (e.g. a csv file path) used by "
+         "'niamoto sync --all', repeat the option for each argument, in "
+         "order.",
+    multiple=True,
+)
 @cli_catch_unknown_error
-def add_data_provider(name, provider_type, synonym_key=None, *args, **kwargs):
+def add_data_provider(name, provider_type, synonym_key=None, sync_args=(),
+                      *args, **kwargs):
     """
     Register a data provider. The name of the data provider must be unique.
     The available provider types can be obtained using the
@@ -67,6 +77,7 @@ def add_data_provider(name, provider_type, synonym_key=None, *args, **kwargs):
         *args,
         properties=properties,
         synonym_key=synonym_key,
+        sync_args=sync_args if len(sync_args) > 0 else None,
         **kwargs
     )
     m = "The data provider had been successfully registered to Niamoto!"
@@ -98,8 +109,16 @@ def delete_data_provider(name, y=False):
 @click.argument("current_name")
 @click.option('--new_name', default=None)
 @click.option('--synonym_key', default=None)
+@click.option(
+    '--sync_args',
+    help="An argument of the provider (e.g. a csv file path) used by "
+         "'niamoto sync --all', repeat the option for each argument, in "
+         "order. If not set, the stored arguments are kept.",
+    multiple=True,
+)
 @cli_catch_unknown_error
-def update_data_provider_cli(current_name, new_name=None, synonym_key=None):
+def update_data_provider_cli(current_name, new_name=None, synonym_key=None,
+                             sync_args=()):
     """
     Update a data provider.
     """
@@ -109,24 +128,67 @@ def update_data_provider_cli(current_name, new_name=None, synonym_key=None):
         current_name,
         new_name=new_name,
         synonym_key=synonym_key,
+        sync_args=sync_args if len(sync_args) > 0 else None,
     )
     m = "The data provider had been successfully updated!"
     click.echo(m)
 
 
 @click.command("sync")
-@click.argument("provider_name")
+@click.argument("provider_name", required=False, default=None)
 @click.argument('provider_args', nargs=-1, type=click.UNPROCESSED)
+@click.option(
+    '--chunk_size',
+    help="Stream the provider's occurrences and sync them by chunks of "
+         "this size, to bound the memory usage.",
+    default=None,
+    type=int,
+)
+@click.option(
+    '--all', 'sync_all',
+    help="Sync all the registered data providers, with their stored "
+         "arguments (c.f. --sync_args of add_provider and --save_args of "
+         "sync). The providers taking arguments without stored ones are "
+         "skipped.",
+    is_flag=True,
+    default=False,
+)
+@click.option(
+    '--jobs',
+    help="With --all, the number of processes extracting the providers' "
+         "data (the database writes are done one provider at a time).",
+    default=1,
+    type=int,
+)
+@click.option(
+    '--save_args',
+    help="If the sync succeeds, store the provider arguments as the ones "
+         "used by 'niamoto sync --all'.",
+    is_flag=True,
+    default=False,
+)
 @cli_catch_unknown_error
-def sync(provider_name, provider_args):
+def sync(provider_name, provider_args, chunk_size=None, sync_all=False,
+         jobs=1, save_args=False):
     """
-    Sync the Niamoto database with a data provider.
+    Sync the Niamoto database with a data provider, or with all the data
+    providers (--all).
     """
+    if sync_all:
+        return sync_all_data_providers(jobs=jobs, chunk_size=chunk_size)
+    if provider_name is None:
+        click.secho("A provider name is required, or use --all.", fg='red')
+        sys.exit(1)
     from niamoto.api.data_provider_api import sync_with_data_provider
     click.echo("Syncing the Niamoto database with '{}'...".format(
         provider_name)
     )
-    r = sync_with_data_provider(provider_name, *provider_args)
+    r = sync_with_data_provider(
+        provider_name,
+        *provider_args,
+        chunk_size=chunk_size,
+        save_args=save_args
+    )
     o = r['occurrence']
     o_i, o_u, o_d = \
         len(o['insert']), \
@@ -168,3 +230,81 @@ def sync(provider_name, provider_args):
         click.secho("        {} inserted".format(po_i), fg='green')
         click.secho("        {} updated".format(po_u), fg='yellow')
         click.secho("        {} deleted".format(po_d), fg='red')
+    if save_args and len(provider_args) > 0:
+        m = "The arguments {} had been saved as the sync arguments of '{}'."
+        click.echo(m.format(list(provider_args), provider_name))
+
+
+@click.command("properties")
+@click.argument(
+    "entity",
+    type=click.Choice(['occurrence', 'plot']),
+    required=False,
+    default=None,
+)
+@click.option(
+    '--refresh',
+    help="Rebuild the property catalog from the occurrences and plots "
+         "before listing it.",
+    is_flag=True,
+    default=False,
+)
+@cli_catch_unknown_error
+def list_properties_cli(entity=None, refresh=False):
+    """
+    List the properties of the occurrences and plots (or of the given
+    entity), with their type and number of values.
+    """
+    from niamoto.api.data_provider_api import get_property_catalog, \
+        refresh_property_catalog
+    if refresh:
+        refresh_property_catalog()
+    catalog_df = get_property_catalog(entity=entity)
+    if len(catalog_df) == 0:
+        click.echo("There are no properties in the database.")
+        return
+    click.echo(catalog_df.to_string(index=False))
+
+
+def sync_all_data_providers(jobs=1, chunk_size=None):
+    import pandas as pd
+    from niamoto.api.data_provider_api import sync_with_all_data_providers
+    from niamoto.data_providers.sync_coordinator import SYNC_SKIPPED
+    click.echo("Syncing the Niamoto database with all the data providers "
+               "({} jobs)...".format(jobs))
+    reports = sync_with_all_data_providers(jobs=jobs, chunk_size=chunk_size)
+    if len(reports) == 0:
+        click.echo(
+            "There are no registered data providers in the database."
+        )
+        return
+    rows = []
+    for name, report in reports.items():
+        row = {'provider': name}
+        for key, label in [('occurrence', 'occ'), ('plot', 'plot'),
+                           ('plot_occurrence', 'plot_occ')]:
+            row[label] = "+{insert} ~{update} -{delete}".format(
+                **report[key]
+            )
+        row['extract (s)'] = "{:.2f}".format(report['extract_time'])
+        row['write (s)'] = "{:.2f}".format(report['write_time'])
+        row['status'] = report['status']
+        rows.append(row)
+    click.echo("Bellow is a summary of what had been done "
+               "(+inserted ~updated -deleted):")
+    click.echo(pd.DataFrame(rows).set_index('provider').to_string())
+    failed = {k: v['error'] for k, v in reports.items()
+              if v['error'] is not None}
+    for name, error in failed.items():
+        click.secho("Data sync with '{}' failed: {}".format(name, error),
+                    fg='red')
+    for name, report in reports.items():
+        if report['status'] == SYNC_SKIPPED:
+            click.secho(
+                "Data sync with '{}' skipped: its sync arguments are not "
+                "set (use 'niamoto update_provider {} --sync_args ...')."
+                "".format(name, name),
+                fg='yellow'
+            )
+    if len(failed) > 0:
+        sys.exit(1)
@@ -15,3 +15,22 @@ def init_db_cli():
     click.echo("Initializing Niamoto database...")
     api_manage_db.init_db()
     click.echo("Niamoto database had been successfully initialized!")
+
+
+@click.command('optimize_db')
+@click.option('--rebuild', is_flag=True, default=False,
+              help="Rebuild all the indexes, not only the invalid ones.")
+@cli_catch_unknown_error
+def optimize_db_cli(rebuild):
+    """
+    Create the missing indexes of the Niamoto database, rebuild the invalid
+    ones concurrently (without locking the tables against writes), and
+    update the planner statistics.
+    """
+    from niamoto.api import manage_db as api_manage_db
+    click.echo("Optimizing Niamoto database...")
+    report = api_manage_db.optimize_db(rebuild=rebuild)
+    for status in ['created', 'rebuilt']:
+        for name in [k for k, v in report.items() if v == status]:
+            click.echo("    {}: {}".format(name, status))
+    click.echo("Niamoto database had been successfully optimized!")
@@ -12,17 +12,30 @@ def make_publish_format_func(publish_key, publish_format):
     from niamoto.api import publish_api
 
     @click.option('--destination', '-d', default=sys.stdout)
+    @click.option('--no-cache', 'no_cache', is_flag=True, default=False,
+                  help="Do not use the publisher cache.")
     @click.pass_context
     @cli_catch_unknown_error
-    def func(ctx, *args, destination=sys.stdout, **kwargs):
+    def func(ctx, *args, destination=sys.stdout, no_cache=False,
+             stream=False, **kwargs):
         kwargs.update(ctx.obj)
         publish_api.publish(
             publish_key,
             publish_format,
             *args,
             destination=destination,
+            use_cache=False if no_cache else None,
+            stream=stream,
             **kwargs
         )
+
+    if publish_format == 'csv':
+        func = click.option(
+            '--stream', is_flag=True, default=False,
+            help="Stream the rows from the database to the destination, "
+                 "without loading them in memory (and without the "
+                 "publisher cache)."
+        )(func)
     return func
 
 
@@ -163,3 +176,30 @@ def list_publish_formats_cli(publisher_key):
                 BaseDataPublisher.PUBLISH_FORMATS_DESCRIPTION[k]
             )
         )
+
+
+@click.command("publisher_cache")
+@click.option('--clear', is_flag=True, default=False,
+              help="Remove all the cached results.")
+@cli_catch_unknown_error
+def publisher_cache_cli(clear):
+    """
+    Display the publisher cache statistics, or clear the cache.
+    """
+    from niamoto.api import publish_api
+    if clear:
+        publish_api.clear_publisher_cache()
+        click.echo("The publisher cache had been cleared.")
+        return
+    stats = publish_api.get_publisher_cache_stats()
+    requests = stats['hits'] + stats['misses']
+    click.echo("    Entries :   {}".format(stats['entries']))
+    click.echo("    Size    :   {:.1f} / {:.1f} MB".format(
+        stats['size'] / 1024 ** 2,
+        stats['max_size'] / 1024 ** 2
+    ))
+    click.echo("    Hits    :   {}".format(stats['hits']))
+    click.echo("    Misses  :   {}".format(stats['misses']))
+    click.echo("    Hit rate:   {:.1f} %".format(
+        100 * stats['hits'] / requests if requests > 0 else 0
+    ))
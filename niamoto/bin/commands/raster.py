@@ -132,54 +132,110 @@ def delete_raster_cli(name, y=False):
 
 
 @click.command('raster_to_occurrences')
-@click.argument('raster_name')
+@click.argument('raster_names', nargs=-1, required=True)
+@click.option('--timing', is_flag=True, default=False,
+              help="Display the time spent in each raster.")
+@click.option('--incremental', is_flag=True, default=False,
+              help="Only extract the missing or outdated values (records "
+                   "inserted or updated since the last extraction, updated "
+                   "rasters).")
 @cli_catch_unknown_error
-def extract_raster_values_to_occurrences_cli(raster_name):
+def extract_raster_values_to_occurrences_cli(raster_names, timing=False,
+                                             incremental=False):
     """
-    Extract raster values to occurrences properties.
+    Extract raster values to occurrences properties. Several rasters can be
+    given, their values are extracted in a single pass.
     """
     from niamoto.api import raster_api
     click.secho("Extracting '{}' raster values to occurrences...".format(
-        raster_name
+        "', '".join(raster_names)
     ))
-    raster_api.extract_raster_values_to_occurrences(raster_name)
+    timings = raster_api.extract_rasters_values_to_occurrences(
+        raster_names,
+        timing=timing,
+        incremental=incremental
+    )
     click.echo("The raster values had been successfully extracted!")
+    echo_timings(timings)
 
 
 @click.command('raster_to_plots')
-@click.argument('raster_name')
+@click.argument('raster_names', nargs=-1, required=True)
+@click.option('--timing', is_flag=True, default=False,
+              help="Display the time spent in each raster.")
+@click.option('--incremental', is_flag=True, default=False,
+              help="Only extract the missing or outdated values (records "
+                   "inserted or updated since the last extraction, updated "
+                   "rasters).")
 @cli_catch_unknown_error
-def extract_raster_values_to_plots_cli(raster_name):
+def extract_raster_values_to_plots_cli(raster_names, timing=False,
+                                       incremental=False):
     """
-    Extract raster values to plots properties.
+    Extract raster values to plots properties. Several rasters can be
+    given, their values are extracted in a single pass.
     """
     from niamoto.api import raster_api
     click.secho("Extracting '{}' raster values to plots...".format(
-        raster_name
+        "', '".join(raster_names)
     ))
-    raster_api.extract_raster_values_to_plots(raster_name)
+    timings = raster_api.extract_rasters_values_to_plots(
+        raster_names,
+        timing=timing,
+        incremental=incremental
+    )
     click.echo("The raster values had been successfully extracted!")
+    echo_timings(timings)
 
 
 @click.command('all_rasters_to_occurrences')
+@click.option('--timing', is_flag=True, default=False,
+              help="Display the time spent in each raster.")
+@click.option('--incremental', is_flag=True, default=False,
+              help="Only extract the missing or outdated values (records "
+                   "inserted or updated since the last extraction, updated "
+                   "rasters).")
 @cli_catch_unknown_error
-def extract_all_rasters_values_to_occurrences_cli():
+def extract_all_rasters_values_to_occurrences_cli(timing=False,
+                                                  incremental=False):
     """
     Extract raster values to occurrences properties for all registered rasters.
     """
     from niamoto.api import raster_api
     click.secho("Extracting all rasters values to occurrences...")
-    raster_api.extract_all_rasters_values_to_occurrences()
+    timings = raster_api.extract_all_rasters_values_to_occurrences(
+        timing=timing,
+        incremental=incremental
+    )
     click.echo("The rasters values had been successfully extracted!")
+    echo_timings(timings)
 
 
 @click.command('all_rasters_to_plots')
+@click.option('--timing', is_flag=True, default=False,
+              help="Display the time spent in each raster.")
+@click.option('--incremental', is_flag=True, default=False,
+              help="Only extract the missing or outdated values (records "
+                   "inserted or updated since the last extraction, updated "
+                   "rasters).")
 @cli_catch_unknown_error
-def extract_all_rasters_values_to_plots_cli():
+def extract_all_rasters_values_to_plots_cli(timing=False,
+                                            incremental=False):
     """
     Extract raster values to plots properties for all registered rasters.
     """
     from niamoto.api import raster_api
     click.secho("Extracting all rasters values to plots...")
-    raster_api.extract_all_rasters_values_to_plots()
+    timings = raster_api.extract_all_rasters_values_to_plots(
+        timing=timing,
+        incremental=incremental
+    )
     click.echo("The rasters values had been successfully extracted!")
+    echo_timings(timings)
+
+
+def echo_timings(timings):
+    if timings is None:
+        return
+    click.echo("Time spent in each raster:")
+    for raster_name, raster_time in timings.items():
+        click.echo("    {}: {:.2f} s".format(raster_name, raster_time))
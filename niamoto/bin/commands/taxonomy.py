@@ -30,16 +30,53 @@ def set_taxonomy_cli(csv_file_path, no_mapping=False):
         map_all_synonyms_cli.invoke(click.Context(map_all_synonyms_cli))
 
 
+@click.command('set_synonyms')
+@click.argument('csv_file_path')
+@click.argument('synonym_key')
+@click.option('--register', is_flag=True, default=False,
+              help="Register the synonym key if it does not exist.")
+@click.option('--no_mapping', is_flag=True, default=False,
+              help="Do not update the synonym mapping of the data "
+                   "providers using the synonym key.")
+@cli_catch_unknown_error
+def set_synonyms_cli(csv_file_path, synonym_key, register=False,
+                     no_mapping=False):
+    """
+    Set the synonyms of the taxa for a synonym key, from a csv file with
+    'taxon_id' and 'provider_taxon_id' columns.
+    """
+    from niamoto.api import taxonomy_api
+    click.secho("Setting the '{}' synonyms...".format(synonym_key))
+    nb = taxonomy_api.set_synonyms(
+        csv_file_path,
+        synonym_key,
+        register=register,
+        mapping=not no_mapping,
+    )
+    click.secho("The synonyms had been successfully set!")
+    click.secho("    {} taxa updated".format(nb), fg='green')
+    if no_mapping:
+        m = "   Advice: run 'niamoto map_all_synonyms' " \
+            "to update occurrences taxon identifiers"
+        click.secho(m, fg='yellow')
+
+
 @click.command('map_all_synonyms')
+@click.option(
+    '--jobs',
+    help="The number of data providers remapped concurrently.",
+    default=1,
+    type=int,
+)
 @cli_catch_unknown_error
-def map_all_synonyms_cli():
+def map_all_synonyms_cli(jobs=1):
     """
     Update the synonym mapping for every data provider registered in the
     database.
     """
     from niamoto.api import taxonomy_api
     click.secho("Mapping all synonyms...")
-    mapped = taxonomy_api.map_all_synonyms()
+    mapped = taxonomy_api.map_all_synonyms(jobs=jobs)
     if len(mapped) == 0:
         m = "No mapping had been processed since there are no registered " \
             "data providers in the database."
@@ -10,6 +10,7 @@ from niamoto.data_marts.dimensions.base_dimension import \
     DIMENSION_TYPE_REGISTRY
 from niamoto.data_publishers.base_data_publisher import PUBLISHER_REGISTRY
 from niamoto.data_marts.dimensions.dimension_manager import DimensionManager
+from niamoto.data_marts.populate_scheduler import populate_data_marts
 from niamoto.exceptions import DimensionNotRegisteredError
 
 
@@ -96,13 +97,41 @@ class DimensionalModel:
             for k, v in self.fact_tables.items():
                 v.create_fact_table(connection=connection)
 
-    def populate_dimensions(self):
-        for k, v in self.dimensions.items():
-            v.populate_from_publisher()
+    def populate(self, jobs=1, raise_on_error=True):
+        """
+        Populate the dimensions and the fact tables, in dependency order,
+        the independent ones being populated concurrently.
+        :param jobs: The number of worker threads.
+        :param raise_on_error: If True, raise a DataMartPopulateError if a
+            dimension or a fact table could not be populated.
+        :return: The population report, see populate_data_marts.
+        """
+        return populate_data_marts(
+            self.dimensions.values(),
+            self.fact_tables.values(),
+            jobs=jobs,
+            raise_on_error=raise_on_error
+        )
 
-    def populate_fact_tables(self):
-        for k, v in self.fact_tables.items():
-            v.populate_from_publisher()
+    def populate_dimensions(self, jobs=1, raise_on_error=True):
+        """
+        :return: The population report, see populate_data_marts.
+        """
+        return populate_data_marts(
+            self.dimensions.values(),
+            jobs=jobs,
+            raise_on_error=raise_on_error
+        )
+
+    def populate_fact_tables(self, jobs=1, raise_on_error=True):
+        """
+        :return: The population report, see populate_data_marts.
+        """
+        return populate_data_marts(
+            fact_tables=self.fact_tables.values(),
+            jobs=jobs,
+            raise_on_error=raise_on_error
+        )
 
 
 def load_model_from_dict(model_dict):
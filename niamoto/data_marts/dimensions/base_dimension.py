@@ -1,6 +1,6 @@
 # coding: utf-8
 
-import io
+import functools
 from datetime import datetime
 
 from sqlalchemy.engine.reflection import Inspector
@@ -10,6 +10,8 @@ import pandas as pd
 
 from niamoto.db import metadata as meta
 from niamoto.db.connector import Connector
+from niamoto.db.staging import DataFrameCopyReader, copy_from_buffer, \
+    to_hex_ewkb
 from niamoto.conf import settings
 from niamoto.log import get_logger
 
@@ -266,43 +268,54 @@ class BaseDimension(metaclass=DimensionMeta):
         """
         Populates the dimension. Assume that the input dataframe had been
         correctly formatted to fit the dimension columns. All the null values
-        are set to the corresponding type NS before populating.
+        are set to the corresponding type NS before populating. The
+        dataframe is streamed to the database by chunks.
         :param dataframe: The dataframe to populate from.
         :param append_ns_row: If True, append a NS row to the dimension.
         """
         LOGGER.debug("Populating {}".format(self))
         cols = [c.name for c in self.columns]
-        s = io.StringIO()
         ns = {}
         for c in self.columns:
             if type(c.type) in self.NS_VALUES:
                 ns[c.name] = self.NS_VALUES[type(c.type)]
             else:
                 ns[c.name] = self.DEFAULT_NS_VALUE
-        dataframe[cols].fillna(value=ns).to_csv(s, columns=cols)
+        dataframes = [dataframe[cols]]
         if append_ns_row:
             idx = 0
             if len(dataframe.index) > 0:
                 idx = dataframe.index.max() + 1
             ns_row = pd.DataFrame(ns, index=[idx])
-            ns_row[cols].to_csv(s, columns=cols, header=False)
-        s.seek(0)
-        sql_copy = \
-            """
-            COPY {}.{} ({}) FROM STDIN CSV HEADER DELIMITER ',';
-            """.format(
-                settings.NIAMOTO_DIMENSIONS_SCHEMA,
-                self.name,
-                ','.join([self.PK_COLUMN_NAME] + cols)
+            dataframes.append(ns_row[cols])
+        reader = DataFrameCopyReader(
+            dataframes,
+            index=True,
+            fill_values=ns,
+            converters=self.get_copy_converters(),
+        )
+        with Connector.get_raw_connection() as raw_connection:
+            copy_from_buffer(
+                raw_connection,
+                reader,
+                "{}.{}".format(settings.NIAMOTO_DIMENSIONS_SCHEMA, self.name),
+                [self.PK_COLUMN_NAME] + cols
             )
-        raw_connection = Connector.get_engine().raw_connection()
-        cur = raw_connection.cursor()
-        cur.copy_expert(sql_copy, s)
-        cur.close()
-        raw_connection.commit()
-        raw_connection.close()
         LOGGER.debug("{} successfully populated".format(self))
 
+    def get_copy_converters(self):
+        """
+        :return: A dict of functions converting the values of a column
+            before copying them into the dimension table, with the column
+            names as keys (see DataFrameCopyReader). By default, the
+            geometry columns are encoded as hex EWKB, using the SRID of
+            their type.
+        """
+        return {
+            c.name: functools.partial(to_hex_ewkb, srid=c.type.srid)
+            for c in self.columns if isinstance(c.type, Geometry)
+        }
+
     def populate_from_publisher(self, *args, append_ns_row=True, **kwargs):
         """
         Populates the dimension using its associated publisher.
@@ -31,16 +31,6 @@ class OccurrenceLocationDimension(BaseDimension):
             label_col='location',
         )
 
-    def populate(self, dataframe, *args, **kwargs):
-        dataframe['location'] = dataframe['location'].apply(
-            lambda x: "SRID={};{}".format("4326", x)
-        )
-        return super(OccurrenceLocationDimension, self).populate(
-            dataframe,
-            *args,
-            **kwargs
-        )
-
     @classmethod
     def get_key(cls):
         return "OCCURRENCE_LOCATION_DIMENSION"
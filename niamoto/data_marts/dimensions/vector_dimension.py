@@ -1,5 +1,8 @@
 # coding: utf-8
 
+import functools
+
+from niamoto.db.staging import to_hex_ewkb
 from niamoto.data_marts.dimensions.base_dimension import BaseDimension
 from niamoto.vector.vector_manager import VectorManager
 from niamoto.data_publishers.vector_publisher import VectorDataPublisher
@@ -55,17 +58,13 @@ class VectorDimension(BaseDimension):
             **kwargs
         )
 
-    def populate(self, dataframe, *args, **kwargs):
-        geom_col_name = self.geom_column_name
-        srid = self.srid
-        dataframe[geom_col_name] = dataframe[geom_col_name].apply(
-            lambda x: "SRID={};{}".format(srid, x)
-        )
-        return super(VectorDimension, self).populate(
-            dataframe,
-            *args,
-            **kwargs
+    def get_copy_converters(self):
+        converters = super(VectorDimension, self).get_copy_converters()
+        converters[self.geom_column_name] = functools.partial(
+            to_hex_ewkb,
+            srid=self.srid
         )
+        return converters
 
     @classmethod
     def get_description(cls):
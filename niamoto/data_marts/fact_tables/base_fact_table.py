@@ -1,6 +1,5 @@
 # coding: utf-8
 
-import io
 from datetime import datetime
 
 from sqlalchemy.engine.reflection import Inspector
@@ -10,6 +9,8 @@ import pandas as pd
 from niamoto.data_marts.dimensions.dimension_manager import DimensionManager
 from niamoto.db import metadata as meta
 from niamoto.db.connector import Connector
+from niamoto.db.staging import DataFrameCopyReader, copy_from_buffer, \
+    staging_table
 from niamoto.conf import settings
 from niamoto.log import get_logger
 
@@ -218,41 +219,166 @@ class BaseFactTable:
             connection.close()
             LOGGER.debug("{} successfully truncated".format(self))
 
-    def populate(self, dataframe):
+    def populate(self, dataframe, connection=None):
         """
         Populates the fact table. Assume that the input dataframe had been
         correctly formatted to fit the fact table columns. All the null
-        measure are set to 0 before populating.
+        measure are set to 0 before populating. The dataframe is streamed
+        to the database by chunks.
         :param dataframe: The dataframe to populate from.
+        :param connection: If not None, use an existing connection (the
+            rows are copied in its current transaction).
         """
+        if connection is None:
+            with Connector.get_raw_connection() as raw_connection:
+                return self.populate(dataframe, connection=raw_connection)
         LOGGER.debug("Populating {}".format(self))
         cols = [c.name for c in self.columns]
-        s = io.StringIO()
-        dataframe[cols].fillna(value=0).to_csv(s, columns=cols, index=False)
-        s.seek(0)
-        sql_copy = \
-            """
-            COPY {}.{} ({}) FROM STDIN CSV HEADER DELIMITER ',';
-            """.format(
-                settings.NIAMOTO_FACT_TABLES_SCHEMA,
-                self.name,
-                ','.join(cols)
-            )
-        raw_connection = Connector.get_engine().raw_connection()
-        cur = raw_connection.cursor()
-        cur.copy_expert(sql_copy, s)
-        cur.close()
-        raw_connection.commit()
-        raw_connection.close()
+        reader = DataFrameCopyReader(dataframe[cols], fill_values=0)
+        copy_from_buffer(
+            connection,
+            reader,
+            "{}.{}".format(settings.NIAMOTO_FACT_TABLES_SCHEMA, self.name),
+            cols
+        )
         LOGGER.debug("{} successfully populated".format(self))
 
     def populate_from_publisher(self, *args, **kwargs):
         """
-        Populates the fact table using its associated publisher.
+        Populates the fact table using its associated publisher, and
+        record the publisher's watermark as the refresh watermark.
         """
         LOGGER.debug("Start populating {} using publisher".format(self))
+        watermark = self.publisher.get_watermark()
         data = self.publisher.process(*args, **kwargs)[0]
-        self.populate(data)
+        with Connector.get_connection() as connection:
+            with connection.begin():
+                self.populate(data, connection=connection)
+                self.set_refresh_watermark(watermark, connection)
+
+    def refresh_from_publisher(self, *args, full=False, **kwargs):
+        """
+        Refresh the fact table using its associated publisher. If the fact
+        table had already been populated from the publisher, and if the
+        publisher supports it, the refresh is incremental: the publisher
+        returns the keys of the rows changed since the refresh watermark
+        and the new rows for those keys (see
+        BaseFactTablePublisher.process_changes), the rows matching the keys
+        are deleted and the new rows inserted. Otherwise, or if the
+        publisher tells that the changes require it, the fact table is
+        truncated and fully populated. Everything, including the update of
+        the refresh watermark, is done in a single transaction.
+        :param full: If True, force a full refresh.
+        :return: A dict with the refresh mode ('incremental', 'full', or
+            'none' if nothing changed since the refresh watermark), and the
+            number of deleted and inserted rows:
+            {'mode': 'incremental', 'deleted': 10, 'inserted': 12}
+        """
+        LOGGER.debug("Start refreshing {} using publisher".format(self))
+        with Connector.get_connection() as connection:
+            watermark = self.get_refresh_watermark(connection)
+            new_watermark = self.publisher.get_watermark(connection)
+        result = {'mode': 'none', 'deleted': 0, 'inserted': 0}
+        incremental = not full and watermark is not None
+        if incremental and new_watermark is not None \
+                and new_watermark <= watermark:
+            LOGGER.debug("{} is up to date".format(self))
+            return result
+        changes = None
+        if incremental:
+            try:
+                changes = self.publisher.process_changes(
+                    watermark,
+                    *args,
+                    **kwargs
+                )
+            except NotImplementedError:
+                LOGGER.debug(
+                    "The publisher does not support incremental refresh"
+                )
+        keys = None
+        if changes is not None:
+            keys, data = changes
+        else:
+            data = self.publisher.process(*args, **kwargs)[0]
+        with Connector.get_connection() as connection:
+            with connection.begin():
+                if keys is None:
+                    result['mode'] = 'full'
+                    result['deleted'] = connection.execute(
+                        self.table.delete()
+                    ).rowcount
+                else:
+                    result['mode'] = 'incremental'
+                    result['deleted'] = self._delete_keys(keys, connection)
+                if len(data) > 0:
+                    self.populate(data, connection=connection)
+                result['inserted'] = len(data)
+                self.set_refresh_watermark(new_watermark, connection)
+        LOGGER.debug("{} successfully refreshed ({})".format(self, result))
+        return result
+
+    def _delete_keys(self, keys, connection):
+        """
+        Delete the rows matching keys.
+        :param keys: A DataFrame with some of the key columns of the fact
+            table.
+        :param connection: The connection to use, in a transaction.
+        :return: The number of deleted rows.
+        """
+        key_columns = [c.name for c in self.table.primary_key]
+        unknown = set(keys.columns) - set(key_columns)
+        if len(keys.columns) == 0 or len(unknown) > 0:
+            raise ValueError(
+                "The keys of the changed rows must be key columns of the "
+                "fact table {}: {}".format(self.name, list(keys.columns))
+            )
+        if len(keys) == 0:
+            return 0
+        columns = [(c, 'integer') for c in keys.columns]
+        with staging_table(connection, columns, dataframe=keys) as staging:
+            return connection.execute(
+                """
+                DELETE FROM {fact_table} AS f
+                USING {staging} AS k
+                WHERE {condition};
+                """.format(**{
+                    'fact_table': '{}.{}'.format(
+                        settings.NIAMOTO_FACT_TABLES_SCHEMA,
+                        self.name
+                    ),
+                    'staging': staging.name,
+                    'condition': ' AND '.join([
+                        'f.{0} = k.{0}'.format(c) for c in keys.columns
+                    ]),
+                })
+            ).rowcount
+
+    def get_refresh_watermark(self, connection=None):
+        """
+        :param connection: If not None, use an existing connection.
+        :return: The publisher's watermark recorded at the last population
+            or refresh of the fact table, None if there is none.
+        """
+        sel = sa.select([meta.fact_table_registry.c.refresh_watermark]).where(
+            meta.fact_table_registry.c.name == self.name
+        )
+        if connection is None:
+            with Connector.get_connection() as connection:
+                return connection.execute(sel).scalar()
+        return connection.execute(sel).scalar()
+
+    def set_refresh_watermark(self, watermark, connection):
+        """
+        :param watermark: The watermark to record.
+        :param connection: The connection to use.
+        """
+        connection.execute(
+            meta.fact_table_registry.update().values({
+                'refresh_watermark': watermark,
+                'date_update': datetime.now(),
+            }).where(meta.fact_table_registry.c.name == self.name)
+        )
 
     def get_values(self):
         """
@@ -0,0 +1,271 @@
+# coding: utf-8
+
+"""
+Population of several dimensions and fact tables at once, in dependency
+order. The dependencies are derived from their definitions: a fact table
+depends on its dimensions, and a dimension on the dimensions its table
+references (e.g. a vector hierarchy dimension on its vector dimensions).
+Only the dependencies between the populated dimensions and fact tables are
+considered, the others are assumed to be already populated.
+The independent dimensions and fact tables (publisher processing and COPY)
+are populated concurrently by a pool of worker threads, most of their time
+being spent waiting for the database.
+"""
+
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from niamoto.conf import settings
+from niamoto.exceptions import DataMartPopulateError
+from niamoto.log import get_logger
+
+
+LOGGER = get_logger(__name__)
+
+
+DIMENSION = 'dimension'
+FACT_TABLE = 'fact_table'
+
+DONE = 'done'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+
+
+def populate_data_marts(dimensions=(), fact_tables=(), jobs=1,
+                        raise_on_error=True):
+    """
+    Populate dimensions and fact tables, in dependency order.
+    :param dimensions: An iterable of dimensions (BaseDimension instances)
+        to populate using their publisher.
+    :param fact_tables: An iterable of fact tables (BaseFactTable instances)
+        to populate using their publisher.
+    :param jobs: The number of worker threads.
+    :param raise_on_error: If True, raise a DataMartPopulateError carrying
+        the population report (as its report attribute) once the population
+        is over if some dimensions or fact tables failed or were skipped.
+        Otherwise, the failures are only reported.
+    :return: The population report, a dict with the nodes ((kind, name)
+        tuples, kind being 'dimension' or 'fact_table') as keys, their
+        status ('done', 'failed', or 'skipped' if a dependency failed),
+        dependencies, start (relative to the start of the population) and
+        populate times, and error message as values, in the population
+        order; and the critical path (the chain of dependent nodes with the
+        longest total time, which bounds the total time whatever the number
+        of jobs) and its total time:
+        {
+            'nodes': {
+                ('dimension', 'dim_1'): {
+                    'status': 'done',
+                    'dependencies': [],
+                    'start': 0.0,
+                    'time': 1.2,
+                    'error': None,
+                },
+                ...
+            },
+            'critical_path': [('dimension', 'dim_1'), ...],
+            'critical_path_time': 2.5,
+            'total_time': 3.1,
+        }
+    """
+    t = time.time()
+    objects = {(DIMENSION, d.name): d for d in dimensions}
+    objects.update({(FACT_TABLE, f.name): f for f in fact_tables})
+    graph = get_populate_graph(dimensions, fact_tables)
+    order = get_topological_order(graph)
+    LOGGER.info("*** Populating {} dimensions and fact tables ({} jobs)"
+                "...".format(len(order), jobs))
+    nodes = {
+        node: {
+            'status': None,
+            'dependencies': sorted(graph[node]),
+            'start': None,
+            'time': None,
+            'error': None,
+        } for node in order
+    }
+    pending = list(order)
+    running = {}
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        while len(pending) > 0 or len(running) > 0:
+            # Pending nodes are in topological order, hence a failure is
+            # propagated to all the dependent nodes in a single pass.
+            for node in list(pending):
+                status = [nodes[dep]['status'] for dep in graph[node]]
+                if FAILED in status or SKIPPED in status:
+                    nodes[node]['status'] = SKIPPED
+                    pending.remove(node)
+                    LOGGER.warning(
+                        "Skipping the {} '{}', a dependency failed.".format(
+                            *node
+                        )
+                    )
+                elif all(s == DONE for s in status):
+                    future = executor.submit(_populate, node, objects[node], t)
+                    running[future] = node
+                    pending.remove(node)
+            if len(running) == 0:
+                continue
+            finished = wait(running, return_when=FIRST_COMPLETED)[0]
+            for future in finished:
+                node = running.pop(future)
+                start, populate_time, error = future.result()
+                nodes[node].update({
+                    'status': DONE if error is None else FAILED,
+                    'start': start,
+                    'time': populate_time,
+                    'error': error,
+                })
+    critical_path, critical_path_time = get_critical_path(
+        graph,
+        order,
+        {k: v['time'] for k, v in nodes.items() if v['time'] is not None}
+    )
+    total_time = time.time() - t
+    statuses = [v['status'] for v in nodes.values()]
+    LOGGER.info(
+        "*** {} dimensions and fact tables populated, {} failed, {} skipped "
+        "(total time: {:.2f} s, critical path: {:.2f} s)".format(
+            statuses.count(DONE),
+            statuses.count(FAILED),
+            statuses.count(SKIPPED),
+            total_time,
+            critical_path_time
+        )
+    )
+    report = {
+        'nodes': nodes,
+        'critical_path': critical_path,
+        'critical_path_time': critical_path_time,
+        'total_time': total_time,
+    }
+    failed = [k for k, v in nodes.items() if v['status'] != DONE]
+    if raise_on_error and len(failed) > 0:
+        raise DataMartPopulateError(
+            "Populating {} dimensions and fact tables failed: {}".format(
+                len(failed),
+                ', '.join([
+                    "{} '{}' ({})".format(
+                        kind,
+                        name,
+                        nodes[(kind, name)]['error']
+                        or nodes[(kind, name)]['status']
+                    ) for kind, name in failed
+                ])
+            ),
+            report=report
+        )
+    return report
+
+
+def get_dimension_dependencies(dimension):
+    """
+    :param dimension: A dimension.
+    :return: The names of the dimensions referenced by the dimension's
+        table.
+    """
+    dependencies = []
+    for fk in dimension.table.foreign_keys:
+        target = fk.target_fullname.split('.')
+        if len(target) == 3 \
+                and target[0] == settings.NIAMOTO_DIMENSIONS_SCHEMA \
+                and target[1] != dimension.name:
+            dependencies.append(target[1])
+    return dependencies
+
+
+def get_populate_graph(dimensions, fact_tables):
+    """
+    :return: The dependency graph of the dimensions and fact tables, as a
+        dict with the nodes ((kind, name) tuples) as keys and the set of
+        nodes they depend on as values.
+    """
+    dimension_names = {d.name for d in dimensions}
+    graph = {}
+    for dimension in dimensions:
+        graph[(DIMENSION, dimension.name)] = {
+            (DIMENSION, name)
+            for name in get_dimension_dependencies(dimension)
+            if name in dimension_names
+        }
+    for fact_table in fact_tables:
+        graph[(FACT_TABLE, fact_table.name)] = {
+            (DIMENSION, d.name) for d in fact_table.dimensions
+            if d.name in dimension_names
+        }
+    return graph
+
+
+def get_topological_order(graph):
+    """
+    :param graph: A dependency graph, see get_populate_graph.
+    :return: The list of the nodes, each node being after its dependencies
+        (level by level, in the graph order within a level).
+    """
+    order = []
+    added = set()
+    remaining = list(graph)
+    while len(remaining) > 0:
+        ready = [n for n in remaining if graph[n].issubset(added)]
+        if len(ready) == 0:
+            raise ValueError(
+                "Cyclic dependencies between: {}".format(remaining)
+            )
+        for node in ready:
+            order.append(node)
+            added.add(node)
+            remaining.remove(node)
+    return order
+
+
+def get_critical_path(graph, order, times):
+    """
+    :param graph: A dependency graph, see get_populate_graph.
+    :param order: The nodes in topological order.
+    :param times: A dict with the nodes as keys and their populate time as
+        values (missing nodes, e.g. skipped, count for 0).
+    :return: The critical path (the list of nodes, from the first to be
+        populated) and its total time.
+    """
+    finish = {}
+    previous = {}
+    for node in order:
+        dependencies = list(graph[node])
+        previous[node] = max(dependencies, key=finish.get) \
+            if len(dependencies) > 0 else None
+        before = 0 if previous[node] is None else finish[previous[node]]
+        finish[node] = before + times.get(node, 0)
+    if len(finish) == 0:
+        return [], 0
+    node = max(order, key=finish.get)
+    path_time = finish[node]
+    path = []
+    while node is not None:
+        path.insert(0, node)
+        node = previous[node]
+    return path, path_time
+
+
+def _populate(node, obj, t0):
+    """
+    Populate a dimension or a fact table using its publisher, in a worker
+    thread.
+    :return: The start time (relative to t0), the populate time and the
+        error message, if any.
+    """
+    kind, name = node
+    start = time.time()
+    error = None
+    try:
+        obj.populate_from_publisher()
+    except Exception as e:
+        LOGGER.error("Populating the {} '{}' failed: {}".format(kind, name, e))
+        LOGGER.debug(traceback.format_exc())
+        error = str(e)
+    end = time.time()
+    if error is None:
+        LOGGER.info("** The {} '{}' had been populated ({:.2f} s).".format(
+            kind, name, end - start
+        ))
+    return start - t0, end - start, error
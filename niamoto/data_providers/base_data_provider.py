@@ -84,9 +84,61 @@ class BaseDataProvider(metaclass=ProviderMeta):
     def plot_occurrence_provider(self):
         raise NotImplementedError()
 
+    def get_sync_flags(self, sync_occurrence=True, sync_plot=True,
+                       sync_plot_occurrence=True):
+        """
+        Adjust the sync flags to what the provider is able to sync (e.g.
+        skip the occurrence sync if no occurrence source is set). Override
+        it to check or disable the provider's data sources.
+        :return: The sync_occurrence, sync_plot and sync_plot_occurrence
+        flags to use.
+        """
+        return sync_occurrence, sync_plot, sync_plot_occurrence
+
+    def get_provider_dataframes(self, sync_occurrence=True, sync_plot=True,
+                                sync_plot_occurrence=True, chunk_size=None):
+        """
+        Extract and prepare the provider's data, without touching the
+        Niamoto database (except for reading the taxa synonyms). This is
+        the client side part of the sync, it can be done in another
+        process, the result being passed to the sync method.
+        :param sync_occurrence: if False, skip the occurrence data.
+        :param sync_plot: if False, skip the plot data.
+        :param sync_plot_occurrence: if False, skip the plot-occurrence data.
+        :param chunk_size: If not None, the occurrences are not extracted,
+            they will be streamed by the sync.
+        :return: A dict containing the prepared provider dataframes
+        ('occurrence', 'plot' and 'plot_occurrence' keys), None for the
+        skipped ones.
+        """
+        sync_occurrence, sync_plot, sync_plot_occurrence = \
+            self.get_sync_flags(
+                sync_occurrence=sync_occurrence,
+                sync_plot=sync_plot,
+                sync_plot_occurrence=sync_plot_occurrence,
+            )
+        dataframes = {
+            'occurrence': None,
+            'plot': None,
+            'plot_occurrence': None,
+        }
+        if sync_occurrence and chunk_size is None:
+            occ_provider = self.occurrence_provider
+            df = occ_provider.get_provider_occurrence_dataframe()
+            occ_provider.map_provider_taxon_ids(df)
+            dataframes['occurrence'] = df
+        if sync_plot:
+            dataframes['plot'] = \
+                self.plot_provider.get_provider_plot_dataframe()
+        if sync_plot_occurrence:
+            plot_occ_provider = self.plot_occurrence_provider
+            dataframes['plot_occurrence'] = \
+                plot_occ_provider.get_provider_plot_occurrence_dataframe()
+        return dataframes
+
     def sync(self, insert=True, update=True, delete=True,
              sync_occurrence=True, sync_plot=True,
-             sync_plot_occurrence=True):
+             sync_plot_occurrence=True, chunk_size=None, dataframes=None):
         """
         Sync Niamoto database with providers data.
         :param insert: if False, skip insert operation.
@@ -95,6 +147,11 @@ class BaseDataProvider(metaclass=ProviderMeta):
         :param sync_occurrence: if False, skip occurrence sync.
         :param sync_plot: if False, skip plot sync.
         :param sync_plot_occurrence: if skip plot-occurrence sync.
+        :param chunk_size: If not None, stream the provider's occurrences
+            and sync them by chunks of chunk_size occurrences.
+        :param dataframes: The provider dataframes, as returned by
+            get_provider_dataframes. If None (or for the None values), the
+            provider's data is extracted by the sync.
         :return A dict containing the insert / update / delete dataframes for
         each specialized provider:
             {
@@ -112,53 +169,68 @@ class BaseDataProvider(metaclass=ProviderMeta):
         LOGGER.info("*** Data sync starting ('{}' - {})...".format(
             self.name, self.get_type_name()
         ))
+        sync_occurrence, sync_plot, sync_plot_occurrence = \
+            self.get_sync_flags(
+                sync_occurrence=sync_occurrence,
+                sync_plot=sync_plot,
+                sync_plot_occurrence=sync_plot_occurrence,
+            )
+        if dataframes is None:
+            dataframes = {}
         with Connector.get_connection() as connection:
+            # The sync is atomic: the occurrence, plot and plot-occurrence
+            # stages are written in savepoints of a single transaction
+            # (c.f. the providers' _sync), the plot-occurrences seeing the
+            # uncommitted occurrences and plots.
             with connection.begin():
                 i1, u1, d1 = self.occurrence_provider.sync(
                     connection,
                     insert=insert,
                     update=update,
                     delete=delete,
+                    chunk_size=chunk_size,
+                    dataframe=dataframes.get('occurrence', None),
                 ) if sync_occurrence else ([], [], [])
                 i2, u2, d2 = self.plot_provider.sync(
                     connection,
                     insert=insert,
                     update=update,
                     delete=delete,
+                    dataframe=dataframes.get('plot', None),
                 ) if sync_plot else ([], [], [])
-            with connection.begin():
                 i3, u3, d3 = self.plot_occurrence_provider.sync(
                     connection,
                     insert=insert,
                     update=update,
                     delete=delete,
+                    dataframe=dataframes.get('plot_occurrence', None),
                 ) if sync_plot_occurrence else ([], [], [])
-            upd = niamoto_db_meta.data_provider.update().values({
-                'last_sync': datetime.now(),
-            }).where(niamoto_db_meta.data_provider.c.name == self.name)
-            connection.execute(upd)
-            m = "*** Data sync with '{}' done (total time: {:.2f} s)!"
-            LOGGER.info(m.format(
-                self.name, time.time() - t
-            ))
-            LOGGER.debug("\r" + "-" * 80)
-            return {
-                'occurrence': {
-                    'insert': i1,
-                    'update': u1,
-                    'delete': d1,
-                },
-                'plot': {
-                    'insert': i2,
-                    'update': u2,
-                    'delete': d2,
-                },
-                'plot_occurrence': {
-                    'insert': i3,
-                    'update': u3,
-                    'delete': d3,
-                },
-            }
+                upd = niamoto_db_meta.data_provider.update().values({
+                    'last_sync': datetime.now(),
+                }).where(niamoto_db_meta.data_provider.c.name == self.name)
+                connection.execute(upd)
+        m = "*** Data sync with '{}' done (total time: {:.2f} s)!"
+        LOGGER.info(m.format(
+            self.name, time.time() - t
+        ))
+        LOGGER.debug("\r" + "-" * 80)
+        return {
+            'occurrence': {
+                'insert': i1,
+                'update': u1,
+                'delete': d1,
+            },
+            'plot': {
+                'insert': i2,
+                'update': u2,
+                'delete': d2,
+            },
+            'plot_occurrence': {
+                'insert': i3,
+                'update': u3,
+                'delete': d3,
+            },
+        }
 
     @classmethod
     def get_type_name(cls):
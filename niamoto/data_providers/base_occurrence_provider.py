@@ -2,15 +2,19 @@
 
 import time
 import json
-import io
 
-from sqlalchemy.sql import select, bindparam, and_, cast, func
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import select, func, and_, text, table, column
 import pandas as pd
 
 from niamoto.conf import settings
 from niamoto.db.connector import Connector
-from niamoto.db.metadata import occurrence
+from niamoto.db.data_version import bump_data_version, OCCURRENCE
+from niamoto.db.metadata import occurrence, taxon
+from niamoto.db.property_catalog import refresh_property_catalog
+from niamoto.db.staging import read_sql_copy, staging_table
+from niamoto.data_providers.bulk_sync import BulkSyncEngine
+from niamoto.data_providers.sync_hash import get_sync_hash, \
+    get_changed_index, SYNC_HASH_COLUMN
 from niamoto.taxonomy.taxonomy_manager import TaxonomyManager
 from niamoto.log import get_logger
 
@@ -23,6 +27,22 @@ class BaseOccurrenceProvider:
     Abstract base class for occurrence provider.
     """
 
+    # 'raster_versions' is not in the sync dataframes, hence reset for the
+    # inserted and updated occurrences: their raster values must be
+    # (re-)extracted.
+    BULK_SYNC_ENGINE = BulkSyncEngine(
+        occurrence,
+        key_columns=['provider_id', 'provider_pk'],
+        value_columns=[
+            'location', 'taxon_id', 'provider_taxon_id', 'properties',
+            SYNC_HASH_COLUMN, 'raster_versions',
+        ],
+    )
+
+    SYNC_HASH_COLUMNS = [
+        'taxon_id', 'location', 'properties', 'provider_taxon_id'
+    ]
+
     def __init__(self, data_provider):
         """
         :param data_provider: The parent data provider.
@@ -44,6 +64,8 @@ class BaseOccurrenceProvider:
             occurrence.c.taxon_id,
             occurrence.c.provider_taxon_id,
             occurrence.c.properties,
+            occurrence.c.sync_hash,
+            occurrence.c.raster_versions,
         ]).where(
             occurrence.c.provider_id == self.data_provider.db_id
         )
@@ -53,12 +75,106 @@ class BaseOccurrenceProvider:
             index_col=occurrence.c.id.name,
         )
 
+    def get_niamoto_occurrence_hash_dataframe(self, connection,
+                                              pk_table=None):
+        """
+        :param connection: A connection to the database to work with.
+        :param pk_table: If not None, the name of a (staging) table with a
+        provider_pk column, only the occurrences whose provider pk is in
+        this table are returned.
+        :return: A DataFrame containing the provider pk and sync hash of the
+        occurrences of this provider that are currently stored in the
+        Niamoto database. Missing hashes are set to 0.
+        """
+        LOGGER.debug("Getting Niamoto occurrence hash dataframe...")
+        where = occurrence.c.provider_id == self.data_provider.db_id
+        if pk_table is not None:
+            where = and_(
+                where,
+                occurrence.c.provider_pk.in_(
+                    select([column('provider_pk')]).select_from(
+                        table(pk_table)
+                    )
+                )
+            )
+        sel = select([
+            occurrence.c.id,
+            occurrence.c.provider_id,
+            occurrence.c.provider_pk,
+            func.coalesce(occurrence.c.sync_hash, 0).label(SYNC_HASH_COLUMN),
+        ]).where(where)
+        return read_sql_copy(
+            sel,
+            connection,
+            index_col=occurrence.c.id.name,
+        )
+
+    def get_synonym_mapping_sql(self):
+        """
+        :return: The update statement mapping the provider's occurrences
+            with the taxa on the provider's synonym key, with its
+            parameters bound. Only the occurrences whose taxon id changes
+            are rewritten. The join on a registered synonym key repeats the
+            predicate of the partial unique index of the synonym key
+            (c.f. TaxonomyManager.register_synonym_key), otherwise the
+            planner cannot use it.
+        """
+        synonym_key = self.data_provider.synonym_key
+        occurrence_table = '{}.{}'.format(
+            settings.NIAMOTO_SCHEMA,
+            occurrence.name
+        )
+        taxon_table = '{}.{}'.format(settings.NIAMOTO_SCHEMA, taxon.name)
+        if synonym_key is None:
+            mapping = "SELECT o.id, NULL::integer AS taxon_id FROM {occ} AS o"
+        elif synonym_key == TaxonomyManager.IDENTITY_SYNONYM_KEY:
+            mapping = \
+                """
+                SELECT o.id, t.id AS taxon_id
+                FROM {occ} AS o
+                LEFT JOIN {taxon} AS t ON t.id = o.provider_taxon_id
+                """
+        else:
+            mapping = \
+                """
+                SELECT o.id, t.id AS taxon_id
+                FROM {occ} AS o
+                LEFT JOIN {taxon} AS t
+                  ON t.synonyms -> :synonym_key = to_jsonb(o.provider_taxon_id)
+                  AND t.synonyms -> :synonym_key != 'null'
+                """
+        sql = text(
+            """
+            UPDATE {occ}
+            SET taxon_id = mapping.taxon_id
+            FROM ({mapping} WHERE o.provider_id = :provider_id) AS mapping
+            WHERE {occ}.id = mapping.id
+              AND {occ}.taxon_id IS DISTINCT FROM mapping.taxon_id;
+            """.format(**{
+                'occ': occurrence_table,
+                'mapping': mapping.format(
+                    occ=occurrence_table,
+                    taxon=taxon_table
+                ),
+            })
+        )
+        params = {'provider_id': self.data_provider.db_id}
+        if synonym_key not in (None, TaxonomyManager.IDENTITY_SYNONYM_KEY):
+            params['synonym_key'] = synonym_key
+        return sql.bindparams(**params)
+
     def update_synonym_mapping(self, connection=None):
         """
         Update the synonym mapping of an already stored dataframe.
         To be called when a synonym had been defined or modified, but not
         the occurrences.
+        The mapping is done server side, with a single update joining the
+        provider's occurrences with the taxa on the synonym key
+        (c.f. get_synonym_mapping_sql). The occurrence data version is
+        incremented if some occurrences changed (see niamoto.db.data_version).
         :param connection: If passed, use an existing connection.
+        :return: A tuple (number of mapped occurrences, number of
+            occurrences) for the provider.
         """
         # Log start
         m = "(provider_id='{}', synonym_key='{}'): Updating synonym " \
@@ -67,85 +183,44 @@ class BaseOccurrenceProvider:
             self.data_provider.db_id,
             self.data_provider.synonym_key)
         )
-        close_after = False
         if connection is None:
-            connection = Connector.get_engine().connect()
-            close_after = True
-        # Start
-        df = self.get_niamoto_occurrence_dataframe(connection)
-        if close_after:
-            connection.close()
-        synonyms = TaxonomyManager.get_synonyms_for_key(
-            self.data_provider.synonym_key
-        )
-        mapping = df["provider_taxon_id"].map(synonyms)
-        if len(df) > 0:
-            df["taxon_id"] = mapping
-            df = df[['provider_id', 'provider_pk', 'taxon_id']]
-            s = io.StringIO()
-            df.where((pd.notnull(df)), None).rename(columns={
-                'provider_id': 'prov_id',
-                'provider_pk': 'prov_pk',
-            }).to_csv(s, columns=['taxon_id', 'prov_id', 'prov_pk'])
-            s.seek(0)
-            sql_create_temp = \
-                """
-                DROP TABLE IF EXISTS {tmp};
-                CREATE TABLE {tmp} (
-                    id float,
-                    taxon_id float,
-                    prov_id float,
-                    prov_pk float
-                );
-                """.format(**{
-                    'tmp': 'tmp_niamoto'
-                })
-            sql_copy_from = \
-                """
-                COPY {tmp} FROM STDIN CSV HEADER DELIMITER ',';
-                """.format(**{
-                    'tmp': 'tmp_niamoto'
-                })
-            sql_update = \
-                """
-                UPDATE {occurrence_table}
-                SET taxon_id = {tmp}.taxon_id::int
-                FROM {tmp}
-                WHERE {occurrence_table}.provider_id = {tmp}.prov_id::int
-                    AND {occurrence_table}.provider_pk = {tmp}.prov_pk::int;
-                DROP TABLE {tmp};
-                """.format(**{
-                    'tmp': 'tmp_niamoto',
-                    'occurrence_table': '{}.{}'.format(
-                        settings.NIAMOTO_SCHEMA, occurrence.name
-                    )
-                })
-            raw_connection = Connector.get_engine().raw_connection()
-            cur = raw_connection.cursor()
-            cur.execute(sql_create_temp)
-            cur.copy_expert(sql_copy_from, s)
-            cur.execute(
-                sql_update
-            )
-            cur.close()
-            raw_connection.commit()
-            raw_connection.close()
+            with Connector.get_connection() as connection:
+                with connection.begin():
+                    return self.update_synonym_mapping(connection)
+        t = time.time()
+        synonym_key = self.data_provider.synonym_key
+        updated = connection.execute(self.get_synonym_mapping_sql()).rowcount
+        if updated > 0:
+            bump_data_version(OCCURRENCE, connection=connection)
+        sel = select([
+            func.count(occurrence.c.taxon_id),
+            func.count(),
+        ]).where(occurrence.c.provider_id == self.data_provider.db_id)
+        mapped, total = connection.execute(sel).fetchone()
         # Log end
-        m = "(provider_id='{}', synonym_key='{}'): {} synonym mapping had " \
-            "been updated."
+        m = "(provider_id='{}', synonym_key='{}'): synonym mapping had " \
+            "been updated, {} occurrences changed, {} / {} mapped " \
+            "({:.2f} s)."
         LOGGER.debug(m.format(
             self.data_provider.db_id,
-            self.data_provider.synonym_key,
-            len(synonyms)
+            synonym_key,
+            updated,
+            mapped,
+            total,
+            time.time() - t
         ))
-        return mapping, synonyms
+        return mapped, total
 
-    def map_provider_taxon_ids(self, dataframe):
+    def map_provider_taxon_ids(self, dataframe, connection=None):
         """
         Map provider's taxon ids with Niamoto taxon ids when importing data.
+        The synonym mapping is read from the database once per taxonomy
+        version (c.f. TaxonomyManager.get_synonyms_arrays).
         :param dataframe: The dataframe where the mapping has to be done.
         ids. The index must correspond to the provider's pk. The dataframe
         corresponds to the provider's dataframe.
+        :param connection: If passed, use an existing connection (e.g. the
+        sync connection) to read the taxonomy version.
         :return: A series with the same index, the niamoto corresponding
         taxon id as values.
         """
@@ -155,17 +230,18 @@ class BaseOccurrenceProvider:
             self.data_provider.db_id,
             self.data_provider.synonym_key)
         )
-        synonyms = TaxonomyManager.get_synonyms_for_key(
-            self.data_provider.synonym_key
-        )
         dataframe["provider_taxon_id"] = dataframe["taxon_id"]
-        dataframe["taxon_id"] = dataframe["taxon_id"].map(synonyms)
+        dataframe["taxon_id"] = TaxonomyManager.map_synonyms(
+            self.data_provider.synonym_key,
+            dataframe["taxon_id"],
+            connection=connection
+        )
         m = "(provider_id='{}', synonym_key='{}'): {} taxon ids had " \
             "been mapped."
         LOGGER.debug(m.format(
             self.data_provider.db_id,
             self.data_provider.synonym_key,
-            len(synonyms)
+            dataframe["taxon_id"].notnull().sum()
         ))
 
     def get_provider_occurrence_dataframe(self):
@@ -189,83 +265,173 @@ class BaseOccurrenceProvider:
         """
         raise NotImplementedError()
 
-    def _sync(self, df, connection, insert=True, update=True, delete=True):
-        niamoto_df = self.get_niamoto_occurrence_dataframe(connection)
+    def get_provider_occurrence_chunks(self, chunk_size):
+        """
+        :param chunk_size: The maximum number of occurrences in a chunk.
+        :return: An iterator over DataFrames structured as the one returned
+        by get_provider_occurrence_dataframe, each one containing at most
+        chunk_size occurrences. A provider pk must not appear in more than
+        one chunk. This default implementation loads the whole provider
+        dataframe, providers able to stream their data should override it.
+        """
+        df = self.get_provider_occurrence_dataframe()
+        for i in range(0, len(df), chunk_size):
+            yield df.iloc[i:i + chunk_size]
+
+    def _sync(self, df, connection, insert=True, update=True, delete=True,
+              pk_table=None):
+        niamoto_df = self.get_niamoto_occurrence_hash_dataframe(
+            connection,
+            pk_table=pk_table
+        )
         provider_df = df.where((pd.notnull(df)), None)
+        provider_df[SYNC_HASH_COLUMN] = get_sync_hash(
+            provider_df,
+            self.SYNC_HASH_COLUMNS
+        )
         insert_df = self.get_insert_dataframe(niamoto_df, provider_df) \
             if insert else []
-        update_df = self.get_update_dataframe(niamoto_df, provider_df) \
+        update_df = self.get_hash_update_dataframe(niamoto_df, provider_df) \
             if update else []
         delete_df = self.get_delete_dataframe(niamoto_df, provider_df) \
             if delete else []
-        with connection.begin():
-            if len(insert_df) > 0:
-                LOGGER.debug("Inserting new occurrence records...")
-                ins_stmt = occurrence.insert().values(
-                    provider_id=bindparam('provider_id'),
-                    provider_pk=bindparam('provider_pk'),
-                    location=bindparam('location'),
-                    taxon_id=bindparam('taxon_id'),
-                    provider_taxon_id=bindparam('provider_taxon_id'),
-                    properties=cast(bindparam('properties'), JSONB),
-                )
-                ins_data = insert_df.to_dict(orient='records')
-                connection.execute(
-                    ins_stmt,
-                    ins_data
-                )
-            if len(update_df) > 0:
-                LOGGER.debug("Updating existing occurrence records...")
-                upd_stmt = occurrence.update().where(
-                    and_(
-                        occurrence.c.provider_id == bindparam('prov_id'),
-                        occurrence.c.provider_pk == bindparam('prov_pk')
-                    )
-                ).values({
-                    'location': bindparam('location'),
-                    'taxon_id': bindparam('taxon_id'),
-                    'properties': cast(bindparam('properties'), JSONB),
-                    'provider_taxon_id': bindparam('provider_taxon_id'),
-                })
-                upd_data = update_df.rename(columns={
-                    'provider_id': 'prov_id',
-                    'provider_pk': 'prov_pk',
-                }).to_dict(orient='records')
-                connection.execute(
-                    upd_stmt,
-                    upd_data
-                )
-            if len(delete_df) > 0:
-                LOGGER.debug("Deleting expired occurrence records...")
-                del_stmt = occurrence.delete().where(
-                    occurrence.c.id.in_(delete_df.index)
-                )
-                connection.execute(del_stmt)
+        # Savepoint, the caller (e.g. the data provider sync) may run
+        # several stages in a single transaction.
+        with connection.begin_nested():
+            LOGGER.debug("Writing occurrence records...")
+            self.BULK_SYNC_ENGINE.sync(
+                connection,
+                insert_df,
+                update_df,
+                delete_df
+            )
         return insert_df, update_df, delete_df
 
-    def sync(self, connection, insert=True, update=True, delete=True):
+    def _sync_chunks(self, chunks, connection, insert=True, update=True,
+                     delete=True):
         """
-        Sync Niamoto database with provider.
+        Sync Niamoto database with an iterator of provider's dataframe
+        chunks, with a memory usage bounded by the size of a chunk. The
+        provider pks of each chunk are staged in a temporary table, joined
+        with the stored occurrences, so that a chunk is only compared with
+        the occurrences having the same pks, whatever the order of the
+        provider's data. They are then recorded in another temporary table,
+        in order to delete the occurrences that were not seen once all the
+        chunks had been processed. Everything is done in a single
+        transaction (or savepoint, if the connection is already in a
+        transaction).
+        :return: The insert, update, delete DataFrames, only containing the
+        provider_pk column.
+        """
+        inserted, updated, deleted = [], [], []
+        with connection.begin_nested():
+            with staging_table(connection, [('provider_pk', 'bigint')],
+                               prefix="niamoto_sync_seen") as seen_table:
+                for i, chunk in enumerate(chunks):
+                    if len(chunk) == 0:
+                        continue
+                    LOGGER.debug(
+                        "Syncing occurrence chunk {} ({} rows)...".format(
+                            i, len(chunk)
+                        )
+                    )
+                    self.map_provider_taxon_ids(chunk, connection=connection)
+                    with staging_table(connection,
+                                       [('provider_pk', 'bigint')],
+                                       prefix="niamoto_sync_chunk",
+                                       dataframe=chunk.index.to_series()) \
+                            as chunk_table:
+                        insert_df, update_df, delete_df = self._sync(
+                            chunk,
+                            connection,
+                            insert=insert,
+                            update=update,
+                            delete=False,
+                            pk_table=chunk_table.name,
+                        )
+                        connection.execute(
+                            "INSERT INTO {} SELECT provider_pk FROM {};"
+                            "".format(seen_table.name, chunk_table.name)
+                        )
+                    if len(insert_df) > 0:
+                        inserted.append(insert_df.index)
+                    if len(update_df) > 0:
+                        updated.append(update_df.index)
+                if delete:
+                    LOGGER.debug("Deleting expired occurrence records...")
+                    seen_table.analyze(connection)
+                    res = connection.execute(
+                        """
+                        DELETE FROM {occurrence} AS occ
+                        WHERE occ.provider_id = {provider_id}
+                            AND NOT EXISTS (
+                                SELECT 1 FROM {seen} AS seen
+                                WHERE seen.provider_pk = occ.provider_pk
+                            )
+                        RETURNING occ.provider_pk;
+                        """.format(**{
+                            'occurrence': '{}.{}'.format(
+                                settings.NIAMOTO_SCHEMA,
+                                occurrence.name
+                            ),
+                            'provider_id': int(self.data_provider.db_id),
+                            'seen': seen_table.name,
+                        })
+                    )
+                    deleted.append(pd.Index([r[0] for r in res]))
+        return tuple(
+            pd.DataFrame({
+                'provider_pk': pd.Index([], dtype=int).append(pks)
+            }).set_index('provider_pk', drop=False)
+            for pks in [inserted, updated, deleted]
+        )
+
+    def sync(self, connection, insert=True, update=True, delete=True,
+             chunk_size=None, dataframe=None):
+        """
+        Sync Niamoto database with provider. The property catalog of the
+        provider's occurrences is refreshed if the sync wrote some records.
         :param connection: A connection to the database to work with.
         :param insert: if False, skip insert operation.
         :param update: if False, skip update operation.
         :param delete: if False, skip delete operation.
+        :param chunk_size: If not None, the provider's data is streamed and
+        synced by chunks of chunk_size occurrences (see _sync_chunks).
+        :param dataframe: The provider's occurrence dataframe, with the
+        taxon ids already mapped. If None, it is retrieved from the provider.
         :return: The insert, update, delete DataFrames.
         """
         t = time.time()
         LOGGER.info("** Occurrence sync starting ('{}' - {})...".format(
             self.data_provider.name, self.data_provider.get_type_name()
         ))
-        LOGGER.debug("Getting provider's occurrence dataframe...")
-        dataframe = self.get_provider_occurrence_dataframe()
-        self.map_provider_taxon_ids(dataframe)
-        sync_result = self._sync(
-            dataframe,
-            connection,
-            insert=insert,
-            update=update,
-            delete=delete,
-        )
+        if chunk_size is not None and dataframe is None:
+            LOGGER.debug("Streaming provider's occurrence dataframe...")
+            sync_result = self._sync_chunks(
+                self.get_provider_occurrence_chunks(chunk_size),
+                connection,
+                insert=insert,
+                update=update,
+                delete=delete,
+            )
+        else:
+            if dataframe is None:
+                LOGGER.debug("Getting provider's occurrence dataframe...")
+                dataframe = self.get_provider_occurrence_dataframe()
+                self.map_provider_taxon_ids(dataframe, connection=connection)
+            sync_result = self._sync(
+                dataframe,
+                connection,
+                insert=insert,
+                update=update,
+                delete=delete,
+            )
+        if any(len(df) > 0 for df in sync_result):
+            refresh_property_catalog(
+                connection,
+                'occurrence',
+                provider_id=self.data_provider.db_id
+            )
         LOGGER.info("** Occurrence sync with '{}' done ({:.2f} s)!".format(
             self.data_provider.name, time.time() - t
         ))
@@ -324,6 +490,26 @@ class BaseOccurrenceProvider:
         provider_dataframe['provider_id'] = self.data_provider.db_id
         return provider_dataframe
 
+    def get_hash_update_dataframe(self, niamoto_dataframe,
+                                  provider_dataframe):
+        """
+        Same as get_update_dataframe, but only compares the sync hashes of
+        the records, hence does not need the full Niamoto records.
+        :param niamoto_dataframe: Occurrence hash DataFrame from Niamoto
+        database (corresponding to this provider).
+        :param provider_dataframe: Occurrence DataFrame from provider, with
+        the sync hash column.
+        :return: The data that is to be updated to sync Niamoto with the
+        provider (i.e. data which is both in the provider and Niamoto, and
+        has changed).
+        """
+        LOGGER.debug("Resolving occurrence update dataframe from hashes...")
+        changed_idx = get_changed_index(niamoto_dataframe, provider_dataframe)
+        provider_dataframe = provider_dataframe.loc[changed_idx]
+        provider_dataframe['provider_pk'] = provider_dataframe.index
+        provider_dataframe['provider_id'] = self.data_provider.db_id
+        return provider_dataframe
+
     def get_delete_dataframe(self, niamoto_dataframe, provider_dataframe):
         """
         :param niamoto_dataframe: Occurrence DataFrame from Niamoto database
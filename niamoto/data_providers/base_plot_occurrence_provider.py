@@ -2,11 +2,12 @@
 
 import time
 
-from sqlalchemy.sql import and_, bindparam, select
+from sqlalchemy.sql import select
 import pandas as pd
 
 from niamoto.db.metadata import plot_occurrence, plot, occurrence
 from niamoto.db.connector import Connector
+from niamoto.data_providers.bulk_sync import BulkSyncEngine
 from niamoto.exceptions import IncoherentDatabaseStateError
 from niamoto.log import get_logger
 
@@ -23,6 +24,16 @@ class BasePlotOccurrenceProvider:
     provider.
     """
 
+    BULK_SYNC_ENGINE = BulkSyncEngine(
+        plot_occurrence,
+        key_columns=['plot_id', 'occurrence_id'],
+        value_columns=[
+            'provider_id', 'provider_plot_pk', 'provider_occurrence_pk',
+            'occurrence_identifier',
+        ],
+        update_columns=['occurrence_identifier'],
+    )
+
     def __init__(self, data_provider):
         """
         :param data_provider: The parent data provider.
@@ -80,71 +91,45 @@ class BasePlotOccurrenceProvider:
             if update else pd.DataFrame()
         delete_df = self.get_delete_dataframe(niamoto_df, provider_df) \
             if delete else pd.DataFrame()
-        with connection.begin():
+        # Savepoint, the caller (e.g. the data provider sync) may run
+        # several stages in a single transaction.
+        with connection.begin_nested():
             connection.execute("SET CONSTRAINTS {}.{} DEFERRED;".format(
                 "niamoto",
                 "uq_plot_occurrence_plot_id__occurrence_identifier"
             ))
-            plot_id_col = plot_occurrence.c.plot_id
-            occurrence_id_col = plot_occurrence.c.occurrence_id
-            if len(insert_df) > 0:
-                LOGGER.debug("Inserting new plot-occurrence records...")
-                ins_stmt = plot_occurrence.insert().values(
-                    insert_df.to_dict(orient='records')
-                )
-                connection.execute(ins_stmt)
-            if len(update_df) > 0:
-                LOGGER.debug("Updating existing plot-occurrence records...")
-                upd_stmt = plot_occurrence.update().where(
-                    and_(
-                        plot_id_col == bindparam('_plot_id'),
-                        occurrence_id_col == bindparam('_occurrence_id')
-                    )
-                ).values({
-                    'occurrence_identifier': bindparam(
-                        'occurrence_identifier'
-                    )
-                })
-                connection.execute(
-                    upd_stmt,
-                    update_df.rename(columns={
-                        'plot_id': '_plot_id',
-                        'occurrence_id': '_occurrence_id',
-                    }).to_dict(orient='records')
-                )
-            if len(delete_df) > 0:
-                LOGGER.debug("Deleting expired plot-occurrence records...")
-                del_stmt = plot_occurrence.delete().where(
-                    and_(
-                        plot_id_col == bindparam('plot_id'),
-                        occurrence_id_col == bindparam('occurrence_id')
-                    )
-                )
-                connection.execute(
-                    del_stmt,
-                    delete_df[[
-                        'plot_id',
-                        'occurrence_id',
-                    ]].to_dict(orient='records')
-                )
+            LOGGER.debug("Writing plot-occurrence records...")
+            self.BULK_SYNC_ENGINE.sync(
+                connection,
+                insert_df,
+                update_df,
+                delete_df
+            )
         return insert_df, update_df, delete_df
 
-    def sync(self, connection, insert=True, update=True, delete=True):
+    def sync(self, connection, insert=True, update=True, delete=True,
+             dataframe=None):
         """
         Sync Niamoto database with provider.
         :param connection: A connection to the database to work with.
         :param insert: if False, skip insert operation.
         :param update: if False, skip update operation.
         :param delete: if False, skip delete operation.
+        :param dataframe: The provider's plot-occurrence dataframe, if None,
+        it is retrieved from the provider.
         :return: The insert, update, delete DataFrames.
         """
         t = time.time()
         LOGGER.info("** Plot-occurrence sync starting ('{}' - {})...".format(
             self.data_provider.name, self.data_provider.get_type_name()
         ))
-        LOGGER.debug("Getting provider's plot-occurrence dataframe...")
-        df = self.get_provider_plot_occurrence_dataframe()
-        reindexed_df = self.get_reindexed_provider_dataframe(df)
+        if dataframe is None:
+            LOGGER.debug("Getting provider's plot-occurrence dataframe...")
+            dataframe = self.get_provider_plot_occurrence_dataframe()
+        reindexed_df = self.get_reindexed_provider_dataframe(
+            dataframe,
+            connection=connection
+        )
         fixed = self.raise_and_fix_inconsistencies(reindexed_df)
         sync_result = self._sync(
             fixed,
@@ -197,11 +182,14 @@ class BasePlotOccurrenceProvider:
             dataframe = dataframe[(~duplicated) | null_identifiers]
         return dataframe
 
-    def get_reindexed_provider_dataframe(self, dataframe):
+    def get_reindexed_provider_dataframe(self, dataframe, connection=None):
         """
         :param dataframe: The provider's DataFrame, or a subset, with index
         being a multi-index composed with
         [plot_id, occurrence_id] (provider's ids).
+        :param connection: If passed, use an existing connection (e.g. the
+        connection of a sync, that can see the plots and occurrences it had
+        not committed yet).
         :return: The dataframe reindexed:
             provider_plot_pk -> plot_id
             provider_occurrence_pk -> occurrence_id
@@ -214,25 +202,11 @@ class BasePlotOccurrenceProvider:
             ['provider_plot_pk', 'provider_occurrence_pk'],
             inplace=True
         )
-        with Connector.get_connection() as connection:
-            sel_plot = select([
-                plot.c.id.label('plot_id'),
-                plot.c.provider_pk.label('provider_plot_pk')
-            ]).where(plot.c.provider_id == self.data_provider.db_id)
-            sel_occ = select([
-                occurrence.c.id.label('occurrence_id'),
-                occurrence.c.provider_pk.label('provider_occurrence_pk')
-            ]).where(occurrence.c.provider_id == self.data_provider.db_id)
-            plot_ids = pd.read_sql(
-                sel_plot,
-                connection,
-                index_col='provider_plot_pk'
-            )
-            occ_ids = pd.read_sql(
-                sel_occ,
-                connection,
-                index_col='provider_occurrence_pk'
-            )
+        if connection is None:
+            with Connector.get_connection() as connection:
+                plot_ids, occ_ids = self._get_niamoto_ids(connection)
+        else:
+            plot_ids, occ_ids = self._get_niamoto_ids(connection)
         dataframe.reset_index(inplace=True)
         # Assert plots and occurrences exist in db
         plot_pks = pd.Index(pd.unique(dataframe['provider_plot_pk']))
@@ -267,6 +241,32 @@ class BasePlotOccurrenceProvider:
         )
         return dataframe
 
+    def _get_niamoto_ids(self, connection):
+        """
+        :return: The (plot_ids, occ_ids) dataframes, containing the Niamoto
+        ids of the provider's plots and occurrences, indexed by their
+        provider pk.
+        """
+        sel_plot = select([
+            plot.c.id.label('plot_id'),
+            plot.c.provider_pk.label('provider_plot_pk')
+        ]).where(plot.c.provider_id == self.data_provider.db_id)
+        sel_occ = select([
+            occurrence.c.id.label('occurrence_id'),
+            occurrence.c.provider_pk.label('provider_occurrence_pk')
+        ]).where(occurrence.c.provider_id == self.data_provider.db_id)
+        plot_ids = pd.read_sql(
+            sel_plot,
+            connection,
+            index_col='provider_plot_pk'
+        )
+        occ_ids = pd.read_sql(
+            sel_occ,
+            connection,
+            index_col='provider_occurrence_pk'
+        )
+        return plot_ids, occ_ids
+
     def get_insert_dataframe(self, niamoto_dataframe, provider_dataframe):
         """
         :param niamoto_dataframe: Plot-occurrence DataFrame from Niamoto
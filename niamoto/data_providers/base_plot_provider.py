@@ -3,11 +3,15 @@
 import json
 import time
 
-from sqlalchemy.sql import select, bindparam, and_, cast, func
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import select, func
 import pandas as pd
 
 from niamoto.db.metadata import plot
+from niamoto.db.property_catalog import refresh_property_catalog
+from niamoto.db.staging import read_sql_copy
+from niamoto.data_providers.bulk_sync import BulkSyncEngine
+from niamoto.data_providers.sync_hash import get_sync_hash, \
+    get_changed_index, SYNC_HASH_COLUMN
 from niamoto.log import get_logger
 
 
@@ -19,6 +23,20 @@ class BasePlotProvider:
     Abstract base class for plot provider.
     """
 
+    # 'raster_versions' is not in the sync dataframes, hence reset for the
+    # inserted and updated plots: their raster values must be
+    # (re-)extracted.
+    BULK_SYNC_ENGINE = BulkSyncEngine(
+        plot,
+        key_columns=['provider_id', 'provider_pk'],
+        value_columns=[
+            'name', 'location', 'properties', SYNC_HASH_COLUMN,
+            'raster_versions',
+        ],
+    )
+
+    SYNC_HASH_COLUMNS = ['name', 'location', 'properties']
+
     def __init__(self, data_provider):
         """
         :param data_provider: The parent data provider.
@@ -39,6 +57,8 @@ class BasePlotProvider:
             plot.c.name,
             func.st_asewkt(plot.c.location).label('location'),
             plot.c.properties,
+            plot.c.sync_hash,
+            plot.c.raster_versions,
         ]).where(
             plot.c.provider_id == self.data_provider.db_id
         )
@@ -48,6 +68,28 @@ class BasePlotProvider:
             index_col=plot.c.id.name,
         )
 
+    def get_niamoto_plot_hash_dataframe(self, connection):
+        """
+        :param connection: A connection to the database to work with.
+        :return: A DataFrame containing the provider pk and sync hash of the
+        plots of this provider that are currently stored in the Niamoto
+        database. Missing hashes are set to 0.
+        """
+        LOGGER.debug("Getting Niamoto plot hash dataframe...")
+        sel = select([
+            plot.c.id,
+            plot.c.provider_id,
+            plot.c.provider_pk,
+            func.coalesce(plot.c.sync_hash, 0).label(SYNC_HASH_COLUMN),
+        ]).where(
+            plot.c.provider_id == self.data_provider.db_id
+        )
+        return read_sql_copy(
+            sel,
+            connection,
+            index_col=plot.c.id.name,
+        )
+
     def get_provider_plot_dataframe(self):
         """
         :return: A DataFrame containing the plot data currently
@@ -62,77 +104,63 @@ class BasePlotProvider:
         raise NotImplementedError()
 
     def _sync(self, df, connection, insert=True, update=True, delete=True):
-        niamoto_df = self.get_niamoto_plot_dataframe(connection)
-        provider_df = df
+        niamoto_df = self.get_niamoto_plot_hash_dataframe(connection)
+        provider_df = df.copy()
+        provider_df[SYNC_HASH_COLUMN] = get_sync_hash(
+            provider_df,
+            self.SYNC_HASH_COLUMNS
+        )
         insert_df = self.get_insert_dataframe(niamoto_df, provider_df) \
             if insert else pd.DataFrame()
-        update_df = self.get_update_dataframe(niamoto_df, provider_df) \
+        update_df = self.get_hash_update_dataframe(niamoto_df, provider_df) \
             if update else pd.DataFrame()
         delete_df = self.get_delete_dataframe(niamoto_df, provider_df) \
             if delete else pd.DataFrame()
-        with connection.begin():
-            if len(insert_df) > 0:
-                LOGGER.debug("Inserting new plot records...")
-                ins_stmt = plot.insert().values(
-                    provider_id=bindparam('provider_id'),
-                    provider_pk=bindparam('provider_pk'),
-                    name=bindparam('name'),
-                    location=bindparam('location'),
-                    properties=cast(bindparam('properties'), JSONB),
-                )
-                connection.execute(
-                    ins_stmt,
-                    insert_df.to_dict(orient='records')
-                )
-            if len(update_df) > 0:
-                LOGGER.debug("Updating existing plot records...")
-                upd_stmt = plot.update().where(
-                    and_(
-                        plot.c.provider_id == bindparam('prov_id'),
-                        plot.c.provider_pk == bindparam('prov_pk')
-                    )
-                ).values({
-                    'location': bindparam('location'),
-                    'name': bindparam('name'),
-                    'properties': cast(bindparam('properties'), JSONB),
-                })
-                connection.execute(
-                    upd_stmt,
-                    update_df.rename(columns={
-                        'provider_id': 'prov_id',
-                        'provider_pk': 'prov_pk',
-                    }).to_dict(orient='records')
-                )
-            if len(delete_df) > 0:
-                LOGGER.debug("Deleting expired plot records...")
-                del_stmt = plot.delete().where(
-                    plot.c.id.in_(delete_df.index)
-                )
-                connection.execute(del_stmt)
+        # Savepoint, the caller (e.g. the data provider sync) may run
+        # several stages in a single transaction.
+        with connection.begin_nested():
+            LOGGER.debug("Writing plot records...")
+            self.BULK_SYNC_ENGINE.sync(
+                connection,
+                insert_df,
+                update_df,
+                delete_df
+            )
         return insert_df, update_df, delete_df
 
-    def sync(self, connection, insert=True, update=True, delete=True):
+    def sync(self, connection, insert=True, update=True, delete=True,
+             dataframe=None):
         """
-        Sync Niamoto database with provider.
+        Sync Niamoto database with provider. The property catalog of the
+        provider's plots is refreshed if the sync wrote some records.
         :param connection: A connection to the database to work with.
         :param insert: if False, skip insert operation.
         :param update: if False, skip update operation.
         :param delete: if False, skip delete operation.
+        :param dataframe: The provider's plot dataframe, if None, it is
+        retrieved from the provider.
         :return: The insert, update, delete DataFrames.
         """
         t = time.time()
         LOGGER.info("** Plot sync starting ('{}' - {})...".format(
             self.data_provider.name, self.data_provider.get_type_name()
         ))
-        LOGGER.debug("Getting provider's plot dataframe...")
-        df = self.get_provider_plot_dataframe()
+        if dataframe is None:
+            LOGGER.debug("Getting provider's plot dataframe...")
+            dataframe = self.get_provider_plot_dataframe()
         sync_result = self._sync(
-            df,
+            dataframe,
             connection,
             insert=insert,
             update=update,
             delete=delete,
         )
+        if any(len(df) > 0 for df in sync_result):
+            refresh_property_catalog(
+                connection,
+                'plot',
+                provider_id=self.data_provider.db_id
+            )
         LOGGER.info("** Plot sync with '{}' done ({:.2f} s)!".format(
             self.data_provider.name, time.time() - t
         ))
@@ -191,6 +219,26 @@ class BasePlotProvider:
         provider_dataframe['provider_id'] = self.data_provider.db_id
         return provider_dataframe
 
+    def get_hash_update_dataframe(self, niamoto_dataframe,
+                                  provider_dataframe):
+        """
+        Same as get_update_dataframe, but only compares the sync hashes of
+        the records, hence does not need the full Niamoto records.
+        :param niamoto_dataframe: Plot hash DataFrame from Niamoto database
+        (corresponding to this provider).
+        :param provider_dataframe: Plot DataFrame from provider, with the
+        sync hash column.
+        :return: The data that is to be updated to sync Niamoto with the
+        provider (i.e. data which is both in the provider and Niamoto, and
+        has changed).
+        """
+        LOGGER.debug("Resolving plot update dataframe from hashes...")
+        changed_idx = get_changed_index(niamoto_dataframe, provider_dataframe)
+        provider_dataframe = provider_dataframe.loc[changed_idx]
+        provider_dataframe['provider_pk'] = provider_dataframe.index
+        provider_dataframe['provider_id'] = self.data_provider.db_id
+        return provider_dataframe
+
     def get_delete_dataframe(self, niamoto_dataframe, provider_dataframe):
         """
         :param niamoto_dataframe: Plot DataFrame from Niamoto database
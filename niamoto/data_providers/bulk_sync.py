@@ -0,0 +1,236 @@
+# coding: utf-8
+
+"""
+COPY based bulk loading of sync operations (insert / update / delete).
+The rows to write are staged with a single COPY FROM STDIN into a
+temporary (hence not WAL-logged) staging table (c.f. niamoto.db.staging),
+and applied to the target table
+with three set based statements (INSERT ... SELECT, UPDATE ... FROM and
+DELETE ... USING), instead of one round trip per row.
+"""
+
+import json
+import time
+
+from sqlalchemy import Integer, Float
+from geoalchemy2.elements import WKBElement, WKTElement
+from geoalchemy2.shape import to_shape
+import pandas as pd
+
+from niamoto.db.staging import staging_table
+from niamoto.log import get_logger
+
+
+LOGGER = get_logger(__name__)
+
+
+INSERT = 'i'
+UPDATE = 'u'
+DELETE = 'd'
+
+ACTION_COLUMN = '_action'
+
+
+class BulkSyncEngine:
+    """
+    Apply the insert, update and delete dataframes resolved by a provider
+    sync to a Niamoto table, using COPY and set based statements.
+    """
+
+    def __init__(self, table, key_columns, value_columns,
+                 update_columns=None):
+        """
+        :param table: The sqlalchemy table to sync.
+        :param key_columns: The columns identifying a record of the table
+            in the sync dataframes (e.g. provider_id, provider_pk).
+        :param value_columns: The columns written on insert.
+        :param update_columns: The columns written on update, if None,
+            same as value_columns.
+        """
+        self.table = table
+        self.key_columns = list(key_columns)
+        self.value_columns = list(value_columns)
+        if update_columns is None:
+            update_columns = value_columns
+        self.update_columns = list(update_columns)
+
+    @property
+    def columns(self):
+        return self.key_columns + self.value_columns
+
+    def sync(self, connection, insert_df, update_df, delete_df):
+        """
+        Write the sync dataframes to the database.
+        :param connection: The connection to use, must be in a transaction.
+            The COPY is done on its underlying DBAPI connection, so that
+            everything happens in the same transaction.
+        :param insert_df: The records to insert, must contain the key
+            columns, the missing value columns are set to null.
+        :param update_df: The records to update, must contain the key
+            columns, the missing update columns are set to null.
+        :param delete_df: The records to delete, must contain the key
+            columns.
+        :return: The number of inserted, updated and deleted records.
+        """
+        t = time.time()
+        staging_df = self.get_staging_dataframe(insert_df, update_df,
+                                                delete_df)
+        if len(staging_df) == 0:
+            return 0, 0, 0
+        dialect = connection.dialect
+        counts = []
+        with staging_table(connection, self.get_staging_columns(),
+                           prefix="niamoto_sync_{}".format(self.table.name),
+                           dataframe=staging_df) as staging:
+            for action, get_sql in [(INSERT, self.get_insert_sql),
+                                    (UPDATE, self.get_update_sql),
+                                    (DELETE, self.get_delete_sql)]:
+                if (staging_df[ACTION_COLUMN] == action).any():
+                    sql = get_sql(staging.name, dialect)
+                    counts.append(connection.execute(sql).rowcount)
+                else:
+                    counts.append(0)
+        m = "'{}' bulk sync: {} inserted, {} updated, {} deleted ({:.2f} s)."
+        LOGGER.debug(m.format(self.table.name, *counts, time.time() - t))
+        return tuple(counts)
+
+    def get_staging_dataframe(self, insert_df, update_df, delete_df):
+        """
+        :return: The concatenation of the sync dataframes, with an action
+            column, and the values serialized for COPY.
+        """
+        frames = []
+        for action, df, cols in [(INSERT, insert_df, self.columns),
+                                 (UPDATE, update_df, self.key_columns +
+                                  self.update_columns),
+                                 (DELETE, delete_df, self.key_columns)]:
+            if len(df) == 0:
+                continue
+            # Key columns can be carried by the index (e.g. plot-occurrence)
+            in_index = [
+                c for c in cols
+                if c not in df.columns and c in df.index.names
+            ]
+            if len(in_index) > 0:
+                df = df.reset_index(level=in_index)
+            # Missing value columns are written as null
+            frame = df.reindex(columns=cols).reindex(columns=self.columns)
+            # Nullable integers, pandas would otherwise store integer
+            # columns containing nulls as floats, and lose precision.
+            for col in self.columns:
+                if self._is_integer(col):
+                    frame[col] = frame[col].astype('Int64')
+            frame[ACTION_COLUMN] = action
+            frames.append(frame)
+        if len(frames) == 0:
+            return pd.DataFrame(columns=self.columns + [ACTION_COLUMN])
+        staging_df = pd.concat(frames, ignore_index=True)
+        for col in self.columns:
+            if staging_df[col].dtype == object:
+                staging_df[col] = staging_df[col].map(serialize_value)
+        return staging_df
+
+    def get_staging_columns(self):
+        """
+        :return: The (column name, sql type) columns of the staging table.
+        """
+        columns = [(c, self._get_staging_type(c)) for c in self.columns]
+        columns.append((ACTION_COLUMN, 'char(1)'))
+        return columns
+
+    def get_insert_sql(self, staging_table, dialect):
+        return \
+            """
+            INSERT INTO {table} ({columns})
+            SELECT {values}
+            FROM {staging} AS stg
+            WHERE stg.{action} = '{insert}';
+            """.format(**{
+                'table': self._get_table_name(),
+                'columns': ', '.join(self.columns),
+                'values': ', '.join(
+                    [self._get_cast(c, dialect) for c in self.columns]
+                ),
+                'staging': staging_table,
+                'action': ACTION_COLUMN,
+                'insert': INSERT,
+            })
+
+    def get_update_sql(self, staging_table, dialect):
+        return \
+            """
+            UPDATE {table}
+            SET {values}
+            FROM {staging} AS stg
+            WHERE stg.{action} = '{update}' AND {join};
+            """.format(**{
+                'table': self._get_table_name(),
+                'values': ', '.join([
+                    "{} = {}".format(c, self._get_cast(c, dialect))
+                    for c in self.update_columns
+                ]),
+                'staging': staging_table,
+                'action': ACTION_COLUMN,
+                'update': UPDATE,
+                'join': self._get_join_condition(dialect),
+            })
+
+    def get_delete_sql(self, staging_table, dialect):
+        return \
+            """
+            DELETE FROM {table}
+            USING {staging} AS stg
+            WHERE stg.{action} = '{delete}' AND {join};
+            """.format(**{
+                'table': self._get_table_name(),
+                'staging': staging_table,
+                'action': ACTION_COLUMN,
+                'delete': DELETE,
+                'join': self._get_join_condition(dialect),
+            })
+
+    def _get_table_name(self):
+        if self.table.schema is None:
+            return self.table.name
+        return "{}.{}".format(self.table.schema, self.table.name)
+
+    def _get_join_condition(self, dialect):
+        return ' AND '.join([
+            "{}.{} = {}".format(
+                self._get_table_name(),
+                c,
+                self._get_cast(c, dialect)
+            ) for c in self.key_columns
+        ])
+
+    def _is_integer(self, col):
+        return isinstance(self.table.c[col].type, Integer)
+
+    def _get_staging_type(self, col):
+        if self._is_integer(col):
+            return 'bigint'
+        if isinstance(self.table.c[col].type, Float):
+            return 'double precision'
+        return 'text'
+
+    def _get_cast(self, col, dialect):
+        return "CAST(stg.{} AS {})".format(
+            col,
+            self.table.c[col].type.compile(dialect=dialect)
+        )
+
+
+def serialize_value(value):
+    """
+    Serialize a dataframe value into a value that PostgreSQL can read as
+    text input in a COPY.
+    :param value: The value to serialize.
+    """
+    if isinstance(value, WKBElement):
+        return "SRID={};{}".format(value.srid, to_shape(value).wkt)
+    if isinstance(value, WKTElement):
+        return "SRID={};{}".format(value.srid, value.data)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
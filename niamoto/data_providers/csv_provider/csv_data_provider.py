@@ -33,23 +33,15 @@ class CsvDataProvider(BaseDataProvider):
             plot_occurrence_csv_path
         )
 
-    def sync(self, insert=True, update=True, delete=True,
-             sync_occurrence=True, sync_plot=True,
-             sync_plot_occurrence=True):
+    def get_sync_flags(self, sync_occurrence=True, sync_plot=True,
+                       sync_plot_occurrence=True):
         if self.occurrence_csv_path is None:
             sync_occurrence = False
         if self.plot_csv_path is None:
             sync_plot = False
         if self.plot_occurrence_csv_path is None:
             sync_plot_occurrence = False
-        return super(CsvDataProvider, self).sync(
-            insert=insert,
-            update=update,
-            delete=delete,
-            sync_occurrence=sync_occurrence,
-            sync_plot=sync_plot,
-            sync_plot_occurrence=sync_plot_occurrence,
-        )
+        return sync_occurrence, sync_plot, sync_plot_occurrence
 
     @property
     def occurrence_provider(self):
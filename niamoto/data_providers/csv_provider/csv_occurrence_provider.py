@@ -6,6 +6,8 @@ import pandas as pd
 
 from niamoto.data_providers.base_occurrence_provider import \
     BaseOccurrenceProvider
+from niamoto.data_providers.provider_encoder import \
+    encode_provider_dataframe, get_common_dtypes
 from niamoto.exceptions import DataSourceNotFoundError, \
     MalformedDataSourceError
 
@@ -23,24 +25,62 @@ class CsvOccurrenceProvider(BaseOccurrenceProvider):
 
     REQUIRED_COLUMNS = set(['id', 'taxon_id', 'x', 'y'])
 
+    MALFORMED_MESSAGE = "The csv file is not valid, it must contains the " \
+        "following columns: ('plot_id', 'occurrence_id', " \
+        "'occurrence_identifier')"
+
     def __init__(self, data_provider, occurrence_csv_path):
         super(CsvOccurrenceProvider, self).__init__(data_provider)
         self.occurrence_csv_path = occurrence_csv_path
 
     def get_provider_occurrence_dataframe(self):
+        self.assert_csv_exists()
+        try:
+            df = pd.read_csv(self.occurrence_csv_path, index_col='id')
+        except ValueError:
+            raise MalformedDataSourceError(self.MALFORMED_MESSAGE)
+        return self.format_provider_dataframe(df)
+
+    def get_provider_occurrence_chunks(self, chunk_size):
+        self.assert_csv_exists()
+        # The dtypes are inferred from the whole file, in a first pass,
+        # hence the chunks are parsed and serialized the same way whatever
+        # their size.
+        dtypes = get_common_dtypes(self._read_csv_chunks(chunk_size))
+        for df in self._read_csv_chunks(chunk_size, dtype=dtypes):
+            yield self.format_provider_dataframe(df)
+
+    def _read_csv_chunks(self, chunk_size, dtype=None):
+        reader = pd.read_csv(
+            self.occurrence_csv_path,
+            index_col='id',
+            chunksize=chunk_size,
+            dtype=dtype
+        )
+        while True:
+            try:
+                df = next(reader)
+            except StopIteration:
+                return
+            except ValueError:
+                raise MalformedDataSourceError(self.MALFORMED_MESSAGE)
+            yield df
+
+    def assert_csv_exists(self):
         path = self.occurrence_csv_path
         if not exists(path) or not isfile(path):
             m = "The occurrence csv file '{}' does not exist.".format(
                 path
             )
             raise DataSourceNotFoundError(m)
-        try:
-            df = pd.read_csv(self.occurrence_csv_path, index_col='id')
-        except ValueError:
-            m = "The csv file is not valid, it must contains the following " \
-                "columns: ('plot_id', 'occurrence_id', " \
-                "'occurrence_identifier')"
-            raise MalformedDataSourceError(m)
+
+    def format_provider_dataframe(self, df):
+        """
+        Check the columns of a dataframe read from the csv file, and format
+        it as expected by the occurrence sync.
+        :param df: The dataframe read from the csv file (or a chunk).
+        :return: The formatted dataframe.
+        """
         cols = set(list(df.columns) + ['id', ])
         inter = cols.intersection(self.REQUIRED_COLUMNS)
         if not inter == self.REQUIRED_COLUMNS:
@@ -49,20 +89,5 @@ class CsvOccurrenceProvider(BaseOccurrenceProvider):
             raise MalformedDataSourceError(m)
         if len(df) == 0:
             return df
-        property_cols = cols.difference(self.REQUIRED_COLUMNS)
-        if len(property_cols) > 0:
-            properties = df[list(property_cols)].apply(
-                lambda x: x.to_json(),
-                axis=1
-            )
-        else:
-            properties = '{}'
-        df.drop(property_cols, axis=1, inplace=True)
-        df['properties'] = properties
-        location = df[['x', 'y']].apply(
-            lambda x: "SRID=4326;POINT({} {})".format(x['x'], x['y']),
-            axis=1
-        )
-        df['location'] = location
-        df.drop(['x', 'y'], axis=1, inplace=True)
-        return df
+        property_cols = sorted(cols.difference(self.REQUIRED_COLUMNS))
+        return encode_provider_dataframe(df, property_cols)
@@ -5,6 +5,8 @@ from os.path import exists, isfile
 import pandas as pd
 
 from niamoto.data_providers.base_plot_provider import BasePlotProvider
+from niamoto.data_providers.provider_encoder import \
+    encode_provider_dataframe
 from niamoto.exceptions import DataSourceNotFoundError, \
     MalformedDataSourceError
 
@@ -48,21 +50,6 @@ class CsvPlotProvider(BasePlotProvider):
             raise MalformedDataSourceError(m)
         if len(df) == 0:
             return df
-        property_cols = cols.difference(self.REQUIRED_COLUMNS)
-        if len(property_cols) > 0:
-            properties = df[list(property_cols)].apply(
-                lambda x: x.to_json(),
-                axis=1
-            )
-        else:
-            properties = '{}'
-        df.drop(property_cols, axis=1, inplace=True)
-        df['properties'] = properties
-        location = df[['x', 'y']].apply(
-            lambda x: "SRID=4326;POINT({} {})".format(x['x'], x['y']),
-            axis=1
-        )
-        df['location'] = location
-        df.drop(['x', 'y'], axis=1, inplace=True)
-        return df
+        property_cols = sorted(cols.difference(self.REQUIRED_COLUMNS))
+        return encode_provider_dataframe(df, property_cols)
 
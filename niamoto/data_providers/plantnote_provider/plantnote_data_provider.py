@@ -35,23 +35,15 @@ class PlantnoteDataProvider(BaseDataProvider):
             self.plantnote_db_path
         )
 
-    def sync(self, insert=True, update=True, delete=True,
-             sync_occurrence=True, sync_plot=True,
-             sync_plot_occurrence=True):
+    def get_sync_flags(self, sync_occurrence=True, sync_plot=True,
+                       sync_plot_occurrence=True):
         db_path = self.plantnote_db_path
         if not exists(db_path) or not isfile(db_path):
             m = "The Pl@ntnote database '{}' does not exist.".format(
                 db_path
             )
             raise DataSourceNotFoundError(m)
-        return super(PlantnoteDataProvider, self).sync(
-            insert=True,
-            update=True,
-            delete=True,
-            sync_occurrence=True,
-            sync_plot=True,
-            sync_plot_occurrence=True
-        )
+        return sync_occurrence, sync_plot, sync_plot_occurrence
 
     @property
     def occurrence_provider(self):
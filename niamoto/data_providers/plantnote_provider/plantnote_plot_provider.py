@@ -4,6 +4,8 @@ from sqlalchemy import *
 import pandas as pd
 
 from niamoto.data_providers.base_plot_provider import BasePlotProvider
+from niamoto.data_providers.provider_encoder import \
+    encode_provider_dataframe
 
 
 class PlantnotePlotProvider(BasePlotProvider):
@@ -43,13 +45,11 @@ class PlantnotePlotProvider(BasePlotProvider):
                 "width",
                 "height",
             ]
-            properties = df[property_cols].apply(
-                lambda x: x.to_json(),
-                axis=1
+            return encode_provider_dataframe(
+                df,
+                property_cols,
+                location=False
             )
-            df.drop(property_cols, axis=1, inplace=True)
-            df['properties'] = properties
-            return df
         except:
             raise
         finally:
@@ -0,0 +1,153 @@
+# coding: utf-8
+
+"""
+Vectorized encoding of provider dataframes into Niamoto records: the
+property columns are serialized to JSON and the coordinates to EWKT points
+for the whole dataframe at once, instead of row by row. The produced
+strings are the same as the ones obtained by applying 'Series.to_json' and
+'"SRID=4326;POINT({} {})".format' on each row.
+"""
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_object_dtype, is_integer_dtype, \
+    is_bool_dtype
+from pandas.core.dtypes.cast import find_common_type
+
+
+def get_properties_json(dataframe, columns, force_ascii=True):
+    """
+    Serialize the given columns of a dataframe to one JSON object per row.
+    :param dataframe: The dataframe.
+    :param columns: The property columns, in the order of the JSON keys.
+    :param force_ascii: Passed to pandas to_json.
+    :return: A series of JSON strings, with the index of the dataframe.
+    """
+    columns = list(columns)
+    if len(columns) == 0:
+        return pd.Series('{}', index=dataframe.index, dtype=object)
+    if len(dataframe) == 0:
+        return pd.Series([], index=dataframe.index, dtype=object)
+    df = _as_row_dtype(dataframe[columns])
+    # The records are serialized without the index, hence a unique default
+    # index is set to avoid any check on duplicated labels.
+    df.index = pd.RangeIndex(len(df))
+    lines = df.to_json(
+        orient='records',
+        lines=True,
+        force_ascii=force_ascii
+    )
+    # Newlines within values are escaped, each line is a record.
+    records = lines.rstrip('\n').split('\n')
+    return pd.Series(records, index=dataframe.index, dtype=object)
+
+
+def get_ewkt_points(x, y, srid=4326):
+    """
+    Build the EWKT points of coordinates series.
+    :param x: The longitudes series.
+    :param y: The latitudes series, with the same index as x.
+    :param srid: The SRID of the points.
+    :return: A series of EWKT strings ('SRID=4326;POINT(x y)').
+    """
+    coords = _as_row_dtype(pd.DataFrame({'x': x, 'y': y}))
+    return "SRID={};POINT(".format(srid) + coords['x'].astype(str) + ' ' \
+        + coords['y'].astype(str) + ')'
+
+
+def encode_provider_dataframe(dataframe, property_columns, force_ascii=True,
+                              location=True):
+    """
+    Replace the property columns of a provider dataframe by a JSON
+    'properties' column, and the 'x' and 'y' columns by an EWKT 'location'
+    column. The dataframe is modified in place.
+    :param dataframe: The provider dataframe.
+    :param property_columns: The property columns.
+    :param force_ascii: Passed to pandas to_json.
+    :param location: If False, the location is not built (e.g. when it is
+        already built by the provider's query).
+    :return: The encoded dataframe.
+    """
+    property_columns = list(property_columns)
+    properties = get_properties_json(
+        dataframe,
+        property_columns,
+        force_ascii=force_ascii
+    )
+    dataframe.drop(property_columns, axis=1, inplace=True)
+    dataframe['properties'] = properties
+    if location:
+        dataframe['location'] = get_ewkt_points(
+            dataframe['x'],
+            dataframe['y']
+        )
+        dataframe.drop(['x', 'y'], axis=1, inplace=True)
+    return dataframe
+
+
+def get_common_dtypes(chunks):
+    """
+    Infer the dtypes of a dataframe read by chunks, as if it had been read
+    at once, so that the chunks can be serialized the same way whatever
+    their size or the order of the rows (the serialized properties and
+    the sync hash depend on the dtypes). The dtypes of the chunks are
+    widened (e.g. integers and floats to floats, numbers and strings to
+    objects), and the integer (resp. boolean) columns having missing
+    values in any chunk to floats (resp. objects).
+    :param chunks: An iterable of dataframes with the same columns.
+    :return: A dict with the columns as keys and their dtype as values.
+    """
+    dtypes = {}
+    first_dtypes = {}
+    missing = set()
+    for chunk in chunks:
+        for col in chunk.columns:
+            first_dtypes.setdefault(col, chunk[col].dtype)
+            nulls = chunk[col].isnull()
+            if nulls.any():
+                missing.add(col)
+            if nulls.all():
+                continue
+            if col in dtypes:
+                dtypes[col] = find_common_type([dtypes[col], chunk[col].dtype])
+            else:
+                dtypes[col] = chunk[col].dtype
+    # The columns only holding missing values keep their dtype
+    first_dtypes.update(dtypes)
+    for col in missing:
+        if is_integer_dtype(first_dtypes[col]):
+            first_dtypes[col] = np.dtype('float64')
+        elif is_bool_dtype(first_dtypes[col]):
+            first_dtypes[col] = np.dtype('object')
+    return first_dtypes
+
+
+def as_dtypes(dataframe, dtypes):
+    """
+    Cast the columns of a dataframe (e.g. a chunk) to given dtypes, see
+    get_common_dtypes.
+    :param dataframe: The dataframe.
+    :param dtypes: A dict with the columns as keys and their dtype as
+        values.
+    :return: The cast dataframe.
+    """
+    changed = {
+        col: dtype for col, dtype in dtypes.items()
+        if col in dataframe.columns and dataframe[col].dtype != dtype
+    }
+    if len(changed) == 0:
+        return dataframe
+    return dataframe.astype(changed)
+
+
+def _as_row_dtype(dataframe):
+    """
+    A row of a dataframe (e.g. in 'apply(..., axis=1)') has the common dtype
+    of the columns: integers become floats when mixed with floats, and
+    values are kept as they are when mixed with other types. Cast the
+    columns accordingly, to serialize the values as the rows would be.
+    """
+    dtype = find_common_type(list(dataframe.dtypes))
+    if is_object_dtype(dtype):
+        return dataframe.copy()
+    return dataframe.astype(dtype)
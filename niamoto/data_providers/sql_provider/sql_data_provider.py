@@ -34,23 +34,15 @@ class SQLDataProvider(BaseDataProvider):
             plot_occurrence_sql
         )
 
-    def sync(self, insert=True, update=True, delete=True,
-             sync_occurrence=True, sync_plot=True,
-             sync_plot_occurrence=True):
+    def get_sync_flags(self, sync_occurrence=True, sync_plot=True,
+                       sync_plot_occurrence=True):
         if self.occurrence_sql is None:
             sync_occurrence = False
         if self.plot_sql is None:
             sync_plot = False
         if self.plot_occurrence_sql is None:
             sync_plot_occurrence = False
-        return super(SQLDataProvider, self).sync(
-            insert=insert,
-            update=update,
-            delete=delete,
-            sync_occurrence=sync_occurrence,
-            sync_plot=sync_plot,
-            sync_plot_occurrence=sync_plot_occurrence,
-        )
+        return sync_occurrence, sync_plot, sync_plot_occurrence
 
     @classmethod
     def get_type_name(cls):
@@ -1,10 +1,12 @@
 # coding: utf-8
 
-import sqlalchemy as sa
 import pandas as pd
 
+from niamoto.db.connector import Connector
 from niamoto.data_providers.base_occurrence_provider import \
     BaseOccurrenceProvider
+from niamoto.data_providers.provider_encoder import \
+    encode_provider_dataframe, get_common_dtypes, as_dtypes
 from niamoto.exceptions import MalformedDataSourceError
 
 
@@ -26,8 +28,44 @@ class SQLOccurrenceProvider(BaseOccurrenceProvider):
         self.occurrence_sql = occurrence_sql
 
     def get_provider_occurrence_dataframe(self):
-        connection = sa.create_engine(self.data_provider.db_url).connect()
-        df = pd.read_sql(self.occurrence_sql, connection, index_col='id')
+        engine = Connector.get_external_engine(self.data_provider.db_url)
+        with engine.connect() as connection:
+            df = pd.read_sql(
+                self.occurrence_sql,
+                connection,
+                index_col='id'
+            )
+        return self.format_provider_dataframe(df)
+
+    def get_provider_occurrence_chunks(self, chunk_size):
+        # The dtypes are inferred from the whole result, in a first pass
+        # (the query is run twice), hence the chunks are serialized the
+        # same way whatever their size.
+        dtypes = get_common_dtypes(self._read_sql_chunks(chunk_size))
+        for df in self._read_sql_chunks(chunk_size):
+            yield self.format_provider_dataframe(as_dtypes(df, dtypes))
+
+    def _read_sql_chunks(self, chunk_size):
+        engine = Connector.get_external_engine(self.data_provider.db_url)
+        with engine.connect() as connection:
+            # Server side cursor, when supported by the database
+            connection = connection.execution_options(stream_results=True)
+            chunks = pd.read_sql(
+                self.occurrence_sql,
+                connection,
+                index_col='id',
+                chunksize=chunk_size
+            )
+            for df in chunks:
+                yield df
+
+    def format_provider_dataframe(self, df):
+        """
+        Check the columns of a dataframe returned by the sql query, and
+        format it as expected by the occurrence sync.
+        :param df: The dataframe returned by the sql query (or a chunk).
+        :return: The formatted dataframe.
+        """
         cols = set(list(df.columns) + ['id', ])
         inter = cols.intersection(self.REQUIRED_COLUMNS)
         if not inter == self.REQUIRED_COLUMNS:
@@ -37,20 +75,5 @@ class SQLOccurrenceProvider(BaseOccurrenceProvider):
             raise MalformedDataSourceError(m)
         if len(df) == 0:
             return df
-        property_cols = cols.difference(self.REQUIRED_COLUMNS)
-        if len(property_cols) > 0:
-            properties = df[list(property_cols)].apply(
-                lambda x: x.to_json(),
-                axis=1
-            )
-        else:
-            properties = '{}'
-        df.drop(property_cols, axis=1, inplace=True)
-        df['properties'] = properties
-        location = df[['x', 'y']].apply(
-            lambda x: "SRID=4326;POINT({} {})".format(x['x'], x['y']),
-            axis=1
-        )
-        df['location'] = location
-        df.drop(['x', 'y'], axis=1, inplace=True)
-        return df
+        property_cols = sorted(cols.difference(self.REQUIRED_COLUMNS))
+        return encode_provider_dataframe(df, property_cols)
@@ -1,8 +1,8 @@
 # coding: utf-8
 
-import sqlalchemy as sa
 import pandas as pd
 
+from niamoto.db.connector import Connector
 from niamoto.data_providers.base_plot_occurrence_provider \
     import BasePlotOccurrenceProvider
 from niamoto.exceptions import MalformedDataSourceError
@@ -29,12 +29,13 @@ class SQLPlotOccurrenceProvider(BasePlotOccurrenceProvider):
         self.plot_occurrence_sql = plot_occurrence_sql
 
     def get_provider_plot_occurrence_dataframe(self):
-        connection = sa.create_engine(self.data_provider.db_url).connect()
-        df = pd.read_sql(
-            self.plot_occurrence_sql,
-            connection,
-            index_col=['plot_id', 'occurrence_id']
-        )
+        engine = Connector.get_external_engine(self.data_provider.db_url)
+        with engine.connect() as connection:
+            df = pd.read_sql(
+                self.plot_occurrence_sql,
+                connection,
+                index_col=['plot_id', 'occurrence_id']
+            )
         cols = set(list(df.columns) + ['plot_id', 'occurrence_id'])
         inter = cols.intersection(self.REQUIRED_COLUMNS)
         if not inter == self.REQUIRED_COLUMNS:
@@ -1,9 +1,11 @@
 # coding: utf-8
 
-import sqlalchemy as sa
 import pandas as pd
 
+from niamoto.db.connector import Connector
 from niamoto.data_providers.base_plot_provider import BasePlotProvider
+from niamoto.data_providers.provider_encoder import \
+    encode_provider_dataframe
 from niamoto.exceptions import MalformedDataSourceError
 
 
@@ -25,8 +27,9 @@ class SQLPlotProvider(BasePlotProvider):
         self.plot_sql = plot_sql
 
     def get_provider_plot_dataframe(self):
-        connection = sa.create_engine(self.data_provider.db_url).connect()
-        df = pd.read_sql(self.plot_sql, connection, index_col='id')
+        engine = Connector.get_external_engine(self.data_provider.db_url)
+        with engine.connect() as connection:
+            df = pd.read_sql(self.plot_sql, connection, index_col='id')
         cols = set(list(df.columns) + ['id', ])
         inter = cols.intersection(self.REQUIRED_COLUMNS)
         if not inter == self.REQUIRED_COLUMNS:
@@ -36,21 +39,6 @@ class SQLPlotProvider(BasePlotProvider):
             raise MalformedDataSourceError(m)
         if len(df) == 0:
             return df
-        property_cols = cols.difference(self.REQUIRED_COLUMNS)
-        if len(property_cols) > 0:
-            properties = df[list(property_cols)].apply(
-                lambda x: x.to_json(),
-                axis=1
-            )
-        else:
-            properties = '{}'
-        df.drop(property_cols, axis=1, inplace=True)
-        df['properties'] = properties
-        location = df[['x', 'y']].apply(
-            lambda x: "SRID=4326;POINT({} {})".format(x['x'], x['y']),
-            axis=1
-        )
-        df['location'] = location
-        df.drop(['x', 'y'], axis=1, inplace=True)
-        return df
+        property_cols = sorted(cols.difference(self.REQUIRED_COLUMNS))
+        return encode_provider_dataframe(df, property_cols)
 
@@ -0,0 +1,221 @@
+# coding: utf-8
+
+"""
+Sync of several data providers at once. The extraction and preparation of
+the providers' data (reading files or external databases, building the
+properties and locations, mapping the taxa) is done in a pool of worker
+processes, while the writes to the Niamoto database are applied by the
+coordinating process, one provider at a time, as soon as its data is
+ready: occurrences and plots first, then the plot-occurrences, that
+reference them.
+"""
+
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from niamoto import conf
+from niamoto.db.connector import Connector
+from niamoto.taxonomy.taxonomy_manager import TaxonomyManager
+from niamoto.log import get_logger
+
+
+LOGGER = get_logger(__name__)
+
+
+SYNC_KEYS = ['occurrence', 'plot', 'plot_occurrence']
+
+#  Status of a provider in a sync report.
+SYNC_OK = 'ok'
+SYNC_FAILED = 'failed'
+SYNC_SKIPPED = 'skipped'
+
+
+def sync_data_providers(providers, jobs=1, chunk_size=None):
+    """
+    Sync the Niamoto database with several data providers.
+    :param providers: A list of (name, provider_class, args) tuples, the
+        providers are instantiated with provider_class(name, *args).
+    :param jobs: The number of worker processes extracting the providers'
+        data. If 1, everything is done in the current process.
+    :param chunk_size: If not None, the providers' occurrences are streamed
+        and synced by chunks of chunk_size occurrences by the coordinator,
+        instead of being extracted by the workers.
+    :return: A dict with the providers' names as keys, and their sync
+        report as values, see get_sync_report.
+    """
+    t = time.time()
+    LOGGER.info("*** Syncing {} data providers ({} jobs)...".format(
+        len(providers), jobs
+    ))
+    reports = {}
+    if jobs <= 1:
+        for name, provider_cls, args in providers:
+            result = prepare_provider_dataframes(
+                name,
+                provider_cls,
+                args,
+                chunk_size=chunk_size,
+            )
+            reports[name] = write_provider_dataframes(
+                result,
+                provider_cls,
+                args,
+                chunk_size=chunk_size,
+            )
+    else:
+        # Forked workers inherit the synonym mappings, instead of each of
+        # them reading the taxon table.
+        TaxonomyManager.load_synonyms_cache()
+        # The pooled connections must not be shared with forked workers
+        Connector.dispose_engines()
+        executor = ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=init_sync_worker,
+            initargs=(
+                conf.NIAMOTO_HOME,
+                conf.settings.settings_module_path,
+            ),
+        )
+        with executor:
+            futures = {
+                executor.submit(
+                    prepare_provider_dataframes,
+                    name,
+                    provider_cls,
+                    args,
+                    chunk_size=chunk_size,
+                ): (name, provider_cls, args)
+                for name, provider_cls, args in providers
+            }
+            for future in as_completed(futures):
+                # Release the future, and the dataframes it holds, once
+                # written
+                name, provider_cls, args = futures.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # e.g. the worker process died
+                    result = _get_error_result(name, e)
+                reports[name] = write_provider_dataframes(
+                    result,
+                    provider_cls,
+                    args,
+                    chunk_size=chunk_size,
+                )
+    LOGGER.info("*** {} data providers synced (total time: {:.2f} s)".format(
+        len(providers), time.time() - t
+    ))
+    LOGGER.debug("Connection pools: {}".format(Connector.get_pool_status()))
+    # In the providers order, rather than in the completion order
+    return {name: reports[name] for name, provider_cls, args in providers}
+
+
+def init_sync_worker(niamoto_home, settings_module_path):
+    """
+    Initialize a worker process (needed when the processes are spawned
+    instead of forked).
+    """
+    conf.set_niamoto_home(niamoto_home)
+    conf.set_settings(settings_module_path)
+
+
+def prepare_provider_dataframes(name, provider_cls, args, chunk_size=None):
+    """
+    Extract and prepare the data of a provider, can be run in a worker
+    process.
+    :return: A dict with the provider's name, its prepared dataframes,
+        the extraction time and the error message, if any.
+    """
+    t = time.time()
+    try:
+        provider = provider_cls(name, *args)
+        dataframes = provider.get_provider_dataframes(chunk_size=chunk_size)
+    except Exception as e:
+        return _get_error_result(name, e)
+    extract_time = time.time() - t
+    LOGGER.info("** Data of '{}' extracted ({:.2f} s).".format(
+        name, extract_time
+    ))
+    return {
+        'name': name,
+        'dataframes': dataframes,
+        'extract_time': extract_time,
+        'error': None,
+    }
+
+
+def write_provider_dataframes(result, provider_cls, args, chunk_size=None):
+    """
+    Sync the Niamoto database with the prepared data of a provider.
+    :param result: A result of prepare_provider_dataframes.
+    :return: The sync report of the provider, see get_sync_report.
+    """
+    if result['error'] is not None:
+        LOGGER.error("Data sync with '{}' failed: {}".format(
+            result['name'], result['error']
+        ))
+        return get_sync_report(None, result['extract_time'], 0,
+                               result['error'])
+    t = time.time()
+    try:
+        provider = provider_cls(result['name'], *args)
+        sync_result = provider.sync(
+            chunk_size=chunk_size,
+            dataframes=result['dataframes'],
+        )
+    except Exception as e:
+        LOGGER.error("Data sync with '{}' failed: {}".format(
+            result['name'], e
+        ))
+        LOGGER.debug(traceback.format_exc())
+        return get_sync_report(None, result['extract_time'],
+                               time.time() - t, str(e))
+    return get_sync_report(sync_result, result['extract_time'],
+                           time.time() - t)
+
+
+def get_sync_report(sync_result, extract_time, write_time, error=None,
+                    status=None):
+    """
+    :param sync_result: The result of a data provider sync, or None if it
+        failed or was skipped.
+    :param status: The status of the sync, if None, SYNC_FAILED if there is
+        an error, SYNC_OK otherwise.
+    :return: A dict containing the number of inserted, updated and
+    deleted rows for each specialized provider, the extraction and write
+    times, the status and the error message, if any:
+        {
+            'occurrence': {'insert': 10, 'update': 0, 'delete': 1},
+            'plot': { ... },
+            'plot_occurrence': { ... },
+            'extract_time': 1.2,
+            'write_time': 0.5,
+            'status': 'ok',
+            'error': None,
+        }
+    """
+    if status is None:
+        status = SYNC_OK if error is None else SYNC_FAILED
+    report = {
+        'extract_time': extract_time,
+        'write_time': write_time,
+        'status': status,
+        'error': error,
+    }
+    for key in SYNC_KEYS:
+        report[key] = {
+            op: 0 if sync_result is None else len(sync_result[key][op])
+            for op in ['insert', 'update', 'delete']
+        }
+    return report
+
+
+def _get_error_result(name, error):
+    LOGGER.debug(traceback.format_exc())
+    return {
+        'name': name,
+        'dataframes': None,
+        'extract_time': 0,
+        'error': str(error),
+    }
@@ -0,0 +1,65 @@
+# coding: utf-8
+
+"""
+Content hash of provider records, used to detect changes during a sync.
+The hash of each record is stored along the record (sync_hash column) when
+it is written, the next sync only has to compare the hashes of the
+provider records with the stored ones, instead of the full records.
+"""
+
+import numpy as np
+import pandas as pd
+
+from niamoto.data_providers.bulk_sync import serialize_value
+
+
+SYNC_HASH_COLUMN = 'sync_hash'
+
+NUMERIC_TYPES = {
+    'empty', 'integer', 'floating', 'mixed-integer-float', 'decimal',
+    'boolean',
+}
+
+
+def get_sync_hash(dataframe, columns):
+    """
+    Compute a stable content hash for each row of a dataframe.
+    :param dataframe: The dataframe to hash.
+    :param columns: The columns to include in the hash.
+    :return: A int64 series with the same index as the dataframe.
+    """
+    if len(dataframe) == 0:
+        return pd.Series([], index=dataframe.index, dtype=np.int64)
+    df = pd.DataFrame(index=dataframe.index)
+    for col in columns:
+        values = dataframe[col]
+        inferred = pd.api.types.infer_dtype(values, skipna=True)
+        if inferred in NUMERIC_TYPES:
+            # Hashed as floats, so 1, 1.0 and None / NaN give the same hash
+            values = pd.to_numeric(values).astype(np.float64)
+        else:
+            if inferred != 'string':
+                # Geometries, dicts...
+                values = values.map(serialize_value)
+            values = values.fillna('').astype(str)
+        df[col] = values
+    hashes = pd.util.hash_pandas_object(df, index=False, categorize=False)
+    return pd.Series(hashes.values.view(np.int64), index=dataframe.index)
+
+
+def get_changed_index(niamoto_dataframe, provider_dataframe):
+    """
+    :param niamoto_dataframe: DataFrame from Niamoto database, with
+        'provider_pk' and 'sync_hash' columns.
+    :param provider_dataframe: DataFrame from provider, indexed by the
+        provider's pk, with a 'sync_hash' column.
+    :return: The provider's pks of the records which are both in the
+        provider and Niamoto, and whose hashes differ.
+    """
+    niamoto_hashes = niamoto_dataframe.set_index(
+        'provider_pk'
+    )[SYNC_HASH_COLUMN]
+    inter = provider_dataframe.index.intersection(niamoto_hashes.index)
+    changed = provider_dataframe.loc[inter, SYNC_HASH_COLUMN].values != \
+        niamoto_hashes.loc[inter].values
+    return inter[changed]
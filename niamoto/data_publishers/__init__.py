@@ -12,6 +12,8 @@ from niamoto.data_publishers.plot_occurrence_data_publisher import \
     PlotOccurrenceDataPublisher
 from niamoto.data_publishers.r_data_publisher import RDataPublisher
 from niamoto.data_publishers.raster_data_publisher import RasterDataPublisher
+from niamoto.data_publishers.occurrence_fact_table_publisher import \
+    OccurrenceFactTablePublisher
 
 R_SCRIPTS_HOME = os.path.join(NIAMOTO_HOME, 'R')
 PYTHON_SCRIPTS_HOME = os.path.join(NIAMOTO_HOME, 'python', 'publishers')
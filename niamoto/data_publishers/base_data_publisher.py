@@ -2,11 +2,14 @@
 
 import sys
 
-from sqlalchemy import create_engine
 from geopandas import GeoDataFrame, GeoSeries
 
 from niamoto.data_publishers.utils.geo_pandas_sql import to_postgis
+from niamoto.data_publishers.utils.arrow_writer import write_parquet, \
+    write_feather
+from niamoto.data_publishers.publisher_cache import PublisherCache
 from niamoto.db.connector import Connector
+from niamoto.db.staging import copy_to_csv
 
 
 PUBLISHER_REGISTRY = {}
@@ -33,13 +36,22 @@ class BaseDataPublisher(metaclass=PublisherMeta):
     CSV = 'csv'
     SQL = 'sql'
     TIFF = 'tiff'
-    PUBLISH_FORMATS = [CSV, SQL, TIFF]
+    PARQUET = 'parquet'
+    FEATHER = 'feather'
+    PUBLISH_FORMATS = [CSV, SQL, TIFF, PARQUET, FEATHER]
     PUBLISH_FORMATS_DESCRIPTION = {
         CSV: "Publish the data using the csv format.",
         SQL: "Publish the data as a table to a SQL database",
         TIFF: "Publish the data as a tiff raster file.",
+        PARQUET: "Publish the data using the (Geo)Parquet columnar format.",
+        FEATHER: "Publish the data using the Arrow IPC (Feather) format.",
     }
 
+    #  If True, the results can be stored in the persistent publisher
+    #  cache. Only for publishers whose results only depend on their
+    #  parameters and on the Niamoto database state (see PublisherCache).
+    CACHED = False
+
     def __init__(self):
         self.last_data = None
         self.last_publish_args = None
@@ -55,15 +67,30 @@ class BaseDataPublisher(metaclass=PublisherMeta):
     def get_description(cls):
         raise NotImplementedError()
 
-    def process(self, *args, **kwargs):
+    def process(self, *args, use_cache=None, **kwargs):
         """
         Process the data, memoize and return the result to be published.
+        :param use_cache: If True, use the persistent publisher cache (see
+            PublisherCache) if the publisher enables it. If None, use the
+            cache if it is enabled in the settings.
         :return: The data to be published after processing, the publish args
             and the publish kwargs.
         """
-        r = self._process(*args, **kwargs)
-        if not isinstance(r, (list, tuple)):
-            r = [r, [], {}]
+        if use_cache is None:
+            use_cache = PublisherCache.is_enabled()
+        use_cache = use_cache and self.CACHED
+        r = None
+        if use_cache:
+            version = PublisherCache.get_database_version()
+            r = PublisherCache.get(self.get_key(), args, kwargs, version)
+        if r is None:
+            r = self._process(*args, **kwargs)
+            if not isinstance(r, (list, tuple)):
+                r = [r, [], {}]
+            if use_cache:
+                PublisherCache.put(
+                    self.get_key(), args, kwargs, version, *r
+                )
         self.last_data = r[0]
         self.last_publish_args = r[1]
         self.last_publish_kwargs = r[2]
@@ -78,6 +105,44 @@ class BaseDataPublisher(metaclass=PublisherMeta):
         """
         raise NotImplementedError()
 
+    def get_csv_select(self, connection, *args, **kwargs):
+        """
+        Return the SQL select whose rows are the data to publish as csv,
+        for the streaming csv publish (see stream_csv). The columns, in
+        order, are the index then the columns of the processed data, and
+        the values must be text or scalars.
+        :param connection: A connection to the Niamoto database.
+        :return: A sqlalchemy selectable, or None if the data cannot be
+            streamed (e.g. it is processed in Python), the default.
+        """
+        return None
+
+    def stream_csv(self, *args, destination=sys.stdout, use_cache=None,
+                   **kwargs):
+        """
+        Publish the data in a csv file, streaming the rows of the csv select
+        (see get_csv_select) from the database to the destination with a
+        COPY ... TO STDOUT, hence without loading them in memory. If the
+        data cannot be streamed, it is processed and published as csv.
+        :param destination: The destination file path, or file object.
+        :param use_cache: If the data cannot be streamed, see process.
+        :return: True if the data had been streamed.
+        """
+        with Connector.get_connection() as connection:
+            sel = self.get_csv_select(connection, *args, **kwargs)
+            if sel is not None:
+                copy_to_csv(sel, connection, destination)
+                return True
+        data, p_args, p_kwargs = self.process(
+            *args,
+            use_cache=use_cache,
+            **kwargs
+        )
+        kwargs.update(p_kwargs)
+        self.publish(data, self.CSV, *p_args, destination=destination,
+                     **kwargs)
+        return False
+
     @classmethod
     def get_publish_formats(cls):
         """
@@ -132,55 +197,105 @@ class BaseDataPublisher(metaclass=PublisherMeta):
             active if if_exists is 'truncate'
         """
         if db_url is None:
-            connection = Connector.get_engine().connect()
+            engine = Connector.get_engine()
         else:
-            connection = create_engine(db_url).connect()
-        with connection.begin():
-            if if_exists == 'truncate':
-                test = \
-                    """
-                    SELECT table_name
-                    FROM information_schema.tables
-                    WHERE table_schema = '{}'
-                    AND table_name = '{}'
-                    """.format(schema, destination)
-                r = connection.execute(test).rowcount
-                if r != 0:
-                    sql = "TRUNCATE {}".format(
-                        "{}.{}".format(schema, destination)
+            engine = Connector.get_external_engine(db_url)
+        with engine.connect() as connection:
+            with connection.begin():
+                if if_exists == 'truncate':
+                    test = \
+                        """
+                        SELECT table_name
+                        FROM information_schema.tables
+                        WHERE table_schema = '{}'
+                        AND table_name = '{}'
+                        """.format(schema, destination)
+                    r = connection.execute(test).rowcount
+                    if r != 0:
+                        sql = "TRUNCATE {}".format(
+                            "{}.{}".format(schema, destination)
+                        )
+                        if truncate_cascade:
+                            sql += " CASCADE"
+                        connection.execute(sql)
+                    if_exists = 'append'
+                if isinstance(data, (GeoDataFrame, GeoSeries)):
+                    return to_postgis(
+                        data,
+                        destination,
+                        con=connection,
+                        schema=schema,
+                        if_exists=if_exists
                     )
-                    if truncate_cascade:
-                        sql += " CASCADE"
-                    connection.execute(sql)
-                if_exists = 'append'
-            if isinstance(data, (GeoDataFrame, GeoSeries)):
-                return to_postgis(
-                    data,
+                data.to_sql(
                     destination,
                     con=connection,
                     schema=schema,
                     if_exists=if_exists
                 )
-            data.to_sql(
-                destination,
-                con=connection,
-                schema=schema,
-                if_exists=if_exists
-            )
-            if set_pk is not None:
-                if isinstance(set_pk, (list, tuple)):
-                    set_pk = ",".join(set_pk)
-                connection.execute(
-                    """
-                    ALTER TABLE {}.{} ADD PRIMARY KEY ({});
-                    """.format(
-                        schema,
-                        destination,
-                        set_pk,
+                if set_pk is not None:
+                    if isinstance(set_pk, (list, tuple)):
+                        set_pk = ",".join(set_pk)
+                    connection.execute(
+                        """
+                        ALTER TABLE {}.{} ADD PRIMARY KEY ({});
+                        """.format(
+                            schema,
+                            destination,
+                            set_pk,
+                        )
                     )
-                )
+
+    @staticmethod
+    def _publish_parquet(data, *args, destination=sys.stdout,
+                         index_label=None, row_group_size=100000,
+                         compression='snappy', **kwargs):
+        """
+        Publish the data in a Parquet file.
+        :param data: The data to publish, assume that it is a pandas
+            DataFrame. The geometry columns are written as WKB (GeoParquet).
+        :param destination: The destination file path.
+        :param row_group_size: The number of rows of the row groups, the
+            data is converted and written by chunks of this size.
+        :param compression: The compression codec: 'snappy', 'gzip',
+            'brotli', 'zstd', 'lz4' or 'none'.
+        """
+        if destination is sys.stdout:
+            destination = sys.stdout.buffer
+        write_parquet(
+            data,
+            destination,
+            chunk_size=row_group_size,
+            compression=compression,
+            index_label=index_label,
+        )
+
+    @staticmethod
+    def _publish_feather(data, *args, destination=sys.stdout,
+                         index_label=None, chunk_size=100000,
+                         compression='lz4', **kwargs):
+        """
+        Publish the data in an Arrow IPC (Feather) file.
+        :param data: The data to publish, assume that it is a pandas
+            DataFrame. The geometry columns are written as WKB.
+        :param destination: The destination file path.
+        :param chunk_size: The number of rows of the record batches, the
+            data is converted and written by chunks of this size.
+        :param compression: The compression codec: 'lz4', 'zstd' or 'none'.
+        """
+        if destination is sys.stdout:
+            destination = sys.stdout.buffer
+        write_feather(
+            data,
+            destination,
+            chunk_size=chunk_size,
+            compression=compression,
+            index_label=index_label,
+        )
 
     FORMAT_TO_METHOD = {
         CSV: _publish_csv.__func__,
         SQL: _publish_sql.__func__,
+        PARQUET: _publish_parquet.__func__,
+        FEATHER: _publish_feather.__func__,
     }
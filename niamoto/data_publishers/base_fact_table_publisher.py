@@ -1,11 +1,17 @@
 # coding: utf-8
 
+import sqlalchemy as sa
+
 from niamoto.data_publishers.base_data_publisher import BaseDataPublisher
+from niamoto.db import metadata as meta
+from niamoto.db.connector import Connector
 
 
 class BaseFactTablePublisher(BaseDataPublisher):
     """
-    Base class for publishers populating fact tables.
+    Base class for publishers populating fact tables. A publisher can
+    support the incremental refresh of its fact table (see
+    BaseFactTable.refresh_from_publisher) by implementing _process_changes.
     """
 
     def __init__(self):
@@ -14,6 +20,68 @@ class BaseFactTablePublisher(BaseDataPublisher):
     def _process(self, *args, **kwargs):
         raise NotImplementedError()
 
+    @classmethod
+    def get_watermark(cls, connection=None):
+        """
+        :param connection: If not None, use an existing connection.
+        :return: The current watermark of the data the publisher reads, the
+            changes since a given watermark being returned by
+            process_changes. By default, the date of the last change of
+            the Niamoto data: the last data provider sync, the last update
+            of the data version markers (taxonomy and synonyms, synonym
+            mapping and raster values extraction, see
+            niamoto.db.data_version) and of the synonym key, raster and
+            vector registries.
+        """
+        if connection is None:
+            with Connector.get_connection() as connection:
+                return cls.get_watermark(connection=connection)
+        dates = [
+            sa.func.max(meta.data_provider.c.last_sync),
+            sa.func.max(meta.data_version.c.date_update),
+        ] + [
+            sa.func.max(sa.func.coalesce(
+                registry.c.date_update,
+                registry.c.date_create
+            )) for registry in [
+                meta.synonym_key_registry,
+                meta.raster_registry,
+                meta.vector_registry,
+            ]
+        ]
+        return connection.execute(sa.select([
+            sa.func.greatest(*[sa.select([d]).as_scalar() for d in dates])
+        ])).scalar()
+
+    def process_changes(self, watermark, *args, **kwargs):
+        """
+        Process the data changed since a watermark.
+        :param watermark: The watermark of the last refresh of the fact
+            table, see get_watermark.
+        :return: The keys of the changed rows and the new rows for those
+            keys, or None if a full refresh is required, see
+            _process_changes.
+        """
+        return self._process_changes(watermark, *args, **kwargs)
+
+    def _process_changes(self, watermark, *args, **kwargs):
+        """
+        Process the data changed since a watermark. Raise
+        NotImplementedError if the publisher does not support the
+        incremental refresh (the default).
+        :param watermark: The watermark of the last refresh of the fact
+            table, see get_watermark.
+        :return: None if the changes require a full refresh, otherwise a
+            tuple (keys, data):
+            - keys: A DataFrame with some of the key columns of the fact
+              table (the dimension id columns), the rows matching those
+              keys are deleted (e.g. with only a 'taxon_id' column, all
+              the rows of the changed taxa);
+            - data: A DataFrame with the fact table columns, the new rows
+              for those keys.
+        """
+        raise NotImplementedError()
+
     @classmethod
     def get_description(cls):
         pass
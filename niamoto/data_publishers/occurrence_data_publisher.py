@@ -7,6 +7,8 @@ import geopandas as gpd
 from niamoto.data_publishers.base_data_publisher import BaseDataPublisher
 from niamoto.db import metadata as meta
 from niamoto.db.connector import Connector
+from niamoto.db.property_catalog import get_property_keys, \
+    get_property_types, get_property_column
 
 
 class OccurrenceDataPublisher(BaseDataPublisher):
@@ -14,6 +16,8 @@ class OccurrenceDataPublisher(BaseDataPublisher):
     Publish occurrence dataframe.
     """
 
+    CACHED = True
+
     @classmethod
     def get_key(cls):
         return 'occurrences'
@@ -28,45 +32,81 @@ class OccurrenceDataPublisher(BaseDataPublisher):
         Return the occurrence dataframe.
         :param properties: List of properties to retain. Can be a python list
             or a comma (',') separated string.
+        :param drop_null_properties: If True, drop the occurrences having
+            a null value for one of the properties.
         """
         with Connector.get_connection() as connection:
-            sel_keys = select([
-                func.jsonb_object_keys(
-                    meta.occurrence.c.properties
-                ).distinct(),
-            ])
-            if properties is None:
-                keys = [i[0] for i in connection.execute(sel_keys).fetchall()]
-            else:
-                if isinstance(properties, str):
-                    properties = properties.split(',')
-                keys = properties
-            props = [meta.occurrence.c.properties[k].label(k) for k in keys]
-            sel = select([
-                meta.occurrence.c.id.label('id'),
-                meta.occurrence.c.taxon_id.label('taxon_id'),
-                cast(meta.taxon.c.rank.label('rank'), String).label('rank'),
-                meta.taxon.c.full_name.label('full_name'),
-                func.st_x(meta.occurrence.c.location).label('x'),
-                func.st_y(meta.occurrence.c.location).label('y'),
-            ] + props).select_from(
-                meta.occurrence.outerjoin(
-                    meta.taxon,
-                    meta.taxon.c.id == meta.occurrence.c.taxon_id
-                )
+            sel = self._get_select(
+                connection,
+                properties=properties,
+                drop_null_properties=drop_null_properties
             )
             df = pd.read_sql(sel, connection, index_col='id')
             df['taxon_id'] = df['taxon_id'].apply(pd.to_numeric)
             #  Replace None values with nan
             df.fillna(value=pd.np.NAN, inplace=True)
-            if drop_null_properties:
-                for k in keys:
-                    df = df[df[k].notnull()]
             return df, [], {'index_label': 'id'}
 
+    def get_csv_select(self, connection, *args, properties=None,
+                       drop_null_properties=False, **kwargs):
+        return self._get_select(
+            connection,
+            properties=properties,
+            drop_null_properties=drop_null_properties,
+            as_text=True
+        )
+
+    @staticmethod
+    def _get_select(connection, properties=None, drop_null_properties=False,
+                    as_text=False):
+        """
+        :param as_text: If True, select the properties as text, otherwise
+            they are cast according to their type in the property catalog.
+        :return: The select of the occurrence dataframe.
+        """
+        if properties is None:
+            keys = get_property_keys('occurrence', connection=connection)
+        else:
+            if isinstance(properties, str):
+                properties = properties.split(',')
+            keys = properties
+        types = get_property_types(
+            'occurrence',
+            keys=keys,
+            connection=connection
+        )
+        props = [
+            get_property_column(
+                meta.occurrence.c.properties,
+                k,
+                property_type=types.get(k),
+                as_text=as_text
+            )
+            for k in keys
+        ]
+        sel = select([
+            meta.occurrence.c.id.label('id'),
+            meta.occurrence.c.taxon_id.label('taxon_id'),
+            cast(meta.taxon.c.rank.label('rank'), String).label('rank'),
+            meta.taxon.c.full_name.label('full_name'),
+            func.st_x(meta.occurrence.c.location).label('x'),
+            func.st_y(meta.occurrence.c.location).label('y'),
+        ] + props).select_from(
+            meta.occurrence.outerjoin(
+                meta.taxon,
+                meta.taxon.c.id == meta.occurrence.c.taxon_id
+            )
+        )
+        if drop_null_properties:
+            for k in keys:
+                sel = sel.where(
+                    meta.occurrence.c.properties[k].astext.isnot(None)
+                )
+        return sel
+
     @classmethod
     def get_publish_formats(cls):
-        return [cls.CSV, cls.SQL]
+        return [cls.CSV, cls.SQL, cls.PARQUET, cls.FEATHER]
 
 
 class OccurrenceLocationPublisher(BaseDataPublisher):
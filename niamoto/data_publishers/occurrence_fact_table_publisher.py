@@ -0,0 +1,131 @@
+# coding: utf-8
+
+import sqlalchemy as sa
+import pandas as pd
+
+from niamoto.data_publishers.base_fact_table_publisher import \
+    BaseFactTablePublisher
+from niamoto.db import metadata as meta
+from niamoto.db.connector import Connector
+from niamoto.db.data_version import get_data_version, TAXONOMY
+
+
+class OccurrenceFactTablePublisher(BaseFactTablePublisher):
+    """
+    Fact table publisher counting the occurrences by taxon, for a fact
+    table having a taxon dimension (c.f. TaxonDimension) as only dimension
+    and an 'occurrence_count' measure. The occurrences without taxon are
+    not counted. Subclasses can publish other measures by overriding
+    _process_taxa.
+    The incremental refresh relies on the occurrence change log (see
+    niamoto.db.metadata.occurrence_change_log): the facts of the taxa of
+    the occurrences changed since the watermark, before and after their
+    change, are recomputed. A change of the taxonomy requires a full
+    refresh.
+    """
+
+    #  The name of the taxon dimension of the fact table
+    TAXON_DIMENSION = 'taxon_dimension'
+
+    @classmethod
+    def get_key(cls):
+        return 'taxon_occurrence_counts'
+
+    @classmethod
+    def get_description(cls):
+        return "Count the occurrences by taxon, for populating a fact " \
+               "table with a taxon dimension."
+
+    @classmethod
+    def get_publish_formats(cls):
+        return []
+
+    @classmethod
+    def get_taxon_key_column(cls):
+        """
+        :return: The name of the fact table column holding the taxon id.
+        """
+        return '{}_id'.format(cls.TAXON_DIMENSION)
+
+    @classmethod
+    def get_watermark(cls, connection=None):
+        """
+        :return: The default watermark (see
+            BaseFactTablePublisher.get_watermark), or the date of the last
+            logged occurrence change if it is more recent.
+        """
+        if connection is None:
+            with Connector.get_connection() as connection:
+                return cls.get_watermark(connection=connection)
+        watermark = super(OccurrenceFactTablePublisher, cls).get_watermark(
+            connection=connection
+        )
+        last_change = connection.execute(sa.select([
+            sa.func.max(meta.occurrence_change_log.c.date_change)
+        ])).scalar()
+        return max(
+            [d for d in [watermark, last_change] if d is not None],
+            default=None
+        )
+
+    @classmethod
+    def prune_change_log(cls, connection):
+        """
+        Delete the occurrence changes that are older than the refresh
+        watermark of every fact table, hence that will not be read by any
+        incremental refresh.
+        :param connection: The connection to use.
+        :return: The number of deleted changes.
+        """
+        log = meta.occurrence_change_log
+        oldest = sa.select([
+            sa.func.min(meta.fact_table_registry.c.refresh_watermark)
+        ]).as_scalar()
+        return connection.execute(
+            log.delete().where(log.c.date_change <= oldest)
+        ).rowcount
+
+    def _process(self, *args, **kwargs):
+        return self._process_taxa(None, *args, **kwargs)
+
+    def _process_changes(self, watermark, *args, **kwargs):
+        with Connector.get_connection() as connection:
+            taxonomy_version = get_data_version(
+                TAXONOMY,
+                connection=connection
+            )
+            if taxonomy_version is not None \
+                    and taxonomy_version[1] > watermark:
+                return None
+            self.prune_change_log(connection)
+            log = meta.occurrence_change_log
+            sel = sa.select([log.c.taxon_id]).distinct().where(sa.and_(
+                log.c.date_change > watermark,
+                log.c.taxon_id.isnot(None)
+            ))
+            taxon_ids = [r[0] for r in connection.execute(sel)]
+        keys = pd.DataFrame({self.get_taxon_key_column(): taxon_ids})
+        return keys, self._process_taxa(taxon_ids, *args, **kwargs)
+
+    def _process_taxa(self, taxon_ids, *args, **kwargs):
+        """
+        :param taxon_ids: The ids of the taxa to process, if None, every
+            taxon.
+        :return: A DataFrame with the fact table columns, the facts of the
+            given taxa.
+        """
+        occurrence = meta.occurrence
+        sel = sa.select([
+            occurrence.c.taxon_id.label(self.get_taxon_key_column()),
+            sa.func.count().label('occurrence_count'),
+        ]).where(occurrence.c.taxon_id.isnot(None)).group_by(
+            occurrence.c.taxon_id
+        )
+        if taxon_ids is not None:
+            if len(taxon_ids) == 0:
+                return pd.DataFrame(
+                    columns=[self.get_taxon_key_column(), 'occurrence_count']
+                )
+            sel = sel.where(occurrence.c.taxon_id.in_(taxon_ids))
+        with Connector.get_connection() as connection:
+            return pd.read_sql(sel, connection)
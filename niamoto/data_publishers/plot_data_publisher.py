@@ -6,6 +6,8 @@ import pandas as pd
 from niamoto.data_publishers.base_data_publisher import BaseDataPublisher
 from niamoto.db import metadata as meta
 from niamoto.db.connector import Connector
+from niamoto.db.property_catalog import get_property_keys, \
+    get_property_types, get_property_column
 
 
 class PlotDataPublisher(BaseDataPublisher):
@@ -13,6 +15,8 @@ class PlotDataPublisher(BaseDataPublisher):
     Publish plot dataframe.
     """
 
+    CACHED = True
+
     @classmethod
     def get_key(cls):
         return 'plots'
@@ -28,30 +32,50 @@ class PlotDataPublisher(BaseDataPublisher):
             or a comma (',') separated string.
         """
         with Connector.get_connection() as connection:
-            sel_keys = select([
-                func.jsonb_object_keys(
-                    meta.plot.c.properties
-                ).distinct(),
-            ])
-            if properties is None:
-                keys = [i[0] for i in connection.execute(sel_keys).fetchall()]
-            else:
-                if isinstance(properties, str):
-                    properties = properties.split(',')
-                keys = properties
-            props = [meta.plot.c.properties[k].label(k) for k in keys]
-            sel = select([
-                meta.plot.c.id.label('id'),
-                meta.plot.c.name.label('name'),
-                func.st_x(meta.plot.c.location).label('x'),
-                func.st_y(meta.plot.c.location).label('y'),
-            ] + props)
+            sel = self._get_select(connection, properties=properties)
             df = pd.read_sql(sel, connection, index_col='id')
             #  Replace None values with nan
             df.fillna(value=pd.np.NAN, inplace=True)
             return df, [], {'index_label': 'id'}
 
+    def get_csv_select(self, connection, *args, properties=None, **kwargs):
+        return self._get_select(
+            connection,
+            properties=properties,
+            as_text=True
+        )
+
+    @staticmethod
+    def _get_select(connection, properties=None, as_text=False):
+        """
+        :param as_text: If True, select the properties as text, otherwise
+            they are cast according to their type in the property catalog.
+        :return: The select of the plot dataframe.
+        """
+        if properties is None:
+            keys = get_property_keys('plot', connection=connection)
+        else:
+            if isinstance(properties, str):
+                properties = properties.split(',')
+            keys = properties
+        types = get_property_types('plot', keys=keys, connection=connection)
+        props = [
+            get_property_column(
+                meta.plot.c.properties,
+                k,
+                property_type=types.get(k),
+                as_text=as_text
+            )
+            for k in keys
+        ]
+        return select([
+            meta.plot.c.id.label('id'),
+            meta.plot.c.name.label('name'),
+            func.st_x(meta.plot.c.location).label('x'),
+            func.st_y(meta.plot.c.location).label('y'),
+        ] + props)
+
     @classmethod
     def get_publish_formats(cls):
-        return [cls.CSV, cls.SQL]
+        return [cls.CSV, cls.SQL, cls.PARQUET, cls.FEATHER]
 
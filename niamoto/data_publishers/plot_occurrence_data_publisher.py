@@ -13,6 +13,8 @@ class PlotOccurrenceDataPublisher(BaseDataPublisher):
     Publish plot/occurrence dataframe.
     """
 
+    CACHED = True
+
     @classmethod
     def get_key(cls):
         return 'plots_occurrences'
@@ -23,15 +25,8 @@ class PlotOccurrenceDataPublisher(BaseDataPublisher):
 
     def _process(self, *args, **kwargs):
         with Connector.get_connection() as connection:
-            sel = select([
-                meta.plot_occurrence.c.plot_id.label('plot_id'),
-                meta.plot_occurrence.c.occurrence_id.label('occurrence_id'),
-                meta.plot_occurrence.c.occurrence_identifier.label(
-                    'occurrence_identifier'
-                ),
-            ])
             df = pd.read_sql(
-                sel,
+                self._get_select(),
                 connection,
                 index_col=['plot_id', 'occurrence_id']
             )
@@ -39,7 +34,20 @@ class PlotOccurrenceDataPublisher(BaseDataPublisher):
             df.fillna(value=pd.np.NAN, inplace=True)
             return df, [], {'index_label': ('plot_id', 'occurrence_id')}
 
+    def get_csv_select(self, connection, *args, **kwargs):
+        return self._get_select()
+
+    @staticmethod
+    def _get_select():
+        return select([
+            meta.plot_occurrence.c.plot_id.label('plot_id'),
+            meta.plot_occurrence.c.occurrence_id.label('occurrence_id'),
+            meta.plot_occurrence.c.occurrence_identifier.label(
+                'occurrence_identifier'
+            ),
+        ])
+
     @classmethod
     def get_publish_formats(cls):
-        return [cls.CSV, cls.SQL]
+        return [cls.CSV, cls.SQL, cls.PARQUET, cls.FEATHER]
 
@@ -0,0 +1,332 @@
+# coding: utf-8
+
+"""
+Persistent cache of the data publishers' results, stored as Parquet files
+in the Niamoto home directory ('cache/publishers'), along with an index
+file (entries and hit/miss statistics). It is shared between processes
+(e.g. successive 'publish' commands, R scripts, dimension populations).
+
+An entry is identified by the publisher key, its (normalized) args and
+kwargs and the state version of the Niamoto database, derived from the
+data providers' last syncs, the taxonomy, raster and vector registries and
+the data version markers (see niamoto.db.data_version), which are
+incremented by the writes that do not go through a data provider sync
+(e.g. a raster values extraction, a synonym mapping). Hence syncing a data
+provider, setting the taxonomy, updating a raster or extracting its values
+invalidates the cached results.
+
+Only pandas DataFrames (and Series) can be cached, and only the results of
+the publishers enabling it (see BaseDataPublisher.CACHED). The total size
+of the cache is bounded, the least recently used entries are evicted
+first.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+
+import pandas as pd
+import numpy as np
+
+from niamoto import conf
+from niamoto.conf import settings
+from niamoto.db.connector import Connector
+from niamoto.log import get_logger
+
+
+LOGGER = get_logger(__name__)
+
+
+#  Default publisher cache settings, can be overridden by the
+#  NIAMOTO_PUBLISHER_CACHE dict of the settings module.
+DEFAULT_CACHE_SETTINGS = {
+    'ENABLED': True,
+    'MAX_SIZE': 512 * 1024 ** 2,
+}
+
+
+class PublisherCache:
+    """
+    Class managing the persistent cache of the data publishers' results.
+    """
+
+    INDEX_FILE = 'index.json'
+    LOCK = threading.RLock()
+
+    @classmethod
+    def get_cache_dir(cls):
+        """
+        :return: The cache directory, in the Niamoto home directory.
+        """
+        return os.path.join(conf.NIAMOTO_HOME, 'cache', 'publishers')
+
+    @classmethod
+    def get_cache_settings(cls):
+        """
+        :return: The publisher cache settings.
+        """
+        cache_settings = DEFAULT_CACHE_SETTINGS.copy()
+        cache_settings.update(
+            getattr(settings, 'NIAMOTO_PUBLISHER_CACHE', {})
+        )
+        return cache_settings
+
+    @classmethod
+    def is_enabled(cls):
+        return cls.get_cache_settings()['ENABLED']
+
+    @classmethod
+    def get_database_version(cls, connection=None):
+        """
+        :return: The state version of the Niamoto database, as a hash of
+        the data providers' last syncs, of the taxonomy, raster and
+        vector registries' dates and sizes, and of the data version
+        markers.
+        """
+        sql = \
+            """
+            SELECT
+                (SELECT count(*) FROM {schema}.data_provider),
+                (SELECT max(last_sync) FROM {schema}.data_provider),
+                (SELECT max(coalesce(date_update, date_create))
+                 FROM {schema}.data_provider),
+                (SELECT count(*) FROM {schema}.synonym_key_registry),
+                (SELECT max(coalesce(date_update, date_create))
+                 FROM {schema}.synonym_key_registry),
+                (SELECT count(*) FROM {schema}.taxon),
+                (SELECT max(xmin::text::bigint) FROM {schema}.taxon),
+                (SELECT count(*) FROM {schema}.raster_registry),
+                (SELECT max(coalesce(date_update, date_create))
+                 FROM {schema}.raster_registry),
+                (SELECT sum(version) FROM {schema}.raster_registry),
+                (SELECT count(*) FROM {schema}.vector_registry),
+                (SELECT max(coalesce(date_update, date_create))
+                 FROM {schema}.vector_registry),
+                (SELECT string_agg(
+                    name || ':' || version || ':' || date_update, ','
+                    ORDER BY name
+                 ) FROM {schema}.data_version);
+            """.format(schema=settings.NIAMOTO_SCHEMA)
+        if connection is None:
+            with Connector.get_connection() as connection:
+                row = connection.execute(sql).fetchone()
+        else:
+            row = connection.execute(sql).fetchone()
+        return _hash([str(v) for v in row])
+
+    @classmethod
+    def get_entry_key(cls, publisher_key, args, kwargs, version):
+        """
+        :return: The key of a cache entry, and the key of its parameters
+            (without the database version).
+        """
+        params_key = _hash([publisher_key, _normalize(args),
+                            _normalize(kwargs)])
+        return _hash([params_key, version]), params_key
+
+    @classmethod
+    def get(cls, publisher_key, args, kwargs, version):
+        """
+        :return: The cached result (data, publish args and publish kwargs)
+            of a publisher, or None if it is not in the cache.
+        """
+        key = cls.get_entry_key(publisher_key, args, kwargs, version)[0]
+        with cls.LOCK:
+            index = cls._read_index()
+            entry = index['entries'].get(key)
+            if entry is not None:
+                try:
+                    data = pd.read_parquet(cls._get_path(key))
+                except (OSError, ValueError):
+                    LOGGER.debug("Cache file of '{}' is missing or "
+                                 "corrupted.".format(publisher_key))
+                    del index['entries'][key]
+                    entry = None
+            if entry is None:
+                index['misses'] += 1
+                cls._write_index(index)
+                return None
+            index['hits'] += 1
+            entry['hits'] += 1
+            entry['last_access'] = time.time()
+            cls._write_index(index)
+        LOGGER.debug("Cache hit for '{}'.".format(publisher_key))
+        # Missing values are read as None in object columns, while the
+        # publishers return nan.
+        for col in data.columns[data.dtypes == object]:
+            missing = data[col].isnull()
+            if missing.any():
+                data.loc[missing, col] = np.nan
+        if entry['series']:
+            data = data[data.columns[0]]
+        return data, entry['publish_args'], entry['publish_kwargs']
+
+    @classmethod
+    def put(cls, publisher_key, args, kwargs, version, data,
+            publish_args, publish_kwargs):
+        """
+        Store the result of a publisher in the cache, if it can be stored
+        (a DataFrame or a Series with JSON serializable publish args and
+        kwargs), and evict the least recently used entries if the cache
+        exceeds its max size.
+        :return: True if the result had been cached.
+        """
+        if type(data) not in (pd.DataFrame, pd.Series):
+            return False
+        key, params_key = cls.get_entry_key(
+            publisher_key, args, kwargs, version
+        )
+        entry = {
+            'publisher_key': publisher_key,
+            'params_key': params_key,
+            'series': isinstance(data, pd.Series),
+            'publish_args': list(publish_args),
+            'publish_kwargs': dict(publish_kwargs),
+            'hits': 0,
+            'last_access': time.time(),
+        }
+        try:
+            json.dumps(entry)
+        except TypeError:
+            return False
+        if entry['series']:
+            data = data.to_frame()
+        os.makedirs(cls.get_cache_dir(), exist_ok=True)
+        path = cls._get_path(key)
+        tmp_path = "{}.{}.{}.tmp".format(
+            path, os.getpid(), threading.get_ident()
+        )
+        try:
+            data.to_parquet(tmp_path)
+        except Exception as e:
+            # e.g. mixed type columns, the pyarrow errors are not all
+            # ValueErrors.
+            LOGGER.debug("The result of '{}' cannot be cached: {}".format(
+                publisher_key, e
+            ))
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+        os.replace(tmp_path, path)
+        entry['size'] = os.path.getsize(path)
+        with cls.LOCK:
+            index = cls._read_index()
+            # The results of the same parameters for previous database
+            # versions cannot be hit anymore.
+            for k, v in list(index['entries'].items()):
+                if v['params_key'] == params_key and k != key:
+                    cls._remove_entry(index, k)
+            index['entries'][key] = entry
+            cls._evict(index, cls.get_cache_settings()['MAX_SIZE'])
+            cls._write_index(index)
+        return key in index['entries']
+
+    @classmethod
+    def get_stats(cls):
+        """
+        :return: A dict with the cache statistics:
+            {
+                'hits': 10,
+                'misses': 3,
+                'entries': 2,
+                'size': 1048576,  # In bytes
+                'max_size': 536870912,
+            }
+        """
+        with cls.LOCK:
+            index = cls._read_index()
+        return {
+            'hits': index['hits'],
+            'misses': index['misses'],
+            'entries': len(index['entries']),
+            'size': sum(e['size'] for e in index['entries'].values()),
+            'max_size': cls.get_cache_settings()['MAX_SIZE'],
+        }
+
+    @classmethod
+    def clear(cls):
+        """
+        Remove all the cache entries and reset the statistics.
+        """
+        with cls.LOCK:
+            cache_dir = cls.get_cache_dir()
+            if os.path.exists(cache_dir):
+                # Including the files of entries lost by concurrent
+                # processes' index updates.
+                for file in os.listdir(cache_dir):
+                    if file.endswith('.parquet'):
+                        os.remove(os.path.join(cache_dir, file))
+            cls._write_index(cls._get_empty_index())
+
+    @classmethod
+    def _evict(cls, index, max_size):
+        entries = index['entries']
+        size = sum(e['size'] for e in entries.values())
+        lru = sorted(entries, key=lambda k: entries[k]['last_access'])
+        for key in lru:
+            if size <= max_size:
+                break
+            size -= entries[key]['size']
+            LOGGER.debug("Evicting the cached result of '{}'.".format(
+                entries[key]['publisher_key']
+            ))
+            cls._remove_entry(index, key)
+
+    @classmethod
+    def _remove_entry(cls, index, key):
+        del index['entries'][key]
+        path = cls._get_path(key)
+        if os.path.exists(path):
+            os.remove(path)
+
+    @classmethod
+    def _get_path(cls, key):
+        return os.path.join(cls.get_cache_dir(), "{}.parquet".format(key))
+
+    @classmethod
+    def _get_empty_index(cls):
+        return {'hits': 0, 'misses': 0, 'entries': {}}
+
+    @classmethod
+    def _read_index(cls):
+        path = os.path.join(cls.get_cache_dir(), cls.INDEX_FILE)
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return cls._get_empty_index()
+
+    @classmethod
+    def _write_index(cls, index):
+        os.makedirs(cls.get_cache_dir(), exist_ok=True)
+        path = os.path.join(cls.get_cache_dir(), cls.INDEX_FILE)
+        # Atomic replacement, the index can be read by other processes
+        tmp_path = "{}.{}.{}.tmp".format(
+            path, os.getpid(), threading.get_ident()
+        )
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, path)
+
+
+def _normalize(value):
+    """
+    Normalize publisher args and kwargs: tuples as lists, sorted dict keys
+    (see _hash), and the comma separated strings, accepted as lists by
+    several publishers (e.g. properties), as lists.
+    """
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, str) and ',' in value:
+        return [v.strip() for v in value.split(',')]
+    return value
+
+
+def _hash(value):
+    return hashlib.sha1(
+        json.dumps(value, sort_keys=True, default=repr).encode('utf-8')
+    ).hexdigest()
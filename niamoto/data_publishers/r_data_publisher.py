@@ -17,6 +17,7 @@ from niamoto.data_publishers.plot_occurrence_data_publisher import \
     PlotOccurrenceDataPublisher
 from niamoto.data_publishers.taxon_data_publisher import TaxonDataPublisher
 from niamoto.data_publishers.raster_data_publisher import RasterDataPublisher
+from niamoto.db import property_catalog
 
 
 class RDataPublisher(BaseDataPublisher):
@@ -45,6 +46,7 @@ class RDataPublisher(BaseDataPublisher):
                 self.get_plot_occurrence_dataframe
             globalenv['get_taxon_dataframe'] = self.get_taxon_dataframe
             globalenv['get_raster'] = self.get_raster
+            globalenv['get_property_keys'] = self.get_property_keys
             r.source(self.r_script_path)
             process_func = r['process']
             df = pandas2ri.ri2py(process_func())
@@ -94,6 +96,11 @@ class RDataPublisher(BaseDataPublisher):
             raster_str = RasterDataPublisher().process(raster_name[0])[0]
             return StrSexpVector((raster_str, ))
 
+    @staticmethod
+    @rternalize
+    def get_property_keys(entity):
+        return StrSexpVector(property_catalog.get_property_keys(entity[0]))
+
     @classmethod
     def get_publish_formats(cls):
         return [cls.CSV, cls.SQL]
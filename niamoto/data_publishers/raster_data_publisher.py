@@ -84,6 +84,8 @@ class RasterValueCountPublisher(BaseDataPublisher):
     Publish the distinct values of a raster and the pixel count.
     """
 
+    CACHED = True
+
     def _process(self, raster_name, *args, cuts=None, **kwargs):
         """
         :param raster_name: The name of the raster.
@@ -141,4 +143,4 @@ class RasterValueCountPublisher(BaseDataPublisher):
 
     @classmethod
     def get_publish_formats(cls):
-        return [cls.CSV, cls.SQL]
+        return [cls.CSV, cls.SQL, cls.PARQUET, cls.FEATHER]
@@ -1,6 +1,7 @@
 # coding: utf-8
 
 from sqlalchemy import select, cast, String
+import numpy as np
 import pandas as pd
 
 from niamoto.data_publishers.base_data_publisher import BaseDataPublisher
@@ -14,6 +15,8 @@ class TaxonDataPublisher(BaseDataPublisher):
     Publish plot dataframe.
     """
 
+    CACHED = True
+
     @classmethod
     def get_key(cls):
         return 'taxa'
@@ -33,26 +36,10 @@ class TaxonDataPublisher(BaseDataPublisher):
             it in the resulting dataframe.
         """
         with Connector.get_connection() as connection:
-            keys = TaxonomyManager.get_synonym_keys()['name']
-            synonyms = []
-            if include_synonyms:
-                synonyms = [meta.taxon.c.synonyms[k].label(k) for k in keys
-                            if k != 'niamoto']
-            mptt = []
-            if include_mptt:
-                mptt = [
-                    meta.taxon.c.mptt_left.label('mptt_left'),
-                    meta.taxon.c.mptt_right.label('mptt_right'),
-                    meta.taxon.c.mptt_tree_id.label('mptt_tree_id'),
-                    meta.taxon.c.mptt_depth.label('mptt_depth'),
-                ]
-            sel = select([
-                meta.taxon.c.id.label('id'),
-                meta.taxon.c.full_name.label('full_name'),
-                meta.taxon.c.rank_name.label('rank_name'),
-                cast(meta.taxon.c.rank, String).label('rank'),
-                meta.taxon.c.parent_id.label('parent_id'),
-            ] + synonyms + mptt)
+            sel = self._get_select(
+                include_mptt=include_mptt,
+                include_synonyms=include_synonyms
+            )
             df = pd.read_sql(sel, connection, index_col='id')
             #  Replace None values with nan
             df.fillna(value=pd.np.NAN, inplace=True)
@@ -60,23 +47,84 @@ class TaxonDataPublisher(BaseDataPublisher):
                 df = _flatten(df)
             return df, [], {'index_label': 'id'}
 
+    def get_csv_select(self, connection, *args, include_mptt=False,
+                       include_synonyms=False, flatten=False, **kwargs):
+        # The flattening of the taxonomy is done in Python
+        if flatten:
+            return None
+        return self._get_select(
+            include_mptt=include_mptt,
+            include_synonyms=include_synonyms,
+            as_text=True
+        )
+
+    @staticmethod
+    def _get_select(include_mptt=False, include_synonyms=False,
+                    as_text=False):
+        """
+        :param as_text: If True, select the synonyms as text instead of
+            JSON values.
+        :return: The select of the taxon dataframe.
+        """
+        keys = TaxonomyManager.get_synonym_keys()['name']
+        synonyms = []
+        if include_synonyms:
+            for k in keys:
+                if k == 'niamoto':
+                    continue
+                synonym = meta.taxon.c.synonyms[k]
+                if as_text:
+                    synonym = synonym.astext
+                synonyms.append(synonym.label(k))
+        mptt = []
+        if include_mptt:
+            mptt = [
+                meta.taxon.c.mptt_left.label('mptt_left'),
+                meta.taxon.c.mptt_right.label('mptt_right'),
+                meta.taxon.c.mptt_tree_id.label('mptt_tree_id'),
+                meta.taxon.c.mptt_depth.label('mptt_depth'),
+            ]
+        return select([
+            meta.taxon.c.id.label('id'),
+            meta.taxon.c.full_name.label('full_name'),
+            meta.taxon.c.rank_name.label('rank_name'),
+            cast(meta.taxon.c.rank, String).label('rank'),
+            meta.taxon.c.parent_id.label('parent_id'),
+        ] + synonyms + mptt)
+
     @classmethod
     def get_publish_formats(cls):
-        return [cls.CSV, cls.SQL]
+        return [cls.CSV, cls.SQL, cls.PARQUET, cls.FEATHER]
 
 
 def _flatten(df):
+    """
+    Flatten the taxonomy hierarchy: add one column per rank, containing
+    the full name of the taxon's ancestor (or of the taxon itself) of this
+    rank. If several ancestors have the same rank, the highest one is
+    kept. The ancestors are walked up one level at a time for all the taxa
+    at once, using an array of parent positions.
+    :param df: The taxon dataframe, indexed by id, with the 'full_name',
+        'rank' and 'parent_id' columns.
+    :return: The dataframe with the rank columns.
+    """
     ranks = [opt.value.lower() for opt in meta.TaxonRankEnum]
-    for r in ranks:
-        df[r] = None
-
-    def _flatten_row(row):
-        row[row['rank'].lower()] = row['full_name']
-        parent_id = row['parent_id']
-        while pd.notnull(parent_id):
-            parent = df.loc[parent_id]
-            row[parent['rank'].lower()] = parent['full_name']
-            parent_id = parent['parent_id']
-        return row
-
-    return df.apply(_flatten_row, axis=1)
+    positions = pd.Series(np.arange(len(df)), index=df.index)
+    parents = df['parent_id'].map(positions).fillna(-1).astype(int).values
+    rank_positions = df['rank'].str.lower().map(
+        {r: i for i, r in enumerate(ranks)}
+    ).values
+    full_names = df['full_name'].values
+    flat = np.full((len(df), len(ranks)), None, dtype=object)
+    rows = np.arange(len(df))
+    nodes = rows
+    while len(rows) > 0:
+        # Upper levels overwrite lower ones
+        flat[rows, rank_positions[nodes]] = full_names[nodes]
+        nodes = parents[nodes]
+        has_parent = nodes >= 0
+        rows = rows[has_parent]
+        nodes = nodes[has_parent]
+    for i, r in enumerate(ranks):
+        df[r] = flat[:, i]
+    return df
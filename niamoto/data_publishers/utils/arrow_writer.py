@@ -0,0 +1,174 @@
+# coding: utf-8
+
+"""
+Writing of DataFrames to columnar files (Parquet and Arrow IPC / Feather),
+using pyarrow. The DataFrames are converted and written by chunks (the
+Parquet row groups, or the Arrow record batches), with a schema inferred
+once from the whole DataFrame, hence the pandas dtypes are kept (e.g.
+nullable integers, categoricals, timestamps). The geometry columns (of
+shapely geometries, e.g. the geometry of a GeoDataFrame) are stored as WKB,
+and described by GeoParquet metadata.
+"""
+
+import json
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from shapely import wkb
+from shapely.geometry.base import BaseGeometry
+
+from niamoto.log import get_logger
+
+
+LOGGER = get_logger(__name__)
+
+
+DEFAULT_CHUNK_SIZE = 100000
+
+GEOPARQUET_VERSION = '1.0.0'
+
+
+def write_parquet(dataframe, destination, chunk_size=DEFAULT_CHUNK_SIZE,
+                  compression='snappy', index_label=None):
+    """
+    Write a DataFrame to a Parquet file, by row groups of chunk_size rows.
+    :param dataframe: The DataFrame (or GeoDataFrame) to write.
+    :param destination: A file path or a writable binary file object.
+    :param chunk_size: The number of rows of the row groups.
+    :param compression: The compression codec ('snappy', 'gzip', 'brotli',
+        'zstd', 'lz4' or 'none').
+    :param index_label: The column name(s) of the index. If None, the index
+        names are used, and an unnamed range index is not written.
+    """
+    dataframe, schema, preserve_index = prepare_dataframe(
+        dataframe,
+        index_label
+    )
+    with pq.ParquetWriter(destination, schema,
+                          compression=compression) as writer:
+        for table in iter_tables(dataframe, schema, chunk_size,
+                                 preserve_index):
+            writer.write_table(table, row_group_size=chunk_size)
+
+
+def write_feather(dataframe, destination, chunk_size=DEFAULT_CHUNK_SIZE,
+                  compression='lz4', index_label=None):
+    """
+    Write a DataFrame to an Arrow IPC file (Feather version 2), by record
+    batches of chunk_size rows.
+    :param dataframe: The DataFrame (or GeoDataFrame) to write.
+    :param destination: A file path or a writable binary file object.
+    :param chunk_size: The number of rows of the record batches.
+    :param compression: The compression codec ('lz4', 'zstd' or 'none').
+    :param index_label: The column name(s) of the index, see write_parquet.
+    """
+    dataframe, schema, preserve_index = prepare_dataframe(
+        dataframe,
+        index_label
+    )
+    options = pa.ipc.IpcWriteOptions(
+        compression=None if compression == 'none' else compression
+    )
+    with pa.OSFile(destination, 'wb') if isinstance(destination, str) \
+            else pa.PythonFile(destination, mode='w') as sink:
+        with pa.ipc.new_file(sink, schema, options=options) as writer:
+            for table in iter_tables(dataframe, schema, chunk_size,
+                                     preserve_index):
+                writer.write_table(table, max_chunksize=chunk_size)
+
+
+def prepare_dataframe(dataframe, index_label=None):
+    """
+    Prepare a DataFrame to be written: string column names, geometry
+    columns as WKB, and mixed type object columns (e.g. JSON properties
+    with numeric and text values) as text.
+    :return: The prepared DataFrame, its Arrow schema, and whether its
+        index is written.
+    """
+    if isinstance(dataframe, pd.Series):
+        dataframe = dataframe.to_frame()
+    crs = getattr(dataframe, 'crs', None)
+    geometry_name = getattr(dataframe, '_geometry_column_name', None)
+    # A plain DataFrame (e.g. instead of a GeoDataFrame), the geometries
+    # being replaced. The shallow copy leaves the original unchanged.
+    dataframe = pd.DataFrame(dataframe).copy(deep=False)
+    dataframe.columns = [str(c) for c in dataframe.columns]
+    if index_label is not None:
+        if isinstance(index_label, str):
+            index_label = [index_label]
+        dataframe.index = dataframe.index.set_names(list(index_label))
+    preserve_index = any(name is not None for name in dataframe.index.names)
+    geo_metadata = {}
+    for col in get_geometry_columns(dataframe):
+        geo_metadata[col] = {
+            'encoding': 'WKB',
+            'geometry_types': sorted({
+                g.geom_type for g in dataframe[col] if g is not None
+            }),
+        }
+        if hasattr(crs, 'to_json_dict'):
+            geo_metadata[col]['crs'] = crs.to_json_dict()
+        dataframe[col] = pd.Series([
+            None if g is None else wkb.dumps(g) for g in dataframe[col]
+        ], index=dataframe.index, dtype=object)
+    try:
+        schema = pa.Schema.from_pandas(
+            dataframe,
+            preserve_index=preserve_index
+        )
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        for col in dataframe.columns[dataframe.dtypes == object]:
+            try:
+                pa.array(dataframe[col], from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                LOGGER.debug("Mixed types in the column '{}', written as "
+                             "text.".format(col))
+                dataframe[col] = dataframe[col].where(
+                    dataframe[col].isnull(),
+                    dataframe[col].astype(str)
+                )
+        schema = pa.Schema.from_pandas(
+            dataframe,
+            preserve_index=preserve_index
+        )
+    if len(geo_metadata) > 0:
+        if geometry_name not in geo_metadata:
+            geometry_name = list(geo_metadata)[0]
+        metadata = dict(schema.metadata or {})
+        metadata[b'geo'] = json.dumps({
+            'version': GEOPARQUET_VERSION,
+            'primary_column': geometry_name,
+            'columns': geo_metadata,
+        }).encode('utf-8')
+        schema = schema.with_metadata(metadata)
+    return dataframe, schema, preserve_index
+
+
+def iter_tables(dataframe, schema, chunk_size, preserve_index):
+    """
+    :return: A generator of the Arrow tables of the DataFrame's chunks.
+    """
+    for i in range(0, max(len(dataframe), 1), chunk_size):
+        yield pa.Table.from_pandas(
+            dataframe.iloc[i:i + chunk_size],
+            schema=schema,
+            preserve_index=preserve_index,
+        )
+
+
+def get_geometry_columns(dataframe):
+    """
+    :return: The names of the columns containing shapely geometries.
+    """
+    columns = []
+    for col in dataframe.columns:
+        values = dataframe[col]
+        if str(values.dtype) == 'geometry':
+            columns.append(col)
+        elif values.dtype == object:
+            notnull = values.notnull().values
+            if notnull.any() and isinstance(
+                    values.values[notnull.argmax()], BaseGeometry):
+                columns.append(col)
+    return columns
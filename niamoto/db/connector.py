@@ -7,12 +7,24 @@ from sqlalchemy import create_engine
 from niamoto.conf import settings
 
 
+#  Default connection pool settings of the Niamoto database, can be
+#  overridden by the NIAMOTO_DATABASE_POOL dict of the settings module.
+DEFAULT_POOL_SETTINGS = {
+    'POOL_SIZE': 5,
+    'MAX_OVERFLOW': 10,
+    'POOL_TIMEOUT': 30,
+    'PRE_PING': False,
+    'RECYCLE': -1,
+}
+
+
 class Connector:
     """
     Class managing engines and connections to database(s).
     """
 
     ENGINES = {}
+    EXTERNAL_ENGINES = {}
 
     @classmethod
     @contextmanager
@@ -27,10 +39,32 @@ class Connector:
         finally:
             connection.close()
 
+    @classmethod
+    @contextmanager
+    def get_raw_connection(cls):
+        """
+        :return: A DBAPI (psycopg2) connection drawn from the pool of the
+        Niamoto database engine, e.g. to COPY with 'cursor.copy_expert'.
+        The transaction is committed when leaving the context, or rolled
+        back if an error occurred, and the connection is returned to the
+        pool.
+        """
+        raw_connection = cls.get_engine().raw_connection()
+        try:
+            yield raw_connection
+            raw_connection.commit()
+        except Exception:
+            raw_connection.rollback()
+            raise
+        finally:
+            raw_connection.close()
+
     @classmethod
     def dispose_engines(cls):
         for i in cls.ENGINES.values():
             i.dispose()
+        for i in cls.EXTERNAL_ENGINES.values():
+            i.dispose()
 
     @classmethod
     def get_engine(cls):
@@ -40,10 +74,68 @@ class Connector:
         """
         db_url = cls.get_database_url()
         if db_url not in cls.ENGINES:
-            engine = create_engine(db_url)
+            pool_settings = cls.get_pool_settings()
+            engine = create_engine(
+                db_url,
+                pool_size=pool_settings['POOL_SIZE'],
+                max_overflow=pool_settings['MAX_OVERFLOW'],
+                pool_timeout=pool_settings['POOL_TIMEOUT'],
+                pool_pre_ping=pool_settings['PRE_PING'],
+                pool_recycle=pool_settings['RECYCLE'],
+            )
             cls.ENGINES[db_url] = engine
         return cls.ENGINES[db_url]
 
+    @classmethod
+    def get_external_engine(cls, db_url):
+        """
+        :param db_url: A sqlalchemy database url, e.g. the database of a
+            SQL data provider.
+        :return: A sqlalchemy engine (with the default pool settings of its
+        dialect), cached by url.
+        """
+        if db_url not in cls.EXTERNAL_ENGINES:
+            cls.EXTERNAL_ENGINES[db_url] = create_engine(db_url)
+        return cls.EXTERNAL_ENGINES[db_url]
+
+    @classmethod
+    def get_pool_settings(cls):
+        """
+        :return: The connection pool settings of the Niamoto database.
+        """
+        pool_settings = DEFAULT_POOL_SETTINGS.copy()
+        pool_settings.update(getattr(settings, 'NIAMOTO_DATABASE_POOL', {}))
+        return pool_settings
+
+    @classmethod
+    def get_pool_status(cls):
+        """
+        :return: A dict with the urls (without password) of the engines
+        created by the connector as keys, and the state of their connection
+        pool as values:
+            {
+                'size': 5,  # The configured size of the pool
+                'checked_in': 2,  # Idle connections in the pool
+                'checked_out': 1,  # Connections in use
+                'overflow': -2,  # Connections beyond the size of the pool
+            }
+        The counts are not available for every pool class (e.g. SQLite
+        engines), hence set to None.
+        """
+        status = {}
+        engines = list(cls.ENGINES.values()) + \
+            list(cls.EXTERNAL_ENGINES.values())
+        for engine in engines:
+            pool = engine.pool
+            status[repr(engine.url)] = {
+                key: getattr(pool, attr)() if hasattr(pool, attr) else None
+                for key, attr in [('size', 'size'),
+                                  ('checked_in', 'checkedin'),
+                                  ('checked_out', 'checkedout'),
+                                  ('overflow', 'overflow')]
+            }
+        return status
+
     @classmethod
     def get_database_url(cls):
         database = settings.NIAMOTO_DATABASE
@@ -0,0 +1,84 @@
+# coding: utf-8
+
+"""
+Change markers of the Niamoto data, stored in the database. A marker is
+incremented in the transaction writing the data it stands for (or right
+after it), hence a process can tell whether its cached data (e.g. the
+synonym mappings, the publishers' results) is outdated, whichever process
+wrote the data. A marker is identified by its version and the date of its
+last update, so that it can not be mistaken for a marker of a recreated
+database.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from niamoto.db import metadata as meta
+from niamoto.db.connector import Connector
+
+
+#  The taxa and their synonyms.
+TAXONOMY = 'taxonomy'
+#  The occurrences and plots, for the writes that do not go through a data
+#  provider sync (e.g. raster values extraction, synonym mapping).
+OCCURRENCE = 'occurrence'
+PLOT = 'plot'
+
+
+def bump_data_version(*names, connection=None):
+    """
+    Increment data version markers.
+    :param names: The names of the markers.
+    :param connection: If not None, the connection to use, the marker is
+        then incremented in its current transaction.
+    """
+    if len(names) == 0:
+        return
+    now = datetime.now()
+    table = meta.data_version
+    ins = insert(table).values([
+        {'name': name, 'version': 1, 'date_update': now} for name in names
+    ])
+    upsert = ins.on_conflict_do_update(
+        index_elements=[table.c.name],
+        set_={
+            'version': table.c.version + 1,
+            'date_update': ins.excluded.date_update,
+        }
+    )
+    if connection is None:
+        with Connector.get_connection() as connection:
+            connection.execute(upsert)
+    else:
+        connection.execute(upsert)
+
+
+def get_data_versions(names=None, connection=None):
+    """
+    :param names: The names of the markers, if None, all the markers.
+    :param connection: If not None, the connection to use.
+    :return: A dict with the markers' names as keys and their (version,
+        date of update) as values. The markers that were never incremented
+        are missing.
+    """
+    table = meta.data_version
+    sel = select([table.c.name, table.c.version, table.c.date_update])
+    if names is not None:
+        sel = sel.where(table.c.name.in_(list(names)))
+    if connection is None:
+        with Connector.get_connection() as connection:
+            rows = connection.execute(sel).fetchall()
+    else:
+        rows = connection.execute(sel).fetchall()
+    return {name: (version, date) for name, version, date in rows}
+
+
+def get_data_version(name, connection=None):
+    """
+    :param name: The name of the marker.
+    :return: The (version, date of update) of a marker, None if it was
+        never incremented.
+    """
+    return get_data_versions([name], connection=connection).get(name, None)
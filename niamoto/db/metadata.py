@@ -42,7 +42,8 @@ occurrence = Table(
         index=True,
     ),
     Column('provider_pk', Integer, nullable=False, index=True),
-    Column('location', Geometry('POINT', srid=4326)),
+    #  The GiST index of the location is declared with the table's indexes
+    Column('location', Geometry('POINT', srid=4326, spatial_index=False)),
     Column(
         'taxon_id',
         ForeignKey(
@@ -55,12 +56,24 @@ occurrence = Table(
     ),
     Column('provider_taxon_id', Integer, nullable=True),
     Column('properties', JSONB, nullable=False),
+    Column('sync_hash', BigInteger, nullable=True, index=True),
+    Column('raster_versions', JSONB, nullable=True),
     UniqueConstraint(
         'id',
         'provider_id',
         'provider_pk',
         name='id__provider_id__provider_pk'
     ),
+    Index(
+        'ix_occurrence_niamoto_occurrence_location',
+        'location',
+        postgresql_using='gist',
+    ),
+    Index(
+        'ix_occurrence_niamoto_occurrence_provider_id_provider_pk',
+        'provider_id',
+        'provider_pk',
+    ),
     schema=settings.NIAMOTO_SCHEMA
 )
 
@@ -111,6 +124,12 @@ taxon = Table(
     CheckConstraint('mptt_left >= 0', name='mptt_left_gt_0'),
     CheckConstraint('mptt_right >= 0', name='mptt_right_gt_0'),
     CheckConstraint('mptt_tree_id >= 0', name='mptt_tree_id_gt_0'),
+    Index(
+        'ix_taxon_niamoto_taxon_mptt_tree_id_mptt_left_mptt_right',
+        'mptt_tree_id',
+        'mptt_left',
+        'mptt_right',
+    ),
     schema=settings.NIAMOTO_SCHEMA,
 )
 
@@ -151,8 +170,14 @@ plot = Table(
     ),
     Column('provider_pk', Integer, nullable=False),
     Column('name', String(100), nullable=False),
-    Column('location', Geometry('POINT', srid=4326), nullable=False),
+    Column(
+        'location',
+        Geometry('POINT', srid=4326, spatial_index=False),
+        nullable=False
+    ),
     Column('properties', JSONB, nullable=False),
+    Column('sync_hash', BigInteger, nullable=True, index=True),
+    Column('raster_versions', JSONB, nullable=True),
     UniqueConstraint('name', name='name'),
     UniqueConstraint(
         'id',
@@ -160,6 +185,12 @@ plot = Table(
         'provider_pk',
         name='id__provider_id__provider_pk'
     ),
+    Index('ix_plot_niamoto_plot_location', 'location', postgresql_using='gist'),
+    Index(
+        'ix_plot_niamoto_plot_provider_id_provider_pk',
+        'provider_id',
+        'provider_pk',
+    ),
     schema=settings.NIAMOTO_SCHEMA,
 )
 
@@ -241,6 +272,134 @@ data_provider = Table(
 )
 
 
+# ------------------------ #
+#  Property catalog table  #
+# ------------------------ #
+
+#  The keys of the occurrence and plot properties, by data provider, with
+#  their inferred type and number of non null values. Maintained by the
+#  data provider sync and the raster values extraction, see
+#  niamoto.db.property_catalog.
+property_catalog = Table(
+    'property_catalog',
+    metadata,
+    Column(
+        'provider_id',
+        ForeignKey(
+            '{}.data_provider.id'.format(settings.NIAMOTO_SCHEMA),
+            onupdate="CASCADE",
+            ondelete="CASCADE",
+        ),
+        primary_key=True,
+    ),
+    Column('entity', String(50), primary_key=True),
+    Column('key', Text, primary_key=True),
+    Column('type', String(50), nullable=False),
+    Column('count', BigInteger, nullable=False),
+    schema=settings.NIAMOTO_SCHEMA,
+)
+
+
+# -------------------- #
+#  Data version table  #
+# -------------------- #
+
+#  Change markers of the data, incremented when it is written (e.g. the
+#  taxonomy and its synonyms), so that the caches of every process can be
+#  invalidated, see niamoto.db.data_version.
+data_version = Table(
+    'data_version',
+    metadata,
+    Column('name', String(100), primary_key=True),
+    Column('version', BigInteger, nullable=False),
+    Column('date_update', DateTime, nullable=False),
+    schema=settings.NIAMOTO_SCHEMA,
+)
+
+
+# ---------------------------- #
+#  Occurrence change log table #
+# ---------------------------- #
+
+#  The occurrences (and their taxon, before and after the change) inserted,
+#  updated or deleted, whichever the writer (data provider sync, synonym
+#  mapping, raster values extraction). Filled by statement level triggers
+#  on the occurrence table, created along with the log. Used by the
+#  incremental refresh of the fact tables, see
+#  niamoto.data_publishers.occurrence_fact_table_publisher.
+occurrence_change_log = Table(
+    'occurrence_change_log',
+    metadata,
+    Column('id', BigInteger, primary_key=True),
+    Column('occurrence_id', Integer, nullable=False),
+    Column('taxon_id', Integer, nullable=True),
+    Column(
+        'date_change',
+        DateTime,
+        nullable=False,
+        server_default=func.now(),
+    ),
+    Index('ix_occurrence_change_log_date_change', 'date_change'),
+    schema=settings.NIAMOTO_SCHEMA,
+)
+#  The log is created after the occurrence table, which holds its triggers
+occurrence_change_log.add_is_dependent_on(occurrence)
+
+OCCURRENCE_CHANGE_LOG_TRIGGERS = \
+    """
+    CREATE OR REPLACE FUNCTION {schema}.log_occurrence_changes()
+    RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO {schema}.occurrence_change_log
+                (occurrence_id, taxon_id)
+            SELECT id, taxon_id FROM new_rows;
+        ELSIF TG_OP = 'UPDATE' THEN
+            INSERT INTO {schema}.occurrence_change_log
+                (occurrence_id, taxon_id)
+            SELECT id, taxon_id FROM new_rows
+            UNION
+            SELECT id, taxon_id FROM old_rows;
+        ELSE
+            INSERT INTO {schema}.occurrence_change_log
+                (occurrence_id, taxon_id)
+            SELECT id, taxon_id FROM old_rows;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+    CREATE TRIGGER occurrence_change_log_insert
+    AFTER INSERT ON {schema}.occurrence
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE PROCEDURE {schema}.log_occurrence_changes();
+    CREATE TRIGGER occurrence_change_log_update
+    AFTER UPDATE ON {schema}.occurrence
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE PROCEDURE {schema}.log_occurrence_changes();
+    CREATE TRIGGER occurrence_change_log_delete
+    AFTER DELETE ON {schema}.occurrence
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE PROCEDURE {schema}.log_occurrence_changes();
+    """.format(schema=settings.NIAMOTO_SCHEMA)
+
+#  The triggers are dropped along with their function
+DROP_OCCURRENCE_CHANGE_LOG_TRIGGERS = \
+    "DROP FUNCTION IF EXISTS {}.log_occurrence_changes() CASCADE;".format(
+        settings.NIAMOTO_SCHEMA
+    )
+
+event.listen(
+    occurrence_change_log,
+    'after_create',
+    DDL(OCCURRENCE_CHANGE_LOG_TRIGGERS)
+)
+event.listen(
+    occurrence_change_log,
+    'before_drop',
+    DDL(DROP_OCCURRENCE_CHANGE_LOG_TRIGGERS)
+)
+
+
 # ---------------------- #
 #  Raster registry table #
 # ---------------------- #
@@ -253,6 +412,7 @@ raster_registry = Table(
     Column('date_create', DateTime, nullable=False),
     Column('date_update', DateTime, nullable=True),
     Column('properties', JSONB, nullable=False),
+    Column('version', Integer, nullable=False, server_default='1'),
     UniqueConstraint('name', name='name'),
     schema=settings.NIAMOTO_SCHEMA,
 )
@@ -333,6 +493,7 @@ fact_table_registry = Table(
     Column('date_create', DateTime, nullable=False),
     Column('date_update', DateTime, nullable=True),
     Column('properties', JSONB, nullable=False),
+    Column('refresh_watermark', DateTime, nullable=True),
     UniqueConstraint('name', name='name'),
     schema=settings.NIAMOTO_SCHEMA,
 )
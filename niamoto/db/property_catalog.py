@@ -0,0 +1,280 @@
+# coding: utf-8
+
+"""
+Catalog of the keys of the occurrence and plot JSONB properties. For each
+data provider and entity (occurrence or plot), the catalog records the
+keys of the properties, the type inferred from their values and their
+number of non null values. It is refreshed by the data provider sync and
+by the raster values extraction, in their transaction, hence the keys of
+the properties can be read without scanning the occurrences or the plots
+(e.g. by the publishers), and their type used to cast the values.
+
+The inferred types are:
+    - 'integer': Only integer numbers.
+    - 'number': Numbers.
+    - 'string': Strings.
+    - 'boolean': Booleans.
+    - 'json': Objects, arrays, or values of different types.
+    - 'null': Only null values.
+"""
+
+from sqlalchemy import select, cast, BigInteger, Float, Boolean
+import pandas as pd
+
+from niamoto.conf import settings
+from niamoto.db import metadata as meta
+from niamoto.db.connector import Connector
+from niamoto.log import get_logger
+
+
+LOGGER = get_logger(__name__)
+
+
+INTEGER = 'integer'
+NUMBER = 'number'
+STRING = 'string'
+BOOLEAN = 'boolean'
+JSON = 'json'
+NULL = 'null'
+
+ENTITY_TABLES = {
+    'occurrence': meta.occurrence,
+    'plot': meta.plot,
+}
+
+#  The SQL casts of the property values (as text) by inferred type, the
+#  values of the other types are selected as JSON.
+TYPE_CASTS = {
+    INTEGER: BigInteger,
+    NUMBER: Float,
+    BOOLEAN: Boolean,
+}
+
+
+def get_refresh_property_catalog_sql(entity, provider_id=None, keys=None):
+    """
+    :param entity: The entity whose properties are cataloged ('occurrence'
+        or 'plot').
+    :param provider_id: If not None, only refresh the properties of the
+        given data provider.
+    :param keys: If not None, only refresh the given keys.
+    :return: The sql statements replacing the catalog entries of an entity
+        with the properties of its table, grouped by provider and key.
+    """
+    table = _get_entity_table(entity)
+    conditions = []
+    if provider_id is not None:
+        conditions.append("provider_id = {}".format(int(provider_id)))
+    if keys is not None:
+        conditions.append("key IN ({})".format(", ".join(
+            "'{}'".format(k.replace("'", "''")) for k in keys
+        ) if len(keys) > 0 else "NULL"))
+    where = "".join(" AND " + c for c in conditions)
+    return \
+        """
+        DELETE FROM {catalog} WHERE entity = '{entity}'{where};
+        INSERT INTO {catalog} (provider_id, entity, key, type, count)
+        SELECT provider_id, '{entity}', key,
+            CASE
+                WHEN bool_and(value_type = 'null') THEN '{null}'
+                WHEN bool_and(value_type IN ('number', 'null')) THEN
+                    CASE
+                        WHEN bool_and(value_type = 'null'
+                                      OR value::text ~ '^-?[0-9]{{1,18}}$')
+                        THEN '{integer}'
+                        ELSE '{number}'
+                    END
+                WHEN bool_and(value_type IN ('string', 'null'))
+                    THEN '{string}'
+                WHEN bool_and(value_type IN ('boolean', 'null'))
+                    THEN '{boolean}'
+                ELSE '{json}'
+            END,
+            count(*) FILTER (WHERE value_type <> 'null')
+        FROM (
+            SELECT t.provider_id, p.key, p.value,
+                jsonb_typeof(p.value) AS value_type
+            FROM {table} AS t, jsonb_each(t.properties) AS p
+        ) AS properties
+        WHERE TRUE{where}
+        GROUP BY provider_id, key;
+        """.format(
+            catalog='{}.{}'.format(
+                settings.NIAMOTO_SCHEMA,
+                meta.property_catalog.name
+            ),
+            table='{}.{}'.format(settings.NIAMOTO_SCHEMA, table.name),
+            entity=entity,
+            where=where,
+            null=NULL,
+            integer=INTEGER,
+            number=NUMBER,
+            string=STRING,
+            boolean=BOOLEAN,
+            json=JSON,
+        )
+
+
+def refresh_property_catalog(connection, entity, provider_id=None,
+                             keys=None):
+    """
+    Refresh the catalog of the properties of an entity, from its table.
+    :param connection: The connection to use, e.g. in the transaction
+        writing the properties.
+    :param entity: 'occurrence' or 'plot'.
+    :param provider_id: If not None, only refresh the properties of the
+        given data provider.
+    :param keys: If not None, only refresh the given keys (e.g. the keys
+        written by a raster values extraction).
+    """
+    LOGGER.debug("Refreshing the {} property catalog...".format(entity))
+    connection.execute(
+        get_refresh_property_catalog_sql(
+            entity,
+            provider_id=provider_id,
+            keys=keys
+        )
+    )
+
+
+def refresh_property_catalogs(provider_id=None):
+    """
+    Refresh the catalog of the occurrence and plot properties.
+    :param provider_id: If not None, only refresh the properties of the
+        given data provider.
+    """
+    with Connector.get_connection() as connection:
+        with connection.begin():
+            for entity in ENTITY_TABLES:
+                refresh_property_catalog(
+                    connection,
+                    entity,
+                    provider_id=provider_id
+                )
+
+
+def get_property_keys(entity, provider_id=None, connection=None):
+    """
+    :param entity: 'occurrence' or 'plot'.
+    :param provider_id: If not None, only return the keys of the given
+        data provider.
+    :return: The sorted list of the keys of the properties of an entity.
+    """
+    catalog = meta.property_catalog
+    sel = select([catalog.c.key]).distinct().where(
+        catalog.c.entity == _assert_entity(entity)
+    ).order_by(catalog.c.key)
+    if provider_id is not None:
+        sel = sel.where(catalog.c.provider_id == provider_id)
+    if connection is None:
+        with Connector.get_connection() as connection:
+            return [r[0] for r in connection.execute(sel)]
+    return [r[0] for r in connection.execute(sel)]
+
+
+def get_property_types(entity, keys=None, connection=None):
+    """
+    :param entity: 'occurrence' or 'plot'.
+    :param keys: If not None, only return the types of the given keys.
+    :return: A dict with the keys of the properties of an entity as keys
+        and their type, across the data providers, as values. The keys that
+        are not in the catalog are not returned.
+    """
+    catalog = meta.property_catalog
+    sel = select([catalog.c.key, catalog.c.type]).where(
+        catalog.c.entity == _assert_entity(entity)
+    )
+    if keys is not None:
+        sel = sel.where(catalog.c.key.in_(list(keys)))
+    if connection is None:
+        with Connector.get_connection() as connection:
+            rows = connection.execute(sel).fetchall()
+    else:
+        rows = connection.execute(sel).fetchall()
+    types = {}
+    for key, property_type in rows:
+        types.setdefault(key, []).append(property_type)
+    return {k: merge_property_types(v) for k, v in types.items()}
+
+
+def get_property_catalog(entity=None, connection=None):
+    """
+    :param entity: If not None, only return the properties of this entity.
+    :return: The property catalog as a DataFrame, with the 'entity',
+        'key', 'type' (across the data providers), 'count' and 'providers'
+        (the names of the data providers, comma separated) columns.
+    """
+    catalog = meta.property_catalog
+    sel = select([
+        catalog.c.entity,
+        catalog.c.key,
+        catalog.c.type,
+        catalog.c.count,
+        meta.data_provider.c.name.label('provider'),
+    ]).select_from(
+        catalog.join(
+            meta.data_provider,
+            meta.data_provider.c.id == catalog.c.provider_id
+        )
+    )
+    if entity is not None:
+        sel = sel.where(catalog.c.entity == _assert_entity(entity))
+    if connection is None:
+        with Connector.get_connection() as connection:
+            df = pd.read_sql(sel, connection)
+    else:
+        df = pd.read_sql(sel, connection)
+    df = df.sort_values(['entity', 'key', 'provider'])
+    return df.groupby(['entity', 'key'], sort=True).agg({
+        'type': merge_property_types,
+        'count': 'sum',
+        'provider': ', '.join,
+    }).rename(columns={'provider': 'providers'}).reset_index()
+
+
+def merge_property_types(types):
+    """
+    :param types: The types of a property, e.g. for several providers.
+    :return: The type of the property across the given types.
+    """
+    types = set(types) - {NULL}
+    if len(types) == 0:
+        return NULL
+    if len(types) == 1:
+        return types.pop()
+    if types <= {INTEGER, NUMBER}:
+        return NUMBER
+    return JSON
+
+
+def get_property_column(properties_column, key, property_type=None,
+                        as_text=False):
+    """
+    :param properties_column: The JSONB properties column.
+    :param key: The key of the property.
+    :param property_type: The type of the property, if it is a scalar type
+        the value is cast accordingly, otherwise it is selected as JSON.
+    :param as_text: If True, select the value as text, whatever its type.
+    :return: The sqlalchemy expression selecting a property, labeled with
+        its key.
+    """
+    value = properties_column[key]
+    if as_text or property_type == STRING:
+        value = value.astext
+    elif property_type in TYPE_CASTS:
+        value = cast(value.astext, TYPE_CASTS[property_type])
+    return value.label(key)
+
+
+def _get_entity_table(entity):
+    return ENTITY_TABLES[_assert_entity(entity)]
+
+
+def _assert_entity(entity):
+    if entity not in ENTITY_TABLES:
+        raise ValueError(
+            "The entity must be one of {}, not '{}'.".format(
+                list(ENTITY_TABLES), entity
+            )
+        )
+    return entity
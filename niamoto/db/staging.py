@@ -0,0 +1,319 @@
+# coding: utf-8
+
+"""
+Staging tables and COPY helpers for the bulk loading (and exporting) code
+paths. A staging table has a unique name, so that several loads (e.g. the
+providers synced or remapped concurrently) never clobber each other's
+data. It is either:
+- a temporary table (the default), private to the session, not WAL-logged
+  and dropped at the end of the transaction (ON COMMIT DROP), hence it must
+  be created and used within a transaction;
+- an unlogged table of the Niamoto schema, not WAL-logged either, but
+  visible from other sessions (once the COPY is committed), for loads
+  spanning several connections. It must be dropped explicitly.
+The dataframes are streamed to the COPY by chunks (see DataFrameCopyReader),
+rather than written to an in-memory CSV buffer first.
+"""
+
+import io
+import uuid
+from contextlib import contextmanager
+
+import pandas as pd
+from psycopg2.extensions import TRANSACTION_STATUS_INERROR
+from sqlalchemy.dialects import postgresql
+from shapely import wkb, wkt
+
+from niamoto.conf import settings
+
+
+#  Number of dataframe rows encoded at once when streaming a COPY.
+COPY_CHUNK_SIZE = 50000
+#  Number of characters sent to the server at once by copy_expert.
+COPY_BLOCK_SIZE = 65536
+
+
+class StagingTable:
+    """
+    A uniquely named staging table.
+    """
+
+    def __init__(self, columns, prefix='niamoto_staging', unlogged=False):
+        """
+        :param columns: A list of (column name, sql type) tuples.
+        :param prefix: The prefix of the table name, the name is suffixed
+            by a random uuid.
+        :param unlogged: If True, create an unlogged table in the Niamoto
+            schema instead of a temporary table.
+        """
+        self.columns = list(columns)
+        self.unlogged = unlogged
+        name = "{}_{}".format(prefix, uuid.uuid4().hex)
+        if unlogged:
+            name = "{}.{}".format(settings.NIAMOTO_SCHEMA, name)
+        self.name = name
+
+    @property
+    def column_names(self):
+        return [name for name, sql_type in self.columns]
+
+    def get_create_sql(self):
+        columns = ', '.join([
+            "{} {}".format(name, sql_type) for name, sql_type in self.columns
+        ])
+        if self.unlogged:
+            return "CREATE UNLOGGED TABLE {} ({});".format(self.name, columns)
+        return "CREATE TEMPORARY TABLE {} ({}) ON COMMIT DROP;".format(
+            self.name,
+            columns
+        )
+
+    def create(self, connection):
+        """
+        :param connection: The connection to use, must be in a transaction
+            for a temporary table.
+        """
+        connection.execute(self.get_create_sql())
+
+    def drop(self, connection):
+        connection.execute("DROP TABLE IF EXISTS {};".format(self.name))
+
+    def analyze(self, connection):
+        """
+        Analyze the staging table, temporary tables are not analyzed by
+        autovacuum.
+        """
+        connection.execute("ANALYZE {};".format(self.name))
+
+    def copy_from_dataframe(self, connection, dataframe, columns=None,
+                            index=False):
+        """
+        COPY a dataframe into the staging table.
+        :param columns: The staging columns corresponding to the dataframe
+            columns (and index if index is True), if None, all the columns.
+        """
+        if columns is None:
+            columns = self.column_names
+        copy_from_dataframe(
+            connection,
+            dataframe,
+            self.name,
+            columns,
+            index=index
+        )
+
+
+@contextmanager
+def staging_table(connection, columns, prefix='niamoto_staging',
+                  unlogged=False, dataframe=None):
+    """
+    Create a staging table, and drop it when leaving the context.
+    :param connection: The connection to use, must be in a transaction for
+        a temporary table.
+    :param columns: A list of (column name, sql type) tuples.
+    :param prefix: The prefix of the table name.
+    :param unlogged: If True, create an unlogged table instead of a
+        temporary table.
+    :param dataframe: If not None, the dataframe (with all the columns, in
+        order) is copied into the staging table, which is then analyzed.
+    :return: The StagingTable.
+    """
+    table = StagingTable(columns, prefix=prefix, unlogged=unlogged)
+    table.create(connection)
+    try:
+        if dataframe is not None:
+            table.copy_from_dataframe(connection, dataframe)
+            table.analyze(connection)
+        yield table
+    finally:
+        if not connection.closed and not _is_transaction_aborted(connection):
+            table.drop(connection)
+
+
+class DataFrameCopyReader:
+    """
+    A read-only file like object streaming dataframes as CSV (without
+    header), to be passed to 'cursor.copy_expert'. The rows are encoded
+    chunk by chunk, as the COPY reads them, hence only one chunk is held
+    in memory as text.
+    """
+
+    def __init__(self, dataframes, index=False, chunk_size=COPY_CHUNK_SIZE,
+                 fill_values=None, converters=None):
+        """
+        :param dataframes: A dataframe (or series), or a list of
+            dataframes (with the same columns) streamed one after the other.
+        :param index: If True, the index is written as the first column.
+        :param chunk_size: The number of rows encoded at once.
+        :param fill_values: If not None, the value (or dict of values by
+            column) replacing the null values, see DataFrame.fillna.
+        :param converters: A dict of functions converting the values of
+            a column (the column name as key), applied on each chunk of the
+            column (a Series), after filling the null values.
+        """
+        if isinstance(dataframes, (pd.DataFrame, pd.Series)):
+            dataframes = [dataframes]
+        self.dataframes = dataframes
+        self.index = index
+        self.chunk_size = chunk_size
+        self.fill_values = fill_values
+        self.converters = {} if converters is None else converters
+        self._chunks = self._iter_chunks()
+        self._buffer = ''
+        self._position = 0
+
+    def _iter_chunks(self):
+        for dataframe in self.dataframes:
+            for start in range(0, len(dataframe), self.chunk_size):
+                chunk = dataframe.iloc[start:start + self.chunk_size]
+                if self.fill_values is not None:
+                    chunk = chunk.fillna(value=self.fill_values)
+                if len(self.converters) > 0:
+                    chunk = chunk.copy()
+                    for column, converter in self.converters.items():
+                        chunk[column] = converter(chunk[column])
+                yield chunk.to_csv(index=self.index, header=False)
+
+    def read(self, size=-1):
+        """
+        :param size: The maximum number of characters to read, if negative,
+            read everything that is left.
+        """
+        data = []
+        while size != 0:
+            if self._position >= len(self._buffer):
+                try:
+                    self._buffer = next(self._chunks)
+                    self._position = 0
+                except StopIteration:
+                    break
+            end = len(self._buffer) if size < 0 \
+                else self._position + size
+            part = self._buffer[self._position:end]
+            self._position += len(part)
+            if size > 0:
+                size -= len(part)
+            data.append(part)
+        return ''.join(data)
+
+
+def to_hex_ewkb(geometries, srid):
+    """
+    Encode geometries as hex EWKB, which PostgreSQL reads from a text COPY
+    without parsing any WKT.
+    :param geometries: A Series of shapely geometries (or WKT strings).
+    :param srid: The SRID of the geometries.
+    :return: A Series of hex EWKB strings (None for the null geometries).
+    """
+    def encode(geometry):
+        if geometry is None or (isinstance(geometry, float) and
+                                pd.isnull(geometry)):
+            return None
+        if isinstance(geometry, str):
+            geometry = wkt.loads(geometry)
+        return wkb.dumps(geometry, hex=True, srid=srid)
+    return geometries.apply(encode).astype(object)
+
+
+def copy_from_dataframe(connection, dataframe, table_name, columns,
+                        index=False, **kwargs):
+    """
+    COPY a dataframe into a table, the values are written as CSV, hence
+    they must have a text representation that PostgreSQL can read.
+    :param connection: The sqlalchemy connection to use, the COPY is done on
+        its underlying DBAPI connection, in its current transaction.
+    :param dataframe: The dataframe to copy.
+    :param table_name: The (schema qualified) name of the table.
+    :param columns: The columns of the table, in the order of the dataframe
+        columns.
+    :param index: If True, the index is written as the first column.
+    :param kwargs: Passed to DataFrameCopyReader (e.g. chunk_size).
+    """
+    reader = DataFrameCopyReader(dataframe, index=index, **kwargs)
+    copy_from_buffer(connection, reader, table_name, columns)
+
+
+def copy_from_buffer(connection, buffer, table_name, columns):
+    """
+    COPY a CSV file like object (without header) into a table.
+    :param connection: A sqlalchemy connection, or a DBAPI connection.
+    """
+    dbapi_connection = getattr(connection, 'connection', connection)
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(
+            "COPY {} ({}) FROM STDIN CSV;".format(
+                table_name,
+                ', '.join(columns)
+            ),
+            buffer,
+            size=COPY_BLOCK_SIZE
+        )
+    finally:
+        cursor.close()
+
+
+def read_sql_copy(sql, connection, index_col=None):
+    """
+    Same as pandas.read_sql, but with a COPY ... TO STDOUT, which is much
+    faster for large results. Only suited to queries returning scalar
+    values (numbers, text).
+    :param sql: The sqlalchemy selectable to read.
+    :param connection: The connection to use.
+    :param index_col: The column to use as index.
+    :return: The result as a DataFrame.
+    """
+    query = sql.compile(
+        dialect=connection.dialect,
+        compile_kwargs={'literal_binds': True}
+    )
+    buffer = io.StringIO()
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(
+            "COPY ({}) TO STDOUT CSV HEADER;".format(query),
+            buffer
+        )
+    finally:
+        cursor.close()
+    buffer.seek(0)
+    return pd.read_csv(buffer, index_col=index_col)
+
+
+def copy_to_csv(sql, connection, destination):
+    """
+    Write the result of a query as CSV (with a header) to a file, with a
+    COPY ... TO STDOUT: the rows are streamed from the server to the file
+    as they are produced, hence the memory use does not depend on the size
+    of the result. NULL values are written as empty fields, and the values
+    with their PostgreSQL text representation (e.g. 't' and 'f' for
+    booleans).
+    :param sql: The sqlalchemy selectable to write.
+    :param connection: A sqlalchemy connection, or a DBAPI connection.
+    :param destination: A file path, or a writable file object (text or
+        binary).
+    """
+    dbapi_connection = getattr(connection, 'connection', connection)
+    query = sql.compile(
+        dialect=postgresql.dialect(),
+        compile_kwargs={'literal_binds': True}
+    )
+    cursor = dbapi_connection.cursor()
+    try:
+        copy = "COPY ({}) TO STDOUT CSV HEADER;".format(query)
+        if isinstance(destination, str):
+            with open(destination, 'wb') as f:
+                cursor.copy_expert(copy, f, size=COPY_BLOCK_SIZE)
+        else:
+            cursor.copy_expert(copy, destination, size=COPY_BLOCK_SIZE)
+    finally:
+        cursor.close()
+
+
+def _is_transaction_aborted(connection):
+    """
+    :return: True if the DBAPI connection is in a failed transaction, in
+        which case the staging table can not (and need not) be dropped.
+    """
+    status = connection.connection.get_transaction_status()
+    return status == TRANSACTION_STATUS_INERROR
@@ -1,7 +1,21 @@
 # coding: utf-8
 
+import re
+
+from sqlalchemy.schema import CreateIndex
+
 from niamoto.db.connector import Connector
+from niamoto.db import metadata as niamoto_db_meta
 from niamoto.conf import settings
+from niamoto.log import get_logger
+
+
+LOGGER = get_logger(__name__)
+
+
+INDEX_CREATED = 'created'
+INDEX_REBUILT = 'rebuilt'
+INDEX_VALID = 'valid'
 
 
 def fix_db_sequences():
@@ -61,3 +75,105 @@ def fix_db_sequences_ownership():
         statements = res.fetchall()
         for s in statements:
             connection.execute(s[0])
+
+
+def optimize_db(rebuild=False, analyze=True):
+    """
+    Create the missing indexes of the Niamoto tables (as declared in the
+    metadata, e.g. for a database initialized before they were declared),
+    and rebuild the invalid ones (left by an interrupted concurrent build).
+    The indexes are built CONCURRENTLY, i.e. without locking the tables
+    against writes. The planner statistics of the tables are then updated.
+    :param rebuild: If True, rebuild all the indexes, e.g. bloated ones
+        after large syncs.
+    :param analyze: If True, ANALYZE the tables.
+    :return: A dict with the index names as keys, and 'created', 'rebuilt'
+        or 'valid' (left unchanged) as values.
+    """
+    report = {}
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with Connector.get_connection() as connection:
+        connection = connection.execution_options(
+            isolation_level='AUTOCOMMIT'
+        )
+        tables = [
+            t for t in niamoto_db_meta.metadata.sorted_tables
+            if t.schema == settings.NIAMOTO_SCHEMA and t.exists(connection)
+        ]
+        existing = get_indexes_validity(connection)
+        for table in tables:
+            for index in sorted(table.indexes, key=lambda i: i.name):
+                valid = existing.get(index.name)
+                if valid is None:
+                    LOGGER.debug("Creating index '{}'...".format(index.name))
+                    connection.execute(get_create_index_concurrently(
+                        index,
+                        connection.dialect
+                    ))
+                    report[index.name] = INDEX_CREATED
+                elif rebuild or not valid:
+                    LOGGER.debug("Rebuilding index '{}'...".format(
+                        index.name
+                    ))
+                    rebuild_index_concurrently(index, connection)
+                    report[index.name] = INDEX_REBUILT
+                else:
+                    report[index.name] = INDEX_VALID
+        if analyze:
+            for table in tables:
+                connection.execute("ANALYZE {}.{};".format(
+                    table.schema, table.name
+                ))
+    LOGGER.debug("Niamoto indexes: {}".format(report))
+    return report
+
+
+def get_indexes_validity(connection, schema=settings.NIAMOTO_SCHEMA):
+    """
+    :return: A dict with the names of the indexes of a schema as keys, and
+        whether they are valid (usable by the planner) as values.
+    """
+    res = connection.execute(
+        """
+        SELECT i.relname, x.indisvalid
+        FROM pg_index AS x
+        JOIN pg_class AS i ON i.oid = x.indexrelid
+        JOIN pg_namespace AS n ON n.oid = i.relnamespace
+        WHERE n.nspname = %s;
+        """,
+        (schema, )
+    )
+    return dict(res.fetchall())
+
+
+def get_create_index_concurrently(index, dialect):
+    """
+    :return: The CREATE INDEX CONCURRENTLY statement of a sqlalchemy index.
+    """
+    sql = str(CreateIndex(index).compile(dialect=dialect))
+    return re.sub(
+        r'^CREATE (UNIQUE )?INDEX',
+        r'CREATE \1INDEX CONCURRENTLY',
+        sql
+    )
+
+
+def rebuild_index_concurrently(index, connection):
+    """
+    Rebuild an index without locking its table against writes, using
+    REINDEX CONCURRENTLY (PostgreSQL >= 12), or dropping and creating it
+    concurrently.
+    :param connection: A connection in autocommit mode.
+    """
+    index_name = '{}.{}'.format(index.table.schema, index.name)
+    if connection.dialect.server_version_info >= (12, ):
+        connection.execute(
+            "REINDEX INDEX CONCURRENTLY {};".format(index_name)
+        )
+    else:
+        connection.execute(
+            "DROP INDEX CONCURRENTLY IF EXISTS {};".format(index_name)
+        )
+        connection.execute(
+            get_create_index_concurrently(index, connection.dialect)
+        )
@@ -19,5 +19,20 @@ DATABASES = {
 
 NIAMOTO_DATABASE = DATABASES['niamoto']
 
+#  Connection pool of the Niamoto database
+NIAMOTO_DATABASE_POOL = {
+    'POOL_SIZE': 5,  # Connections kept open in the pool
+    'MAX_OVERFLOW': 10,  # Connections allowed beyond the pool size
+    'POOL_TIMEOUT': 30,  # Seconds to wait for a connection
+    'PRE_PING': False,  # Test the connections when checked out
+    'RECYCLE': -1,  # Max age of the connections in seconds, -1 to disable
+}
+
+#  Persistent cache of the data publishers' results
+NIAMOTO_PUBLISHER_CACHE = {
+    'ENABLED': True,
+    'MAX_SIZE': 512 * 1024 ** 2,  # Max size of the cache in bytes
+}
+
 DEFAULT_POSTGRES_SUPERUSER = 'postgres'
 DEFAULT_POSTGRES_SUPERUSER_PASSWORD = 'postgres'
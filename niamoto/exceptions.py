@@ -77,6 +77,18 @@ class BaseDataMartException(NiamotoException):
     """
 
 
+class DataMartPopulateError(BaseDataMartException):
+    """
+    Error to raise when some dimensions or fact tables could not be
+    populated, the population report being available as the report
+    attribute.
+    """
+
+    def __init__(self, message, report=None):
+        super(DataMartPopulateError, self).__init__(message)
+        self.report = report
+
+
 class BaseDimensionException(BaseDataMartException):
     """
     Base class for errors related to data mart dimensions.
@@ -0,0 +1,55 @@
+"""Add sync_hash column to occurrence and plot tables
+
+Revision ID: 3a9f1c2d7b4e
+Revises: 5bd039f6f1b0
+Create Date: 2026-10-18 10:12:31.482113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '3a9f1c2d7b4e'
+down_revision = '5bd039f6f1b0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'occurrence',
+        sa.Column('sync_hash', sa.BigInteger(), nullable=True),
+        schema='niamoto'
+    )
+    op.create_index(
+        'ix_occurrence_niamoto_occurrence_sync_hash',
+        'occurrence',
+        ['sync_hash'],
+        schema='niamoto'
+    )
+    op.add_column(
+        'plot',
+        sa.Column('sync_hash', sa.BigInteger(), nullable=True),
+        schema='niamoto'
+    )
+    op.create_index(
+        'ix_plot_niamoto_plot_sync_hash',
+        'plot',
+        ['sync_hash'],
+        schema='niamoto'
+    )
+
+
+def downgrade():
+    op.drop_index(
+        'ix_plot_niamoto_plot_sync_hash',
+        table_name='plot',
+        schema='niamoto'
+    )
+    op.drop_column('plot', 'sync_hash', schema='niamoto')
+    op.drop_index(
+        'ix_occurrence_niamoto_occurrence_sync_hash',
+        table_name='occurrence',
+        schema='niamoto'
+    )
+    op.drop_column('occurrence', 'sync_hash', schema='niamoto')
@@ -0,0 +1,53 @@
+"""Add raster version and raster_versions columns
+
+Revision ID: 9d4e7b2a6f10
+Revises: 3a9f1c2d7b4e
+Create Date: 2026-10-18 14:03:52.916204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '9d4e7b2a6f10'
+down_revision = '3a9f1c2d7b4e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'raster_registry',
+        sa.Column(
+            'version',
+            sa.Integer(),
+            nullable=False,
+            server_default='1'
+        ),
+        schema='niamoto'
+    )
+    op.add_column(
+        'occurrence',
+        sa.Column(
+            'raster_versions',
+            postgresql.JSONB(),
+            nullable=True
+        ),
+        schema='niamoto'
+    )
+    op.add_column(
+        'plot',
+        sa.Column(
+            'raster_versions',
+            postgresql.JSONB(),
+            nullable=True
+        ),
+        schema='niamoto'
+    )
+
+
+def downgrade():
+    op.drop_column('plot', 'raster_versions', schema='niamoto')
+    op.drop_column('occurrence', 'raster_versions', schema='niamoto')
+    op.drop_column('raster_registry', 'version', schema='niamoto')
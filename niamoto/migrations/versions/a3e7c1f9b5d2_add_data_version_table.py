@@ -0,0 +1,31 @@
+"""Add data_version table
+
+Revision ID: a3e7c1f9b5d2
+Revises: f5a2d8c4e1b3
+Create Date: 2026-10-18 21:05:12.533402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3e7c1f9b5d2'
+down_revision = 'f5a2d8c4e1b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'data_version',
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.Column('date_update', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+        schema='niamoto'
+    )
+
+
+def downgrade():
+    op.drop_table('data_version', schema='niamoto')
@@ -0,0 +1,82 @@
+"""Add location, provider key and mptt indexes
+
+Revision ID: b7c3e9a1d2f4
+Revises: e41b8d6a2c57
+Create Date: 2026-10-18 17:02:44.915236
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7c3e9a1d2f4'
+down_revision = 'e41b8d6a2c57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The spatial indexes automatically created by geoalchemy, if any, are
+    # replaced by the explicitly named ones.
+    op.execute("DROP INDEX IF EXISTS niamoto.idx_occurrence_location;")
+    op.execute("DROP INDEX IF EXISTS niamoto.idx_plot_location;")
+    op.create_index(
+        'ix_occurrence_niamoto_occurrence_location',
+        'occurrence',
+        ['location'],
+        postgresql_using='gist',
+        schema='niamoto'
+    )
+    op.create_index(
+        'ix_occurrence_niamoto_occurrence_provider_id_provider_pk',
+        'occurrence',
+        ['provider_id', 'provider_pk'],
+        schema='niamoto'
+    )
+    op.create_index(
+        'ix_plot_niamoto_plot_location',
+        'plot',
+        ['location'],
+        postgresql_using='gist',
+        schema='niamoto'
+    )
+    op.create_index(
+        'ix_plot_niamoto_plot_provider_id_provider_pk',
+        'plot',
+        ['provider_id', 'provider_pk'],
+        schema='niamoto'
+    )
+    op.create_index(
+        'ix_taxon_niamoto_taxon_mptt_tree_id_mptt_left_mptt_right',
+        'taxon',
+        ['mptt_tree_id', 'mptt_left', 'mptt_right'],
+        schema='niamoto'
+    )
+
+
+def downgrade():
+    op.drop_index(
+        'ix_taxon_niamoto_taxon_mptt_tree_id_mptt_left_mptt_right',
+        table_name='taxon',
+        schema='niamoto'
+    )
+    op.drop_index(
+        'ix_plot_niamoto_plot_provider_id_provider_pk',
+        table_name='plot',
+        schema='niamoto'
+    )
+    op.drop_index(
+        'ix_plot_niamoto_plot_location',
+        table_name='plot',
+        schema='niamoto'
+    )
+    op.drop_index(
+        'ix_occurrence_niamoto_occurrence_provider_id_provider_pk',
+        table_name='occurrence',
+        schema='niamoto'
+    )
+    op.drop_index(
+        'ix_occurrence_niamoto_occurrence_location',
+        table_name='occurrence',
+        schema='niamoto'
+    )
@@ -0,0 +1,53 @@
+"""Add occurrence_change_log table
+
+Revision ID: d8b2f6a4c9e1
+Revises: a3e7c1f9b5d2
+Create Date: 2026-10-18 23:12:41.208715
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from niamoto.db.metadata import OCCURRENCE_CHANGE_LOG_TRIGGERS, \
+    DROP_OCCURRENCE_CHANGE_LOG_TRIGGERS
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8b2f6a4c9e1'
+down_revision = 'a3e7c1f9b5d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'occurrence_change_log',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('occurrence_id', sa.Integer(), nullable=False),
+        sa.Column('taxon_id', sa.Integer(), nullable=True),
+        sa.Column(
+            'date_change',
+            sa.DateTime(),
+            server_default=sa.text('now()'),
+            nullable=False
+        ),
+        sa.PrimaryKeyConstraint('id'),
+        schema='niamoto'
+    )
+    op.create_index(
+        'ix_occurrence_change_log_date_change',
+        'occurrence_change_log',
+        ['date_change'],
+        schema='niamoto'
+    )
+    op.execute(OCCURRENCE_CHANGE_LOG_TRIGGERS)
+
+
+def downgrade():
+    op.execute(DROP_OCCURRENCE_CHANGE_LOG_TRIGGERS)
+    op.drop_index(
+        'ix_occurrence_change_log_date_change',
+        table_name='occurrence_change_log',
+        schema='niamoto'
+    )
+    op.drop_table('occurrence_change_log', schema='niamoto')
@@ -0,0 +1,29 @@
+"""Add refresh_watermark column to fact_table_registry
+
+Revision ID: e41b8d6a2c57
+Revises: 9d4e7b2a6f10
+Create Date: 2026-10-18 16:21:07.403518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e41b8d6a2c57'
+down_revision = '9d4e7b2a6f10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'fact_table_registry',
+        sa.Column('refresh_watermark', sa.DateTime(), nullable=True),
+        schema='niamoto'
+    )
+
+
+def downgrade():
+    op.drop_column('fact_table_registry', 'refresh_watermark',
+                   schema='niamoto')
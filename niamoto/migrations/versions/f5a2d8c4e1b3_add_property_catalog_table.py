@@ -0,0 +1,44 @@
+"""Add property_catalog table
+
+Revision ID: f5a2d8c4e1b3
+Revises: b7c3e9a1d2f4
+Create Date: 2026-10-18 19:42:31.208815
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from niamoto.db.property_catalog import get_refresh_property_catalog_sql
+
+
+# revision identifiers, used by Alembic.
+revision = 'f5a2d8c4e1b3'
+down_revision = 'b7c3e9a1d2f4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'property_catalog',
+        sa.Column('provider_id', sa.Integer(), nullable=False),
+        sa.Column('entity', sa.String(length=50), nullable=False),
+        sa.Column('key', sa.Text(), nullable=False),
+        sa.Column('type', sa.String(length=50), nullable=False),
+        sa.Column('count', sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ['provider_id'],
+            ['niamoto.data_provider.id'],
+            onupdate='CASCADE',
+            ondelete='CASCADE'
+        ),
+        sa.PrimaryKeyConstraint('provider_id', 'entity', 'key'),
+        schema='niamoto'
+    )
+    # Catalog the properties of the existing occurrences and plots
+    for entity in ['occurrence', 'plot']:
+        op.execute(get_refresh_property_catalog_sql(entity))
+
+
+def downgrade():
+    op.drop_table('property_catalog', schema='niamoto')
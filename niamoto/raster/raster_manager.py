@@ -26,6 +26,12 @@ class RasterManager:
 
     REGISTRY_TABLE = niamoto_db_meta.raster_registry
     DB_SCHEMA = settings.NIAMOTO_RASTER_SCHEMA
+    #  The tables whose properties can hold values extracted from the
+    #  rasters (c.f. RasterValueExtractor).
+    EXTRACTION_TABLES = [
+        niamoto_db_meta.occurrence,
+        niamoto_db_meta.plot,
+    ]
 
     @classmethod
     def get_raster_list(cls, alt_index=None):
@@ -115,6 +121,7 @@ class RasterManager:
         values.update(kwargs)
         ins = cls.REGISTRY_TABLE.insert().values(values)
         with Connector.get_connection() as connection:
+            cls.index_raster(name, connection=connection)
             connection.execute(ins)
 
     @classmethod
@@ -189,6 +196,9 @@ class RasterManager:
         }
         if properties is not None:
             upd_values['properties'] = properties
+        if raster_file_path is not None:
+            # The values extracted from the previous data are outdated
+            upd_values['version'] = cls.REGISTRY_TABLE.c.version + 1
         upd = cls.REGISTRY_TABLE.update() \
             .values(upd_values)\
             .where(cls.REGISTRY_TABLE.c.name == name)
@@ -217,11 +227,16 @@ class RasterManager:
                             )
                         )
                     )
+            if raster_file_path is not None:
+                cls.index_raster(new_name, connection=connection)
 
     @classmethod
     def delete_raster(cls, name, connection=None):
         """
-        Delete an existing raster.
+        Delete an existing raster. The values extracted from it, and their
+        raster version, are removed from the occurrences and plots, hence
+        a raster later added with the same name (whose version restarts at
+        1) is extracted again.
         :param name: The name of the raster.
         :param connection: If provided, use an existing connection.
         """
@@ -238,6 +253,75 @@ class RasterManager:
                 cls.REGISTRY_TABLE.c.name == name
             )
             connection.execute(del_stmt)
+            cls.delete_raster_values(name, connection)
+        if close_after:
+            connection.close()
+
+    @classmethod
+    def delete_raster_values(cls, name, connection):
+        """
+        Remove the values extracted from a raster, and its version, from
+        the properties of the occurrences and plots, and from their property
+        catalog. The data version of the updated tables is incremented.
+        :param name: The name of the raster.
+        :param connection: The connection to use.
+        """
+        from niamoto.raster.raster_value_extractor import \
+            RASTER_PROPERTY_PREFIX
+        from niamoto.db.property_catalog import refresh_property_catalog
+        from niamoto.db.data_version import bump_data_version
+        key = RASTER_PROPERTY_PREFIX + name
+        for table in cls.EXTRACTION_TABLES:
+            sql = text(
+                """
+                UPDATE {table}
+                SET properties = properties - CAST(:key AS TEXT),
+                    raster_versions = raster_versions - CAST(:name AS TEXT)
+                WHERE raster_versions ? CAST(:name AS TEXT)
+                    OR properties ? CAST(:key AS TEXT);
+                """.format(
+                    table='{}.{}'.format(settings.NIAMOTO_SCHEMA, table.name)
+                )
+            )
+            updated = connection.execute(
+                sql.bindparams(key=key, name=name)
+            ).rowcount
+            if updated > 0:
+                refresh_property_catalog(connection, table.name, keys=[key])
+                bump_data_version(table.name, connection=connection)
+
+    @classmethod
+    def index_raster(cls, name, connection=None):
+        """
+        Ensure that the tiles of a raster are indexed with a GiST index on
+        their convex hull (the index created by the -I option of
+        raster2pgsql), which is used by the value extraction to find the
+        tile containing a point. The raster table is then analyzed, so that
+        the planner knows its number of tiles.
+        :param name: The name of the raster.
+        :param connection: If provided, use an existing connection.
+        """
+        close_after = False
+        if connection is None:
+            close_after = True
+            connection = Connector.get_engine().connect()
+        sel = \
+            """
+            SELECT indexname
+            FROM pg_indexes
+            WHERE schemaname = '{}' AND tablename = '{}'
+              AND indexdef ILIKE '%%st_convexhull%%'
+            """.format(cls.DB_SCHEMA, name)
+        tb = "{}.{}".format(cls.DB_SCHEMA, name)
+        if connection.execute(sel).rowcount == 0:
+            LOGGER.debug("Creating the convex hull index of '{}'...".format(
+                name
+            ))
+            connection.execute(
+                "CREATE INDEX {} ON {} USING GIST (ST_ConvexHull(rast));"
+                .format("{}_st_convexhull_idx".format(name), tb)
+            )
+        connection.execute("ANALYZE {};".format(tb))
         if close_after:
             connection.close()
 
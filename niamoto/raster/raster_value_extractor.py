@@ -1,8 +1,15 @@
 # coding: utf-8
 
+import time
+import json
+
+from sqlalchemy import select
+
 from niamoto.conf import settings
 from niamoto.db import metadata as meta
 from niamoto.db.connector import Connector
+from niamoto.db.data_version import bump_data_version
+from niamoto.db.property_catalog import refresh_property_catalog
 from niamoto.raster.raster_manager import RasterManager
 from niamoto.log import get_logger
 
@@ -11,6 +18,10 @@ LOGGER = get_logger(__name__)
 
 RASTER_PROPERTY_PREFIX = ""
 
+#  PostgreSQL functions accept at most 100 arguments, hence at most 50
+#  key / value pairs per jsonb_build_object call.
+JSONB_BUILD_OBJECT_MAX_PAIRS = 50
+
 
 class RasterValueExtractor:
     """
@@ -19,80 +30,255 @@ class RasterValueExtractor:
 
     @classmethod
     def extract_raster_values_to_occurrences(cls, raster_name):
-        with Connector.get_connection() as connection:
-            with connection.begin():
-                RasterManager.assert_raster_exists(
-                    raster_name,
-                    connection=connection
-                )
-                m = "Extracting '{}' raster values to occurrences properties."
-                LOGGER.debug(m.format(raster_name))
-                sql = \
-                    """
-                    WITH {raster_name} AS (
-                      SELECT occ.id AS id,
-                        ST_Value(raster.rast, occ.location) AS rast_value
-                      FROM {occurrence_table} AS occ
-                      LEFT JOIN {raster_table} AS raster
-                      ON ST_Intersects(raster.rast, occ.location)
-                    )
-                    UPDATE {occurrence_table}
-                    SET properties = (
-                      {occurrence_table}.properties || jsonb_build_object(
-                        '{prefix}{raster_name}', {raster_name}.rast_value
-                      )
-                    ) FROM {raster_name}
-                    WHERE {raster_name}.id = {occurrence_table}.id
-                    """.format(**{
-                        'raster_name': raster_name,
-                        'raster_table': '{}.{}'.format(
-                            settings.NIAMOTO_RASTER_SCHEMA,
-                            raster_name
-                        ),
-                        'occurrence_table': '{}.{}'.format(
-                            settings.NIAMOTO_SCHEMA,
-                            meta.occurrence.name
-                        ),
-                        'prefix': RASTER_PROPERTY_PREFIX,
-                    })
-                connection.execute(sql)
+        cls.extract_rasters_values_to_occurrences([raster_name])
 
     @classmethod
     def extract_raster_values_to_plots(cls, raster_name):
+        cls.extract_rasters_values_to_plots([raster_name])
+
+    @classmethod
+    def extract_rasters_values_to_occurrences(cls, raster_names,
+                                              timing=False,
+                                              incremental=False):
+        """
+        Extract the values of several rasters to occurrences properties,
+        in a single pass over the occurrences.
+        :param raster_names: The names of the rasters.
+        :param timing: If True, measure the time spent in each raster.
+        :param incremental: If True, only extract the values of the
+            occurrences that do not hold a value from the current version
+            of a raster.
+        :return: If timing, a dict with the rasters' names as keys and the
+            time spent extracting their values (in seconds) as values.
+        """
+        return cls.extract_rasters_values(
+            raster_names,
+            meta.occurrence,
+            timing=timing,
+            incremental=incremental
+        )
+
+    @classmethod
+    def extract_rasters_values_to_plots(cls, raster_names, timing=False,
+                                        incremental=False):
+        """
+        Extract the values of several rasters to plots properties, in a
+        single pass over the plots.
+        :param raster_names: The names of the rasters.
+        :param timing: If True, measure the time spent in each raster.
+        :param incremental: If True, only extract the values of the plots
+            that do not hold a value from the current version of a raster.
+        :return: If timing, a dict with the rasters' names as keys and the
+            time spent extracting their values (in seconds) as values.
+        """
+        return cls.extract_rasters_values(
+            raster_names,
+            meta.plot,
+            timing=timing,
+            incremental=incremental
+        )
+
+    @classmethod
+    def extract_rasters_values(cls, raster_names, table, timing=False,
+                               incremental=False):
+        """
+        Extract the values of several rasters to the properties of a table
+        (occurrence or plot). The values of all the rasters are looked up
+        in one statement (one lateral join per raster) and merged into the
+        properties with a single update, so that each row is rewritten once
+        whatever the number of rasters.
+        The tile containing a location is looked up with the bounding box
+        operator on the convex hull of the tiles, which can use the GiST
+        index of the raster (c.f. RasterManager.index_raster), before the
+        exact intersection test.
+        The catalog of the table's properties is refreshed for the keys of
+        the rasters (see niamoto.db.property_catalog), and the data version
+        of the table is incremented (see niamoto.db.data_version).
+        The version of the rasters the values were extracted from is stored
+        in the 'raster_versions' column of the table. It is reset by the
+        data provider sync for the inserted and updated rows, and the
+        version of a raster is incremented when its data is updated.
+        :param raster_names: The names of the rasters.
+        :param table: The sqlalchemy table (occurrence or plot).
+        :param timing: If True, the update is run with EXPLAIN ANALYZE, to
+            measure the time spent in each raster.
+        :param incremental: If True, only the rows that do not hold a value
+            from the current version of a raster are updated, with the
+            values of the rasters they are missing.
+        :return: If timing, a dict with the rasters' names as keys and the
+            time spent extracting their values (in seconds) as values.
+        """
+        raster_names = list(raster_names)
+        if len(raster_names) == 0:
+            return {} if timing else None
+        t = time.time()
         with Connector.get_connection() as connection:
             with connection.begin():
-                RasterManager.assert_raster_exists(
-                    raster_name,
-                    connection=connection
+                for raster_name in raster_names:
+                    RasterManager.assert_raster_exists(
+                        raster_name,
+                        connection=connection
+                    )
+                versions = cls.get_rasters_versions(raster_names, connection)
+                m = "Extracting {} raster values to {} properties{}."
+                LOGGER.debug(m.format(
+                    raster_names,
+                    table.name,
+                    " (incremental)" if incremental else ""
+                ))
+                sql = cls.get_extract_rasters_values_sql(
+                    raster_names,
+                    table,
+                    versions=versions,
+                    incremental=incremental
                 )
-                m = "Extracting '{}' raster values to plots properties."
-                LOGGER.debug(m.format(raster_name))
-                sql = \
-                    """
-                    WITH {raster_name} AS (
-                      SELECT plot.id AS id,
-                        ST_Value(raster.rast, plot.location) AS rast_value
-                      FROM {plot_table} AS plot
-                      LEFT JOIN {raster_table} AS raster
-                      ON ST_Intersects(raster.rast, plot.location)
+                if timing:
+                    result = connection.execute(
+                        "EXPLAIN (ANALYZE, FORMAT JSON) {}".format(sql)
                     )
-                    UPDATE {plot_table}
-                    SET properties = (
-                      {plot_table}.properties || jsonb_build_object(
-                        '{prefix}{raster_name}', {raster_name}.rast_value
-                      )
-                    ) FROM {raster_name}
-                    WHERE {raster_name}.id = {plot_table}.id
-                    """.format(**{
-                        'raster_name': raster_name,
-                        'raster_table': '{}.{}'.format(
-                            settings.NIAMOTO_RASTER_SCHEMA,
-                            raster_name
-                        ),
-                        'plot_table': '{}.{}'.format(
-                            settings.NIAMOTO_SCHEMA,
-                            meta.plot.name
-                        ),
-                        'prefix': RASTER_PROPERTY_PREFIX,
-                    })
-                connection.execute(sql)
+                    plan = result.fetchone()[0]
+                    timings = cls.get_rasters_timings(raster_names, plan)
+                else:
+                    result = connection.execute(sql)
+                    m = "{} rows updated."
+                    LOGGER.debug(m.format(result.rowcount))
+                refresh_property_catalog(
+                    connection,
+                    table.name,
+                    keys=[RASTER_PROPERTY_PREFIX + name
+                          for name in raster_names]
+                )
+                bump_data_version(table.name, connection=connection)
+        m = "{} raster values extracted to {} properties ({:.2f} s)."
+        LOGGER.debug(m.format(raster_names, table.name, time.time() - t))
+        if timing:
+            for raster_name, raster_time in timings.items():
+                LOGGER.debug("    '{}': {:.2f} s".format(
+                    raster_name, raster_time
+                ))
+            return timings
+
+    @classmethod
+    def get_rasters_versions(cls, raster_names, connection):
+        """
+        :return: A dict with the rasters' names as keys and their current
+            version, in the raster registry, as values.
+        """
+        registry = RasterManager.REGISTRY_TABLE
+        sel = select([registry.c.name, registry.c.version]).where(
+            registry.c.name.in_(raster_names)
+        )
+        return {name: version for name, version in connection.execute(sel)}
+
+    @classmethod
+    def get_extract_rasters_values_sql(cls, raster_names, table,
+                                       versions=None, incremental=False):
+        """
+        :param versions: A dict with the current version of each raster,
+            if None, the rasters are considered to be at version 1.
+        :param incremental: If True, only extract the values that are
+            missing or outdated.
+        :return: The sql update statement extracting the values of the given
+            rasters to the properties of the given table.
+        """
+        if versions is None:
+            versions = {}
+        versions = {name: versions.get(name, 1) for name in raster_names}
+        table_name = '{}.{}'.format(settings.NIAMOTO_SCHEMA, table.name)
+        joins = []
+        pairs = []
+        outdated = []
+        for i, raster_name in enumerate(raster_names):
+            # The row does not hold a value from the current raster version
+            outdated.append(
+                "COALESCE((t.raster_versions ->> '{}')::integer, 0) "
+                "<> {}".format(raster_name, versions[raster_name])
+            )
+            joins.append(
+                """
+                LEFT JOIN LATERAL (
+                  SELECT ST_Value(raster_{i}.rast, t.location) AS rast_value
+                  FROM {raster_table} AS raster_{i}
+                  WHERE ST_ConvexHull(raster_{i}.rast) && t.location
+                    AND ST_Intersects(raster_{i}.rast, t.location){outdated}
+                  LIMIT 1
+                ) AS value_{i} ON TRUE
+                """.format(**{
+                    'i': i,
+                    'raster_table': '{}.{}'.format(
+                        settings.NIAMOTO_RASTER_SCHEMA,
+                        raster_name
+                    ),
+                    'outdated': (
+                        " AND {}".format(outdated[i]) if incremental else ""
+                    ),
+                })
+            )
+            pairs.append("'{}{}', value_{}.rast_value".format(
+                RASTER_PROPERTY_PREFIX,
+                raster_name,
+                i
+            ))
+        if incremental:
+            # Only merge the values of the outdated rasters
+            rast_values = ' || '.join([
+                "(CASE WHEN {} THEN jsonb_build_object({}) "
+                "ELSE '{{}}'::jsonb END)".format(outdated[i], pairs[i])
+                for i in range(len(pairs))
+            ])
+            where = "WHERE {}".format(' OR '.join(outdated))
+        else:
+            n = JSONB_BUILD_OBJECT_MAX_PAIRS
+            rast_values = ' || '.join([
+                "jsonb_build_object({})".format(', '.join(pairs[i:i + n]))
+                for i in range(0, len(pairs), n)
+            ])
+            where = ""
+        return \
+            """
+            WITH raster_values AS (
+              SELECT t.id AS id, {rast_values} AS rast_values
+              FROM {table} AS t
+              {joins}
+              {where}
+            )
+            UPDATE {table}
+            SET properties = (
+              {table}.properties || raster_values.rast_values
+            ), raster_versions = (
+              COALESCE({table}.raster_versions, '{{}}'::jsonb)
+              || '{versions}'::jsonb
+            ) FROM raster_values
+            WHERE raster_values.id = {table}.id
+            """.format(**{
+                'rast_values': rast_values,
+                'table': table_name,
+                'joins': ''.join(joins),
+                'where': where,
+                'versions': json.dumps(versions),
+            })
+
+    @classmethod
+    def get_rasters_timings(cls, raster_names, plan):
+        """
+        :param raster_names: The names of the rasters, in the order given
+            to get_extract_rasters_values_sql.
+        :param plan: The JSON output of EXPLAIN ANALYZE for the extraction
+            statement.
+        :return: A dict with the rasters' names as keys and the time spent
+            scanning them (including the ST_Value computation), in seconds.
+        """
+        aliases = {
+            'raster_{}'.format(i): name for i, name in enumerate(raster_names)
+        }
+        timings = {name: 0 for name in raster_names}
+        nodes = [plan[0]['Plan']]
+        while len(nodes) > 0:
+            node = nodes.pop()
+            alias = node.get('Alias', None)
+            if alias in aliases:
+                # Times are per loop, in milliseconds
+                timings[aliases[alias]] += node['Actual Total Time'] \
+                    * node['Actual Loops'] / 1000
+            nodes.extend(node.get('Plans', []))
+        return timings
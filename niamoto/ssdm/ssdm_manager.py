@@ -19,6 +19,8 @@ class SSDMManager(RasterManager):
     REGISTRY_TABLE = niamoto_db_meta.sdm_registry
     DB_SCHEMA = settings.NIAMOTO_SSDM_SCHEMA
     TAXON_ID_PREFIX = "species"
+    #  The values of the SDMs are not extracted to the occurrences and plots
+    EXTRACTION_TABLES = []
 
     @classmethod
     def get_sdm_list(cls):
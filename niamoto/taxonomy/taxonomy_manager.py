@@ -3,12 +3,18 @@
 from datetime import datetime
 import time
 
-from sqlalchemy import select, func, bindparam, Index, cast
+from sqlalchemy import select, func, bindparam, Index, cast, case, and_, \
+    or_, text
 from sqlalchemy.dialects.postgresql import JSONB
+import numpy as np
 import pandas as pd
 
+from niamoto.conf import settings
 from niamoto.db.connector import Connector
 from niamoto.db import metadata as meta
+from niamoto.db.data_version import bump_data_version, get_data_version, \
+    TAXONOMY
+from niamoto.db.staging import staging_table
 from niamoto.exceptions import MalformedDataSourceError, \
     NoRecordFoundError, RecordAlreadyExistsError
 from niamoto.log import get_logger
@@ -24,6 +30,13 @@ class TaxonomyManager:
 
     IDENTITY_SYNONYM_KEY = 'niamoto'
 
+    # In-process cache of the synonym mappings, keyed by the taxonomy data
+    # version of the database (c.f. niamoto.db.data_version), which is
+    # incremented by any change of the taxonomy or of the synonyms made
+    # through the TaxonomyManager, by any process:
+    #   {synonym_key: (taxonomy_version, provider_ids, niamoto_ids)}
+    _SYNONYMS_CACHE = {}
+
     @classmethod
     def get_raw_taxon_dataframe(cls):
         """
@@ -51,6 +64,7 @@ class TaxonomyManager:
         else:
             with Connector.get_connection() as connection:
                 result = connection.execute(delete)
+        cls.invalidate_synonyms_cache(bind=bind)
         LOGGER.debug("{} taxa had been deleted.".format(result.rowcount))
 
     @classmethod
@@ -170,10 +184,146 @@ class TaxonomyManager:
                 m = "The taxonomy had been successfully set ({} taxa " \
                     "inserted)!"
                 LOGGER.debug(m.format(result))
+        cls.invalidate_synonyms_cache()
         return result, synonym_cols
 
-    def set_synonym_data(self, synonym_key, data):
-        pass  # TODO
+    @classmethod
+    def set_synonym_data(cls, synonym_key, data):
+        """
+        Set the synonyms of several taxa for a synonym key at once. The
+        synonyms are checked against the unique synonym key index before
+        writing anything, COPY into a temporary staging table and merged
+        into the taxa synonyms with a single update.
+        :param synonym_key: The synonym key, must be registered.
+        :param data: A DataFrame with a 'taxon_id' column (or index),
+            containing the ids of the taxa in Niamoto's referential, and a
+            'provider_taxon_id' column, containing their synonym. Rows with
+            a null value are ignored.
+        :return: The number of updated taxa.
+        """
+        if synonym_key == cls.IDENTITY_SYNONYM_KEY:
+            m = "The '{}' synonym key is a special key reserved by Niamoto."
+            raise MalformedDataSourceError(m.format(synonym_key))
+        data = cls._get_synonym_dataframe(data)
+        LOGGER.debug("Setting {} '{}' synonyms...".format(
+            len(data), synonym_key
+        ))
+        taxon_table = "{}.{}".format(settings.NIAMOTO_SCHEMA, meta.taxon.name)
+        staging_columns = [
+            ('taxon_id', 'bigint'),
+            ('provider_taxon_id', 'bigint'),
+        ]
+        with Connector.get_connection() as connection:
+            cls.assert_synonym_key_exists(synonym_key, bind=connection)
+            if len(data) == 0:
+                return 0
+            with connection.begin():
+                with staging_table(connection, staging_columns,
+                                   prefix="niamoto_synonyms",
+                                   dataframe=data) as staging:
+                    cls._assert_synonym_data_is_valid(
+                        synonym_key,
+                        staging.name,
+                        connection
+                    )
+                    # Unset the synonyms that are exchanged between staged
+                    # taxa, the unique index is checked row by row.
+                    connection.execute(text(
+                        """
+                        UPDATE {taxon}
+                        SET synonyms = {taxon}.synonyms - :key
+                        FROM {staging} AS stg
+                        WHERE {taxon}.synonyms -> :key
+                            = to_jsonb(stg.provider_taxon_id)
+                          AND {taxon}.id <> stg.taxon_id;
+                        """.format(taxon=taxon_table, staging=staging.name)
+                    ).bindparams(key=synonym_key))
+                    result = connection.execute(text(
+                        """
+                        UPDATE {taxon}
+                        SET synonyms = {taxon}.synonyms || jsonb_build_object(
+                            CAST(:key AS text), stg.provider_taxon_id
+                        )
+                        FROM {staging} AS stg
+                        WHERE {taxon}.id = stg.taxon_id;
+                        """.format(taxon=taxon_table, staging=staging.name)
+                    ).bindparams(key=synonym_key)).rowcount
+        cls.invalidate_synonyms_cache()
+        LOGGER.debug("{} '{}' synonyms had been set.".format(
+            result, synonym_key
+        ))
+        return result
+
+    @staticmethod
+    def _get_synonym_dataframe(data):
+        """
+        :return: The (taxon_id, provider_taxon_id) int64 dataframe of the
+        synonyms to set, checked for duplicates.
+        """
+        if 'taxon_id' not in data.columns and data.index.name == 'taxon_id':
+            data = data.reset_index()
+        required_columns = {'taxon_id', 'provider_taxon_id'}
+        if not required_columns.issubset(set(data.columns)):
+            m = "The synonym dataframe does not contains the required " \
+                "columns {}, it has: {}"
+            raise MalformedDataSourceError(m.format(
+                required_columns,
+                set(data.columns)
+            ))
+        data = data[['taxon_id', 'provider_taxon_id']].dropna()
+        data = data.astype(np.int64)
+        for col in ['taxon_id', 'provider_taxon_id']:
+            duplicated = data[col][data[col].duplicated()]
+            if len(duplicated) > 0:
+                m = "The synonym dataframe contains duplicated {} values: {}"
+                raise MalformedDataSourceError(m.format(
+                    col,
+                    list(duplicated.unique()[:10])
+                ))
+        return data
+
+    @classmethod
+    def _assert_synonym_data_is_valid(cls, synonym_key, staging_table,
+                                      connection):
+        """
+        Check that the staged synonyms refer to existing taxa, and that
+        they are not already the synonyms of other taxa (unique synonym
+        key index).
+        """
+        taxon_table = "{}.{}".format(settings.NIAMOTO_SCHEMA, meta.taxon.name)
+        missing = connection.execute(
+            """
+            SELECT stg.taxon_id
+            FROM {staging} AS stg
+            LEFT JOIN {taxon} ON {taxon}.id = stg.taxon_id
+            WHERE {taxon}.id IS NULL
+            LIMIT 10;
+            """.format(taxon=taxon_table, staging=staging_table)
+        ).fetchall()
+        if len(missing) > 0:
+            m = "The following taxa do not exist in database: {}"
+            raise NoRecordFoundError(m.format([r[0] for r in missing]))
+        conflicts = connection.execute(text(
+            """
+            SELECT stg.provider_taxon_id, {taxon}.id
+            FROM {staging} AS stg
+            JOIN {taxon} ON {taxon}.synonyms -> :key
+                = to_jsonb(stg.provider_taxon_id)
+            WHERE {taxon}.id <> stg.taxon_id
+              AND NOT EXISTS (
+                SELECT 1 FROM {staging} AS stg_2
+                WHERE stg_2.taxon_id = {taxon}.id
+              )
+            LIMIT 10;
+            """.format(taxon=taxon_table, staging=staging_table)
+        ).bindparams(key=synonym_key)).fetchall()
+        if len(conflicts) > 0:
+            m = "The following '{}' synonyms are already used by other " \
+                "taxa (synonym, taxon_id): {}"
+            raise RecordAlreadyExistsError(m.format(
+                synonym_key,
+                [tuple(r) for r in conflicts]
+            ))
 
     @classmethod
     def get_synonym_keys(cls):
@@ -219,6 +369,7 @@ class TaxonomyManager:
             cls.assert_synonym_key_does_not_exists(synonym_key, bind=bind)
             bind.execute(ins)
             cls._register_unique_synonym_key_constraint(synonym_key, bind=bind)
+            cls.invalidate_synonyms_cache(bind=bind)
             return
         with Connector.get_connection() as connection:
             cls.assert_synonym_key_does_not_exists(
@@ -230,6 +381,7 @@ class TaxonomyManager:
                 synonym_key,
                 bind=connection
             )
+        cls.invalidate_synonyms_cache()
         LOGGER.debug("synonym_key {} registered.".format(synonym_key))
 
     @classmethod
@@ -249,6 +401,7 @@ class TaxonomyManager:
                 synonym_key,
                 bind=bind
             )
+            cls.invalidate_synonyms_cache(bind=bind)
             return
         with Connector.get_connection() as connection:
             cls.assert_synonym_key_exists(synonym_key, bind=connection)
@@ -257,6 +410,7 @@ class TaxonomyManager:
                 synonym_key,
                 bind=connection
             )
+        cls.invalidate_synonyms_cache()
         LOGGER.debug(
             "synonym_key {} unregistered.".format(synonym_key)
         )
@@ -347,6 +501,110 @@ class TaxonomyManager:
         with Connector.get_connection() as connection:
             cls.assert_synonym_key_exists(synonym_key, bind=connection)
             connection.execute(upd)
+        cls.invalidate_synonyms_cache()
+
+    @classmethod
+    def get_taxonomy_version(cls, connection=None):
+        """
+        :return: The taxonomy data version of the database, a (version,
+        date of update) tuple incremented each time the taxonomy or the
+        synonyms are modified, None if they never were.
+        """
+        return get_data_version(TAXONOMY, connection=connection)
+
+    @classmethod
+    def invalidate_synonyms_cache(cls, bind=None):
+        """
+        Increment the taxonomy data version of the database, invalidating
+        the cached synonym mappings of every process. Must be called when
+        the taxa or their synonyms are modified without using the
+        TaxonomyManager.
+        :param bind: If passed, use an existing engine or connection, e.g.
+            to increment the version in the transaction modifying the
+            taxonomy.
+        """
+        bump_data_version(TAXONOMY, connection=bind)
+        cls.clear_synonyms_cache()
+
+    @classmethod
+    def clear_synonyms_cache(cls):
+        """
+        Clear the cached synonym mappings of the current process.
+        """
+        cls._SYNONYMS_CACHE.clear()
+
+    @classmethod
+    def get_synonyms_arrays(cls, synonym_key, connection=None):
+        """
+        :param synonym_key: The synonym key to consider. If synonym key is
+        'niamoto', return the niamoto id's (identity synonym).
+        :param connection: If passed, use an existing connection (e.g. the
+        connection of a sync, in its transaction) instead of checking out a
+        new one.
+        :return: A (provider_ids, niamoto_ids) tuple of int64 arrays, sorted
+        by provider id. The mapping is read once from the database for a
+        given taxonomy data version, and then served from an in-process
+        cache. The version is read from the database at each call, hence
+        the changes made by other processes are taken into account.
+        """
+        if synonym_key is None:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+        version = cls.get_taxonomy_version(connection=connection)
+        cached = cls._SYNONYMS_CACHE.get(synonym_key, None)
+        if cached is not None and cached[0] == version:
+            return cached[1], cached[2]
+        provider_ids, niamoto_ids = cls._read_synonyms(
+            synonym_key,
+            connection=connection
+        )
+        cls._SYNONYMS_CACHE[synonym_key] = (
+            version,
+            provider_ids,
+            niamoto_ids
+        )
+        return provider_ids, niamoto_ids
+
+    @classmethod
+    def load_synonyms_cache(cls, synonym_keys=None):
+        """
+        Read the synonym mappings of several synonym keys into the cache,
+        e.g. before forking worker processes, which inherit it.
+        :param synonym_keys: The synonym keys to load, if None, all the
+        registered synonym keys.
+        """
+        if synonym_keys is None:
+            synonym_keys = set(cls.get_synonym_keys()['name'])
+            synonym_keys.add(cls.IDENTITY_SYNONYM_KEY)
+        for synonym_key in synonym_keys:
+            cls.get_synonyms_arrays(synonym_key)
+
+    @classmethod
+    def _read_synonyms(cls, synonym_key, connection=None):
+        if connection is None:
+            with Connector.get_connection() as connection:
+                return cls._read_synonyms(synonym_key, connection=connection)
+        LOGGER.debug("Reading the '{}' synonyms...".format(synonym_key))
+        niamoto_id_col = meta.taxon.c.id
+        synonym_col = meta.taxon.c.synonyms
+        if synonym_key == cls.IDENTITY_SYNONYM_KEY:
+            sel = select([
+                niamoto_id_col.label("niamoto_taxon_id"),
+                niamoto_id_col.label("provider_taxon_id"),
+            ])
+        else:
+            sel = select([
+                niamoto_id_col.label("niamoto_taxon_id"),
+                synonym_col[synonym_key].label("provider_taxon_id"),
+            ]).where(synonym_col[synonym_key].isnot(None))
+        df = pd.read_sql(sel, connection)
+        provider_ids = pd.to_numeric(df["provider_taxon_id"], errors='coerce')
+        df = df[provider_ids.notnull()]
+        provider_ids = provider_ids[provider_ids.notnull()].values.astype(
+            np.int64
+        )
+        niamoto_ids = df["niamoto_taxon_id"].values.astype(np.int64)
+        order = np.argsort(provider_ids, kind='mergesort')
+        return provider_ids[order], niamoto_ids[order]
 
     @classmethod
     def get_synonyms_for_key(cls, synonym_key):
@@ -357,25 +615,45 @@ class TaxonomyManager:
         taxa ids, and values corresponding to their synonym in Niamoto's
         referential.
         """
-        with Connector.get_connection() as connection:
-            niamoto_id_col = meta.taxon.c.id
-            synonym_col = meta.taxon.c.synonyms
-            if synonym_key == cls.IDENTITY_SYNONYM_KEY:
-                sel = select([
-                    niamoto_id_col.label("niamoto_taxon_id"),
-                    niamoto_id_col.label("provider_taxon_id"),
-                ])
-            else:
-                sel = select([
-                    niamoto_id_col.label("niamoto_taxon_id"),
-                    synonym_col[synonym_key].label("provider_taxon_id"),
-                ]).where(synonym_col[synonym_key].isnot(None))
-            synonyms = pd.read_sql(
-                sel,
-                connection,
-                index_col="provider_taxon_id"
-            )["niamoto_taxon_id"]
-            return synonyms[synonyms.index.notnull()]
+        provider_ids, niamoto_ids = cls.get_synonyms_arrays(synonym_key)
+        return pd.Series(
+            niamoto_ids,
+            index=pd.Index(provider_ids, name="provider_taxon_id"),
+            name="niamoto_taxon_id",
+        )
+
+    @classmethod
+    def map_synonyms(cls, synonym_key, provider_taxon_ids, connection=None):
+        """
+        Map provider's taxon ids to Niamoto taxon ids, with a binary search
+        in the cached synonym mapping.
+        :param synonym_key: The synonym key to consider.
+        :param provider_taxon_ids: A Series of provider's taxon ids.
+        :param connection: If passed, use an existing connection to read
+        the taxonomy version (and the synonyms, if not cached).
+        :return: A Series with the same index, containing the corresponding
+        Niamoto taxon ids, NaN where there is no synonym (same result as
+        provider_taxon_ids.map(get_synonyms_for_key(synonym_key))).
+        """
+        keys, values = cls.get_synonyms_arrays(
+            synonym_key,
+            connection=connection
+        )
+        ids = pd.to_numeric(provider_taxon_ids, errors='coerce').values
+        ids = ids.astype(np.float64)
+        valid = np.flatnonzero(np.isfinite(ids))
+        int_ids = ids[valid].astype(np.int64)
+        positions = np.searchsorted(keys, int_ids)
+        positions[positions == len(keys)] = 0
+        found = np.zeros(len(valid), dtype=bool)
+        if len(keys) > 0:
+            found = (keys[positions] == int_ids) & (int_ids == ids[valid])
+        if len(found) == len(ids) and found.all():
+            mapped = values[positions]
+        else:
+            mapped = np.full(len(ids), np.nan)
+            mapped[valid[found]] = values[positions[found]]
+        return pd.Series(mapped, index=provider_taxon_ids.index)
 
     @staticmethod
     def assert_synonym_key_exists(synonym_key, bind=None):
@@ -443,11 +721,286 @@ class TaxonomyManager:
                 ]].to_dict(orient='records')
             )
 
+    @classmethod
+    def add_taxon(cls, taxon_id, full_name, rank_name, rank, parent_id=None,
+                  synonyms={}):
+        """
+        Add a single taxon to the taxonomy, as the last child of its parent
+        (or as the root of a new tree if parent_id is None). Only the mptt
+        values of the parent's tree located after the insertion point are
+        shifted, the rest of the taxonomy is left untouched.
+        :param taxon_id: The id of the taxon to add.
+        :param full_name: The full name of the taxon.
+        :param rank_name: The rank name of the taxon.
+        :param rank: The rank of the taxon (a TaxonRankEnum value or name).
+        :param parent_id: The id of the parent taxon, None for a root.
+        :param synonyms: A dict of synonyms {synonym_key: provider_taxon_id},
+            the synonym keys must be registered.
+        """
+        rank = meta.TaxonRankEnum(
+            rank.value if isinstance(rank, meta.TaxonRankEnum) else rank
+        )
+        taxon = meta.taxon
+        with Connector.get_connection() as connection:
+            with connection.begin():
+                cls._lock_taxon_table(connection)
+                cls.assert_taxon_does_not_exist_in_database(
+                    taxon_id,
+                    connection=connection
+                )
+                for synonym_key in synonyms:
+                    cls.assert_synonym_key_exists(
+                        synonym_key,
+                        bind=connection
+                    )
+                if parent_id is None:
+                    tree_id, depth, left = taxon_id, 0, 1
+                else:
+                    parent = cls._get_mptt_node(parent_id, connection)
+                    tree_id = parent.mptt_tree_id
+                    depth = parent.mptt_depth + 1
+                    left = parent.mptt_right
+                    connection.execute(
+                        cls._get_mptt_gap_update(tree_id, left, 2)
+                    )
+                connection.execute(taxon.insert().values(
+                    id=taxon_id,
+                    full_name=full_name,
+                    rank_name=rank_name,
+                    rank=rank,
+                    parent_id=parent_id,
+                    synonyms=synonyms,
+                    mptt_left=left,
+                    mptt_right=left + 1,
+                    mptt_tree_id=tree_id,
+                    mptt_depth=depth,
+                ))
+        cls.invalidate_synonyms_cache()
+        LOGGER.debug("Taxon {} added (parent: {}).".format(
+            taxon_id, parent_id
+        ))
+
+    @classmethod
+    def move_taxon(cls, taxon_id, new_parent_id=None):
+        """
+        Move a taxon and its whole subtree, as the last child of a new
+        parent (or as the root of a new tree if new_parent_id is None).
+        The mptt values are updated with a single set based UPDATE touching
+        only the rows whose mptt values change: the subtree, the nodes
+        between its old and new positions and their ancestors.
+        :param taxon_id: The id of the taxon to move.
+        :param new_parent_id: The id of the new parent, None to make the
+            taxon a root.
+        """
+        taxon = meta.taxon
+        c = taxon.c
+        with Connector.get_connection() as connection:
+            with connection.begin():
+                cls._lock_taxon_table(connection)
+                node = cls._get_mptt_node(taxon_id, connection)
+                l, r = node.mptt_left, node.mptt_right
+                src_tree = node.mptt_tree_id
+                width = r - l + 1
+                in_subtree = and_(
+                    c.mptt_tree_id == src_tree,
+                    c.mptt_left.between(l, r),
+                )
+                if new_parent_id is None:
+                    dst_tree, dst_depth, p = taxon_id, 0, 1
+                else:
+                    parent = cls._get_mptt_node(new_parent_id, connection)
+                    dst_tree = parent.mptt_tree_id
+                    dst_depth = parent.mptt_depth + 1
+                    p = parent.mptt_right
+                    if dst_tree == src_tree and l <= parent.mptt_left <= r:
+                        m = "The taxon '{}' cannot be moved under one of " \
+                            "its descendants ('{}')."
+                        raise ValueError(m.format(taxon_id, new_parent_id))
+                depth_shift = dst_depth - node.mptt_depth
+                if dst_tree == src_tree:
+                    # Move inside the same tree: the subtree is shifted by
+                    # 'offset' and the nodes between the subtree and the
+                    # insertion point are shifted by '-shift'.
+                    if p > r:
+                        offset, shift = p - r - 1, width
+                        low, high = r + 1, p - 1
+                    else:
+                        offset, shift = p - l, -width
+                        low, high = p, l - 1
+
+                    def _new_value(col):
+                        return case(
+                            [
+                                (col.between(l, r), col + offset),
+                                (col.between(low, high), col - shift),
+                            ],
+                            else_=col
+                        )
+                    lo, hi = min(l, low), max(r, high)
+                    upd = taxon.update().where(
+                        and_(
+                            c.mptt_tree_id == src_tree,
+                            or_(
+                                c.mptt_left.between(lo, hi),
+                                c.mptt_right.between(lo, hi),
+                            )
+                        )
+                    ).values({
+                        'mptt_left': _new_value(c.mptt_left),
+                        'mptt_right': _new_value(c.mptt_right),
+                        'mptt_depth': case(
+                            [(in_subtree, c.mptt_depth + depth_shift)],
+                            else_=c.mptt_depth
+                        ),
+                    })
+                else:
+                    # Move to another (or a new) tree: close the gap in the
+                    # source tree and open one in the destination tree.
+                    def _new_value(col, strict):
+                        dst_cond = col > p if strict else col >= p
+                        return case(
+                            [
+                                (in_subtree, col - l + p),
+                                (
+                                    and_(c.mptt_tree_id == src_tree, col > r),
+                                    col - width
+                                ),
+                                (
+                                    and_(c.mptt_tree_id == dst_tree, dst_cond),
+                                    col + width
+                                ),
+                            ],
+                            else_=col
+                        )
+                    # The subtree and the nodes after it in the source
+                    # tree, the nodes after the insertion point in the
+                    # destination tree.
+                    upd = taxon.update().where(
+                        or_(
+                            and_(
+                                c.mptt_tree_id == src_tree,
+                                c.mptt_right >= l,
+                            ),
+                            and_(
+                                c.mptt_tree_id == dst_tree,
+                                c.mptt_right >= p,
+                            ),
+                        )
+                    ).values({
+                        'mptt_left': _new_value(c.mptt_left, True),
+                        'mptt_right': _new_value(c.mptt_right, False),
+                        'mptt_depth': case(
+                            [(in_subtree, c.mptt_depth + depth_shift)],
+                            else_=c.mptt_depth
+                        ),
+                        'mptt_tree_id': case(
+                            [(in_subtree, dst_tree)],
+                            else_=c.mptt_tree_id
+                        ),
+                    })
+                connection.execute(upd)
+                connection.execute(
+                    taxon.update().where(c.id == taxon_id).values(
+                        parent_id=new_parent_id
+                    )
+                )
+        LOGGER.debug("Taxon {} moved (new parent: {}).".format(
+            taxon_id, new_parent_id
+        ))
+
+    @classmethod
+    def delete_subtree(cls, taxon_id):
+        """
+        Delete a taxon and all its descendants, and close the gap left in
+        the mptt of its tree. Occurrences referring to the deleted taxa
+        will have their taxon_id set to NULL.
+        :param taxon_id: The id of the root of the subtree to delete.
+        :return: The number of deleted taxa.
+        """
+        taxon = meta.taxon
+        c = taxon.c
+        with Connector.get_connection() as connection:
+            with connection.begin():
+                cls._lock_taxon_table(connection)
+                node = cls._get_mptt_node(taxon_id, connection)
+                l, r = node.mptt_left, node.mptt_right
+                tree_id = node.mptt_tree_id
+                connection.execute("SET CONSTRAINTS ALL DEFERRED;")
+                result = connection.execute(taxon.delete().where(
+                    and_(
+                        c.mptt_tree_id == tree_id,
+                        c.mptt_left.between(l, r),
+                    )
+                )).rowcount
+                connection.execute(
+                    cls._get_mptt_gap_update(tree_id, r + 1, l - r - 1)
+                )
+        cls.invalidate_synonyms_cache()
+        LOGGER.debug("{} taxa deleted (subtree of {}).".format(
+            result, taxon_id
+        ))
+        return result
+
+    @staticmethod
+    def _lock_taxon_table(connection):
+        """
+        Serialize the concurrent modifications of the taxonomy, reads are
+        still allowed.
+        :param connection: The connection holding the transaction.
+        """
+        sql = "LOCK TABLE {}.{} IN SHARE ROW EXCLUSIVE MODE;".format(
+            settings.NIAMOTO_SCHEMA,
+            meta.taxon.name
+        )
+        connection.execute(sql)
+
+    @staticmethod
+    def _get_mptt_node(taxon_id, connection):
+        """
+        :param taxon_id: The id of the taxon.
+        :param connection: The connection to use.
+        :return: The mptt record of the taxon.
+        """
+        c = meta.taxon.c
+        sel = select([
+            c.id, c.mptt_left, c.mptt_right, c.mptt_tree_id, c.mptt_depth,
+        ]).where(c.id == taxon_id)
+        node = connection.execute(sel).fetchone()
+        if node is None:
+            m = "The taxon '{}' does not exist in database."
+            raise NoRecordFoundError(m.format(taxon_id))
+        return node
+
+    @staticmethod
+    def _get_mptt_gap_update(tree_id, position, width):
+        """
+        :param tree_id: The mptt tree id.
+        :param position: The mptt position where the gap starts.
+        :param width: The width of the gap to open (or to close if negative).
+        :return: The UPDATE statement shifting the mptt values of the tree
+            that are greater or equal to position.
+        """
+        c = meta.taxon.c
+        return meta.taxon.update().where(
+            and_(c.mptt_tree_id == tree_id, c.mptt_right >= position)
+        ).values({
+            'mptt_left': case(
+                [(c.mptt_left >= position, c.mptt_left + width)],
+                else_=c.mptt_left
+            ),
+            'mptt_right': c.mptt_right + width,
+        })
+
     @staticmethod
     def construct_mptt(dataframe):
         """
         Given a taxa DataFrame, Construct the mptt (modified pre order tree
         traversal) and return it as a DataFrame.
+        The tree is walked with a single iterative depth first search over
+        a parent -> children adjacency stored in CSR layout (children
+        positions sorted by parent, plus an offset array). Children are
+        visited in the order they appear in the DataFrame, and the mptt
+        columns are written in bulk at the end.
         :param dataframe: A pandas DataFrame of taxa. The 'parent_id' must be
         filled since the method will rely on it to build the mptt.
         :return: The built mptt.
@@ -455,41 +1008,70 @@ class TaxonomyManager:
         LOGGER.debug("Constructing the MPTT tree...")
         t = time.time()
         df = dataframe.copy()
-        # Find roots
-        roots = dataframe[pd.isnull(dataframe['parent_id'])]
-        for i, root in roots.iterrows():
-            df.loc[i, 'mptt_tree_id'] = i
-            df.loc[i, 'mptt_depth'] = 0
-            df.loc[i, 'mptt_left'] = 1
-            right = TaxonomyManager._construct_tree(df, i, 1, 1)
-            df.loc[i, 'mptt_right'] = right
+        n = len(df)
+        ids = df.index.values
+        mptt = {}
+        for col in ['mptt_tree_id', 'mptt_depth', 'mptt_left', 'mptt_right']:
+            if col in df.columns:
+                mptt[col] = df[col].values.astype(np.int64)
+            else:
+                mptt[col] = np.zeros(n, dtype=np.int64)
+        tree_ids = mptt['mptt_tree_id']
+        depths = mptt['mptt_depth']
+        lefts = mptt['mptt_left']
+        rights = mptt['mptt_right']
+        children, offsets = TaxonomyManager._get_children_adjacency(df)
+        children = children.tolist()
+        offsets = offsets.tolist()
+        next_child = offsets[:-1]
+        roots = np.flatnonzero(pd.isnull(df['parent_id']).values)
+        for root in roots.tolist():
+            tree_id = ids[root]
+            tree_ids[root] = tree_id
+            depths[root] = 0
+            lefts[root] = 1
+            counter = 1
+            stack = [root]
+            while stack:
+                node = stack[-1]
+                k = next_child[node]
+                if k < offsets[node + 1]:
+                    next_child[node] = k + 1
+                    child = children[k]
+                    counter += 1
+                    tree_ids[child] = tree_id
+                    depths[child] = len(stack)
+                    lefts[child] = counter
+                    stack.append(child)
+                else:
+                    counter += 1
+                    rights[node] = counter
+                    stack.pop()
+        for col, values in mptt.items():
+            if col in dataframe.columns:
+                values = values.astype(dataframe[col].dtype)
+            df[col] = values
         m = "The MPTT tree had been successfully constructed ({:.2f} s)!"
         LOGGER.debug(m.format(time.time() - t))
         return df
 
     @staticmethod
-    def _construct_tree(df, parent_id, depth, left):
+    def _get_children_adjacency(df):
         """
-        Recursive method that builds the subtree under a given taxon.
-        Writes the attributes in the DataFrame given as parameter.
+        Build the parent -> children adjacency of a taxon DataFrame in CSR
+        layout. The children of the taxon at position i are
+        children[offsets[i]:offsets[i + 1]], in DataFrame order.
         :param df: The taxon DataFrame.
-        :param parent_id: The id of the taxon to build the subtree for.
-        :param depth: The depth for the first level of the subtree.
-        :param left: The starting left attribute.
-        :return: The final right attribute.
-        """
-        children = df[df['parent_id'] == parent_id]
-        right = left + 1
-        if len(children) == 0:
-            return right
-        for i, child in children.iterrows():
-            df.loc[i, 'mptt_tree_id'] = df.loc[parent_id]['mptt_tree_id']
-            df.loc[i, 'mptt_depth'] = depth
-            df.loc[i, 'mptt_left'] = right
-            right = TaxonomyManager._construct_tree(df, i, depth + 1, right)
-            df.loc[i, 'mptt_right'] = right
-            right += 1
-        return right
+        :return: The (children, offsets) tuple of positional arrays.
+        """
+        parent_pos = df.index.get_indexer(df['parent_id'].values)
+        has_parent = np.flatnonzero(parent_pos >= 0)
+        order = np.argsort(parent_pos[has_parent], kind='stable')
+        children = has_parent[order]
+        counts = np.bincount(parent_pos[has_parent], minlength=len(df))
+        offsets = np.zeros(len(df) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        return children, offsets
 
     @staticmethod
     def assert_taxon_exists_in_database(taxon_id, connection=None):
@@ -510,3 +1092,22 @@ class TaxonomyManager:
         if r == 0:
             m = "The taxon '{}' does not exist in database."
             raise NoRecordFoundError(m.format(taxon_id))
+
+    @staticmethod
+    def assert_taxon_does_not_exist_in_database(taxon_id, connection=None):
+        """
+        Assert the non-existence of a taxon in database, from its id.
+        :param taxon_id: The id of the taxon to check.
+        :param connection: Use an existing connection if provided.
+        """
+        sel = meta.taxon.select().where(
+            meta.taxon.c.id == taxon_id
+        )
+        if connection is not None:
+            r = connection.execute(sel).rowcount
+        else:
+            with Connector.get_connection() as connection:
+                r = connection.execute(sel).rowcount
+        if r > 0:
+            m = "The taxon '{}' already exists in database."
+            raise RecordAlreadyExistsError(m.format(taxon_id))
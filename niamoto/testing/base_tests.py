@@ -7,6 +7,7 @@ from sqlalchemy.engine.reflection import Inspector
 from niamoto.conf import settings
 from niamoto.db.connector import Connector
 from niamoto.db import metadata as meta
+from niamoto.taxonomy.taxonomy_manager import TaxonomyManager
 
 
 class BaseTest(unittest.TestCase):
@@ -23,9 +24,12 @@ class BaseTestNiamotoSchemaCreated(BaseTest):
         engine = Connector.get_engine()
         meta.metadata.create_all(engine, tables=[
             meta.occurrence,
+            meta.occurrence_change_log,
             meta.plot,
             meta.plot_occurrence,
             meta.data_provider,
+            meta.property_catalog,
+            meta.data_version,
             meta.taxon,
             meta.synonym_key_registry,
             meta.raster_registry,
@@ -39,6 +43,8 @@ class BaseTestNiamotoSchemaCreated(BaseTest):
     def tearDownClass(cls):
         engine = Connector.get_engine()
         meta.metadata.drop_all(engine)
+        # The taxonomy is dropped along with the schema
+        TaxonomyManager.clear_synonyms_cache()
         with Connector.get_connection() as connection:
             inspector = Inspector.from_engine(connection)
             # Drop vectors
@@ -68,3 +68,22 @@ class TestFactTablePublisher(BaseFactTablePublisher):
     @classmethod
     def get_key(cls):
         return 'TEST_FACT_TABLE_PUBLISHER'
+
+
+class TestIncrementalFactTablePublisher(TestFactTablePublisher):
+    """
+    Test fact table publisher supporting incremental refresh: the rows of
+    dim_1_id = 3 changed (measures multiplied by 10, and the dim_2_id = 4
+    row removed).
+    """
+
+    def _process_changes(self, watermark, *args, **kwargs):
+        df = self._process()
+        df = df[(df['dim_1_id'] == 3) & (df['dim_2_id'] != 4)].copy()
+        df['measure_1'] = df['measure_1'] * 10
+        keys = pd.DataFrame({'dim_1_id': [3]})
+        return keys, df
+
+    @classmethod
+    def get_key(cls):
+        return 'TEST_INCREMENTAL_FACT_TABLE_PUBLISHER'
@@ -0,0 +1,135 @@
+# coding: utf-8
+
+"""
+Benchmark of the fact table population on a test database: a fact table
+of N rows (two dimensions and a float measure) is populated from a
+dataframe, first by writing the whole dataframe to an in-memory CSV buffer
+before the COPY (the previous implementation), then by streaming it by
+chunks (BaseFactTable.populate). The best time of two runs and the peak of
+memory allocated (measured with tracemalloc, in another run) are reported
+for both.
+Usage: python scripts/benchmark_fact_table_populate.py [rows]
+"""
+
+from niamoto.testing import set_test_path
+set_test_path()
+
+if __name__ == "__main__":
+
+    import io
+    import sys
+    import time
+    import tracemalloc
+
+    import numpy as np
+    import pandas as pd
+    import sqlalchemy as sa
+
+    from niamoto.conf import settings
+    from niamoto.db import metadata as niamoto_db_meta
+    from niamoto.db.connector import Connector
+    from niamoto.data_marts.fact_tables.base_fact_table import BaseFactTable
+    from niamoto.testing.test_data_marts import TestDimension
+    from niamoto.testing.test_database_manager import TestDatabaseManager
+
+    SIZE = 5000000
+    if len(sys.argv) > 1:
+        SIZE = int(sys.argv[1])
+
+    DIM_1_SIZE = 2500
+    DIM_2_SIZE = -(-SIZE // DIM_1_SIZE)
+
+    def make_dimension_dataframe(size):
+        return pd.DataFrame({
+            'value': np.arange(size),
+            'category': ['cat_{}'.format(i % 10) for i in range(size)],
+        })
+
+    def make_fact_dataframe():
+        rng = np.random.RandomState(0)
+        measure = rng.random_sample(SIZE)
+        measure[rng.random_sample(SIZE) < 0.1] = np.nan
+        return pd.DataFrame({
+            'dim_1_id': np.tile(np.arange(DIM_1_SIZE), DIM_2_SIZE)[:SIZE],
+            'dim_2_id': np.repeat(np.arange(DIM_2_SIZE), DIM_1_SIZE)[:SIZE],
+            'measure': measure,
+        })
+
+    def populate_csv_buffer(fact_table, dataframe):
+        cols = [c.name for c in fact_table.columns]
+        s = io.StringIO()
+        dataframe[cols].fillna(value=0).to_csv(s, columns=cols, index=False)
+        s.seek(0)
+        sql_copy = "COPY {}.{} ({}) FROM STDIN CSV HEADER;".format(
+            settings.NIAMOTO_FACT_TABLES_SCHEMA,
+            fact_table.name,
+            ','.join(cols)
+        )
+        with Connector.get_raw_connection() as raw_connection:
+            cur = raw_connection.cursor()
+            cur.copy_expert(sql_copy, s)
+            cur.close()
+
+    def populate_streamed(fact_table, dataframe):
+        fact_table.populate(dataframe)
+
+    def run(populate, fact_table, dataframe, trace):
+        # A new table for each run, the runs would otherwise depend on
+        # their order (WAL, table files of the truncated tables).
+        fact_table.drop_fact_table()
+        fact_table.create_fact_table()
+        with Connector.get_connection() as connection:
+            connection.execute("CHECKPOINT;")
+        if trace:
+            tracemalloc.start()
+        t = time.time()
+        populate(fact_table, dataframe)
+        elapsed = time.time() - t
+        peak = 0
+        if trace:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        return elapsed, peak
+
+    TestDatabaseManager.setup_test_database()
+    TestDatabaseManager.create_schema(settings.NIAMOTO_SCHEMA)
+    TestDatabaseManager.create_schema(settings.NIAMOTO_DIMENSIONS_SCHEMA)
+    TestDatabaseManager.create_schema(settings.NIAMOTO_FACT_TABLES_SCHEMA)
+    engine = Connector.get_engine()
+    niamoto_db_meta.metadata.create_all(engine, tables=[
+        niamoto_db_meta.dimension_registry,
+        niamoto_db_meta.fact_table_registry,
+    ])
+    try:
+        dim_1 = TestDimension("dim_1")
+        dim_2 = TestDimension("dim_2")
+        dim_1.create_dimension()
+        dim_2.create_dimension()
+        dim_1.populate(make_dimension_dataframe(DIM_1_SIZE))
+        dim_2.populate(make_dimension_dataframe(DIM_2_SIZE))
+        fact_table = BaseFactTable(
+            "benchmark",
+            dimensions=[dim_1, dim_2],
+            measure_columns=[sa.Column('measure', sa.Float)],
+        )
+        fact_table.create_fact_table()
+        df = make_fact_dataframe()
+        print("{:>10} | {:>12} | {:>8} | {:>10} | {:>8}".format(
+            "rows", "method", "time (s)", "rows/s", "peak (MB)"
+        ))
+        methods = [('csv buffer', populate_csv_buffer),
+                   ('streamed', populate_streamed)]
+        # The best of two interleaved runs
+        times = {name: [] for name, populate in methods}
+        for i in range(2):
+            for name, populate in methods:
+                times[name].append(run(populate, fact_table, df, False)[0])
+        for name, populate in methods:
+            elapsed = min(times[name])
+            peak = run(populate, fact_table, df, trace=True)[1]
+            print("{:>10} | {:>12} | {:>8.2f} | {:>10.0f} | {:>8.1f}".format(
+                SIZE, name, elapsed, SIZE / elapsed, peak / 1024 ** 2
+            ))
+    finally:
+        Connector.dispose_engines()
+        TestDatabaseManager.teardown_test_database()
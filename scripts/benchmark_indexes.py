@@ -0,0 +1,178 @@
+# coding: utf-8
+
+"""
+Benchmark of the Niamoto database indexes on a test database: N
+occurrences, N / 100 plots and N / 5 taxa are generated, then typical
+queries are timed without the location, provider key and mptt indexes,
+and after they were created by optimize_db:
+    - A bounding box query on the occurrences and plots locations (e.g.
+      raster extraction, vector spatial join, location dimension).
+    - A join of 1000 (provider_id, provider_pk) keys with the occurrences
+      and plots (the data provider sync updates).
+    - The descendants of a taxon, using the mptt columns.
+The best time of five runs is reported.
+Usage: python scripts/benchmark_indexes.py [occurrences]
+"""
+
+from niamoto.testing import set_test_path
+set_test_path()
+
+if __name__ == "__main__":
+
+    import sys
+    import time
+
+    from niamoto.conf import settings
+    from niamoto.db import metadata as niamoto_db_meta
+    from niamoto.db.connector import Connector
+    from niamoto.db.utils import optimize_db
+    from niamoto.testing.test_database_manager import TestDatabaseManager
+
+    SIZE = 1000000
+    if len(sys.argv) > 1:
+        SIZE = int(sys.argv[1])
+
+    PLOTS = max(SIZE // 100, 1000)
+    TAXA = max(SIZE // 5, 1000)
+    TREES = 20
+
+    INDEX_NAMES = [
+        'ix_occurrence_niamoto_occurrence_location',
+        'ix_occurrence_niamoto_occurrence_provider_id_provider_pk',
+        'ix_plot_niamoto_plot_location',
+        'ix_plot_niamoto_plot_provider_id_provider_pk',
+        'ix_taxon_niamoto_taxon_mptt_tree_id_mptt_left_mptt_right',
+    ]
+
+    # Random points in New Caledonia
+    LOCATION = "'SRID=4326;POINT(' || (164 + random() * 3) || ' ' " \
+               "|| (-22.7 + random() * 2.5) || ')'"
+
+    def generate_data():
+        with Connector.get_connection() as connection:
+            connection.execute(
+                """
+                INSERT INTO {schema}.data_provider
+                    (id, name, provider_type_key, properties, date_create)
+                VALUES
+                    (1, 'provider_1', 'CSV', '{{}}', now()),
+                    (2, 'provider_2', 'CSV', '{{}}', now());
+                INSERT INTO {schema}.taxon
+                    (id, full_name, rank_name, rank, synonyms, mptt_left,
+                     mptt_right, mptt_tree_id, mptt_depth)
+                SELECT i, 'taxon_' || i, 'species', 'SPECIES', '{{}}',
+                       2 * (i / {trees}) + 1, 2 * (i / {trees}) + 2,
+                       i %% {trees}, 1
+                FROM generate_series(1, {taxa}) AS i;
+                INSERT INTO {schema}.occurrence
+                    (id, provider_id, provider_pk, location, taxon_id,
+                     properties)
+                SELECT i, i %% 2 + 1, i, {location}, i %% {taxa} + 1, '{{}}'
+                FROM generate_series(1, {size}) AS i;
+                INSERT INTO {schema}.plot
+                    (id, provider_id, provider_pk, name, location,
+                     properties)
+                SELECT i, i %% 2 + 1, i, 'plot_' || i, {location}, '{{}}'
+                FROM generate_series(1, {plots}) AS i;
+                """.format(
+                    schema=settings.NIAMOTO_SCHEMA,
+                    location=LOCATION,
+                    trees=TREES,
+                    taxa=TAXA,
+                    size=SIZE,
+                    plots=PLOTS,
+                )
+            )
+
+    def get_queries():
+        keys = ', '.join(
+            '({}, {})'.format(i % 2 + 1, i)
+            for i in range(1, SIZE, max(SIZE // 1000, 1))
+        )
+        plot_keys = ', '.join(
+            '({}, {})'.format(i % 2 + 1, i)
+            for i in range(1, PLOTS, max(PLOTS // 1000, 1))
+        )
+        envelope = "ST_MakeEnvelope(165.5, -21.5, 165.6, -21.4, 4326)"
+        return [
+            ('occurrence bbox',
+             "SELECT count(*) FROM {schema}.occurrence "
+             "WHERE location && {envelope};"),
+            ('plot bbox',
+             "SELECT count(*) FROM {schema}.plot "
+             "WHERE location && {envelope};"),
+            ('occurrence keys',
+             "SELECT count(*) FROM {schema}.occurrence AS o "
+             "JOIN (VALUES {keys}) AS k (provider_id, provider_pk) "
+             "ON o.provider_id = k.provider_id "
+             "AND o.provider_pk = k.provider_pk;"),
+            ('plot keys',
+             "SELECT count(*) FROM {schema}.plot AS p "
+             "JOIN (VALUES {plot_keys}) AS k (provider_id, provider_pk) "
+             "ON p.provider_id = k.provider_id "
+             "AND p.provider_pk = k.provider_pk;"),
+            ('taxon descendants',
+             "SELECT count(*) FROM {schema}.taxon "
+             "WHERE mptt_tree_id = 3 AND mptt_left > 1000 "
+             "AND mptt_right < 1400;"),
+        ], {
+            'schema': settings.NIAMOTO_SCHEMA,
+            'envelope': envelope,
+            'keys': keys,
+            'plot_keys': plot_keys,
+        }
+
+    def run_queries():
+        queries, params = get_queries()
+        times = {}
+        with Connector.get_connection() as connection:
+            for name, sql in queries:
+                sql = sql.format(**params)
+                best = None
+                for i in range(5):
+                    t = time.time()
+                    connection.execute(sql)
+                    elapsed = time.time() - t
+                    best = elapsed if best is None else min(best, elapsed)
+                times[name] = best
+        return [name for name, sql in queries], times
+
+    TestDatabaseManager.setup_test_database()
+    TestDatabaseManager.create_schema(settings.NIAMOTO_SCHEMA)
+    engine = Connector.get_engine()
+    niamoto_db_meta.metadata.create_all(engine, tables=[
+        niamoto_db_meta.synonym_key_registry,
+        niamoto_db_meta.data_provider,
+        niamoto_db_meta.taxon,
+        niamoto_db_meta.occurrence,
+        niamoto_db_meta.plot,
+    ])
+    try:
+        with Connector.get_connection() as connection:
+            for name in INDEX_NAMES:
+                connection.execute("DROP INDEX {}.{};".format(
+                    settings.NIAMOTO_SCHEMA, name
+                ))
+        generate_data()
+        with Connector.get_connection() as connection:
+            connection.execute("ANALYZE;")
+        names, before = run_queries()
+        t = time.time()
+        optimize_db()
+        optimize_time = time.time() - t
+        names, after = run_queries()
+        print("{} occurrences, {} plots, {} taxa (optimize_db: {:.2f} s)"
+              "".format(SIZE, PLOTS, TAXA, optimize_time))
+        print("{:>18} | {:>11} | {:>10} | {:>8}".format(
+            "query", "before (ms)", "after (ms)", "speedup"
+        ))
+        for name in names:
+            print("{:>18} | {:>11.2f} | {:>10.2f} | {:>7.1f}x".format(
+                name,
+                before[name] * 1000,
+                after[name] * 1000,
+                before[name] / after[name]
+            ))
+    finally:
+        Connector.dispose_engines()
+        TestDatabaseManager.teardown_test_database()
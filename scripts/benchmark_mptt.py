@@ -0,0 +1,43 @@
+# coding: utf-8
+
+"""
+Benchmark of the MPTT construction (TaxonomyManager.construct_mptt) on
+randomly generated taxonomies of 10k, 100k and 1M taxa.
+Usage: python scripts/benchmark_mptt.py [size, ...]
+"""
+
+from niamoto.testing import set_test_path
+set_test_path()
+
+if __name__ == "__main__":
+
+    import sys
+    import time
+
+    import numpy as np
+    import pandas as pd
+
+    from niamoto.taxonomy.taxonomy_manager import TaxonomyManager
+
+    SIZES = [10000, 100000, 1000000]
+    if len(sys.argv) > 1:
+        SIZES = [int(i) for i in sys.argv[1:]]
+
+    def make_random_taxonomy(size, nb_roots=10, seed=0):
+        rng = np.random.RandomState(seed)
+        ids = np.arange(1, size + 1)
+        # Each taxon is attached to a random previous taxon, shuffled after.
+        parents = ids[(rng.random_sample(size) * np.arange(size)).astype(int)]
+        parent_id = pd.Series(parents, index=ids, dtype=float)
+        parent_id.iloc[:nb_roots] = np.nan
+        df = pd.DataFrame({'parent_id': parent_id})
+        for col in ['mptt_tree_id', 'mptt_depth', 'mptt_left', 'mptt_right']:
+            df[col] = 0
+        return df.sample(frac=1, random_state=seed)
+
+    print("{:>10} | {:>10}".format("taxa", "time (s)"))
+    for size in SIZES:
+        df = make_random_taxonomy(size)
+        t = time.time()
+        TaxonomyManager.construct_mptt(df)
+        print("{:>10} | {:>10.2f}".format(size, time.time() - t))
@@ -0,0 +1,83 @@
+# coding: utf-8
+
+"""
+Benchmark of the occurrence sync on a test database: sync N new
+occurrences, re-sync them unchanged, then re-sync with 10% of them
+updated and 10% deleted.
+Usage: python scripts/benchmark_occurrence_sync.py [size, ...]
+"""
+
+from niamoto.testing import set_test_path
+set_test_path()
+
+if __name__ == "__main__":
+
+    import sys
+    import time
+    import json
+
+    import numpy as np
+    import pandas as pd
+
+    from niamoto.conf import settings
+    from niamoto.db import metadata as niamoto_db_meta
+    from niamoto.db.connector import Connector
+    from niamoto.data_providers.base_occurrence_provider import \
+        BaseOccurrenceProvider
+    from niamoto.testing.test_data_provider import TestDataProvider
+    from niamoto.testing.test_database_manager import TestDatabaseManager
+
+    SIZES = [1000000]
+    if len(sys.argv) > 1:
+        SIZES = [int(i) for i in sys.argv[1:]]
+
+    def make_occurrences(size, seed=0):
+        rng = np.random.RandomState(seed)
+        x = 164 + rng.random_sample(size) * 3
+        y = -22.5 + rng.random_sample(size) * 2
+        pks = np.arange(1, size + 1)
+        return pd.DataFrame({
+            'location': [
+                "SRID=4326;POINT({} {})".format(*c) for c in zip(x, y)
+            ],
+            'taxon_id': None,
+            'provider_taxon_id': None,
+            'properties': [
+                json.dumps({'dbh': int(d)}) for d in rng.randint(10, 100, size)
+            ],
+        }, index=pks)
+
+    TestDatabaseManager.setup_test_database()
+    TestDatabaseManager.create_schema(settings.NIAMOTO_SCHEMA)
+    engine = Connector.get_engine()
+    niamoto_db_meta.metadata.create_all(engine, tables=[
+        niamoto_db_meta.synonym_key_registry,
+        niamoto_db_meta.data_provider,
+        niamoto_db_meta.taxon,
+        niamoto_db_meta.occurrence,
+    ])
+    try:
+        provider = TestDataProvider.register_data_provider('benchmark')
+        occurrence_provider = BaseOccurrenceProvider(provider)
+        print("{:>10} | {:>10} | {:>10} | {:>14}".format(
+            "rows", "insert (s)", "resync (s)", "upd./del. (s)"
+        ))
+        for size in SIZES:
+            df = make_occurrences(size)
+            n = size // 10
+            changed = df.iloc[:-n].copy()
+            changed.iloc[:n, changed.columns.get_loc('properties')] = '{}'
+            times = []
+            for provider_df in [df, df, changed]:
+                with Connector.get_connection() as connection:
+                    t = time.time()
+                    occurrence_provider._sync(provider_df, connection)
+                    times.append(time.time() - t)
+            with Connector.get_connection() as connection:
+                connection.execute(niamoto_db_meta.occurrence.delete())
+            print("{:>10} | {:>10.2f} | {:>10.2f} | {:>14.2f}".format(
+                size, *times
+            ))
+    finally:
+        Connector.dispose_engines()
+        TestDatabaseManager.teardown_test_database()
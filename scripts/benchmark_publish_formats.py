@@ -0,0 +1,82 @@
+# coding: utf-8
+
+"""
+Benchmark of the file publish formats: an occurrence-like dataframe of N
+rows (taxon, coordinates and 30 numeric and text properties, with missing
+values) is published as csv, parquet and feather files. The write time,
+the file size and the time to read the file back with pandas are reported.
+Usage: python scripts/benchmark_publish_formats.py [rows]
+"""
+
+from niamoto.testing import set_test_path
+set_test_path()
+
+if __name__ == "__main__":
+
+    import os
+    import sys
+    import time
+    import tempfile
+
+    import numpy as np
+    import pandas as pd
+
+    from niamoto.data_publishers.base_data_publisher import BaseDataPublisher
+
+    SIZE = 3000000
+    if len(sys.argv) > 1:
+        SIZE = int(sys.argv[1])
+
+    PROPERTIES = 30
+
+    def make_dataframe():
+        rng = np.random.RandomState(0)
+        data = {
+            'taxon_id': rng.randint(0, 3000, SIZE).astype(float),
+            'full_name': pd.Series(
+                ['taxon_{}'.format(i) for i in range(3000)]
+            ).take(rng.randint(0, 3000, SIZE)).values,
+            'x': 164 + rng.random_sample(SIZE) * 3,
+            'y': -22.7 + rng.random_sample(SIZE) * 2.5,
+        }
+        for i in range(PROPERTIES):
+            if i % 3 == 0:
+                values = pd.Series(['value_{}'.format(j) for j in range(50)])
+                values = values.take(rng.randint(0, 50, SIZE)).values
+            else:
+                values = rng.random_sample(SIZE) * 100
+            values[rng.random_sample(SIZE) < 0.2] = np.nan
+            data['property_{}'.format(i)] = values
+        return pd.DataFrame(data, index=pd.Index(np.arange(SIZE), name='id'))
+
+    readers = {
+        BaseDataPublisher.CSV: lambda path: pd.read_csv(path, index_col='id'),
+        BaseDataPublisher.PARQUET: pd.read_parquet,
+        BaseDataPublisher.FEATHER: pd.read_feather,
+    }
+
+    df = make_dataframe()
+    print("{:>10} | {:>8} | {:>9} | {:>9} | {:>8}".format(
+        "rows", "format", "write (s)", "size (MB)", "read (s)"
+    ))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for publish_format, read in readers.items():
+            path = os.path.join(tmp_dir, 'occurrences.' + publish_format)
+            t = time.time()
+            BaseDataPublisher.publish(
+                df,
+                publish_format,
+                destination=path,
+                index_label='id'
+            )
+            write_time = time.time() - t
+            t = time.time()
+            read(path)
+            read_time = time.time() - t
+            print("{:>10} | {:>8} | {:>9.2f} | {:>9.1f} | {:>8.2f}".format(
+                SIZE,
+                publish_format,
+                write_time,
+                os.path.getsize(path) / 1024 ** 2,
+                read_time
+            ))
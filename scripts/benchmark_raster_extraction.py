@@ -0,0 +1,136 @@
+# coding: utf-8
+
+"""
+Benchmark of the raster value extraction on a test database (requires
+PostGIS raster): a 10000x10000 pixels in-db raster, cut in 100x100 tiles,
+and N random occurrences. The extraction is run before (no convex hull
+index, raster not analyzed, ST_Intersects join only) and after
+(RasterManager.index_raster, bounding box pre-filter on the convex hull).
+Usage: python scripts/benchmark_raster_extraction.py [occurrences]
+"""
+
+from niamoto.testing import set_test_path
+set_test_path()
+
+if __name__ == "__main__":
+
+    import sys
+    import time
+    from datetime import datetime
+
+    from niamoto.conf import settings
+    from niamoto.db import metadata as niamoto_db_meta
+    from niamoto.db.connector import Connector
+    from niamoto.raster.raster_manager import RasterManager
+    from niamoto.raster.raster_value_extractor import RasterValueExtractor
+    from niamoto.testing.test_data_provider import TestDataProvider
+    from niamoto.testing.test_database_manager import TestDatabaseManager
+
+    SIZE = 500000
+    if len(sys.argv) > 1:
+        SIZE = int(sys.argv[1])
+
+    RASTER = 'benchmark'
+    PIXELS = 10000
+    TILE = 100
+    # Extent of the raster, around New Caledonia
+    X_MIN, Y_MAX, WIDTH, HEIGHT = 164.0, -19.5, 3.0, 3.0
+    RASTER_TABLE = "{}.{}".format(settings.NIAMOTO_RASTER_SCHEMA, RASTER)
+    PREFILTER = "ST_ConvexHull(raster_0.rast) && t.location\n" \
+        "                    AND "
+
+    def create_raster(connection):
+        connection.execute(
+            """
+            CREATE TABLE {table} AS
+            SELECT row_number() OVER () AS rid, ST_AddBand(
+              ST_MakeEmptyRaster(
+                {tile}, {tile},
+                {x_min} + i * {tile} * {scale_x},
+                {y_max} + j * {tile} * {scale_y},
+                {scale_x}, {scale_y}, 0, 0, 4326
+              ),
+              '32BF'::text, (i * {n} + j)::double precision, -9999
+            ) AS rast
+            FROM generate_series(0, {n} - 1) AS i,
+              generate_series(0, {n} - 1) AS j;
+            """.format(**{
+                'table': RASTER_TABLE,
+                'tile': TILE,
+                'n': PIXELS // TILE,
+                'x_min': X_MIN,
+                'y_max': Y_MAX,
+                'scale_x': WIDTH / PIXELS,
+                'scale_y': - HEIGHT / PIXELS,
+            })
+        )
+        connection.execute(niamoto_db_meta.raster_registry.insert().values({
+            'name': RASTER,
+            'date_create': datetime.now(),
+            'properties': {},
+        }))
+
+    def create_occurrences(connection, provider_id):
+        connection.execute(
+            """
+            INSERT INTO {table} (provider_id, provider_pk, location,
+                                 properties)
+            SELECT {provider_id}, i, ST_SetSRID(ST_MakePoint(
+              {x_min} + random() * {width}, {y_max} - random() * {height}
+            ), 4326), '{{}}'
+            FROM generate_series(1, {size}) AS i;
+            ANALYZE {table};
+            """.format(**{
+                'table': '{}.{}'.format(
+                    settings.NIAMOTO_SCHEMA,
+                    niamoto_db_meta.occurrence.name
+                ),
+                'provider_id': provider_id,
+                'x_min': X_MIN,
+                'y_max': Y_MAX,
+                'width': WIDTH,
+                'height': HEIGHT,
+                'size': SIZE,
+            })
+        )
+
+    def extract(connection, prefilter):
+        sql = RasterValueExtractor.get_extract_rasters_values_sql(
+            [RASTER],
+            niamoto_db_meta.occurrence
+        )
+        if not prefilter:
+            sql = sql.replace(PREFILTER, "")
+        t = time.time()
+        with connection.begin():
+            connection.execute(sql)
+        return time.time() - t
+
+    TestDatabaseManager.setup_test_database()
+    TestDatabaseManager.create_schema(settings.NIAMOTO_SCHEMA)
+    TestDatabaseManager.create_schema(settings.NIAMOTO_RASTER_SCHEMA)
+    engine = Connector.get_engine()
+    niamoto_db_meta.metadata.create_all(engine, tables=[
+        niamoto_db_meta.synonym_key_registry,
+        niamoto_db_meta.data_provider,
+        niamoto_db_meta.taxon,
+        niamoto_db_meta.occurrence,
+        niamoto_db_meta.raster_registry,
+    ])
+    try:
+        provider = TestDataProvider.register_data_provider('benchmark')
+        with Connector.get_connection() as connection:
+            create_raster(connection)
+            create_occurrences(connection, provider.db_id)
+            before = extract(connection, prefilter=False)
+            RasterManager.index_raster(RASTER, connection=connection)
+            after = extract(connection, prefilter=True)
+        print("{:>12} | {:>10} | {:>10} | {:>10}".format(
+            "occurrences", "tiles", "before (s)", "after (s)"
+        ))
+        print("{:>12} | {:>10} | {:>10.2f} | {:>10.2f}".format(
+            SIZE, (PIXELS // TILE) ** 2, before, after
+        ))
+    finally:
+        Connector.dispose_engines()
+        TestDatabaseManager.teardown_test_database()
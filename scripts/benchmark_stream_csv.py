@@ -0,0 +1,127 @@
+# coding: utf-8
+
+"""
+Benchmark of the csv publish of the occurrences on a test database: N
+occurrences (with 10 numeric and text properties) and N / 100 taxa are
+generated, then the occurrences are published as a csv file by streaming
+them from the database (COPY ... TO STDOUT, see
+BaseDataPublisher.stream_csv), and by processing them into a DataFrame
+which is then written. The time, the increase of the peak memory use of
+the process and the file size are reported. The streaming publish is run
+first, the peak memory use being monotonic.
+Usage: python scripts/benchmark_stream_csv.py [occurrences]
+"""
+
+from niamoto.testing import set_test_path
+set_test_path()
+
+if __name__ == "__main__":
+
+    import os
+    import sys
+    import time
+    import resource
+    import tempfile
+
+    from niamoto.conf import settings
+    from niamoto.db import metadata as niamoto_db_meta
+    from niamoto.db.connector import Connector
+    from niamoto.data_publishers.occurrence_data_publisher import \
+        OccurrenceDataPublisher
+    from niamoto.testing.test_database_manager import TestDatabaseManager
+
+    SIZE = 5000000
+    if len(sys.argv) > 1:
+        SIZE = int(sys.argv[1])
+
+    TAXA = max(SIZE // 100, 1000)
+
+    # Random points in New Caledonia
+    LOCATION = "'SRID=4326;POINT(' || (164 + random() * 3) || ' ' " \
+               "|| (-22.7 + random() * 2.5) || ')'"
+
+    PROPERTIES = "jsonb_build_object(" + ", ".join([
+        "'property_{i}', "
+        "CASE WHEN random() < 0.2 THEN NULL "
+        "ELSE {value} END".format(
+            i=i,
+            value="round((random() * 100)::numeric, 2)" if i % 3
+            else "'value_' || (i %% 50)"
+        )
+        for i in range(10)
+    ]) + ")"
+
+    def generate_data():
+        with Connector.get_connection() as connection:
+            connection.execute(
+                """
+                INSERT INTO {schema}.data_provider
+                    (id, name, provider_type_key, properties, date_create)
+                VALUES (1, 'provider_1', 'CSV', '{{}}', now());
+                INSERT INTO {schema}.taxon
+                    (id, full_name, rank_name, rank, synonyms, mptt_left,
+                     mptt_right, mptt_tree_id, mptt_depth)
+                SELECT i, 'taxon_' || i, 'species', 'SPECIES', '{{}}',
+                       1, 2, i, 0
+                FROM generate_series(1, {taxa}) AS i;
+                INSERT INTO {schema}.occurrence
+                    (id, provider_id, provider_pk, location, taxon_id,
+                     properties)
+                SELECT i, 1, i, {location}, i %% {taxa} + 1, {properties}
+                FROM generate_series(1, {size}) AS i;
+                ANALYZE;
+                """.format(
+                    schema=settings.NIAMOTO_SCHEMA,
+                    location=LOCATION,
+                    properties=PROPERTIES,
+                    taxa=TAXA,
+                    size=SIZE,
+                )
+            )
+
+    def get_max_rss():
+        # In kilobytes on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    def stream(publisher, path):
+        publisher.stream_csv(destination=path)
+
+    def process_and_publish(publisher, path):
+        data, p_args, p_kwargs = publisher.process(use_cache=False)
+        publisher.publish(data, publisher.CSV, destination=path, **p_kwargs)
+
+    TestDatabaseManager.setup_test_database()
+    TestDatabaseManager.create_schema(settings.NIAMOTO_SCHEMA)
+    engine = Connector.get_engine()
+    niamoto_db_meta.metadata.create_all(engine, tables=[
+        niamoto_db_meta.synonym_key_registry,
+        niamoto_db_meta.data_provider,
+        niamoto_db_meta.taxon,
+        niamoto_db_meta.occurrence,
+    ])
+    try:
+        t = time.time()
+        generate_data()
+        print("{} occurrences, {} taxa (generated in {:.1f} s)".format(
+            SIZE, TAXA, time.time() - t
+        ))
+        print("{:>10} | {:>8} | {:>15} | {:>9}".format(
+            "publish", "time (s)", "peak +mem (MB)", "size (MB)"
+        ))
+        publisher = OccurrenceDataPublisher()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for name, method in [('stream', stream),
+                                 ('dataframe', process_and_publish)]:
+                path = os.path.join(tmp_dir, name + '.csv')
+                rss = get_max_rss()
+                t = time.time()
+                method(publisher, path)
+                print("{:>10} | {:>8.2f} | {:>15.1f} | {:>9.1f}".format(
+                    name,
+                    time.time() - t,
+                    get_max_rss() - rss,
+                    os.path.getsize(path) / 1024 ** 2
+                ))
+    finally:
+        Connector.dispose_engines()
+        TestDatabaseManager.teardown_test_database()
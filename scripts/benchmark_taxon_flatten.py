@@ -0,0 +1,77 @@
+# coding: utf-8
+
+"""
+Benchmark of the taxonomy flattening of the taxon data publisher on a
+randomly generated taxonomy of 50k taxa, compared to the previous row by
+row implementation (df.apply, walking up the parents with df.loc).
+Usage: python scripts/benchmark_taxon_flatten.py [size, ...]
+"""
+
+from niamoto.testing import set_test_path
+set_test_path()
+
+if __name__ == "__main__":
+
+    import sys
+    import time
+
+    import numpy as np
+    import pandas as pd
+
+    from niamoto.db import metadata as meta
+    from niamoto.data_publishers.taxon_data_publisher import _flatten
+
+    SIZES = [50000]
+    if len(sys.argv) > 1:
+        SIZES = [int(i) for i in sys.argv[1:]]
+
+    RANKS = [opt.value for opt in meta.TaxonRankEnum]
+
+    def make_random_taxonomy(size, nb_roots=10, seed=0):
+        rng = np.random.RandomState(seed)
+        ids = np.arange(1, size + 1)
+        # Each taxon is attached to a random previous taxon, its rank is
+        # the one below its parent's.
+        parents = ids[(rng.random_sample(size) * np.arange(size)).astype(int)]
+        parents[:nb_roots] = 0
+        depth = np.zeros(size + 1, dtype=int)
+        for i in range(nb_roots, size):
+            depth[ids[i]] = min(depth[parents[i]] + 1, len(RANKS) - 1)
+        df = pd.DataFrame({
+            'full_name': ['Taxon {}'.format(i) for i in ids],
+            'rank_name': [RANKS[d].lower() for d in depth[1:]],
+            'rank': [RANKS[d] for d in depth[1:]],
+            'parent_id': pd.Series(parents, index=ids).replace(0, np.nan),
+        }, index=pd.Index(ids, name='id'))
+        return df.sample(frac=1, random_state=seed)
+
+    def flatten_rows(df):
+        for r in RANKS:
+            df[r.lower()] = None
+
+        def _flatten_row(row):
+            row[row['rank'].lower()] = row['full_name']
+            parent_id = row['parent_id']
+            while pd.notnull(parent_id):
+                parent = df.loc[parent_id]
+                row[parent['rank'].lower()] = parent['full_name']
+                parent_id = parent['parent_id']
+            return row
+
+        return df.apply(_flatten_row, axis=1)
+
+    print("{:>10} | {:>12} | {:>14}".format(
+        "taxa", "row wise (s)", "vectorized (s)"
+    ))
+    for size in SIZES:
+        df = make_random_taxonomy(size)
+        t = time.time()
+        expected = flatten_rows(df.copy())
+        t_rows = time.time() - t
+        t = time.time()
+        result = _flatten(df.copy())
+        t_vectorized = time.time() - t
+        pd.testing.assert_frame_equal(result, expected)
+        print("{:>10} | {:>12.2f} | {:>14.2f}".format(
+            size, t_rows, t_vectorized
+        ))
@@ -29,6 +29,7 @@ setup(
         'psycopg2',
         'GeoAlchemy2',
         'pandas',
+        'pyarrow',
         'shapely',
         'rasterio',
         'geopandas',
@@ -24,7 +24,7 @@ from niamoto.api.vector_api import add_vector
 from niamoto.api.raster_api import add_raster
 from niamoto.api import data_marts_api
 from niamoto.testing.test_data_marts import TestDimension, \
-    TestFactTablePublisher
+    TestFactTablePublisher, TestIncrementalFactTablePublisher
 from niamoto.data_marts.dimensions.vector_dimension import VectorDimension
 from niamoto.data_marts.dimensional_model import DimensionalModel
 from niamoto.exceptions import DimensionNotRegisteredError
@@ -170,6 +170,57 @@ class TestDataMartsApi(BaseTestNiamotoSchemaCreated):
             truncate=True
         )
 
+    def test_refresh_fact_table(self):
+        dim_1 = TestDimension("dim_1")
+        dim_2 = TestDimension("dim_2")
+        dim_1.create_dimension()
+        dim_2.create_dimension()
+        dim_1.populate_from_publisher()
+        dim_2.populate_from_publisher()
+        data_marts_api.create_fact_table(
+            "test_fact",
+            dimension_names=['dim_1', 'dim_2'],
+            measure_names=['measure_1'],
+        )
+        result = data_marts_api.refresh_fact_table(
+            'test_fact',
+            TestIncrementalFactTablePublisher.get_key()
+        )
+        self.assertEqual(result['mode'], 'full')
+        self.assertEqual(result['inserted'], 11)
+        result = data_marts_api.refresh_fact_table(
+            'test_fact',
+            TestIncrementalFactTablePublisher.get_key(),
+            full=True
+        )
+        self.assertEqual(result['deleted'], 11)
+
+    def test_populate_data_marts(self):
+        dim_1 = TestDimension("dim_1")
+        dim_2 = TestDimension("dim_2")
+        dim_1.create_dimension()
+        dim_2.create_dimension()
+        data_marts_api.create_fact_table(
+            "test_fact",
+            dimension_names=['dim_1', 'dim_2'],
+            measure_names=['measure_1'],
+        )
+        report = data_marts_api.populate_data_marts(
+            dimension_names=['dim_1', 'dim_2'],
+            fact_tables=[('test_fact', TestFactTablePublisher.get_key())],
+            jobs=2
+        )
+        self.assertEqual(
+            [v['status'] for v in report['nodes'].values()],
+            ['done', 'done', 'done']
+        )
+        self.assertEqual(
+            report['critical_path'][-1],
+            ('fact_table', 'test_fact')
+        )
+        fact_table = data_marts_api.get_fact_table('test_fact')
+        self.assertEqual(len(fact_table.get_values()), 11)
+
     def test_truncate_fact_table(self):
         dim_1 = TestDimension("dim_1")
         dim_2 = TestDimension("dim_2")
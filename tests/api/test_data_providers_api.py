@@ -116,6 +116,73 @@ class TestDataProvidersApi(BaseTestNiamotoSchemaCreated):
             self.TEST_DB_PATH,
         )
 
+    def test_sync_with_all_data_providers(self):
+        csv_dir = os.path.join(NIAMOTO_HOME, 'data', 'csv')
+        sync_args = [
+            os.path.join(csv_dir, 'occurrences.csv'),
+            os.path.join(csv_dir, 'plots.csv'),
+            os.path.join(csv_dir, 'plots_occurrences.csv'),
+        ]
+        for name in ['csv_provider_1', 'csv_provider_2']:
+            add_data_provider(
+                name,
+                "CSV",
+                properties={SYNC_ARGS_PROPERTY: sync_args},
+            )
+        add_data_provider(
+            "csv_provider_3",
+            "CSV",
+            properties={
+                SYNC_ARGS_PROPERTY: [os.path.join(csv_dir, 'missing.csv')]
+            },
+        )
+        reports = sync_with_all_data_providers(jobs=2)
+        self.assertEqual(len(reports), 3)
+        for name in ['csv_provider_1', 'csv_provider_2']:
+            self.assertIsNone(reports[name]['error'])
+            self.assertGreater(reports[name]['occurrence']['insert'], 0)
+            self.assertGreater(reports[name]['plot_occurrence']['insert'], 0)
+        self.assertIsNotNone(reports['csv_provider_3']['error'])
+        # Already up to date
+        reports = sync_with_all_data_providers(jobs=1)
+        for name in ['csv_provider_1', 'csv_provider_2']:
+            for key in ['occurrence', 'plot', 'plot_occurrence']:
+                self.assertEqual(
+                    list(reports[name][key].values()),
+                    [0, 0, 0]
+                )
+
+    def test_sync_args(self):
+        add_data_provider(
+            "csv_provider_1",
+            "CSV",
+            sync_args=['occurrences.csv'],
+        )
+        self.assertEqual(get_sync_args("csv_provider_1"), ['occurrences.csv'])
+        # The stored args are kept by an update without sync args
+        update_data_provider("csv_provider_1", new_name="csv_provider_2")
+        self.assertEqual(get_sync_args("csv_provider_2"), ['occurrences.csv'])
+        set_sync_args("csv_provider_2", ['occ.csv', 'none', 'plots.csv'])
+        self.assertEqual(
+            get_sync_args("csv_provider_2"),
+            ['occ.csv', 'none', 'plots.csv']
+        )
+        update_data_provider("csv_provider_2", sync_args=[])
+        self.assertEqual(get_sync_args("csv_provider_2"), [])
+
+    def test_sync_with_all_data_providers_skipped(self):
+        add_data_provider("csv_provider_1", "CSV")
+        add_data_provider(
+            "csv_provider_2",
+            "CSV",
+            sync_args=[os.path.join(NIAMOTO_HOME, 'missing.csv')],
+        )
+        reports = sync_with_all_data_providers()
+        self.assertEqual(list(reports), ["csv_provider_1", "csv_provider_2"])
+        self.assertEqual(reports["csv_provider_1"]['status'], 'skipped')
+        self.assertIsNone(reports["csv_provider_1"]['error'])
+        self.assertEqual(reports["csv_provider_2"]['status'], 'failed')
+
 
 if __name__ == '__main__':
     TestDatabaseManager.setup_test_database()
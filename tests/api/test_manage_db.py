@@ -6,7 +6,8 @@ from niamoto.testing import set_test_path
 set_test_path()
 
 from niamoto.conf import settings
-from niamoto.testing.base_tests import BaseTest
+from niamoto.testing.base_tests import BaseTest, \
+    BaseTestNiamotoSchemaCreated
 from niamoto.testing.test_database_manager import TestDatabaseManager
 from niamoto.api import manage_db
 
@@ -24,6 +25,19 @@ class TestInitDbApi(BaseTest):
         manage_db.init_db()
 
 
+class TestOptimizeDbApi(BaseTestNiamotoSchemaCreated):
+    """
+    Test case for optimize_db api.
+    """
+
+    def test_optimize_db(self):
+        report = manage_db.optimize_db()
+        self.assertEqual(
+            report['ix_plot_niamoto_plot_provider_id_provider_pk'],
+            'valid'
+        )
+
+
 if __name__ == '__main__':
     TestDatabaseManager.setup_test_database()
     TestDatabaseManager.create_schema(settings.NIAMOTO_SCHEMA)
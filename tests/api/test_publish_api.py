@@ -2,12 +2,14 @@
 
 import unittest
 import tempfile
+import shutil
+import os
 
 from niamoto.testing import set_test_path
 
 set_test_path()
 
-from niamoto.conf import settings
+from niamoto.conf import settings, NIAMOTO_HOME
 from niamoto.testing.test_database_manager import TestDatabaseManager
 from niamoto.testing.base_tests import BaseTestNiamotoSchemaCreated
 from niamoto.exceptions import WrongPublisherKeyError, \
@@ -68,7 +70,31 @@ class TestPublishApi(BaseTestNiamotoSchemaCreated):
             destination=csv_temp,
             **{'properties': ['dbh','height']}
         )
-
+        publish_api.publish(
+            OccurrenceDataPublisher.get_key(),
+            BaseDataPublisher.CSV,
+            destination=csv_temp,
+            use_cache=True,
+        )
+        publish_api.publish(
+            OccurrenceDataPublisher.get_key(),
+            BaseDataPublisher.CSV,
+            destination=csv_temp,
+            use_cache=True,
+        )
+        stats = publish_api.get_publisher_cache_stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        publish_api.clear_publisher_cache()
+        self.assertEqual(publish_api.get_publisher_cache_stats()['entries'], 0)
+        shutil.rmtree(os.path.join(NIAMOTO_HOME, 'cache'))
+        publish_api.publish(
+            OccurrenceDataPublisher.get_key(),
+            BaseDataPublisher.CSV,
+            destination=csv_temp,
+            stream=True,
+            properties='dbh,height',
+        )
         csv_temp.close()
 
 
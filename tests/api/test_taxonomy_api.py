@@ -2,6 +2,7 @@
 
 import unittest
 import os
+import tempfile
 import logging
 
 from geoalchemy2.shape import from_shape
@@ -74,6 +75,26 @@ class TestTaxonomyApi(BaseTestNiamotoSchemaCreated):
             "fake_csv_file_path"
         )
 
+    def test_set_synonyms(self):
+        taxonomy_api.add_taxon(0, 'Family 0', 'Family', 'FAMILIA')
+        taxonomy_api.add_taxon(1, 'Genus 1', 'Genus', 'GENUS', parent_id=0)
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv') as csv:
+            pd.DataFrame({
+                'taxon_id': [0, 1],
+                'provider_taxon_id': [100, 101],
+            }).to_csv(csv, index=False)
+            csv.flush()
+            nb = taxonomy_api.set_synonyms(csv.name, 'new_key', register=True)
+        self.assertEqual(nb, 2)
+        synonyms = TaxonomyManager.get_synonyms_for_key('new_key')
+        self.assertEqual(dict(synonyms), {100: 0, 101: 1})
+        self.assertRaises(
+            DataSourceNotFoundError,
+            taxonomy_api.set_synonyms,
+            "fake_csv_file_path",
+            "new_key"
+        )
+
     def test_map_all_synonyms(self):
         data_provider_a = TestDataProvider.register_data_provider(
             'test_data_provider_a',
@@ -144,6 +165,38 @@ class TestTaxonomyApi(BaseTestNiamotoSchemaCreated):
         taxonomy_api.map_all_synonyms()
 
 
+    def test_map_all_synonyms_jobs(self):
+        TaxonomyManager.register_synonym_key('gbif')
+        taxonomy_api.add_taxon(
+            1, 'Family 1', 'Family', 'FAMILIA', synonyms={'gbif': 10}
+        )
+        providers = []
+        for name in ['test_data_provider_a', 'test_data_provider_b']:
+            TestDataProvider.register_data_provider(name, synonym_key='gbif')
+            provider = TestDataProvider(name)
+            occ = pd.DataFrame.from_records([
+                {
+                    'id': i,
+                    'taxon_id': None,
+                    'provider_taxon_id': provider_taxon_id,
+                    'location': from_shape(Point(166.5, -22.0), srid=4326),
+                    'properties': '{}',
+                } for i, provider_taxon_id in enumerate([10, 20])
+            ], index='id')
+            with Connector.get_connection() as connection:
+                BaseOccurrenceProvider(provider)._sync(occ, connection)
+            providers.append(provider)
+        data_providers = taxonomy_api.map_all_synonyms(jobs=2)
+        self.assertEqual(len(data_providers), 2)
+        for provider in providers:
+            with Connector.get_connection() as connection:
+                df = BaseOccurrenceProvider(
+                    provider
+                ).get_niamoto_occurrence_dataframe(connection)
+            df = df.set_index('provider_pk').sort_index()
+            self.assertEqual(df['taxon_id'].iloc[0], 1)
+            self.assertTrue(pd.isnull(df['taxon_id'].iloc[1]))
+
 if __name__ == '__main__':
     TestDatabaseManager.setup_test_database()
     TestDatabaseManager.create_schema(settings.NIAMOTO_SCHEMA)
@@ -222,6 +222,67 @@ class TestCLIDataMarts(BaseTestNiamotoSchemaCreated):
         self.assertEqual(result.exit_code, 0)
 
 
+    def test_refresh_fact_table_cli(self):
+        data_marts_api.create_taxon_dimension('taxon_dim')
+        data_marts_api.create_fact_table('fact_table', ['taxon_dim'], ['n'])
+
+        class TestCLIFactTablePublisher(BaseFactTablePublisher):
+            @classmethod
+            def get_key(cls):
+                return 'test_cli_fact_table_publisher'
+
+            def _process(self, *args, **kwargs):
+                dim = data_marts_api.get_dimension('taxon_dim')
+                df = dim.get_values()
+                df['n'] = df.index
+                df['taxon_dim_id'] = df.index
+                return df[['taxon_dim_id', 'n']]
+
+        runner = CliRunner()
+        result = runner.invoke(
+            data_marts.refresh_fact_table_cli,
+            ['fact_table', 'test_cli_fact_table_publisher']
+        )
+        self.assertEqual(result.exit_code, 0)
+        result = runner.invoke(
+            data_marts.refresh_fact_table_cli,
+            ['fact_table', 'test_cli_fact_table_publisher', '--full']
+        )
+        self.assertEqual(result.exit_code, 0)
+
+    def test_populate_data_marts_cli(self):
+        data_marts_api.create_taxon_dimension('taxon_dim', populate=False)
+        data_marts_api.create_fact_table('fact_table', ['taxon_dim'], ['n'])
+
+        class TestCLIFactTablePublisher(BaseFactTablePublisher):
+            @classmethod
+            def get_key(cls):
+                return 'test_cli_fact_table_publisher'
+
+            def _process(self, *args, **kwargs):
+                dim = data_marts_api.get_dimension('taxon_dim')
+                df = dim.get_values()
+                df['n'] = df.index
+                df['taxon_dim_id'] = df.index
+                return df[['taxon_dim_id', 'n']]
+
+        runner = CliRunner()
+        result = runner.invoke(
+            data_marts.populate_data_marts_cli,
+            [
+                '-d', 'taxon_dim',
+                '-f', 'fact_table', 'test_cli_fact_table_publisher',
+                '--jobs', '2',
+            ]
+        )
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn('taxon_dim -> fact_table', result.output)
+        result = runner.invoke(
+            data_marts.populate_data_marts_cli,
+            ['-f', 'fact_table', 'test_cli_fact_table_publisher']
+        )
+        self.assertEqual(result.exit_code, 1)
+
     def test_truncate_fact_table_cli(self):
         data_marts_api.create_taxon_dimension('taxon_dim')
         data_marts_api.create_fact_table('fact_table', ['taxon_dim'], ['n'])
@@ -2,8 +2,10 @@
 
 import unittest
 import os
+import tempfile
 
 from click.testing import CliRunner
+import pandas as pd
 
 from niamoto.testing import set_test_path
 
@@ -13,9 +15,11 @@ from niamoto.conf import settings, NIAMOTO_HOME
 from niamoto.db import metadata as niamoto_db_meta
 from niamoto.db.connector import Connector
 from niamoto.bin.commands import data_provider
+from niamoto.api.data_provider_api import get_sync_args
 from niamoto.testing.test_database_manager import TestDatabaseManager
 from niamoto.testing.test_data_provider import TestDataProvider
 from niamoto.data_providers.plantnote_provider import PlantnoteDataProvider
+from niamoto.data_providers.csv_provider import CsvDataProvider
 from niamoto.testing.base_tests import BaseTestNiamotoSchemaCreated
 
 
@@ -122,6 +126,74 @@ class TestCLIDataProvider(BaseTestNiamotoSchemaCreated):
         )
         self.assertEqual(result.exit_code, 1)
 
+    def test_sync_all(self):
+        runner = CliRunner()
+        PlantnoteDataProvider.register_data_provider(
+            'plantnote_provider',
+            properties={'sync_args': [self.TEST_DB_PATH]},
+        )
+        result = runner.invoke(data_provider.sync, ['--all', '--jobs', '2'])
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn('plantnote_provider', result.output)
+        result = runner.invoke(data_provider.sync, [])
+        self.assertEqual(result.exit_code, 1)
+
+    def test_sync_args(self):
+        runner = CliRunner()
+        result = runner.invoke(
+            data_provider.add_data_provider,
+            ['csv_provider', 'CSV', '--sync_args', 'occ.csv',
+             '--sync_args', 'none']
+        )
+        self.assertEqual(result.exit_code, 0)
+        result = runner.invoke(
+            data_provider.update_data_provider_cli,
+            ['csv_provider', '--sync_args', 'occ_2.csv']
+        )
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(get_sync_args('csv_provider'), ['occ_2.csv'])
+        PlantnoteDataProvider.register_data_provider('plantnote_provider')
+        result = runner.invoke(data_provider.sync, ['--all'])
+        self.assertIn('skipped', result.output)
+
+    def test_sync_save_args(self):
+        runner = CliRunner()
+        CsvDataProvider.register_data_provider('csv_provider')
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_path = os.path.join(tmp_dir, 'occurrences.csv')
+            pd.DataFrame({
+                'id': [1, 2],
+                'taxon_id': [None, None],
+                'x': [166.5, 166.6],
+                'y': [-22.0, -22.1],
+            }).to_csv(csv_path, index=False)
+            result = runner.invoke(
+                data_provider.sync,
+                ['csv_provider', csv_path]
+            )
+            self.assertEqual(result.exit_code, 0)
+            self.assertNotIn('saved', result.output)
+            self.assertIsNone(get_sync_args('csv_provider'))
+            result = runner.invoke(
+                data_provider.sync,
+                ['csv_provider', csv_path, '--save_args']
+            )
+            self.assertEqual(result.exit_code, 0)
+            self.assertIn('saved', result.output)
+            self.assertEqual(get_sync_args('csv_provider'), [csv_path])
+
+    def test_list_properties(self):
+        runner = CliRunner()
+        result = runner.invoke(data_provider.list_properties_cli)
+        self.assertEqual(result.exit_code, 0)
+        result = runner.invoke(
+            data_provider.list_properties_cli,
+            ['occurrence', '--refresh']
+        )
+        self.assertEqual(result.exit_code, 0)
+        result = runner.invoke(data_provider.list_properties_cli, ['yo'])
+        self.assertEqual(result.exit_code, 2)
+
 
 if __name__ == '__main__':
     TestDatabaseManager.setup_test_database()
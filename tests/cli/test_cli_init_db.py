@@ -9,9 +9,10 @@ from niamoto.testing import set_test_path
 set_test_path()
 
 from niamoto.conf import settings
-from niamoto.bin.commands.manage_db import init_db_cli
+from niamoto.bin.commands.manage_db import init_db_cli, optimize_db_cli
 from niamoto.testing.test_database_manager import TestDatabaseManager
-from niamoto.testing.base_tests import BaseTest
+from niamoto.testing.base_tests import BaseTest, \
+    BaseTestNiamotoSchemaCreated
 
 
 class TestCLIInitDb(BaseTest):
@@ -28,6 +29,25 @@ class TestCLIInitDb(BaseTest):
         self.assertEqual(result.exit_code, 0)
 
 
+class TestCLIOptimizeDb(BaseTestNiamotoSchemaCreated):
+    """
+    Test case for optimize_db_cli cli method.
+    """
+
+    def test_optimize_db(self):
+        runner = CliRunner()
+        result = runner.invoke(
+            optimize_db_cli,
+            ['--rebuild'],
+            catch_exceptions=False,
+        )
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn(
+            'ix_plot_niamoto_plot_provider_id_provider_pk: rebuilt',
+            result.output
+        )
+
+
 if __name__ == '__main__':
     TestDatabaseManager.setup_test_database()
     TestDatabaseManager.create_schema(settings.NIAMOTO_SCHEMA)
@@ -2,6 +2,8 @@
 
 import unittest
 import tempfile
+import shutil
+import os
 
 from click.testing import CliRunner
 
@@ -9,7 +11,7 @@ from niamoto.testing import set_test_path
 
 set_test_path()
 
-from niamoto.conf import settings
+from niamoto.conf import settings, NIAMOTO_HOME
 from niamoto.bin.commands import publish
 from niamoto.data_publishers.occurrence_data_publisher import \
     OccurrenceDataPublisher
@@ -82,6 +84,36 @@ class TestCLIPublish(BaseTestNiamotoSchemaCreated):
                 ],
             )
             self.assertNotEqual(result.exit_code, 0)
+            result = runner.invoke(
+                publish.publish_cli,
+                [
+                    OccurrenceDataPublisher.get_key(),
+                    BaseDataPublisher.CSV,
+                    '-d', csv_temp.name,
+                    '--no-cache',
+                ]
+            )
+            self.assertEqual(result.exit_code, 0)
+            result = runner.invoke(
+                publish.publish_cli,
+                [
+                    OccurrenceDataPublisher.get_key(),
+                    BaseDataPublisher.CSV,
+                    '-d', csv_temp.name,
+                    '--stream',
+                ]
+            )
+            self.assertEqual(result.exit_code, 0)
+
+    def test_publisher_cache_cli(self):
+        runner = CliRunner()
+        result = runner.invoke(publish.publisher_cache_cli, [])
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn('Hits', result.output)
+        result = runner.invoke(publish.publisher_cache_cli, ['--clear'])
+        self.assertEqual(result.exit_code, 0)
+        shutil.rmtree(os.path.join(NIAMOTO_HOME, 'cache'))
+
 
 if __name__ == '__main__':
     TestDatabaseManager.setup_test_database()
@@ -157,6 +157,17 @@ class TestCLIRaster(BaseTestNiamotoSchemaCreated):
             []
         )
         self.assertEqual(result.exit_code, 0)
+        result = runner.invoke(
+            raster.extract_raster_values_to_occurrences_cli,
+            ['test_raster_1', 'test_raster_2', '--timing']
+        )
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn('test_raster_2', result.output)
+        result = runner.invoke(
+            raster.extract_raster_values_to_occurrences_cli,
+            ['test_raster_1', 'test_raster_2', '--incremental']
+        )
+        self.assertEqual(result.exit_code, 0)
 
 
 if __name__ == '__main__':
@@ -11,7 +11,7 @@ set_test_path()
 
 from niamoto.conf import settings, NIAMOTO_HOME
 from niamoto.bin.commands.taxonomy import set_taxonomy_cli, \
-    map_all_synonyms_cli, get_synonym_keys_cli
+    map_all_synonyms_cli, get_synonym_keys_cli, set_synonyms_cli
 from niamoto.bin.commands.status import get_general_status_cli
 from niamoto.testing.test_database_manager import TestDatabaseManager
 from niamoto.testing.test_data_provider import TestDataProvider
@@ -48,6 +48,14 @@ class TestCLITaxonomy(BaseTestNiamotoSchemaCreated):
         )
         self.assertEqual(result.exit_code, 1)
 
+    def test_set_synonyms(self):
+        runner = CliRunner()
+        result = runner.invoke(
+            set_synonyms_cli,
+            ["This is not a path", "gbif"],
+        )
+        self.assertEqual(result.exit_code, 1)
+
     def test_map_all_synonyms(self):
         runner = CliRunner()
         result = runner.invoke(
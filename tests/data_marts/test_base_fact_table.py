@@ -1,6 +1,7 @@
 # coding: utf-8
 
 import unittest
+from datetime import datetime
 
 from sqlalchemy.engine.reflection import Inspector
 import sqlalchemy as sa
@@ -14,10 +15,12 @@ from niamoto.conf import settings
 from niamoto.testing.test_database_manager import TestDatabaseManager
 from niamoto.testing.base_tests import BaseTestNiamotoSchemaCreated
 from niamoto.testing.test_data_marts import TestDimension, \
-    TestFactTablePublisher
+    TestFactTablePublisher, TestIncrementalFactTablePublisher
+from niamoto.testing.test_data_provider import TestDataProvider
 from niamoto.data_marts.fact_tables.base_fact_table import BaseFactTable
 from niamoto.db.connector import Connector
 from niamoto.db import metadata as meta
+from niamoto.db.data_version import bump_data_version, OCCURRENCE
 
 
 class TestBaseFactTable(BaseTestNiamotoSchemaCreated):
@@ -106,6 +109,88 @@ class TestBaseFactTable(BaseTestNiamotoSchemaCreated):
             ['measure_1', ]
         )
         self.assertEqual(ft_bis.name, ft.name)
+    def _create_fact_table(self, publisher_cls):
+        dim_1 = TestDimension("dim_1")
+        dim_2 = TestDimension("dim_2")
+        dim_1.create_dimension()
+        dim_2.create_dimension()
+        dim_1.populate_from_publisher()
+        dim_2.populate_from_publisher()
+        ft = BaseFactTable(
+            "test_fact",
+            dimensions=[dim_1, dim_2],
+            measure_columns=[
+                sa.Column('measure_1', sa.Float),
+            ],
+            publisher_cls=publisher_cls
+        )
+        ft.create_fact_table()
+        return ft
+
+    def _set_last_sync(self, last_sync):
+        with Connector.get_connection() as connection:
+            connection.execute(meta.data_provider.update().values({
+                'last_sync': last_sync,
+            }))
+
+    def test_refresh_from_publisher(self):
+        TestDataProvider.register_data_provider('test_refresh_provider')
+        self._set_last_sync(datetime(2017, 1, 1))
+        ft = self._create_fact_table(TestIncrementalFactTablePublisher)
+        self.assertIsNone(ft.get_refresh_watermark())
+        # Never populated from the publisher: full refresh
+        result = ft.refresh_from_publisher()
+        self.assertEqual(
+            result,
+            {'mode': 'full', 'deleted': 0, 'inserted': 11}
+        )
+        self.assertEqual(ft.get_refresh_watermark(), datetime(2017, 1, 1))
+        # Nothing changed
+        result = ft.refresh_from_publisher()
+        self.assertEqual(result['mode'], 'none')
+        # Incremental refresh
+        self._set_last_sync(datetime(2017, 1, 2))
+        result = ft.refresh_from_publisher()
+        self.assertEqual(
+            result,
+            {'mode': 'incremental', 'deleted': 5, 'inserted': 4}
+        )
+        self.assertEqual(ft.get_refresh_watermark(), datetime(2017, 1, 2))
+        vals = ft.get_values().set_index(['dim_1_id', 'dim_2_id'])
+        self.assertEqual(len(vals), 10)
+        self.assertEqual(vals.loc[(3, 3), 'measure_1'], 50)
+        self.assertEqual(vals.loc[(0, 3), 'measure_1'], 3)
+        self.assertNotIn((3, 4), vals.index)
+        # Forced full refresh
+        result = ft.refresh_from_publisher(full=True)
+        self.assertEqual(
+            result,
+            {'mode': 'full', 'deleted': 10, 'inserted': 11}
+        )
+        with Connector.get_connection() as connection:
+            connection.execute(meta.data_provider.delete())
+
+    def test_refresh_not_incremental_publisher(self):
+        TestDataProvider.register_data_provider('test_refresh_provider')
+        self._set_last_sync(datetime(2017, 1, 1))
+        ft = self._create_fact_table(TestFactTablePublisher)
+        ft.populate_from_publisher()
+        self.assertEqual(ft.get_refresh_watermark(), datetime(2017, 1, 1))
+        self._set_last_sync(datetime(2017, 1, 2))
+        result = ft.refresh_from_publisher()
+        self.assertEqual(
+            result,
+            {'mode': 'full', 'deleted': 11, 'inserted': 11}
+        )
+        self.assertEqual(len(ft.get_values()), 11)
+        self.assertEqual(ft.refresh_from_publisher()['mode'], 'none')
+        # Writes outside of a sync (e.g. raster values extraction)
+        bump_data_version(OCCURRENCE)
+        self.assertEqual(ft.refresh_from_publisher()['mode'], 'full')
+        with Connector.get_connection() as connection:
+            connection.execute(meta.data_provider.delete())
+            connection.execute(meta.data_version.delete())
+
 
 if __name__ == '__main__':
     TestDatabaseManager.setup_test_database()
@@ -0,0 +1,204 @@
+# coding: utf-8
+
+import unittest
+
+from sqlalchemy.engine.reflection import Inspector
+import sqlalchemy as sa
+
+from niamoto.testing import set_test_path
+
+set_test_path()
+
+from niamoto.conf import settings
+from niamoto.testing.test_database_manager import TestDatabaseManager
+from niamoto.testing.base_tests import BaseTestNiamotoSchemaCreated
+from niamoto.testing.test_data_marts import TestDimension, \
+    TestFactTablePublisher
+from niamoto.data_marts.dimensions.base_dimension import BaseDimension
+from niamoto.data_marts.fact_tables.base_fact_table import BaseFactTable
+from niamoto.data_marts.populate_scheduler import populate_data_marts, \
+    get_populate_graph, get_topological_order, get_critical_path, \
+    DIMENSION, FACT_TABLE
+from niamoto.data_publishers.base_data_publisher import BaseDataPublisher
+from niamoto.db.connector import Connector
+from niamoto.db import metadata as meta
+from niamoto.exceptions import DataMartPopulateError
+
+
+class FailingPublisher(BaseDataPublisher):
+
+    def _process(self, *args, **kwargs):
+        raise ValueError("Failing publisher")
+
+
+class TestChildDimension(TestDimension):
+
+    def __init__(self, name, parent_dimension):
+        BaseDimension.__init__(
+            self,
+            name,
+            [
+                sa.Column('value', sa.Integer),
+                sa.Column('category', sa.String),
+                sa.Column('parent_id', sa.ForeignKey('{}.{}.{}'.format(
+                    settings.NIAMOTO_DIMENSIONS_SCHEMA,
+                    parent_dimension.name,
+                    parent_dimension.PK_COLUMN_NAME
+                ))),
+            ],
+            label_col='category'
+        )
+
+
+class TestPopulateScheduler(BaseTestNiamotoSchemaCreated):
+    """
+    Test case for the data marts populate scheduler.
+    """
+
+    def setUp(self):
+        super(TestPopulateScheduler, self).setUp()
+        self.tearDown()
+
+    def tearDown(self):
+        with Connector.get_connection() as connection:
+            inspector = Inspector.from_engine(connection)
+            for schema in [settings.NIAMOTO_FACT_TABLES_SCHEMA,
+                           settings.NIAMOTO_DIMENSIONS_SCHEMA]:
+                for tb in inspector.get_table_names(schema=schema):
+                    connection.execute("DROP TABLE {}.{} CASCADE;".format(
+                        schema, tb
+                    ))
+            connection.execute(meta.fact_table_registry.delete())
+            connection.execute(meta.dimension_registry.delete())
+
+    def test_populate_graph(self):
+        dim_1 = TestDimension("dim_1")
+        dim_2 = TestDimension("dim_2")
+        child = TestChildDimension("child", dim_1)
+        orphan = TestChildDimension("orphan", TestDimension("dim_3"))
+        ft = BaseFactTable(
+            "test_fact",
+            dimensions=[child, dim_2],
+            measure_columns=[sa.Column('measure_1', sa.Float)],
+        )
+        graph = get_populate_graph([child, dim_1, dim_2, orphan], [ft])
+        self.assertEqual(graph, {
+            (DIMENSION, 'child'): {(DIMENSION, 'dim_1')},
+            (DIMENSION, 'dim_1'): set(),
+            (DIMENSION, 'dim_2'): set(),
+            (DIMENSION, 'orphan'): set(),
+            (FACT_TABLE, 'test_fact'): {
+                (DIMENSION, 'child'),
+                (DIMENSION, 'dim_2')
+            },
+        })
+        self.assertEqual(get_topological_order(graph), [
+            (DIMENSION, 'dim_1'),
+            (DIMENSION, 'dim_2'),
+            (DIMENSION, 'orphan'),
+            (DIMENSION, 'child'),
+            (FACT_TABLE, 'test_fact'),
+        ])
+
+    def test_cyclic_graph(self):
+        graph = {'a': {'b'}, 'b': {'a'}, 'c': set()}
+        self.assertRaises(ValueError, get_topological_order, graph)
+
+    def test_critical_path(self):
+        graph = {'a': set(), 'b': {'a'}, 'c': set(), 'd': {'b', 'c'}}
+        order = get_topological_order(graph)
+        path, path_time = get_critical_path(
+            graph,
+            order,
+            {'a': 1, 'b': 2, 'c': 2.5, 'd': 1}
+        )
+        self.assertEqual(path, ['a', 'b', 'd'])
+        self.assertEqual(path_time, 4)
+        self.assertEqual(get_critical_path({}, [], {}), ([], 0))
+
+    def test_populate_data_marts(self):
+        dim_1 = TestDimension("dim_1")
+        dim_2 = TestDimension("dim_2")
+        dim_1.create_dimension()
+        dim_2.create_dimension()
+        ft = BaseFactTable(
+            "test_fact",
+            dimensions=[dim_1, dim_2],
+            measure_columns=[sa.Column('measure_1', sa.Float)],
+            publisher_cls=TestFactTablePublisher
+        )
+        ft.create_fact_table()
+        report = populate_data_marts([dim_1, dim_2], [ft], jobs=2)
+        nodes = report['nodes']
+        self.assertEqual(list(nodes), [
+            (DIMENSION, 'dim_1'),
+            (DIMENSION, 'dim_2'),
+            (FACT_TABLE, 'test_fact'),
+        ])
+        for node in nodes.values():
+            self.assertEqual(node['status'], 'done')
+            self.assertIsNone(node['error'])
+        fact = nodes[(FACT_TABLE, 'test_fact')]
+        self.assertEqual(
+            fact['dependencies'],
+            [(DIMENSION, 'dim_1'), (DIMENSION, 'dim_2')]
+        )
+        for dim_node in [nodes[(DIMENSION, 'dim_1')],
+                         nodes[(DIMENSION, 'dim_2')]]:
+            self.assertGreaterEqual(
+                fact['start'],
+                dim_node['start'] + dim_node['time']
+            )
+        self.assertEqual(report['critical_path'][-1], (FACT_TABLE, 'test_fact'))
+        self.assertEqual(len(report['critical_path']), 2)
+        self.assertLessEqual(
+            report['critical_path_time'],
+            report['total_time']
+        )
+        self.assertEqual(len(dim_1.get_values()), 6)
+        self.assertEqual(len(ft.get_values()), 11)
+
+    def test_populate_data_marts_failure(self):
+        dim_1 = TestDimension("dim_1")
+        dim_2 = TestDimension("dim_2", publisher=FailingPublisher())
+        dim_3 = TestDimension("dim_3")
+        for dim in [dim_1, dim_2, dim_3]:
+            dim.create_dimension()
+        ft = BaseFactTable(
+            "test_fact",
+            dimensions=[dim_1, dim_2],
+            measure_columns=[sa.Column('measure_1', sa.Float)],
+            publisher_cls=TestFactTablePublisher
+        )
+        ft.create_fact_table()
+        with self.assertRaises(DataMartPopulateError) as context:
+            populate_data_marts([dim_1, dim_2, dim_3], [ft])
+        report = context.exception.report
+        self.assertIn("Failing publisher", str(context.exception))
+        nodes = report['nodes']
+        self.assertEqual(nodes[(DIMENSION, 'dim_1')]['status'], 'done')
+        self.assertEqual(nodes[(DIMENSION, 'dim_2')]['status'], 'failed')
+        self.assertEqual(
+            nodes[(DIMENSION, 'dim_2')]['error'],
+            "Failing publisher"
+        )
+        self.assertEqual(nodes[(DIMENSION, 'dim_3')]['status'], 'done')
+        self.assertEqual(nodes[(FACT_TABLE, 'test_fact')]['status'], 'skipped')
+        self.assertIsNone(nodes[(FACT_TABLE, 'test_fact')]['time'])
+        self.assertEqual(len(ft.get_values()), 0)
+        report = populate_data_marts([dim_2], [ft], raise_on_error=False)
+        self.assertEqual(
+            [v['status'] for v in report['nodes'].values()],
+            ['failed', 'skipped']
+        )
+
+
+if __name__ == '__main__':
+    TestDatabaseManager.setup_test_database()
+    TestDatabaseManager.create_schema(settings.NIAMOTO_SCHEMA)
+    TestDatabaseManager.create_schema(settings.NIAMOTO_RASTER_SCHEMA)
+    TestDatabaseManager.create_schema(settings.NIAMOTO_VECTOR_SCHEMA)
+    TestDatabaseManager.create_schema(settings.NIAMOTO_DIMENSIONS_SCHEMA)
+    TestDatabaseManager.create_schema(settings.NIAMOTO_FACT_TABLES_SCHEMA)
+    unittest.main(exit=False)
+    TestDatabaseManager.teardown_test_database()
@@ -2,6 +2,9 @@
 
 import unittest
 import os
+import tempfile
+
+import pandas as pd
 
 from niamoto.testing import set_test_path
 set_test_path()
@@ -10,6 +13,7 @@ from niamoto.conf import settings, NIAMOTO_HOME
 from niamoto.exceptions import DataSourceNotFoundError, \
     MalformedDataSourceError
 from niamoto.data_providers.csv_provider import CsvDataProvider
+from niamoto.db.connector import Connector
 from niamoto.testing.test_database_manager import TestDatabaseManager
 from niamoto.testing.base_tests import BaseTestNiamotoSchemaCreated
 
@@ -110,6 +114,65 @@ class TestCsvDataProvider(BaseTestNiamotoSchemaCreated):
         )
         csv_provider.sync()
 
+    def test_csv_data_provider_occurrences_chunks(self):
+        csv_provider = CsvDataProvider(
+            'csv_provider',
+            occurrence_csv_path=TEST_OCCURRENCE_CSV,
+        )
+        csv_provider.sync()
+        r = csv_provider.sync(chunk_size=2)
+        self.assertEqual(len(r['occurrence']['insert']), 0)
+        self.assertEqual(len(r['occurrence']['update']), 0)
+        self.assertEqual(len(r['occurrence']['delete']), 0)
+        occurrence_provider = csv_provider.occurrence_provider
+        with Connector.get_connection() as connection:
+            nb_occurrences = len(
+                occurrence_provider.get_niamoto_occurrence_dataframe(
+                    connection
+                )
+            )
+        csv_provider = CsvDataProvider(
+            'csv_provider',
+            occurrence_csv_path=TEST_EMPTY_OCCURRENCE_CSV,
+        )
+        r = csv_provider.sync(chunk_size=2)
+        self.assertEqual(len(r['occurrence']['delete']), nb_occurrences)
+        csv_provider = CsvDataProvider(
+            'csv_provider',
+            occurrence_csv_path=TEST_NO_INDEX_OCCURRENCE_CSV,
+        )
+        self.assertRaises(
+            MalformedDataSourceError,
+            csv_provider.sync,
+            chunk_size=2,
+        )
+
+    def test_csv_data_provider_occurrences_chunk_dtypes(self):
+        # The dtypes of the columns differ from a chunk to another (integers
+        # and missing values, numbers and strings), the properties must
+        # not depend on the chunk size.
+        CsvDataProvider.register_data_provider('csv_provider_dtypes')
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_path = os.path.join(tmp_dir, 'occurrences.csv')
+            pd.DataFrame({
+                'id': [1, 2, 3, 4, 5, 6],
+                'taxon_id': [1, 2, 3, 4, 5, 6],
+                'x': [166.5] * 6,
+                'y': [-22.0] * 6,
+                'dbh': [10, 12, 14, None, 16, 18],
+                'code': [1, 2, 3, 4, 'a', 5],
+                'height': [1.5, 2, 3, 4, 5, 6],
+            }).to_csv(csv_path, index=False)
+            csv_provider = CsvDataProvider(
+                'csv_provider_dtypes',
+                occurrence_csv_path=csv_path,
+            )
+            r = csv_provider.sync(chunk_size=2)
+            self.assertEqual(len(r['occurrence']['insert']), 6)
+            for chunk_size in [3, 4, None]:
+                r = csv_provider.sync(chunk_size=chunk_size)
+                self.assertEqual(len(r['occurrence']['update']), 0)
+
     def test_csv_data_provider_plots(self):
         csv_provider = CsvDataProvider(
             'csv_provider',
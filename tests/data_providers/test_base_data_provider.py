@@ -1,6 +1,11 @@
 # coding: utf-8
 
 import unittest
+import os
+import tempfile
+
+import pandas as pd
+from sqlalchemy import event, select, func
 
 from niamoto.testing import set_test_path
 set_test_path()
@@ -10,7 +15,13 @@ from niamoto.db.connector import Connector
 from niamoto.testing.test_database_manager import TestDatabaseManager
 from niamoto.testing.base_tests import BaseTestNiamotoSchemaCreated
 from niamoto.testing.test_data_provider import TestDataProvider
+from niamoto.data_providers.csv_provider.csv_data_provider import \
+    CsvDataProvider
 from niamoto.taxonomy.taxonomy_manager import TaxonomyManager
+from niamoto.db import metadata as niamoto_db_meta
+from niamoto.db.property_catalog import get_property_keys, \
+    get_property_types, INTEGER, STRING
+from niamoto.exceptions import IncoherentDatabaseStateError
 
 
 class TestBaseDataProvider(BaseTestNiamotoSchemaCreated):
@@ -30,6 +41,138 @@ class TestBaseDataProvider(BaseTestNiamotoSchemaCreated):
             synonym_key="synonym"
         )
 
+    def _get_dataframes(self, occurrence_pks, plot_occurrence_pks):
+        location = "SRID=4326;POINT(166.5 -22.0)"
+        occurrence = pd.DataFrame({
+            'taxon_id': None,
+            'provider_taxon_id': None,
+            'location': location,
+            'properties': '{}',
+        }, index=pd.Index(occurrence_pks, name='id'))
+        plot = pd.DataFrame({
+            'name': ['plot_10'],
+            'location': location,
+            'properties': '{}',
+        }, index=pd.Index([10], name='id'))
+        plot_occurrence = pd.DataFrame({
+            'occurrence_identifier': [
+                'occ_{}'.format(pk) for pk in plot_occurrence_pks
+            ],
+        }, index=pd.MultiIndex.from_tuples(
+            [(10, pk) for pk in plot_occurrence_pks],
+            names=['plot_id', 'occurrence_id']
+        ))
+        return {
+            'occurrence': occurrence,
+            'plot': plot,
+            'plot_occurrence': plot_occurrence,
+        }
+
+    def test_sync_single_transaction(self):
+        TestDataProvider.register_data_provider('test_data_provider_3')
+        provider = TestDataProvider('test_data_provider_3')
+        checkouts = []
+
+        def on_checkout(*args):
+            checkouts.append(1)
+
+        engine = Connector.get_engine()
+        event.listen(engine, 'checkout', on_checkout)
+        try:
+            result = provider.sync(
+                dataframes=self._get_dataframes([1, 2], [1, 2])
+            )
+        finally:
+            event.remove(engine, 'checkout', on_checkout)
+        # A single connection, the plot-occurrences seeing the uncommitted
+        # occurrences and plots.
+        self.assertEqual(len(checkouts), 1)
+        self.assertEqual(len(result['occurrence']['insert']), 2)
+        self.assertEqual(len(result['plot']['insert']), 1)
+        self.assertEqual(len(result['plot_occurrence']['insert']), 2)
+        # A failure of the plot-occurrence stage rolls back the whole sync
+        self.assertRaises(
+            IncoherentDatabaseStateError,
+            provider.sync,
+            dataframes=self._get_dataframes([1, 2, 3], [1, 4])
+        )
+        occurrence = niamoto_db_meta.occurrence
+        with Connector.get_connection() as connection:
+            count = connection.execute(
+                select([func.count()]).where(
+                    occurrence.c.provider_id == provider.db_id
+                )
+            ).scalar()
+        self.assertEqual(count, 2)
+
+    def test_sync_single_transaction_provider_data(self):
+        # The provider reads and maps its own occurrences, the taxonomy
+        # version and the synonyms are read with the sync connection.
+        TaxonomyManager.register_synonym_key('single_transaction_key')
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_path = os.path.join(tmp_dir, 'occurrences.csv')
+            pd.DataFrame({
+                'id': [1, 2, 3],
+                'taxon_id': [10, 20, None],
+                'x': [166.5, 166.6, 166.7],
+                'y': [-22.0, -22.1, -22.2],
+                'height': [1, 2, 3],
+            }).to_csv(csv_path, index=False)
+            provider = CsvDataProvider.register_data_provider(
+                'test_data_provider_5',
+                occurrence_csv_path=csv_path,
+                synonym_key='single_transaction_key',
+            )
+            checkouts = []
+
+            def on_checkout(*args):
+                checkouts.append(1)
+
+            engine = Connector.get_engine()
+            for chunk_size in [None, 2]:
+                checkouts.clear()
+                event.listen(engine, 'checkout', on_checkout)
+                try:
+                    provider.sync(chunk_size=chunk_size)
+                finally:
+                    event.remove(engine, 'checkout', on_checkout)
+                self.assertEqual(len(checkouts), 1)
+
+    def _get_catalog_dataframes(self, occurrence_properties):
+        dataframes = self._get_dataframes([1, 2], [1])
+        dataframes['occurrence']['properties'] = occurrence_properties
+        dataframes['plot']['name'] = ['plot_20']
+        dataframes['plot']['properties'] = ['{"width": 20}']
+        return dataframes
+
+    def test_sync_property_catalog(self):
+        TestDataProvider.register_data_provider('test_data_provider_4')
+        provider = TestDataProvider('test_data_provider_4')
+        provider.sync(dataframes=self._get_catalog_dataframes([
+            '{"dbh": 10, "status": "alive"}',
+            '{"dbh": 12}',
+        ]))
+        self.assertEqual(
+            get_property_keys('occurrence', provider_id=provider.db_id),
+            ['dbh', 'status']
+        )
+        self.assertEqual(
+            get_property_types('occurrence', keys=['dbh', 'status']),
+            {'dbh': INTEGER, 'status': STRING}
+        )
+        self.assertEqual(
+            get_property_keys('plot', provider_id=provider.db_id),
+            ['width']
+        )
+        # The catalog follows the updates
+        provider.sync(
+            dataframes=self._get_catalog_dataframes('{"dbh": 10}')
+        )
+        self.assertEqual(
+            get_property_keys('occurrence', provider_id=provider.db_id),
+            ['dbh']
+        )
+
 
 if __name__ == '__main__':
     TestDatabaseManager.setup_test_database()
@@ -14,7 +14,9 @@ from niamoto.data_providers.base_occurrence_provider import *
 from niamoto.api import taxonomy_api
 from niamoto.db import metadata as niamoto_db_meta
 from niamoto.db.connector import Connector
+from niamoto.db.data_version import get_data_version, OCCURRENCE
 from niamoto.db.utils import fix_db_sequences
+from niamoto.db.staging import staging_table
 from niamoto.testing.base_tests import BaseTestNiamotoSchemaCreated
 from niamoto.testing.test_data_provider import TestDataProvider
 from niamoto.testing.test_database_manager import TestDatabaseManager
@@ -72,6 +74,23 @@ class TestBaseOccurrenceProvider(BaseTestNiamotoSchemaCreated):
             for db_col in db_cols:
                 self.assertIn(db_col.name, df_cols)
 
+    def test_get_niamoto_occurrence_hash_dataframe(self):
+        data_provider_1 = TestDataProvider('test_data_provider_1')
+        op1 = BaseOccurrenceProvider(data_provider_1)
+        with Connector.get_connection() as connection:
+            with connection.begin():
+                df = op1.get_niamoto_occurrence_hash_dataframe(connection)
+                self.assertEqual(sorted(df['provider_pk']), [0, 1, 2, 5])
+                # Only the pks of the table, not the pks between them
+                pks = pd.Series([5, 0, 42])
+                with staging_table(connection, [('provider_pk', 'bigint')],
+                                   dataframe=pks) as pk_table:
+                    df = op1.get_niamoto_occurrence_hash_dataframe(
+                        connection,
+                        pk_table=pk_table.name
+                    )
+                self.assertEqual(sorted(df['provider_pk']), [0, 5])
+
     def test_get_insert_dataframe(self):
         data_provider_1 = TestDataProvider('test_data_provider_1')
         with Connector.get_connection() as connection:
@@ -375,6 +394,76 @@ class TestBaseOccurrenceProvider(BaseTestNiamotoSchemaCreated):
                 4
             )
 
+    def test_sync_unchanged(self):
+        self.tearDownClass()
+        self.setUpClass()
+        data_provider_3 = TestDataProvider('test_data_provider_3')
+        with Connector.get_connection() as connection:
+            op3 = BaseOccurrenceProvider(data_provider_3)
+            occ = pd.DataFrame.from_records([
+                {
+                    'id': 0,
+                    'taxon_id': None,
+                    'provider_taxon_id': None,
+                    'location': from_shape(Point(166.551, -22.039), srid=4326),
+                    'properties': '{}',
+                },
+                {
+                    'id': 1,
+                    'taxon_id': None,
+                    'provider_taxon_id': None,
+                    'location': from_shape(Point(166.551, -22.098), srid=4326),
+                    'properties': '{}',
+                },
+            ], index='id')
+            op3._sync(occ, connection)
+            i, u, d = op3._sync(occ, connection)
+            self.assertEqual(len(i), 0)
+            self.assertEqual(len(u), 0)
+            self.assertEqual(len(d), 0)
+            occ.loc[1, 'properties'] = '{"yo": "yo"}'
+            i, u, d = op3._sync(occ, connection)
+            self.assertEqual(len(i), 0)
+            self.assertEqual(list(u.index), [1])
+            self.assertEqual(len(d), 0)
+
+    def test_sync_chunks(self):
+        self.tearDownClass()
+        self.setUpClass()
+        data_provider_3 = TestDataProvider('test_data_provider_3')
+        with Connector.get_connection() as connection:
+            op3 = BaseOccurrenceProvider(data_provider_3)
+            occ = pd.DataFrame.from_records([
+                {
+                    'id': i,
+                    'taxon_id': None,
+                    'provider_taxon_id': None,
+                    'location': from_shape(
+                        Point(166.551, -22.039 + i / 100),
+                        srid=4326
+                    ),
+                    'properties': '{}',
+                } for i in range(5)
+            ], index='id')
+            chunks = [occ.iloc[:2], occ.iloc[2:4], occ.iloc[4:]]
+            i, u, d = op3._sync_chunks(iter(chunks), connection)
+            self.assertEqual(list(i.index), [0, 1, 2, 3, 4])
+            self.assertEqual(len(u), 0)
+            self.assertEqual(len(d), 0)
+            # Update 1, delete 0 and 3
+            occ.loc[1, 'properties'] = '{"yo": "yo"}'
+            chunks = [occ.loc[[4, 1]], occ.loc[[2]]]
+            i, u, d = op3._sync_chunks(iter(chunks), connection)
+            self.assertEqual(len(i), 0)
+            self.assertEqual(list(u.index), [1])
+            self.assertEqual(sorted(d.index), [0, 3])
+            df = op3.get_niamoto_occurrence_dataframe(connection)
+            self.assertEqual(sorted(df['provider_pk']), [1, 2, 4])
+            self.assertEqual(
+                df.set_index('provider_pk').loc[1]['properties'],
+                {'yo': 'yo'}
+            )
+
     def test_sync_delete(self):
         self.tearDownClass()
         self.setUpClass()
@@ -459,6 +548,102 @@ class TestBaseOccurrenceProvider(BaseTestNiamotoSchemaCreated):
             )
 
 
+    def test_update_synonym_mapping_identity_and_changes(self):
+        self.tearDownClass()
+        self.setUpClass()
+        TaxonomyManager.register_synonym_key('gbif')
+        TaxonomyManager.add_taxon(
+            1, 'Family 1', 'Family', 'FAMILIA', synonyms={'gbif': 20}
+        )
+        TaxonomyManager.add_taxon(
+            2, 'Genus 2', 'Genus', 'GENUS', parent_id=1,
+            synonyms={'gbif': 30}
+        )
+        data_provider_3 = TestDataProvider('test_data_provider_3')
+        occ = pd.DataFrame.from_records([
+            {
+                'id': i,
+                'taxon_id': None,
+                'provider_taxon_id': provider_taxon_id,
+                'location': from_shape(Point(166.551, -22.039), srid=4326),
+                'properties': '{}',
+            } for i, provider_taxon_id in enumerate([20, 30, 2, None])
+        ], index='id')
+        with Connector.get_connection() as connection:
+            BaseOccurrenceProvider(data_provider_3)._sync(occ, connection)
+
+        def get_mapping():
+            with Connector.get_connection() as connection:
+                df = BaseOccurrenceProvider(
+                    data_provider_3
+                ).get_niamoto_occurrence_dataframe(connection)
+            df = df.set_index('provider_pk').sort_index()
+            return [None if pd.isnull(v) else v for v in df['taxon_id']]
+
+        data_provider_3 = TestDataProvider.update_data_provider(
+            "test_data_provider_3",
+            synonym_key='gbif'
+        )
+        op3 = BaseOccurrenceProvider(data_provider_3)
+        version = get_data_version(OCCURRENCE)
+        self.assertEqual(op3.update_synonym_mapping(), (2, 4))
+        self.assertEqual(get_mapping(), [1, 2, None, None])
+        self.assertNotEqual(get_data_version(OCCURRENCE), version)
+        # Nothing changes, the occurrence data version is left untouched
+        version = get_data_version(OCCURRENCE)
+        op3.update_synonym_mapping()
+        self.assertEqual(get_data_version(OCCURRENCE), version)
+        # Exchange the synonyms
+        TaxonomyManager.set_synonym_data('gbif', pd.DataFrame({
+            'taxon_id': [1, 2],
+            'provider_taxon_id': [30, 20],
+        }))
+        op3.update_synonym_mapping()
+        self.assertEqual(get_mapping(), [2, 1, None, None])
+        # Identity synonym key (registered by the initial migration)
+        TaxonomyManager.register_synonym_key(
+            TaxonomyManager.IDENTITY_SYNONYM_KEY
+        )
+        data_provider_3 = TestDataProvider.update_data_provider(
+            "test_data_provider_3",
+            synonym_key=TaxonomyManager.IDENTITY_SYNONYM_KEY
+        )
+        op3 = BaseOccurrenceProvider(data_provider_3)
+        self.assertEqual(op3.update_synonym_mapping(), (1, 4))
+        self.assertEqual(get_mapping(), [None, None, 2, None])
+        # The other providers are left untouched
+        data_provider_1 = TestDataProvider('test_data_provider_1')
+        with Connector.get_connection() as connection:
+            df = BaseOccurrenceProvider(
+                data_provider_1
+            ).get_niamoto_occurrence_dataframe(connection)
+        self.assertTrue(df['taxon_id'].isnull().all())
+
+    def test_synonym_mapping_uses_synonym_key_index(self):
+        self.tearDownClass()
+        self.setUpClass()
+        TaxonomyManager.register_synonym_key('gbif')
+        TaxonomyManager.add_taxon(
+            1, 'Family 1', 'Family', 'FAMILIA', synonyms={'gbif': 20}
+        )
+        data_provider_3 = TestDataProvider.update_data_provider(
+            "test_data_provider_3",
+            synonym_key='gbif'
+        )
+        op3 = BaseOccurrenceProvider(data_provider_3)
+        sql = op3.get_synonym_mapping_sql()
+        with Connector.get_connection() as connection:
+            with connection.begin():
+                connection.execute("SET LOCAL enable_seqscan = off;")
+                compiled = sql.compile(connection)
+                plan = connection.execute(
+                    "EXPLAIN {}".format(compiled.string),
+                    compiled.params
+                ).fetchall()
+        plan = '\n'.join([r[0] for r in plan])
+        self.assertIn('gbif_unique_synonym_key', plan)
+
+
 if __name__ == '__main__':
     TestDatabaseManager.setup_test_database()
     TestDatabaseManager.create_schema(settings.NIAMOTO_SCHEMA)
@@ -0,0 +1,166 @@
+# coding: utf-8
+
+import unittest
+import json
+
+import pandas as pd
+from geoalchemy2.shape import from_shape
+from shapely.geometry import Point
+
+from niamoto.testing import set_test_path
+set_test_path()
+
+from niamoto.conf import settings
+from niamoto.data_providers.bulk_sync import BulkSyncEngine, \
+    serialize_value, ACTION_COLUMN
+from niamoto.db import metadata as niamoto_db_meta
+from niamoto.db.connector import Connector
+from niamoto.testing.base_tests import BaseTestNiamotoSchemaCreated
+from niamoto.testing.test_data_provider import TestDataProvider
+from niamoto.testing.test_database_manager import TestDatabaseManager
+
+
+class TestBulkSyncEngine(BaseTestNiamotoSchemaCreated):
+    """
+    Test case for the COPY based bulk sync engine.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super(TestBulkSyncEngine, cls).setUpClass()
+        TestDataProvider.register_data_provider('test_data_provider_1')
+
+    def setUp(self):
+        self.engine = BulkSyncEngine(
+            niamoto_db_meta.occurrence,
+            key_columns=['provider_id', 'provider_pk'],
+            value_columns=[
+                'location', 'taxon_id', 'provider_taxon_id', 'properties'
+            ],
+        )
+        self.provider_id = TestDataProvider('test_data_provider_1').db_id
+
+    def tearDown(self):
+        del_stmt = niamoto_db_meta.occurrence.delete()
+        with Connector.get_connection() as connection:
+            connection.execute(del_stmt)
+
+    def _get_dataframe(self, pks, properties):
+        return pd.DataFrame({
+            'provider_id': self.provider_id,
+            'provider_pk': pks,
+            'location': [
+                from_shape(Point(166.5, -22.1), srid=4326) for i in pks
+            ],
+            'taxon_id': None,
+            'provider_taxon_id': None,
+            'properties': [json.dumps(properties) for i in pks],
+        }, index=pks)
+
+    def _get_occurrences(self):
+        sel = niamoto_db_meta.occurrence.select().where(
+            niamoto_db_meta.occurrence.c.provider_id == self.provider_id
+        )
+        with Connector.get_connection() as connection:
+            return pd.read_sql(sel, connection, index_col='provider_pk')
+
+    def test_serialize_value(self):
+        point = from_shape(Point(166.5, -22.1), srid=4326)
+        self.assertEqual(
+            serialize_value(point),
+            "SRID=4326;POINT (166.5 -22.1)"
+        )
+        self.assertEqual(serialize_value({'a': 1}), '{"a": 1}')
+        self.assertEqual(serialize_value('{}'), '{}')
+        self.assertIsNone(serialize_value(None))
+
+    def test_get_staging_dataframe(self):
+        insert_df = self._get_dataframe([1, 2], {})
+        update_df = self._get_dataframe([3], {})
+        delete_df = insert_df[['provider_id', 'provider_pk']]
+        staging_df = self.engine.get_staging_dataframe(
+            insert_df,
+            update_df,
+            delete_df
+        )
+        self.assertEqual(len(staging_df), 5)
+        self.assertEqual(
+            list(staging_df.columns),
+            self.engine.columns + [ACTION_COLUMN]
+        )
+        self.assertEqual(
+            list(staging_df[ACTION_COLUMN]),
+            ['i', 'i', 'u', 'd', 'd']
+        )
+        self.assertTrue(pd.isnull(staging_df['location'].iloc[-1]))
+        empty = self.engine.get_staging_dataframe([], [], pd.DataFrame())
+        self.assertEqual(len(empty), 0)
+
+    def test_sync(self):
+        with Connector.get_connection() as connection:
+            with connection.begin():
+                counts = self.engine.sync(
+                    connection,
+                    self._get_dataframe([1, 2, 3], {'a': 1}),
+                    [],
+                    []
+                )
+        self.assertEqual(counts, (3, 0, 0))
+        df = self._get_occurrences()
+        self.assertEqual(list(df.index.sort_values()), [1, 2, 3])
+        self.assertEqual(df.loc[1]['properties'], {'a': 1})
+        with Connector.get_connection() as connection:
+            with connection.begin():
+                counts = self.engine.sync(
+                    connection,
+                    self._get_dataframe([4], {}),
+                    self._get_dataframe([2], {'a': 2}),
+                    self._get_dataframe([1, 3], {})
+                )
+        self.assertEqual(counts, (1, 1, 2))
+        df = self._get_occurrences()
+        self.assertEqual(list(df.index.sort_values()), [2, 4])
+        self.assertEqual(df.loc[2]['properties'], {'a': 2})
+        self.assertEqual(df.loc[4]['properties'], {})
+
+    def test_sync_missing_value_columns(self):
+        engine = BulkSyncEngine(
+            niamoto_db_meta.occurrence,
+            key_columns=['provider_id', 'provider_pk'],
+            value_columns=[
+                'location', 'taxon_id', 'provider_taxon_id', 'properties',
+                'raster_versions',
+            ],
+        )
+        upd = niamoto_db_meta.occurrence.update().values({
+            'raster_versions': {'raster': 1},
+        })
+        with Connector.get_connection() as connection:
+            with connection.begin():
+                engine.sync(
+                    connection,
+                    self._get_dataframe([1, 2], {}),
+                    [],
+                    []
+                )
+            connection.execute(upd)
+            with connection.begin():
+                engine.sync(
+                    connection,
+                    self._get_dataframe([3], {}),
+                    self._get_dataframe([2], {'a': 2}),
+                    []
+                )
+        df = self._get_occurrences()
+        self.assertEqual(df.loc[1]['raster_versions'], {'raster': 1})
+        self.assertIsNone(df.loc[2]['raster_versions'])
+        self.assertIsNone(df.loc[3]['raster_versions'])
+
+
+if __name__ == '__main__':
+    TestDatabaseManager.setup_test_database()
+    TestDatabaseManager.create_schema(settings.NIAMOTO_SCHEMA)
+    TestDatabaseManager.create_schema(settings.NIAMOTO_RASTER_SCHEMA)
+    TestDatabaseManager.create_schema(settings.NIAMOTO_VECTOR_SCHEMA)
+    unittest.main(exit=False)
+    TestDatabaseManager.teardown_test_database()
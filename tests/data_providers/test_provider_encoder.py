@@ -0,0 +1,111 @@
+# coding: utf-8
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from niamoto.testing import set_test_path
+set_test_path()
+
+from niamoto.data_providers.provider_encoder import get_properties_json, \
+    get_ewkt_points, encode_provider_dataframe, get_common_dtypes, \
+    as_dtypes
+
+
+class TestProviderEncoder(unittest.TestCase):
+    """
+    Test case for the vectorized provider dataframe encoder.
+    """
+
+    def _get_dataframe(self):
+        return pd.DataFrame({
+            'x': [166.5, 0.1 + 0.2, np.nan],
+            'y': [-22, -21.5, 1e-7],
+            'dbh': [10, 20, 30],
+            'height': [1.5, np.nan, 3.0],
+            'name': ['é "a"', None, 'b\nc'],
+        }, index=[3, 1, 1])
+
+    def _get_row_properties(self, df, columns, force_ascii=True):
+        return list(df[columns].apply(
+            lambda x: x.to_json(force_ascii=force_ascii),
+            axis=1
+        ))
+
+    def test_get_properties_json(self):
+        df = self._get_dataframe()
+        for columns in [['dbh'], ['dbh', 'height'], ['dbh', 'name'],
+                        ['name', 'height', 'dbh']]:
+            for force_ascii in [True, False]:
+                properties = get_properties_json(df, columns, force_ascii)
+                self.assertEqual(list(properties.index), [3, 1, 1])
+                self.assertEqual(
+                    list(properties),
+                    self._get_row_properties(df, columns, force_ascii)
+                )
+        self.assertEqual(list(get_properties_json(df, [])), ['{}'] * 3)
+        self.assertEqual(len(get_properties_json(df[:0], ['dbh'])), 0)
+
+    def test_get_ewkt_points(self):
+        df = self._get_dataframe()
+        points = get_ewkt_points(df['x'], df['y'])
+        self.assertEqual(list(points), [
+            "SRID=4326;POINT(166.5 -22.0)",
+            "SRID=4326;POINT(0.30000000000000004 -21.5)",
+            "SRID=4326;POINT(nan 1e-07)",
+        ])
+        points = get_ewkt_points(df['dbh'], df['dbh'])
+        self.assertEqual(points.iloc[0], "SRID=4326;POINT(10 10)")
+
+    def test_encode_provider_dataframe(self):
+        df = self._get_dataframe()
+        properties = self._get_row_properties(df, ['dbh', 'height'])
+        encoded = encode_provider_dataframe(df, ['dbh', 'height'])
+        self.assertEqual(
+            list(encoded.columns),
+            ['name', 'properties', 'location']
+        )
+        self.assertEqual(list(encoded['properties']), properties)
+        df = self._get_dataframe()
+        encoded = encode_provider_dataframe(df, ['dbh'], location=False)
+        self.assertEqual(
+            list(encoded.columns),
+            ['x', 'y', 'height', 'name', 'properties']
+        )
+
+
+    def test_get_common_dtypes(self):
+        chunks = [
+            pd.DataFrame({
+                'a': [1, 2], 'b': [1, 2], 'c': [True, False],
+                'd': [1, 2], 'e': [np.nan, np.nan],
+            }),
+            pd.DataFrame({
+                'a': [3, np.nan], 'b': [3.5, 4], 'c': [True, None],
+                'd': [3, 'x'], 'e': [np.nan, np.nan],
+            }),
+        ]
+        dtypes = get_common_dtypes(chunks)
+        self.assertEqual(dtypes, {
+            'a': np.dtype('float64'),
+            'b': np.dtype('float64'),
+            'c': np.dtype('object'),
+            'd': np.dtype('object'),
+            'e': np.dtype('float64'),
+        })
+        df = as_dtypes(chunks[0], dtypes)
+        self.assertEqual(df.dtypes.to_dict(), dtypes)
+        self.assertIs(as_dtypes(df, dtypes), df)
+        # The properties do not depend on the chunks
+        whole = pd.concat(chunks)
+        self.assertEqual(
+            list(pd.concat([as_dtypes(c, dtypes) for c in chunks]).pipe(
+                get_properties_json, list(dtypes.keys())
+            )),
+            list(get_properties_json(whole, list(dtypes.keys())))
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+# coding: utf-8
+
+import unittest
+
+import numpy as np
+import pandas as pd
+from geoalchemy2.shape import from_shape
+from shapely.geometry import Point
+
+from niamoto.testing import set_test_path
+set_test_path()
+
+from niamoto.data_providers.sync_hash import get_sync_hash, \
+    get_changed_index, SYNC_HASH_COLUMN
+
+
+class TestSyncHash(unittest.TestCase):
+    """
+    Test case for the sync content hash.
+    """
+
+    COLUMNS = ['taxon_id', 'location', 'properties']
+
+    def _get_dataframe(self, taxon_ids=(1, None, 3)):
+        return pd.DataFrame({
+            'taxon_id': list(taxon_ids),
+            'location': [
+                from_shape(Point(166.5 + i, -22.1), srid=4326)
+                for i in range(3)
+            ],
+            'properties': ['{}', '{"a": 1}', '{"a": 2}'],
+        }, index=[10, 20, 30])
+
+    def test_get_sync_hash(self):
+        df = self._get_dataframe()
+        hashes = get_sync_hash(df, self.COLUMNS)
+        self.assertEqual(hashes.dtype, np.int64)
+        self.assertEqual(list(hashes.index), [10, 20, 30])
+        self.assertEqual(len(hashes.unique()), 3)
+        # Stable, and insensitive to the representation of numbers / nulls
+        df_2 = self._get_dataframe(taxon_ids=(1.0, np.nan, 3.0))
+        self.assertEqual(
+            list(hashes),
+            list(get_sync_hash(df_2, self.COLUMNS))
+        )
+        # Sensitive to changes
+        df_2.loc[20, 'properties'] = '{"a": 3}'
+        df_2.loc[30, 'taxon_id'] = 4
+        self.assertEqual(
+            list(hashes == get_sync_hash(df_2, self.COLUMNS)),
+            [True, False, False]
+        )
+        # Empty dataframe, columns may be missing
+        empty = pd.DataFrame(columns=['location'])
+        self.assertEqual(len(get_sync_hash(empty, self.COLUMNS)), 0)
+
+    def test_get_changed_index(self):
+        provider_df = self._get_dataframe()
+        provider_df[SYNC_HASH_COLUMN] = get_sync_hash(
+            provider_df,
+            self.COLUMNS
+        )
+        niamoto_df = pd.DataFrame({
+            'provider_pk': [10, 20, 40],
+            SYNC_HASH_COLUMN: [
+                provider_df.loc[10, SYNC_HASH_COLUMN],
+                0,
+                provider_df.loc[30, SYNC_HASH_COLUMN],
+            ]
+        }, index=[1, 2, 3])
+        changed = get_changed_index(niamoto_df, provider_df)
+        self.assertEqual(list(changed), [20])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,13 +2,19 @@
 
 import unittest
 import tempfile
+import json
 import os
 
 import pandas as pd
+from pandas.testing import assert_frame_equal
+import pyarrow as pa
+import pyarrow.parquet as pq
+from shapely import wkb
 import geopandas as gpd
 from sqlalchemy.engine.reflection import Inspector
 from sqlalchemy import select, cast, String
 from shapely.geometry import (
+    Point,
     Polygon,
     GeometryCollection,
     LineString,
@@ -63,6 +69,61 @@ class TestBaseDataPublisher(BaseTestNiamotoSchemaCreated):
         )
         temp_csv.close()
 
+    def test_publish_parquet(self):
+        data = pd.DataFrame({
+            'count': pd.array([1, None, 3], dtype='Int64'),
+            'rank': pd.Categorical(['GENUS', 'SPECIES', 'GENUS']),
+            'date': pd.to_datetime(['2017-01-01', None, '2017-03-01']),
+            'mixed': [1, 'a', None],
+            'location': [Point(166, -22), None, Point(165, -21)],
+        }, index=pd.Index([10, 20, 30], name='id'))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'data.parquet')
+            BaseDataPublisher.publish(
+                data,
+                'parquet',
+                destination=path,
+                row_group_size=2,
+            )
+            parquet_file = pq.ParquetFile(path)
+            self.assertEqual(parquet_file.num_row_groups, 2)
+            geo = json.loads(parquet_file.schema_arrow.metadata[b'geo'])
+            self.assertEqual(geo['primary_column'], 'location')
+            self.assertEqual(geo['columns']['location']['encoding'], 'WKB')
+            self.assertEqual(
+                geo['columns']['location']['geometry_types'],
+                ['Point']
+            )
+            df = pd.read_parquet(path)
+            assert_frame_equal(df.drop(['mixed', 'location'], axis=1),
+                               data.drop(['mixed', 'location'], axis=1))
+            self.assertEqual(list(df['mixed'].iloc[:2]), ['1', 'a'])
+            self.assertEqual(wkb.loads(df.loc[30, 'location']),
+                             Point(165, -21))
+            self.assertIsNone(df.loc[20, 'location'])
+            # The data is unchanged
+            self.assertIsInstance(data.loc[10, 'location'], Point)
+
+    def test_publish_feather(self):
+        data = pd.DataFrame.from_records([
+            [1, 2, 3, 4],
+            [5, 6, 7, 8],
+            [9, 10, 11, 12],
+        ])
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'data.feather')
+            BaseDataPublisher.publish(
+                data,
+                'feather',
+                destination=path,
+                chunk_size=2,
+            )
+            with pa.ipc.open_file(path) as reader:
+                self.assertEqual(reader.num_record_batches, 2)
+            df = pd.read_feather(path)
+            self.assertEqual(list(df.columns), ['0', '1', '2', '3'])
+            self.assertEqual(df.values.tolist(), data.values.tolist())
+
     def test_publish_to_postgis(self):
         CsvDataProvider.register_data_provider('csv_provider')
         csv_provider = CsvDataProvider(
@@ -2,8 +2,11 @@
 
 import unittest
 import os
+import tempfile
 import logging
 
+import pandas as pd
+
 from niamoto.testing import set_test_path
 set_test_path()
 
@@ -48,9 +51,28 @@ class TestOccurrencesPublisher(BaseTestNiamotoSchemaCreated):
         self.assertIsNotNone(op.get_key())
         self.assertIsNotNone(op.get_publish_formats())
 
+    def test_stream_csv(self):
+        op = OccurrenceDataPublisher()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'occurrences.csv')
+            self.assertTrue(op.stream_csv(
+                destination=path,
+                drop_null_properties=True
+            ))
+            streamed = pd.read_csv(path, index_col='id')
+        df = op.process(drop_null_properties=True, use_cache=False)[0]
+        self.assertEqual(len(streamed), len(df))
+        self.assertEqual(list(streamed.columns), list(df.columns))
+
     def test_occurrence_locations_publisher(self):
         op = OccurrenceLocationPublisher()
-        result = op.process()
+        result = op.process()[0]
+        self.assertEqual(
+            list(result.columns),
+            ['location', 'location_wkt']
+        )
+        self.assertGreater(len(result), 0)
+        self.assertTrue(result['location_wkt'].is_unique)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,155 @@
+# coding: utf-8
+
+import unittest
+
+from sqlalchemy.engine.reflection import Inspector
+import sqlalchemy as sa
+
+from niamoto.testing import set_test_path
+
+set_test_path()
+
+from niamoto.conf import settings
+from niamoto.testing.test_database_manager import TestDatabaseManager
+from niamoto.testing.base_tests import BaseTestNiamotoSchemaCreated
+from niamoto.testing.test_data_provider import TestDataProvider
+from niamoto.api import data_marts_api
+from niamoto.data_publishers.occurrence_fact_table_publisher import \
+    OccurrenceFactTablePublisher
+from niamoto.taxonomy.taxonomy_manager import TaxonomyManager
+from niamoto.db.connector import Connector
+from niamoto.db import metadata as meta
+
+
+class TestOccurrenceFactTablePublisher(BaseTestNiamotoSchemaCreated):
+    """
+    Test case for the occurrence fact table publisher.
+    """
+
+    def setUp(self):
+        super(TestOccurrenceFactTablePublisher, self).setUp()
+        self.tearDown()
+        TaxonomyManager.add_taxon(1, 'Family 1', 'Family', 'FAMILIA')
+        TaxonomyManager.add_taxon(
+            2, 'Genus 2', 'Genus', 'GENUS', parent_id=1
+        )
+        TaxonomyManager.add_taxon(
+            3, 'Genus 3', 'Genus', 'GENUS', parent_id=1
+        )
+        provider = TestDataProvider.register_data_provider(
+            'test_data_provider_1'
+        )
+        with Connector.get_connection() as connection:
+            connection.execute(meta.occurrence.insert(), [
+                {
+                    'id': i,
+                    'provider_id': provider.db_id,
+                    'provider_pk': i,
+                    'taxon_id': taxon_id,
+                    'properties': {},
+                    'raster_versions': None,
+                } for i, taxon_id in enumerate([1, 2, 2, 3, None])
+            ])
+
+    def tearDown(self):
+        with Connector.get_connection() as connection:
+            for schema in [settings.NIAMOTO_FACT_TABLES_SCHEMA,
+                           settings.NIAMOTO_DIMENSIONS_SCHEMA]:
+                inspector = Inspector.from_engine(connection)
+                for tb in inspector.get_table_names(schema=schema):
+                    connection.execute("DROP TABLE {}.{};".format(schema, tb))
+            connection.execute(meta.fact_table_registry.delete())
+            connection.execute(meta.dimension_registry.delete())
+            connection.execute(meta.occurrence.delete())
+            connection.execute(meta.occurrence_change_log.delete())
+            connection.execute(meta.data_provider.delete())
+        TaxonomyManager.delete_all_taxa()
+
+    @staticmethod
+    def get_counts(fact_table):
+        df = fact_table.get_values().set_index('taxon_dimension_id')
+        return df['occurrence_count'].sort_index().to_dict()
+
+    def test_change_log(self):
+        log = meta.occurrence_change_log
+        sel = sa.select([log.c.occurrence_id, log.c.taxon_id]).order_by(
+            log.c.id
+        )
+        with Connector.get_connection() as connection:
+            self.assertEqual(
+                [tuple(r) for r in connection.execute(sel)],
+                [(0, 1), (1, 2), (2, 2), (3, 3), (4, None)]
+            )
+            connection.execute(log.delete())
+            connection.execute(
+                meta.occurrence.update().values({'taxon_id': 3}).where(
+                    meta.occurrence.c.id == 1
+                )
+            )
+            connection.execute(
+                meta.occurrence.delete().where(meta.occurrence.c.id == 0)
+            )
+            self.assertEqual(
+                sorted([tuple(r) for r in connection.execute(sel)]),
+                [(0, 1), (1, 2), (1, 3)]
+            )
+
+    def test_refresh_from_publisher(self):
+        data_marts_api.create_taxon_dimension()
+        ft = data_marts_api.create_fact_table(
+            'occurrence_fact',
+            ['taxon_dimension'],
+            ['occurrence_count'],
+            publisher_cls=OccurrenceFactTablePublisher
+        )
+        ft.populate_from_publisher()
+        self.assertEqual(self.get_counts(ft), {1: 1, 2: 2, 3: 1})
+        self.assertEqual(ft.refresh_from_publisher()['mode'], 'none')
+        # An occurrence changes of taxon
+        with Connector.get_connection() as connection:
+            connection.execute(
+                meta.occurrence.update().values({'taxon_id': 3}).where(
+                    meta.occurrence.c.id == 1
+                )
+            )
+        self.assertEqual(
+            ft.refresh_from_publisher(),
+            {'mode': 'incremental', 'deleted': 2, 'inserted': 2}
+        )
+        self.assertEqual(self.get_counts(ft), {1: 1, 2: 1, 3: 2})
+        # An occurrence is deleted
+        with Connector.get_connection() as connection:
+            connection.execute(
+                meta.occurrence.delete().where(meta.occurrence.c.id == 0)
+            )
+        self.assertEqual(
+            ft.refresh_from_publisher(),
+            {'mode': 'incremental', 'deleted': 1, 'inserted': 0}
+        )
+        self.assertEqual(self.get_counts(ft), {2: 1, 3: 2})
+        # The taxonomy changes
+        TaxonomyManager.add_taxon(
+            4, 'Genus 4', 'Genus', 'GENUS', parent_id=1
+        )
+        self.assertEqual(
+            ft.refresh_from_publisher(),
+            {'mode': 'full', 'deleted': 2, 'inserted': 2}
+        )
+        # The changes read by every fact table are pruned
+        with Connector.get_connection() as connection:
+            OccurrenceFactTablePublisher.prune_change_log(connection)
+            count = connection.execute(sa.select([
+                sa.func.count()
+            ]).select_from(meta.occurrence_change_log)).scalar()
+        self.assertEqual(count, 0)
+
+
+if __name__ == '__main__':
+    TestDatabaseManager.setup_test_database()
+    TestDatabaseManager.create_schema(settings.NIAMOTO_SCHEMA)
+    TestDatabaseManager.create_schema(settings.NIAMOTO_RASTER_SCHEMA)
+    TestDatabaseManager.create_schema(settings.NIAMOTO_VECTOR_SCHEMA)
+    TestDatabaseManager.create_schema(settings.NIAMOTO_DIMENSIONS_SCHEMA)
+    TestDatabaseManager.create_schema(settings.NIAMOTO_FACT_TABLES_SCHEMA)
+    unittest.main(exit=False)
+    TestDatabaseManager.teardown_test_database()
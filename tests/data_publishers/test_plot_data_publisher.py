@@ -2,8 +2,12 @@
 
 import unittest
 import os
+import tempfile
 import logging
 
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
 from niamoto.testing import set_test_path
 set_test_path()
 
@@ -47,6 +51,21 @@ class TestPlotPublisher(BaseTestNiamotoSchemaCreated):
         self.assertIsNotNone(op.get_publish_formats())
         op.process(properties="width,height")
 
+    def test_stream_csv(self):
+        op = PlotDataPublisher()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'plots.csv')
+            self.assertTrue(op.stream_csv(destination=path))
+            streamed = pd.read_csv(path, index_col='id')
+            path = os.path.join(tmp_dir, 'plots_pandas.csv')
+            data, p_args, p_kwargs = op.process(use_cache=False)
+            op.publish(data, op.CSV, destination=path, **p_kwargs)
+            published = pd.read_csv(path, index_col='id')
+        assert_frame_equal(
+            streamed.sort_index(axis=1),
+            published.sort_index(axis=1)
+        )
+
 
 if __name__ == '__main__':
     TestDatabaseManager.setup_test_database()
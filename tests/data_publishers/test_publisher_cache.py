@@ -0,0 +1,306 @@
+# coding: utf-8
+
+import unittest
+import shutil
+import os
+import tempfile
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal, assert_series_equal
+
+from niamoto.testing import set_test_path
+set_test_path()
+
+from niamoto.conf import settings, NIAMOTO_HOME
+from niamoto.data_providers.csv_provider.csv_data_provider import \
+    CsvDataProvider
+from niamoto.data_publishers.base_data_publisher import BaseDataPublisher
+from niamoto.data_publishers.occurrence_data_publisher import \
+    OccurrenceDataPublisher
+from niamoto.data_publishers.taxon_data_publisher import TaxonDataPublisher
+from niamoto.data_publishers.raster_data_publisher import \
+    RasterValueCountPublisher
+from niamoto.data_publishers.publisher_cache import PublisherCache
+from niamoto.db.data_version import bump_data_version, OCCURRENCE
+from niamoto.testing.test_database_manager import TestDatabaseManager
+from niamoto.testing.base_tests import BaseTestNiamotoSchemaCreated
+from niamoto.taxonomy.taxonomy_manager import TaxonomyManager
+from niamoto.raster.raster_manager import RasterManager
+from niamoto.raster.raster_value_extractor import RasterValueExtractor, \
+    RASTER_PROPERTY_PREFIX
+from niamoto.db.connector import Connector
+from niamoto.db import metadata as meta
+
+
+TEST_RASTER = os.path.join(
+    NIAMOTO_HOME, 'data', 'raster', 'rainfall_wgs84.tif',
+)
+
+
+class CachedPublisher(BaseDataPublisher):
+
+    CACHED = True
+    CALLS = 0
+
+    @classmethod
+    def get_key(cls):
+        return 'test_cached_publisher'
+
+    @classmethod
+    def get_description(cls):
+        return "Test cached publisher."
+
+    def _process(self, *args, properties=None, series=False, **kwargs):
+        CachedPublisher.CALLS += 1
+        if isinstance(properties, str):
+            properties = properties.split(',')
+        df = pd.DataFrame({
+            'name': ['a', None, 'c'],
+            'value': [1.5, np.nan, 3],
+        }, index=pd.Index([1, 2, 3], name='id'))
+        if properties is not None:
+            for p in properties:
+                df[p] = 0
+        if series:
+            return df['value'], [], {}
+        return df, [], {'index_label': 'id'}
+
+
+class TestPublisherCache(BaseTestNiamotoSchemaCreated):
+    """
+    Test case for the persistent publisher cache.
+    """
+
+    def setUp(self):
+        super(TestPublisherCache, self).setUp()
+        CachedPublisher.CALLS = 0
+        PublisherCache.clear()
+
+    def tearDown(self):
+        shutil.rmtree(os.path.dirname(PublisherCache.get_cache_dir()))
+
+    def test_process_cached(self):
+        publisher = CachedPublisher()
+        df, args, kwargs = publisher.process(use_cache=True)
+        self.assertEqual(CachedPublisher.CALLS, 1)
+        cached_df, cached_args, cached_kwargs = publisher.process(
+            use_cache=True
+        )
+        self.assertEqual(CachedPublisher.CALLS, 1)
+        assert_frame_equal(cached_df, df)
+        self.assertTrue(np.isnan(cached_df.loc[2, 'name']))
+        self.assertEqual(cached_args, args)
+        self.assertEqual(cached_kwargs, kwargs)
+        self.assertIs(publisher.last_data, cached_df)
+        stats = PublisherCache.get_stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['entries'], 1)
+        self.assertGreater(stats['size'], 0)
+        # Without the cache, the cache is disabled in the test settings
+        publisher.process(use_cache=False)
+        publisher.process()
+        self.assertEqual(CachedPublisher.CALLS, 3)
+        self.assertEqual(PublisherCache.get_stats()['hits'], 1)
+
+    def test_normalized_kwargs(self):
+        publisher = CachedPublisher()
+        df = publisher.process(properties='dbh, height', use_cache=True)[0]
+        cached_df = publisher.process(
+            properties=['dbh', 'height'],
+            use_cache=True
+        )[0]
+        self.assertEqual(CachedPublisher.CALLS, 1)
+        assert_frame_equal(cached_df, df)
+        publisher.process(properties=['dbh'], use_cache=True)
+        self.assertEqual(CachedPublisher.CALLS, 2)
+
+    def test_series(self):
+        publisher = CachedPublisher()
+        s = publisher.process(series=True, use_cache=True)[0]
+        cached_s = publisher.process(series=True, use_cache=True)[0]
+        self.assertEqual(CachedPublisher.CALLS, 1)
+        assert_series_equal(cached_s, s)
+
+    def test_database_version(self):
+        publisher = CachedPublisher()
+        version = PublisherCache.get_database_version()
+        publisher.process(use_cache=True)
+        CsvDataProvider.register_data_provider('csv_provider')
+        self.assertNotEqual(PublisherCache.get_database_version(), version)
+        publisher.process(use_cache=True)
+        self.assertEqual(CachedPublisher.CALLS, 2)
+        # The entry of the previous version had been replaced
+        self.assertEqual(PublisherCache.get_stats()['entries'], 1)
+        # Writes outside of a sync (e.g. raster values extraction)
+        version = PublisherCache.get_database_version()
+        bump_data_version(OCCURRENCE)
+        self.assertNotEqual(PublisherCache.get_database_version(), version)
+        publisher.process(use_cache=True)
+        self.assertEqual(CachedPublisher.CALLS, 3)
+
+    def test_eviction(self):
+        publisher = CachedPublisher()
+        publisher.process(properties=['a'], use_cache=True)
+        size = PublisherCache.get_stats()['size']
+        cache_settings = {'ENABLED': True, 'MAX_SIZE': 2 * size}
+        with mock.patch.object(PublisherCache, 'get_cache_settings',
+                               return_value=cache_settings):
+            publisher.process(properties=['b'], use_cache=True)
+            # Access 'a', making 'b' the least recently used entry
+            publisher.process(properties=['a'], use_cache=True)
+            publisher.process(properties=['c'], use_cache=True)
+            self.assertEqual(PublisherCache.get_stats()['entries'], 2)
+            self.assertEqual(CachedPublisher.CALLS, 3)
+            publisher.process(properties=['a'], use_cache=True)
+            self.assertEqual(CachedPublisher.CALLS, 3)
+            publisher.process(properties=['b'], use_cache=True)
+            self.assertEqual(CachedPublisher.CALLS, 4)
+
+    def test_not_cacheable(self):
+        version = PublisherCache.get_database_version()
+        self.assertFalse(PublisherCache.put(
+            'test', [], {}, version, [1, 2, 3], [], {}
+        ))
+        mixed = pd.DataFrame({'a': [1, 'b']})
+        self.assertFalse(PublisherCache.put(
+            'test', [], {}, version, mixed, [], {}
+        ))
+        self.assertFalse(PublisherCache.put(
+            'test', [], {}, version, pd.DataFrame(), [], {'a': object()}
+        ))
+        self.assertEqual(PublisherCache.get_stats()['entries'], 0)
+
+
+class TestPublisherCacheWrites(BaseTestNiamotoSchemaCreated):
+    """
+    Test case checking that each write path of the database invalidates
+    the cached results of the publishers: a publisher is processed, the
+    database is written, then the publisher is processed again and must
+    return fresh data.
+    """
+
+    def setUp(self):
+        super(TestPublisherCacheWrites, self).setUp()
+        PublisherCache.clear()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.tmp_dir, 'occurrences.csv')
+        self.set_taxonomy(['Family 1', 'Genus 2', 'Genus 3'])
+        self.write_occurrences([1.5, 2.5, 3.5])
+        self.provider = CsvDataProvider.register_data_provider(
+            'cache_provider',
+            occurrence_csv_path=self.csv_path,
+            synonym_key='cache_key',
+        )
+        self.provider.sync()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+        shutil.rmtree(os.path.dirname(PublisherCache.get_cache_dir()))
+        for name in RasterManager.get_raster_list()['name']:
+            RasterManager.delete_raster(name)
+        with Connector.get_connection() as connection:
+            connection.execute(meta.occurrence.delete())
+            connection.execute(meta.data_provider.delete())
+            connection.execute(meta.property_catalog.delete())
+        TaxonomyManager.delete_all_taxa()
+        TaxonomyManager.unregister_all_synonym_keys()
+
+    @staticmethod
+    def set_taxonomy(full_names):
+        TaxonomyManager.set_taxonomy(pd.DataFrame({
+            'parent_id': [None, 1, 1],
+            'rank': ['FAMILIA', 'GENUS', 'GENUS'],
+            'full_name': full_names,
+            'rank_name': ['Family', 'Genus', 'Genus'],
+            'cache_key': [10, 20, 30],
+        }, index=pd.Index([1, 2, 3], name='id')))
+
+    def write_occurrences(self, heights):
+        pd.DataFrame({
+            'id': [1, 2, 3],
+            'taxon_id': [10, 20, 30],
+            'x': [166.5, 166.6, 166.7],
+            'y': [-22.0, -22.1, -22.2],
+            'height': heights,
+        }).to_csv(self.csv_path, index=False)
+
+    @staticmethod
+    def get_occurrences(properties=None):
+        df = OccurrenceDataPublisher().process(
+            properties=properties,
+            use_cache=True
+        )[0]
+        return df.sort_values('x')
+
+    def test_sync(self):
+        self.assertEqual(
+            list(self.get_occurrences(['height'])['height']),
+            [1.5, 2.5, 3.5]
+        )
+        self.write_occurrences([1.5, 2.5, 4.5])
+        self.provider.sync()
+        self.assertEqual(
+            list(self.get_occurrences(['height'])['height']),
+            [1.5, 2.5, 4.5]
+        )
+
+    def test_set_taxonomy(self):
+        df = TaxonDataPublisher().process(use_cache=True)[0]
+        self.assertEqual(df.loc[3, 'full_name'], 'Genus 3')
+        self.set_taxonomy(['Family 1', 'Genus 2', 'Genus 4'])
+        df = TaxonDataPublisher().process(use_cache=True)[0]
+        self.assertEqual(df.loc[3, 'full_name'], 'Genus 4')
+
+    def test_synonym_mapping(self):
+        self.assertEqual(
+            list(self.get_occurrences()['taxon_id']),
+            [1, 2, 3]
+        )
+        TaxonomyManager.add_synonym_for_single_taxon(3, 'cache_key', 40)
+        self.assertEqual(
+            list(self.get_occurrences()['taxon_id']),
+            [1, 2, 3]
+        )
+        self.provider.occurrence_provider.update_synonym_mapping()
+        self.assertTrue(np.isnan(self.get_occurrences()['taxon_id'].iloc[2]))
+
+    def test_raster_update(self):
+        RasterManager.add_raster('rainfall', TEST_RASTER)
+        publisher = RasterValueCountPublisher()
+        publisher.process('rainfall', use_cache=True)
+        publisher.process('rainfall', use_cache=True)
+        self.assertEqual(PublisherCache.get_stats()['misses'], 1)
+        RasterManager.update_raster(
+            'rainfall',
+            TEST_RASTER,
+            tile_dimension=(50, 50)
+        )
+        publisher.process('rainfall', use_cache=True)
+        self.assertEqual(PublisherCache.get_stats()['misses'], 2)
+
+    def test_raster_extraction(self):
+        key = RASTER_PROPERTY_PREFIX + 'rainfall'
+        RasterManager.add_raster('rainfall', TEST_RASTER)
+        self.assertNotIn(key, self.get_occurrences().columns)
+        RasterValueExtractor.extract_raster_values_to_occurrences('rainfall')
+        self.assertIn(key, self.get_occurrences().columns)
+
+    def test_raster_deletion(self):
+        key = RASTER_PROPERTY_PREFIX + 'rainfall'
+        RasterManager.add_raster('rainfall', TEST_RASTER)
+        RasterValueExtractor.extract_raster_values_to_occurrences('rainfall')
+        self.assertIn(key, self.get_occurrences().columns)
+        RasterManager.delete_raster('rainfall')
+        self.assertNotIn(key, self.get_occurrences().columns)
+
+
+if __name__ == '__main__':
+    TestDatabaseManager.setup_test_database()
+    TestDatabaseManager.create_schema(settings.NIAMOTO_SCHEMA)
+    TestDatabaseManager.create_schema(settings.NIAMOTO_RASTER_SCHEMA)
+    TestDatabaseManager.create_schema(settings.NIAMOTO_VECTOR_SCHEMA)
+    unittest.main(exit=False)
+    TestDatabaseManager.teardown_test_database()
@@ -4,6 +4,9 @@ import unittest
 import os
 import logging
 
+import numpy as np
+import pandas as pd
+
 from niamoto.testing import set_test_path
 set_test_path()
 
@@ -15,7 +18,8 @@ log.FILE_LOGGING_LEVEL = logging.DEBUG
 from niamoto.conf import settings, NIAMOTO_HOME
 from niamoto.api.taxonomy_api import set_taxonomy
 from niamoto.testing.test_database_manager import TestDatabaseManager
-from niamoto.data_publishers.taxon_data_publisher import TaxonDataPublisher
+from niamoto.data_publishers.taxon_data_publisher import \
+    TaxonDataPublisher, _flatten
 from niamoto.testing.base_tests import BaseTestNiamotoSchemaCreated
 
 
@@ -47,6 +51,31 @@ class TestTaxaPublisher(BaseTestNiamotoSchemaCreated):
         self.assertEqual(len(result), 3)
         self.assertIsNotNone(publisher.get_key())
         self.assertIsNotNone(publisher.get_publish_formats())
+        df = result[0]
+        self.assertIn('familia', df.columns)
+        self.assertTrue(df['regnum'].notnull().all())
+
+    def test_flatten(self):
+        df = pd.DataFrame({
+            'full_name': ['Plantae', 'Fabaceae', 'Acacia', 'Acacia spirorbis',
+                          'Acacia sp.'],
+            'rank': ['REGNUM', 'FAMILIA', 'GENUS', 'SPECIES', 'SPECIES'],
+            'parent_id': [np.nan, 1, 2, 3, 4],
+        }, index=pd.Index([1, 2, 3, 4, 5], name='id'))
+        flat = _flatten(df.sample(frac=1, random_state=0))
+        self.assertEqual(list(flat.columns[3:]), [
+            'regnum', 'phylum', 'classis', 'ordo', 'familia', 'genus',
+            'species', 'infraspecies'
+        ])
+        self.assertEqual(flat.loc[4, 'regnum'], 'Plantae')
+        self.assertEqual(flat.loc[4, 'familia'], 'Fabaceae')
+        self.assertEqual(flat.loc[4, 'genus'], 'Acacia')
+        self.assertEqual(flat.loc[4, 'species'], 'Acacia spirorbis')
+        self.assertIsNone(flat.loc[4, 'phylum'])
+        self.assertIsNone(flat.loc[2, 'genus'])
+        # The highest ancestor of a rank is kept
+        self.assertEqual(flat.loc[5, 'species'], 'Acacia spirorbis')
+
 
 if __name__ == '__main__':
     TestDatabaseManager.setup_test_database()
@@ -7,7 +7,7 @@ from sqlalchemy.engine import Connection
 from niamoto.testing import set_test_path
 set_test_path()
 
-from niamoto.db.connector import Connector
+from niamoto.db.connector import Connector, DEFAULT_POOL_SETTINGS
 from niamoto.conf import settings
 from niamoto.testing.base_tests import BaseTest
 from niamoto.testing.test_database_manager import TestDatabaseManager
@@ -22,6 +22,40 @@ class TestConnector(BaseTest):
         with Connector.get_connection() as connection:
             self.assertIsInstance(connection, Connection)
 
+    def test_get_raw_connection(self):
+        with Connector.get_raw_connection() as raw_connection:
+            cur = raw_connection.cursor()
+            cur.execute("SELECT 1;")
+            self.assertEqual(cur.fetchone()[0], 1)
+            cur.close()
+        with self.assertRaises(ZeroDivisionError):
+            with Connector.get_raw_connection() as raw_connection:
+                raw_connection.cursor().execute("SELECT 1;")
+                1 / 0
+        # Both connections were returned to the pool
+        status = Connector.get_pool_status()
+        url = repr(Connector.get_engine().url)
+        self.assertEqual(status[url]['checked_out'], 0)
+
+    def test_pool_settings(self):
+        pool_settings = Connector.get_pool_settings()
+        self.assertEqual(
+            set(pool_settings.keys()),
+            set(DEFAULT_POOL_SETTINGS.keys())
+        )
+        engine = Connector.get_engine()
+        self.assertEqual(engine.pool.size(), pool_settings['POOL_SIZE'])
+
+    def test_get_external_engine(self):
+        db_url = Connector.get_database_url()
+        engine = Connector.get_external_engine(db_url)
+        self.assertIs(engine, Connector.get_external_engine(db_url))
+        self.assertIsNot(engine, Connector.get_engine())
+        with engine.connect() as connection:
+            self.assertEqual(connection.execute("SELECT 1;").scalar(), 1)
+        status = Connector.get_pool_status()
+        self.assertEqual(status[repr(engine.url)]['checked_out'], 0)
+
 
 if __name__ == '__main__':
     TestDatabaseManager.setup_test_database()
@@ -0,0 +1,54 @@
+# coding: utf-8
+
+import unittest
+
+from niamoto.testing import set_test_path
+set_test_path()
+
+from niamoto.conf import settings
+from niamoto.db import metadata as meta
+from niamoto.db.connector import Connector
+from niamoto.db.data_version import bump_data_version, get_data_version, \
+    get_data_versions, TAXONOMY, OCCURRENCE, PLOT
+from niamoto.testing.base_tests import BaseTestNiamotoSchemaCreated
+from niamoto.testing.test_database_manager import TestDatabaseManager
+
+
+class TestDataVersion(BaseTestNiamotoSchemaCreated):
+    """
+    Test case for the data version markers.
+    """
+
+    def tearDown(self):
+        with Connector.get_connection() as connection:
+            connection.execute(meta.data_version.delete())
+
+    def test_bump_data_version(self):
+        self.assertIsNone(get_data_version(TAXONOMY))
+        bump_data_version(TAXONOMY)
+        version, date = get_data_version(TAXONOMY)
+        self.assertEqual(version, 1)
+        bump_data_version(TAXONOMY, OCCURRENCE)
+        self.assertEqual(get_data_version(TAXONOMY)[0], 2)
+        self.assertGreaterEqual(get_data_version(TAXONOMY)[1], date)
+        versions = get_data_versions()
+        self.assertEqual(
+            {k: v[0] for k, v in versions.items()},
+            {TAXONOMY: 2, OCCURRENCE: 1}
+        )
+        self.assertEqual(list(get_data_versions([PLOT])), [])
+        # In a transaction
+        with Connector.get_connection() as connection:
+            transaction = connection.begin()
+            bump_data_version(PLOT, connection=connection)
+            transaction.rollback()
+        self.assertIsNone(get_data_version(PLOT))
+
+
+if __name__ == '__main__':
+    TestDatabaseManager.setup_test_database()
+    TestDatabaseManager.create_schema(settings.NIAMOTO_SCHEMA)
+    TestDatabaseManager.create_schema(settings.NIAMOTO_RASTER_SCHEMA)
+    TestDatabaseManager.create_schema(settings.NIAMOTO_VECTOR_SCHEMA)
+    unittest.main(exit=False)
+    TestDatabaseManager.teardown_test_database()
@@ -0,0 +1,190 @@
+# coding: utf-8
+
+import unittest
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+
+from niamoto.testing import set_test_path
+set_test_path()
+
+from niamoto.db import metadata as meta
+from niamoto.db.connector import Connector
+from niamoto.db.property_catalog import refresh_property_catalog, \
+    refresh_property_catalogs, get_property_keys, get_property_types, \
+    get_property_catalog, get_property_column, merge_property_types, \
+    INTEGER, NUMBER, STRING, BOOLEAN, JSON, NULL
+from niamoto.data_providers.csv_provider.csv_data_provider import \
+    CsvDataProvider
+from niamoto.conf import settings
+from niamoto.testing.base_tests import BaseTestNiamotoSchemaCreated
+from niamoto.testing.test_database_manager import TestDatabaseManager
+
+
+class TestPropertyCatalog(BaseTestNiamotoSchemaCreated):
+    """
+    Test case for the catalog of the occurrence and plot properties.
+    """
+
+    def setUp(self):
+        super(TestPropertyCatalog, self).setUp()
+        self.provider_1 = CsvDataProvider.register_data_provider(
+            'csv_provider_1',
+            return_object=True
+        )
+        self.provider_2 = CsvDataProvider.register_data_provider(
+            'csv_provider_2',
+            return_object=True
+        )
+        properties_1 = [
+            {'dbh': 10, 'height': 2.5, 'name': 'a', 'dead': False},
+            {'dbh': 12, 'height': 3, 'name': None, 'dead': True,
+             'o\'key': [1, 2]},
+        ]
+        properties_2 = [
+            {'dbh': 10.5, 'height': None, 'name': 1},
+        ]
+        with Connector.get_connection() as connection:
+            connection.execute(meta.occurrence.insert(), [
+                {
+                    'id': i,
+                    'provider_id': provider.db_id,
+                    'provider_pk': i,
+                    'properties': properties,
+                }
+                for i, (provider, properties) in enumerate(
+                    [(self.provider_1, p) for p in properties_1] +
+                    [(self.provider_2, p) for p in properties_2]
+                )
+            ])
+
+    def tearDown(self):
+        with Connector.get_connection() as connection:
+            connection.execute(meta.occurrence.delete())
+            connection.execute(meta.property_catalog.delete())
+            connection.execute(meta.data_provider.delete())
+
+    def test_refresh_property_catalog(self):
+        self.assertEqual(get_property_keys('occurrence'), [])
+        refresh_property_catalogs()
+        self.assertEqual(
+            get_property_keys('occurrence'),
+            ['dbh', 'dead', 'height', 'name', 'o\'key']
+        )
+        self.assertEqual(
+            get_property_keys('occurrence', provider_id=self.provider_2.db_id),
+            ['dbh', 'height', 'name']
+        )
+        self.assertEqual(get_property_keys('plot'), [])
+        with Connector.get_connection() as connection:
+            catalog = pd.read_sql(
+                select([meta.property_catalog]).where(
+                    meta.property_catalog.c.provider_id ==
+                    self.provider_1.db_id
+                ),
+                connection,
+                index_col='key'
+            )
+        self.assertEqual(catalog.loc['dbh', 'type'], INTEGER)
+        self.assertEqual(catalog.loc['height', 'type'], NUMBER)
+        self.assertEqual(catalog.loc['name', 'type'], STRING)
+        self.assertEqual(catalog.loc['name', 'count'], 1)
+        self.assertEqual(catalog.loc['dead', 'type'], BOOLEAN)
+        self.assertEqual(catalog.loc['o\'key', 'type'], JSON)
+        self.assertEqual(catalog.loc['dbh', 'count'], 2)
+        self.assertEqual(
+            get_property_types('occurrence', keys=['dbh', 'name', 'yo']),
+            {'dbh': NUMBER, 'name': JSON}
+        )
+        # Refresh a single key
+        with Connector.get_connection() as connection:
+            connection.execute(
+                "UPDATE {}.occurrence "
+                "SET properties = properties || '{{\"dbh\": \"big\"}}'"
+                "".format(settings.NIAMOTO_SCHEMA)
+            )
+            refresh_property_catalog(connection, 'occurrence', keys=['dbh'])
+        types = get_property_types('occurrence')
+        self.assertEqual(types['dbh'], STRING)
+        self.assertEqual(types['height'], NUMBER)
+        # Refresh a single provider
+        with Connector.get_connection() as connection:
+            connection.execute(
+                meta.occurrence.delete().where(
+                    meta.occurrence.c.provider_id == self.provider_2.db_id
+                )
+            )
+            refresh_property_catalog(
+                connection,
+                'occurrence',
+                provider_id=self.provider_2.db_id
+            )
+        self.assertEqual(get_property_types('occurrence')['name'], STRING)
+        self.assertRaises(ValueError, get_property_keys, 'yo')
+
+    def test_get_property_catalog(self):
+        refresh_property_catalogs()
+        df = get_property_catalog(entity='occurrence').set_index('key')
+        self.assertEqual(len(df), 5)
+        self.assertEqual(df.loc['dbh', 'type'], NUMBER)
+        self.assertEqual(df.loc['dbh', 'count'], 3)
+        self.assertEqual(
+            df.loc['dbh', 'providers'],
+            'csv_provider_1, csv_provider_2'
+        )
+        self.assertEqual(df.loc['dead', 'providers'], 'csv_provider_1')
+        self.assertEqual(len(get_property_catalog(entity='plot')), 0)
+
+    def test_get_property_column(self):
+        refresh_property_catalogs()
+        types = get_property_types('occurrence')
+        keys = ['dbh', 'height', 'name', 'dead']
+        with Connector.get_connection() as connection:
+            df = pd.read_sql(
+                select([meta.occurrence.c.id] + [
+                    get_property_column(
+                        meta.occurrence.c.properties,
+                        k,
+                        property_type=types[k]
+                    ) for k in keys
+                ]).order_by(meta.occurrence.c.id),
+                connection,
+                index_col='id'
+            )
+            text_df = pd.read_sql(
+                select([meta.occurrence.c.id] + [
+                    get_property_column(
+                        meta.occurrence.c.properties,
+                        k,
+                        property_type=types[k],
+                        as_text=True
+                    ) for k in keys
+                ]).order_by(meta.occurrence.c.id),
+                connection,
+                index_col='id'
+            )
+        self.assertEqual(list(df.columns), keys)
+        self.assertEqual(df['dbh'].dtype, np.float64)
+        self.assertEqual(list(df['dbh']), [10, 12, 10.5])
+        self.assertTrue(np.isnan(df.loc[2, 'height']))
+        # 'name' has mixed types, read as JSON
+        self.assertEqual(df.loc[2, 'name'], 1)
+        self.assertEqual(df.loc[0, 'dead'], False)
+        self.assertEqual(list(text_df['dbh']), ['10', '12', '10.5'])
+
+    def test_merge_property_types(self):
+        self.assertEqual(merge_property_types([]), NULL)
+        self.assertEqual(merge_property_types([NULL, STRING]), STRING)
+        self.assertEqual(merge_property_types([INTEGER, INTEGER]), INTEGER)
+        self.assertEqual(merge_property_types([INTEGER, NUMBER]), NUMBER)
+        self.assertEqual(merge_property_types([INTEGER, STRING]), JSON)
+
+
+if __name__ == '__main__':
+    TestDatabaseManager.setup_test_database()
+    TestDatabaseManager.create_schema(settings.NIAMOTO_SCHEMA)
+    TestDatabaseManager.create_schema(settings.NIAMOTO_RASTER_SCHEMA)
+    TestDatabaseManager.create_schema(settings.NIAMOTO_VECTOR_SCHEMA)
+    unittest.main(exit=False)
+    TestDatabaseManager.teardown_test_database()
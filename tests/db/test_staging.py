@@ -0,0 +1,212 @@
+# coding: utf-8
+
+import unittest
+import io
+import os
+import tempfile
+
+import pandas as pd
+from shapely import wkb
+from shapely.geometry import Point
+from sqlalchemy import select, func, text
+from sqlalchemy.exc import ProgrammingError
+
+from niamoto.testing import set_test_path
+set_test_path()
+
+from niamoto.db.connector import Connector
+from niamoto.db.staging import StagingTable, staging_table, \
+    copy_from_dataframe, read_sql_copy, copy_to_csv, DataFrameCopyReader, \
+    to_hex_ewkb
+from niamoto.conf import settings
+from niamoto.testing.base_tests import BaseTestNiamotoSchemaCreated
+from niamoto.testing.test_database_manager import TestDatabaseManager
+
+
+class TestStaging(BaseTestNiamotoSchemaCreated):
+    """
+    Test case for the staging tables and COPY helpers.
+    """
+
+    COLUMNS = [('id', 'bigint'), ('name', 'text')]
+
+    def _get_dataframe(self):
+        return pd.DataFrame({
+            'id': [1, 2, 3],
+            'name': ['a', None, 'c, "d"'],
+        })
+
+    def _read(self, connection, table_name):
+        return read_sql_copy(
+            select([text('*')]).select_from(text(table_name)),
+            connection,
+            index_col='id'
+        )
+
+    def test_unique_names(self):
+        t1 = StagingTable(self.COLUMNS)
+        t2 = StagingTable(self.COLUMNS)
+        self.assertNotEqual(t1.name, t2.name)
+        self.assertTrue(t1.name.startswith('niamoto_staging_'))
+        t3 = StagingTable(self.COLUMNS, prefix='yo', unlogged=True)
+        self.assertTrue(
+            t3.name.startswith('{}.yo_'.format(settings.NIAMOTO_SCHEMA))
+        )
+        self.assertIn('ON COMMIT DROP', t1.get_create_sql())
+        self.assertIn('UNLOGGED', t3.get_create_sql())
+
+    def test_temporary_staging_table(self):
+        df = self._get_dataframe()
+        with Connector.get_connection() as connection:
+            with connection.begin():
+                with staging_table(connection, self.COLUMNS,
+                                   dataframe=df) as staging:
+                    result = self._read(connection, staging.name)
+                    self.assertEqual(list(result.index), [1, 2, 3])
+                    self.assertEqual(result.loc[3, 'name'], 'c, "d"')
+                    self.assertTrue(pd.isnull(result.loc[2, 'name']))
+                    staging.copy_from_dataframe(
+                        connection,
+                        df[['id']],
+                        columns=['id']
+                    )
+                    count = connection.execute(
+                        select([func.count()]).select_from(
+                            text(staging.name)
+                        )
+                    ).scalar()
+                    self.assertEqual(count, 6)
+                # Dropped when leaving the context
+                self.assertRaises(
+                    ProgrammingError,
+                    connection.execute,
+                    "SELECT * FROM {};".format(staging.name)
+                )
+
+    def test_aborted_transaction(self):
+        with Connector.get_connection() as connection:
+            transaction = connection.begin()
+            try:
+                with staging_table(connection, self.COLUMNS) as staging:
+                    connection.execute(
+                        "SELECT * FROM {}_missing;".format(staging.name)
+                    )
+            except ProgrammingError:
+                transaction.rollback()
+            else:
+                self.fail("The query should have failed.")
+
+    def test_unlogged_staging_table(self):
+        df = self._get_dataframe()
+        with Connector.get_connection() as connection:
+            with staging_table(connection, self.COLUMNS,
+                               unlogged=True) as staging:
+                with connection.begin():
+                    staging.copy_from_dataframe(connection, df)
+                # Visible from other connections, once committed
+                with Connector.get_connection() as other_connection:
+                    result = self._read(other_connection, staging.name)
+                    self.assertEqual(len(result), 3)
+            exists = connection.execute(
+                "SELECT to_regclass('{}');".format(staging.name)
+            ).scalar()
+            self.assertIsNone(exists)
+
+    def test_copy_from_dataframe(self):
+        df = self._get_dataframe().set_index('id')
+        with Connector.get_connection() as connection:
+            with connection.begin():
+                staging = StagingTable(self.COLUMNS)
+                staging.create(connection)
+                copy_from_dataframe(
+                    connection,
+                    df,
+                    staging.name,
+                    ['id', 'name'],
+                    index=True
+                )
+                result = self._read(connection, staging.name)
+                self.assertEqual(list(result.index), [1, 2, 3])
+                self.assertEqual(result.loc[1, 'name'], 'a')
+
+    def test_copy_reader(self):
+        df = self._get_dataframe()
+        expected = df.to_csv(index=False, header=False)
+        reader = DataFrameCopyReader(df, chunk_size=2)
+        self.assertEqual(reader.read(), expected)
+        self.assertEqual(reader.read(), '')
+        # By blocks, over several chunks and dataframes
+        reader = DataFrameCopyReader([df, df], chunk_size=2)
+        blocks = []
+        block = reader.read(3)
+        while block != '':
+            self.assertLessEqual(len(block), 3)
+            blocks.append(block)
+            block = reader.read(3)
+        self.assertEqual(''.join(blocks), expected * 2)
+        self.assertEqual(DataFrameCopyReader(df['id']).read(), '1\n2\n3\n')
+        # Null values and converters
+        reader = DataFrameCopyReader(
+            df.set_index('id'),
+            index=True,
+            chunk_size=1,
+            fill_values={'name': 'NS'},
+            converters={'name': lambda s: s.str.upper()}
+        )
+        self.assertEqual(reader.read(), '1,A\n2,NS\n3,"C, ""D"""\n')
+
+    def test_to_hex_ewkb(self):
+        geometries = pd.Series([Point(166.5, -22.1), None, 'POINT (1 2)'])
+        encoded = to_hex_ewkb(geometries, 4326)
+        self.assertIsNone(encoded[1])
+        point = wkb.loads(encoded[0], hex=True)
+        self.assertEqual((point.x, point.y), (166.5, -22.1))
+        self.assertTrue(encoded[0].upper().startswith('0101000020E6100000'))
+        self.assertEqual(wkb.loads(encoded[2], hex=True).x, 1)
+
+    def test_copy_from_dataframe_chunks(self):
+        df = pd.DataFrame({
+            'id': range(1000),
+            'name': ['name_{}'.format(i) for i in range(1000)],
+        })
+        with Connector.get_connection() as connection:
+            with connection.begin():
+                with staging_table(connection, self.COLUMNS) as staging:
+                    copy_from_dataframe(
+                        connection,
+                        df,
+                        staging.name,
+                        staging.column_names,
+                        chunk_size=64
+                    )
+                    result = self._read(connection, staging.name)
+                    self.assertEqual(len(result), 1000)
+                    self.assertEqual(result.loc[999, 'name'], 'name_999')
+
+    def test_copy_to_csv(self):
+        sel = select([
+            func.generate_series(1, 3).label('id'),
+            func.concat('name_', text("'\"a\", b'")).label('name'),
+        ])
+        with Connector.get_connection() as connection:
+            buffer = io.StringIO()
+            copy_to_csv(sel, connection, buffer)
+            self.assertEqual(
+                buffer.getvalue().splitlines()[:2],
+                ['id,name', '1,"name_""a"", b"']
+            )
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                path = os.path.join(tmp_dir, 'test.csv')
+                copy_to_csv(sel, connection, path)
+                df = pd.read_csv(path, index_col='id')
+        self.assertEqual(list(df.index), [1, 2, 3])
+        self.assertEqual(df.loc[3, 'name'], 'name_"a", b')
+
+
+if __name__ == '__main__':
+    TestDatabaseManager.setup_test_database()
+    TestDatabaseManager.create_schema(settings.NIAMOTO_SCHEMA)
+    TestDatabaseManager.create_schema(settings.NIAMOTO_RASTER_SCHEMA)
+    TestDatabaseManager.create_schema(settings.NIAMOTO_VECTOR_SCHEMA)
+    unittest.main(exit=False)
+    TestDatabaseManager.teardown_test_database()
@@ -0,0 +1,57 @@
+# coding: utf-8
+
+import unittest
+
+from niamoto.testing import set_test_path
+set_test_path()
+
+from niamoto.db.connector import Connector
+from niamoto.db.utils import optimize_db, get_indexes_validity, \
+    INDEX_CREATED, INDEX_REBUILT, INDEX_VALID
+from niamoto.conf import settings
+from niamoto.testing.base_tests import BaseTestNiamotoSchemaCreated
+from niamoto.testing.test_database_manager import TestDatabaseManager
+
+
+class TestOptimizeDb(BaseTestNiamotoSchemaCreated):
+    """
+    Test case for the Niamoto database indexes management.
+    """
+
+    INDEX_NAMES = [
+        'ix_occurrence_niamoto_occurrence_location',
+        'ix_occurrence_niamoto_occurrence_provider_id_provider_pk',
+        'ix_plot_niamoto_plot_location',
+        'ix_plot_niamoto_plot_provider_id_provider_pk',
+        'ix_taxon_niamoto_taxon_mptt_tree_id_mptt_left_mptt_right',
+    ]
+
+    def test_optimize_db(self):
+        with Connector.get_connection() as connection:
+            indexes = get_indexes_validity(connection)
+            for name in self.INDEX_NAMES:
+                self.assertTrue(indexes[name])
+            connection.execute("DROP INDEX {}.{};".format(
+                settings.NIAMOTO_SCHEMA,
+                self.INDEX_NAMES[1]
+            ))
+        report = optimize_db()
+        self.assertEqual(report[self.INDEX_NAMES[1]], INDEX_CREATED)
+        for name in self.INDEX_NAMES[2:]:
+            self.assertEqual(report[name], INDEX_VALID)
+        with Connector.get_connection() as connection:
+            self.assertTrue(
+                get_indexes_validity(connection)[self.INDEX_NAMES[1]]
+            )
+        report = optimize_db(rebuild=True)
+        for name in self.INDEX_NAMES:
+            self.assertEqual(report[name], INDEX_REBUILT)
+
+
+if __name__ == '__main__':
+    TestDatabaseManager.setup_test_database()
+    TestDatabaseManager.create_schema(settings.NIAMOTO_SCHEMA)
+    TestDatabaseManager.create_schema(settings.NIAMOTO_RASTER_SCHEMA)
+    TestDatabaseManager.create_schema(settings.NIAMOTO_VECTOR_SCHEMA)
+    unittest.main(exit=False)
+    TestDatabaseManager.teardown_test_database()
@@ -5,6 +5,7 @@ import os
 from datetime import datetime
 import logging
 
+from sqlalchemy import select
 from sqlalchemy.engine.reflection import Inspector
 
 from niamoto.testing import set_test_path
@@ -20,8 +21,11 @@ from niamoto.conf import settings, NIAMOTO_HOME
 from niamoto.testing.test_database_manager import TestDatabaseManager
 from niamoto.testing.base_tests import BaseTestNiamotoSchemaCreated
 from niamoto.raster.raster_manager import RasterManager
+from niamoto.db.data_version import get_data_version, OCCURRENCE
 from niamoto.db import metadata as niamoto_db_meta
 from niamoto.db.connector import Connector
+from niamoto.db.property_catalog import get_property_keys
+from niamoto.testing.test_data_provider import TestDataProvider
 
 
 class TestRasterManager(BaseTestNiamotoSchemaCreated):
@@ -123,7 +127,8 @@ class TestRasterManager(BaseTestNiamotoSchemaCreated):
             new_name="rainfall_new",
             tile_dimension=(100, 100),
         )
-        df = RasterManager.get_raster_list()
+        df = RasterManager.get_raster_list(alt_index='name')
+        self.assertEqual(df.loc['rainfall_new']['version'], 2)
         engine = Connector.get_engine()
         inspector = Inspector.from_engine(engine)
         self.assertIn(
@@ -139,6 +144,41 @@ class TestRasterManager(BaseTestNiamotoSchemaCreated):
             "rainfall_new",
             properties={'test': 10}
         )
+        df = RasterManager.get_raster_list(alt_index='name')
+        self.assertEqual(df.loc['rainfall_new']['version'], 2)
+
+    def test_index_raster(self):
+        test_raster = os.path.join(
+            NIAMOTO_HOME,
+            "data",
+            "raster",
+            "rainfall_wgs84.tif"
+        )
+        RasterManager.add_raster(
+            "rainfall",
+            test_raster,
+            tile_dimension=(200, 200),
+        )
+        sel = \
+            """
+            SELECT indexname
+            FROM pg_indexes
+            WHERE schemaname = '{}' AND tablename = 'rainfall'
+              AND indexdef ILIKE '%%st_convexhull%%'
+            """.format(settings.NIAMOTO_RASTER_SCHEMA)
+        with Connector.get_connection() as connection:
+            indexes = [r[0] for r in connection.execute(sel)]
+            self.assertEqual(len(indexes), 1)
+            connection.execute("DROP INDEX {}.{};".format(
+                settings.NIAMOTO_RASTER_SCHEMA,
+                indexes[0]
+            ))
+            self.assertEqual(connection.execute(sel).rowcount, 0)
+            RasterManager.index_raster("rainfall", connection=connection)
+            self.assertEqual(connection.execute(sel).rowcount, 1)
+            # Idempotent
+            RasterManager.index_raster("rainfall", connection=connection)
+            self.assertEqual(connection.execute(sel).rowcount, 1)
 
     def test_delete_raster(self):
         test_raster = os.path.join(
@@ -154,6 +194,52 @@ class TestRasterManager(BaseTestNiamotoSchemaCreated):
         )
         RasterManager.delete_raster("rainfall")
 
+    def test_delete_raster_values(self):
+        provider = TestDataProvider.register_data_provider(
+            'test_data_provider_1'
+        )
+        with Connector.get_connection() as connection:
+            connection.execute(niamoto_db_meta.raster_registry.insert({
+                'name': 'raster_1',
+                'date_create': datetime.now(),
+                'properties': {},
+            }))
+            connection.execute(niamoto_db_meta.occurrence.insert(), [
+                {
+                    'id': 0,
+                    'provider_id': provider.db_id,
+                    'provider_pk': 0,
+                    'properties': {'raster_1': 10, 'height': 2},
+                    'raster_versions': {'raster_1': 1, 'raster_2': 1},
+                },
+                {
+                    'id': 1,
+                    'provider_id': provider.db_id,
+                    'provider_pk': 1,
+                    'properties': {'height': 3},
+                    'raster_versions': None,
+                },
+            ])
+        try:
+            version = get_data_version(OCCURRENCE)
+            RasterManager.delete_raster('raster_1')
+            self.assertNotEqual(get_data_version(OCCURRENCE), version)
+            with Connector.get_connection() as connection:
+                rows = connection.execute(
+                    select([
+                        niamoto_db_meta.occurrence.c.properties,
+                        niamoto_db_meta.occurrence.c.raster_versions,
+                    ]).order_by(niamoto_db_meta.occurrence.c.id)
+                ).fetchall()
+            self.assertEqual(rows[0][0], {'height': 2})
+            self.assertEqual(rows[0][1], {'raster_2': 1})
+            self.assertEqual(rows[1][0], {'height': 3})
+            self.assertNotIn('raster_1', get_property_keys('occurrence'))
+        finally:
+            with Connector.get_connection() as connection:
+                connection.execute(niamoto_db_meta.occurrence.delete())
+                connection.execute(niamoto_db_meta.data_provider.delete())
+
     def test_raster_srid(self):
         test_raster = os.path.join(
             NIAMOTO_HOME,
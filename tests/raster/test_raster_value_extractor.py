@@ -4,7 +4,10 @@ import unittest
 import os
 import logging
 
+from sqlalchemy import select, cast
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.engine.reflection import Inspector
+import pandas as pd
 
 from niamoto.testing import set_test_path
 
@@ -60,6 +63,10 @@ class TestRasterValueExtractor(BaseTestNiamotoSchemaCreated):
             "rainfall",
             test_raster,
         )
+        RasterManager.add_raster(
+            "rainfall_2",
+            test_raster,
+        )
         csv_provider.sync()
 
     @classmethod
@@ -88,6 +95,120 @@ class TestRasterValueExtractor(BaseTestNiamotoSchemaCreated):
         df = PlotDataPublisher().process()[0]
         self.assertIn('rainfall', df.columns)
 
+    def test_extract_rasters_values_to_occurrences(self):
+        timings = RasterValueExtractor.extract_rasters_values_to_occurrences(
+            ['rainfall', 'rainfall_2'],
+            timing=True
+        )
+        self.assertEqual(list(timings.keys()), ['rainfall', 'rainfall_2'])
+        df = OccurrenceDataPublisher().process()[0]
+        self.assertIn('rainfall', df.columns)
+        self.assertIn('rainfall_2', df.columns)
+        self.assertEqual(
+            list(df['rainfall'].fillna(-1)),
+            list(df['rainfall_2'].fillna(-1))
+        )
+
+    def test_extract_rasters_values_to_plots(self):
+        r = RasterValueExtractor.extract_rasters_values_to_plots(
+            ['rainfall', 'rainfall_2'],
+        )
+        self.assertIsNone(r)
+        df = PlotDataPublisher().process()[0]
+        self.assertIn('rainfall', df.columns)
+        self.assertIn('rainfall_2', df.columns)
+
+    def test_get_extract_rasters_values_sql(self):
+        names = ['raster_{}'.format(i) for i in range(60)]
+        sql = RasterValueExtractor.get_extract_rasters_values_sql(
+            names,
+            niamoto_db_meta.occurrence
+        )
+        self.assertEqual(sql.count('LEFT JOIN LATERAL'), 60)
+        self.assertEqual(sql.count('ST_ConvexHull(raster_'), 60)
+        self.assertEqual(sql.count('jsonb_build_object'), 2)
+        self.assertEqual(sql.count('UPDATE'), 1)
+
+    def test_extract_rasters_values_incremental(self):
+        occ = niamoto_db_meta.occurrence
+        RasterValueExtractor.extract_rasters_values_to_occurrences(
+            ['rainfall', 'rainfall_2'],
+        )
+        with Connector.get_connection() as connection:
+            versions = connection.execute(
+                select([occ.c.raster_versions])
+            ).fetchall()
+            self.assertTrue(all(
+                v == ({'rainfall': 1, 'rainfall_2': 1}, ) for v in versions
+            ))
+            # Simulate an occurrence updated by a sync, and a value that
+            # would not be extracted again if up to date.
+            occ_id = connection.execute(select([occ.c.id])).scalar()
+            connection.execute(occ.update().where(occ.c.id == occ_id).values({
+                'properties': {},
+                'raster_versions': None,
+            }))
+            connection.execute(occ.update().where(occ.c.id != occ_id).values({
+                'properties': occ.c.properties.op('||')(
+                    cast({'rainfall_2': -1}, JSONB)
+                ),
+            }))
+        RasterValueExtractor.extract_rasters_values_to_occurrences(
+            ['rainfall', 'rainfall_2'],
+            incremental=True
+        )
+        with Connector.get_connection() as connection:
+            df = pd.read_sql(select([occ]), connection, index_col='id')
+        self.assertIn('rainfall', df.loc[occ_id]['properties'])
+        self.assertNotEqual(df.loc[occ_id]['properties']['rainfall_2'], -1)
+        others = df[df.index != occ_id]['properties']
+        self.assertTrue(all(p['rainfall_2'] == -1 for p in others))
+        self.assertEqual(
+            df.loc[occ_id]['raster_versions'],
+            {'rainfall': 1, 'rainfall_2': 1}
+        )
+
+    def test_get_extract_rasters_values_sql_incremental(self):
+        sql = RasterValueExtractor.get_extract_rasters_values_sql(
+            ['rainfall', 'elevation'],
+            niamoto_db_meta.plot,
+            versions={'rainfall': 3},
+            incremental=True
+        )
+        self.assertEqual(sql.count('LEFT JOIN LATERAL'), 2)
+        self.assertIn(
+            "COALESCE((t.raster_versions ->> 'rainfall')::integer, 0) <> 3",
+            sql
+        )
+        self.assertIn(
+            "COALESCE((t.raster_versions ->> 'elevation')::integer, 0) <> 1",
+            sql
+        )
+        self.assertIn('{"rainfall": 3, "elevation": 1}', sql)
+
+    def test_get_rasters_timings(self):
+        plan = [{'Plan': {
+            'Node Type': 'ModifyTable',
+            'Plans': [{
+                'Node Type': 'Nested Loop',
+                'Plans': [
+                    {'Node Type': 'Seq Scan', 'Alias': 't',
+                     'Actual Total Time': 10, 'Actual Loops': 1},
+                    {'Node Type': 'Seq Scan', 'Alias': 'raster_0',
+                     'Actual Total Time': 0.5, 'Actual Loops': 100},
+                    {'Node Type': 'Limit', 'Plans': [
+                        {'Node Type': 'Seq Scan', 'Alias': 'raster_1',
+                         'Actual Total Time': 0.25, 'Actual Loops': 100},
+                    ]},
+                ],
+            }],
+        }}]
+        timings = RasterValueExtractor.get_rasters_timings(
+            ['rainfall', 'elevation'],
+            plan
+        )
+        self.assertEqual(timings, {'rainfall': 0.05, 'elevation': 0.025})
+
 
 if __name__ == '__main__':
     TestDatabaseManager.setup_test_database()
@@ -14,6 +14,7 @@ from niamoto.db import metadata as niamoto_db_meta
 from niamoto.testing.test_database_manager import TestDatabaseManager
 from niamoto.testing.base_tests import BaseTestNiamotoSchemaCreated
 from niamoto.testing.mptt import make_taxon_tree
+from niamoto.exceptions import NoRecordFoundError, RecordAlreadyExistsError
 
 
 class TestMPTT(BaseTestNiamotoSchemaCreated):
@@ -91,6 +92,142 @@ class TestMPTT(BaseTestNiamotoSchemaCreated):
              13, 15, 15, 15, 13, 19, 19, 21, 19, 23]
         )
 
+    def test_construct_mptt_deep_tree(self):
+        # Deeper than the default recursion limit
+        depth = 5000
+        df = pd.DataFrame(
+            {'parent_id': [None] + list(range(1, depth))},
+            index=range(1, depth + 1),
+        )
+        for col in ['mptt_tree_id', 'mptt_depth', 'mptt_left', 'mptt_right']:
+            df[col] = 0
+        mptt = TaxonomyManager.construct_mptt(df)
+        self.assertEqual(list(mptt['mptt_tree_id']), [1] * depth)
+        self.assertEqual(list(mptt['mptt_depth']), list(range(depth)))
+        self.assertEqual(list(mptt['mptt_left']), list(range(1, depth + 1)))
+        self.assertEqual(
+            list(mptt['mptt_right']),
+            list(range(2 * depth, depth, -1))
+        )
+
+    def _insert_simple_tree(self):
+        tree = [
+            [1, [1, ]],
+            [1, ]
+        ]
+        data, last_id = make_taxon_tree(tree)
+        ins = niamoto_db_meta.taxon.insert().values(data)
+        with Connector.get_connection() as connection:
+            connection.execute(ins)
+        TaxonomyManager.make_mptt()
+
+    def _get_mptt_values(self):
+        mptt = TaxonomyManager.get_raw_taxon_dataframe().sort_index()
+        return [
+            list(mptt[col]) for col in
+            ['mptt_tree_id', 'mptt_left', 'mptt_right', 'mptt_depth']
+        ]
+
+    def test_add_taxon(self):
+        self._insert_simple_tree()
+        TaxonomyManager.add_taxon(
+            7, 'taxon_7', 'taxon_7', 'FAMILIA', parent_id=3
+        )
+        tree_id, left, right, depth = self._get_mptt_values()
+        self.assertEqual(tree_id, [1, 1, 1, 1, 5, 5, 1])
+        self.assertEqual(left, [1, 2, 4, 5, 1, 2, 7])
+        self.assertEqual(right, [10, 3, 9, 6, 4, 3, 8])
+        self.assertEqual(depth, [0, 1, 1, 2, 0, 1, 2])
+        TaxonomyManager.add_taxon(8, 'taxon_8', 'taxon_8', 'FAMILIA')
+        tree_id, left, right, depth = self._get_mptt_values()
+        self.assertEqual(tree_id[-1], 8)
+        self.assertEqual([left[-1], right[-1], depth[-1]], [1, 2, 0])
+        self.assertRaises(
+            RecordAlreadyExistsError,
+            TaxonomyManager.add_taxon,
+            8, 'taxon_9', 'taxon_9', 'FAMILIA',
+        )
+        self.assertRaises(
+            NoRecordFoundError,
+            TaxonomyManager.add_taxon,
+            9, 'taxon_9', 'taxon_9', 'FAMILIA', parent_id=42,
+        )
+
+    def test_move_taxon(self):
+        self._insert_simple_tree()
+        # Same tree, to the left
+        TaxonomyManager.move_taxon(4, 2)
+        tree_id, left, right, depth = self._get_mptt_values()
+        self.assertEqual(tree_id, [1, 1, 1, 1, 5, 5])
+        self.assertEqual(left, [1, 2, 6, 3, 1, 2])
+        self.assertEqual(right, [8, 5, 7, 4, 4, 3])
+        self.assertEqual(depth, [0, 1, 1, 2, 0, 1])
+        # Same tree, to the right
+        TaxonomyManager.move_taxon(2, 3)
+        tree_id, left, right, depth = self._get_mptt_values()
+        self.assertEqual(left, [1, 3, 2, 4, 1, 2])
+        self.assertEqual(right, [8, 6, 7, 5, 4, 3])
+        self.assertEqual(depth, [0, 2, 1, 3, 0, 1])
+        # Other tree
+        TaxonomyManager.move_taxon(3, 5)
+        tree_id, left, right, depth = self._get_mptt_values()
+        self.assertEqual(tree_id, [1, 5, 5, 5, 5, 5])
+        self.assertEqual(left, [1, 5, 4, 6, 1, 2])
+        self.assertEqual(right, [2, 8, 9, 7, 10, 3])
+        self.assertEqual(depth, [0, 2, 1, 3, 0, 1])
+        # New tree
+        TaxonomyManager.move_taxon(2, None)
+        tree_id, left, right, depth = self._get_mptt_values()
+        self.assertEqual(tree_id, [1, 2, 5, 2, 5, 5])
+        self.assertEqual(left, [1, 1, 4, 2, 1, 2])
+        self.assertEqual(right, [2, 4, 5, 3, 6, 3])
+        self.assertEqual(depth, [0, 0, 1, 1, 0, 1])
+        mptt = TaxonomyManager.get_raw_taxon_dataframe().sort_index()
+        self.assertTrue(pd.isnull(mptt.loc[2]['parent_id']))
+        self.assertRaises(ValueError, TaxonomyManager.move_taxon, 2, 4)
+
+    def _get_row_versions(self):
+        with Connector.get_connection() as connection:
+            return dict(connection.execute(
+                "SELECT id, xmin::text FROM {}.taxon;".format(
+                    settings.NIAMOTO_SCHEMA
+                )
+            ).fetchall())
+
+    def test_move_taxon_affected_rows(self):
+        self._insert_simple_tree()
+        # Same tree: 1 and the other tree are not rewritten
+        versions = self._get_row_versions()
+        TaxonomyManager.move_taxon(4, 2)
+        new_versions = self._get_row_versions()
+        self.assertEqual(
+            sorted(i for i in versions if versions[i] != new_versions[i]),
+            [2, 3, 4]
+        )
+        # Other tree: the nodes before the moved subtree are not rewritten
+        versions = new_versions
+        TaxonomyManager.move_taxon(3, 6)
+        new_versions = self._get_row_versions()
+        self.assertEqual(
+            sorted(i for i in versions if versions[i] != new_versions[i]),
+            [1, 3, 5, 6]
+        )
+
+    def test_delete_subtree(self):
+        self._insert_simple_tree()
+        deleted = TaxonomyManager.delete_subtree(3)
+        self.assertEqual(deleted, 2)
+        tree_id, left, right, depth = self._get_mptt_values()
+        self.assertEqual(tree_id, [1, 1, 5, 5])
+        self.assertEqual(left, [1, 2, 1, 2])
+        self.assertEqual(right, [4, 3, 4, 3])
+        self.assertEqual(depth, [0, 1, 0, 1])
+        self.assertRaises(
+            NoRecordFoundError,
+            TaxonomyManager.delete_subtree,
+            3
+        )
+
 if __name__ == '__main__':
     TestDatabaseManager.setup_test_database()
     TestDatabaseManager.create_schema(settings.NIAMOTO_SCHEMA)
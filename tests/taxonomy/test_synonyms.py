@@ -2,6 +2,8 @@
 
 import unittest
 
+import numpy as np
+import pandas as pd
 from sqlalchemy.exc import IntegrityError
 
 from niamoto.testing import set_test_path
@@ -9,6 +11,7 @@ set_test_path()
 
 from niamoto.taxonomy.taxonomy_manager import TaxonomyManager
 from niamoto.db.connector import Connector
+from niamoto.db.data_version import bump_data_version, TAXONOMY
 from niamoto.db import metadata as niamoto_db_meta
 from niamoto.conf import settings
 from niamoto.exceptions import MalformedDataSourceError, NoRecordFoundError, \
@@ -94,10 +97,7 @@ class TestSynonymsTaxon(BaseTestNiamotoSchemaCreated):
         df2 = TaxonomyManager.get_raw_taxon_dataframe()
         self.assertEqual(
             df2.loc[0]['synonyms'],
-            {
-                synonym_key: 1,
-                synonym_key: 2,
-            }
+            {synonym_key: 2}
         )
 
     def test_duplicate_synonym(self):
@@ -190,6 +190,151 @@ class TestSynonymsTaxon(BaseTestNiamotoSchemaCreated):
         with Connector.get_connection() as connection:
             TaxonomyManager.get_synonym_key("test", bind=connection)
 
+    def _insert_taxa(self, synonyms):
+        data = [
+            {
+                'id': i,
+                'full_name': 'Family {}'.format(i),
+                'rank_name': 'Family',
+                'rank': niamoto_db_meta.TaxonRankEnum.FAMILIA,
+                'parent_id': None,
+                'synonyms': syno,
+                'mptt_left': 0,
+                'mptt_right': 0,
+                'mptt_tree_id': 0,
+                'mptt_depth': 0,
+            } for i, syno in enumerate(synonyms)
+        ]
+        ins = niamoto_db_meta.taxon.insert().values(data)
+        with Connector.get_connection() as connection:
+            connection.execute(ins)
+
+    def test_synonyms_cache(self):
+        synonym_key = "synonym_key_1"
+        TaxonomyManager.register_synonym_key(synonym_key)
+        self._insert_taxa([{synonym_key: 30}, {synonym_key: 10}, {}])
+        version = TaxonomyManager.get_taxonomy_version()
+        keys, values = TaxonomyManager.get_synonyms_arrays(synonym_key)
+        self.assertEqual(list(keys), [10, 30])
+        self.assertEqual(list(values), [1, 0])
+        self.assertEqual(keys.dtype, np.int64)
+        # Served from the cache
+        keys_2, values_2 = TaxonomyManager.get_synonyms_arrays(synonym_key)
+        self.assertIs(keys, keys_2)
+        self.assertIs(values, values_2)
+        # Invalidated by a synonym modification
+        TaxonomyManager.add_synonym_for_single_taxon(2, synonym_key, 20)
+        self.assertGreater(TaxonomyManager.get_taxonomy_version(), version)
+        keys, values = TaxonomyManager.get_synonyms_arrays(synonym_key)
+        self.assertEqual(list(keys), [10, 20, 30])
+        self.assertEqual(list(values), [1, 2, 0])
+        identity = TaxonomyManager.get_synonyms_for_key(
+            TaxonomyManager.IDENTITY_SYNONYM_KEY
+        )
+        self.assertEqual(list(identity.index), [0, 1, 2])
+        TaxonomyManager.load_synonyms_cache()
+        self.assertIn(synonym_key, TaxonomyManager._SYNONYMS_CACHE)
+        # Invalidated by a modification made by another process, which
+        # only increments the version in the database.
+        with Connector.get_connection() as connection:
+            connection.execute(
+                niamoto_db_meta.taxon.update().where(
+                    niamoto_db_meta.taxon.c.id == 2
+                ).values(synonyms={synonym_key: 40})
+            )
+        keys, values = TaxonomyManager.get_synonyms_arrays(synonym_key)
+        self.assertEqual(list(keys), [10, 20, 30])
+        bump_data_version(TAXONOMY)
+        keys, values = TaxonomyManager.get_synonyms_arrays(synonym_key)
+        self.assertEqual(list(keys), [10, 30, 40])
+
+    def test_map_synonyms(self):
+        synonym_key = "synonym_key_1"
+        TaxonomyManager.register_synonym_key(synonym_key)
+        self._insert_taxa([{synonym_key: 30}, {synonym_key: 10}])
+        provider_ids = pd.Series([10, None, 30, 40, 10], index=[5, 4, 3, 2, 1])
+        mapping = TaxonomyManager.map_synonyms(synonym_key, provider_ids)
+        expected = provider_ids.map(
+            TaxonomyManager.get_synonyms_for_key(synonym_key)
+        )
+        pd.testing.assert_series_equal(mapping, expected)
+        mapping = TaxonomyManager.map_synonyms(
+            synonym_key,
+            pd.Series([30, 10])
+        )
+        self.assertEqual(list(mapping), [0, 1])
+        self.assertEqual(mapping.dtype, np.int64)
+        mapping = TaxonomyManager.map_synonyms(None, provider_ids)
+        self.assertTrue(mapping.isnull().all())
+
+    def test_set_synonym_data(self):
+        synonym_key = "synonym_key_1"
+        TaxonomyManager.register_synonym_key(synonym_key)
+        self._insert_taxa([
+            {synonym_key: 10}, {synonym_key: 20}, {}, {synonym_key: 40},
+        ])
+        # Exchange the synonyms of the taxa 0 and 1, set the one of 2
+        data = pd.DataFrame({
+            'taxon_id': [0, 1, 2, 3],
+            'provider_taxon_id': [20, 10, 30, None],
+        })
+        updated = TaxonomyManager.set_synonym_data(synonym_key, data)
+        self.assertEqual(updated, 3)
+        synonyms = TaxonomyManager.get_synonyms_for_key(synonym_key)
+        self.assertEqual(
+            dict(synonyms),
+            {20: 0, 10: 1, 30: 2, 40: 3}
+        )
+        # Taxon id as index
+        data = pd.DataFrame(
+            {'provider_taxon_id': [50]},
+            index=pd.Index([2], name='taxon_id')
+        )
+        TaxonomyManager.set_synonym_data(synonym_key, data)
+        synonyms = TaxonomyManager.get_synonyms_for_key(synonym_key)
+        self.assertEqual(synonyms[50], 2)
+        # Duplicates
+        data = pd.DataFrame({
+            'taxon_id': [0, 1],
+            'provider_taxon_id': [60, 60],
+        })
+        self.assertRaises(
+            MalformedDataSourceError,
+            TaxonomyManager.set_synonym_data,
+            synonym_key, data
+        )
+        # Already used by another taxon
+        data = pd.DataFrame({'taxon_id': [0], 'provider_taxon_id': [40]})
+        self.assertRaises(
+            RecordAlreadyExistsError,
+            TaxonomyManager.set_synonym_data,
+            synonym_key, data
+        )
+        # Unknown taxon
+        data = pd.DataFrame({'taxon_id': [99], 'provider_taxon_id': [70]})
+        self.assertRaises(
+            NoRecordFoundError,
+            TaxonomyManager.set_synonym_data,
+            synonym_key, data
+        )
+        # Nothing changed by the failed calls
+        synonyms = TaxonomyManager.get_synonyms_for_key(synonym_key)
+        self.assertEqual(
+            dict(synonyms),
+            {20: 0, 10: 1, 50: 2, 40: 3}
+        )
+        # Reserved and unregistered keys
+        self.assertRaises(
+            MalformedDataSourceError,
+            TaxonomyManager.set_synonym_data,
+            TaxonomyManager.IDENTITY_SYNONYM_KEY, data
+        )
+        self.assertRaises(
+            NoRecordFoundError,
+            TaxonomyManager.set_synonym_data,
+            "unregistered", data
+        )
+
     def test_register_unregister_unique_constraints(self):
         TaxonomyManager._register_unique_synonym_key_constraint("Yo")
         TaxonomyManager._unregister_unique_synonym_key_constraint("Yo")
@@ -20,5 +20,9 @@ DATABASES = {
 NIAMOTO_DATABASE = DATABASES['niamoto']
 TEST_DATABASE = NIAMOTO_DATABASE
 
+NIAMOTO_PUBLISHER_CACHE = {
+    'ENABLED': False,
+}
+
 DEFAULT_POSTGRES_SUPERUSER = 'postgres'
 DEFAULT_POSTGRES_SUPERUSER_PASSWORD = 'postgres'